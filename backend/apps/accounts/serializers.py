@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from django.contrib.auth import get_user_model
+from django.contrib.auth import get_user_model, user_logged_in
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import UserProfile
@@ -153,6 +153,9 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         
         # Add user data
         data['user'] = UserSerializer(self.user).data
+
+        # Let other apps act on the login, e.g. merge the visitor's cart
+        user_logged_in.send(sender=self.user.__class__, request=self.context.get('request'), user=self.user)
         
         return data
 
@@ -0,0 +1,50 @@
+"""
+Admin configuration for customers app.
+"""
+
+from django.contrib import admin
+from .models import Customer, DuplicateCandidate, LoyaltyAccrual, LoyaltyTransaction
+
+
+@admin.register(Customer)
+class CustomerAdmin(admin.ModelAdmin):
+    """Admin for Customer model."""
+    list_display = ('name', 'phone', 'email', 'points_balance', 'tier', 'segment', 'created_at')
+    search_fields = ('name', 'phone', 'email')
+    list_filter = ('tier', 'segment')
+    readonly_fields = (
+        'points_balance', 'last_purchase_at', 'purchase_count', 'total_spent', 'recency_score', 'frequency_score',
+        'monetary_score', 'segment', 'tier', 'scored_at', 'merged_into',
+    )
+
+
+@admin.register(LoyaltyTransaction)
+class LoyaltyTransactionAdmin(admin.ModelAdmin):
+    """Admin for the append-only loyalty ledger."""
+    list_display = ('customer', 'kind', 'points', 'reference', 'created_at')
+    list_filter = ('kind',)
+    search_fields = ('customer__name', 'customer__phone', 'reference')
+    list_select_related = ('customer',)
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(LoyaltyAccrual)
+class LoyaltyAccrualAdmin(admin.ModelAdmin):
+    """Admin for points waiting for the batch worker."""
+    list_display = ('customer', 'points', 'reference', 'created_at')
+    search_fields = ('reference',)
+
+
+@admin.register(DuplicateCandidate)
+class DuplicateCandidateAdmin(admin.ModelAdmin):
+    """Admin for reviewing possible duplicate customers."""
+    list_display = ('customer', 'duplicate', 'score', 'reasons', 'status', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('customer__name', 'customer__phone', 'duplicate__name', 'duplicate__phone')
+    list_select_related = ('customer', 'duplicate')
+    raw_id_fields = ('customer', 'duplicate')
@@ -5,3 +5,7 @@ class CustomersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.customers'
     label = 'customers'
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import apps.customers.signals
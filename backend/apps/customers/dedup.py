@@ -0,0 +1,234 @@
+"""
+Duplicate customer detection.
+
+Comparing every customer with every other is out of the question, so
+customers are only compared within blocks: groups sharing a normalized
+blocking key. Each customer gets up to three keys, stored in
+CustomerMatchKey:
+
+- ``p:`` the last 10 digits of the phone number, so ``+8801712345678``
+  and ``01712345678`` meet;
+- ``e:`` the email local part, lowercased, without dots or a ``+tag``;
+- ``n:`` the Soundex codes of the name's words, in order.
+
+Keys are rebuilt a chunk of customers at a time. Candidate pairs are then
+drawn from blocks a batch of keys at a time; blocks larger than
+CUSTOMER_DEDUP_MAX_BLOCK (common names, shared office numbers) are skipped.
+Each batch of pairs is scored from one query for the customers involved,
+and pairs scoring at least CUSTOMER_DEDUP_MIN_SCORE are stored as
+DuplicateCandidate rows for review or ``CustomerService.merge``.
+"""
+
+import re
+import unicodedata
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from .lookup import normalize
+from .models import Customer, CustomerMatchKey, DuplicateCandidate
+
+PHONE_DIGITS = 10
+
+# Blocks whose members are fetched together
+BLOCK_BATCH = 500
+
+_SOUNDEX = str.maketrans('bfpvcgjkqsxzdtlmnr', '111122222222334556')
+
+_WORDS = re.compile(r'[a-z]+')
+
+
+def soundex(word):
+    """American Soundex code of a lowercase ASCII word, e.g. ``r163``."""
+    codes = word.translate(_SOUNDEX)
+    result, previous = word[0], codes[0]
+    for letter, code in zip(word[1:], codes[1:]):
+        if code.isdigit() and code != previous:
+            result += code
+        if letter not in 'hw':
+            previous = code
+    return (result + '000')[:4]
+
+
+def _ascii_words(name):
+    """Lowercase ASCII words of a name."""
+    text = unicodedata.normalize('NFKD', name or '').encode('ascii', 'ignore').decode().lower()
+    return _WORDS.findall(text)
+
+
+def phone_key(phone):
+    """Last digits of a phone number, or '' when too short to compare."""
+    digits = normalize(phone)
+    return digits[-PHONE_DIGITS:] if len(digits) >= PHONE_DIGITS - 3 else ''
+
+
+def email_parts(email):
+    """Normalized local part and domain of an email address."""
+    local, _, domain = (email or '').strip().lower().partition('@')
+    return local.split('+', 1)[0].replace('.', ''), domain
+
+
+def name_key(name):
+    """Soundex codes of the name's words."""
+    return ' '.join(soundex(word) for word in _ascii_words(name))
+
+
+def blocking_keys(name, phone, email):
+    """Blocking keys of one customer."""
+    keys = []
+    if phone_key(phone):
+        keys.append(f'p:{phone_key(phone)}')
+    local, _ = email_parts(email)
+    if local:
+        keys.append(f'e:{local}')
+    if name_key(name):
+        keys.append(f'n:{name_key(name)}')
+    return keys
+
+
+def index_keys(customer_ids):
+    """Rebuild the blocking keys of a chunk of customers; returns the keys written."""
+    rows = Customer.objects.filter(pk__in=customer_ids, is_deleted=False).values_list('pk', 'name', 'phone', 'email')
+    keys = [
+        CustomerMatchKey(customer_id=pk, key=key)
+        for pk, name, phone, email in rows
+        for key in blocking_keys(name, phone, email)
+    ]
+    with transaction.atomic():
+        CustomerMatchKey.objects.filter(customer_id__in=customer_ids).delete()
+        CustomerMatchKey.objects.bulk_create(keys)
+    return len(keys)
+
+
+def customer_chunks(chunk_size):
+    """Ids of every live customer, a chunk at a time in key order."""
+    last = None
+    while True:
+        customers = Customer.objects.filter(is_deleted=False).order_by('pk')
+        if last is not None:
+            customers = customers.filter(pk__gt=last)
+        chunk = list(customers.values_list('pk', flat=True)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def score(a, b):
+    """
+    Match score of two customers from 0 to 1 and the fields that matched.
+
+    ``a`` and ``b`` are dicts of ``name``, ``phone`` and ``email``.
+    """
+    total, reasons = 0.0, []
+    if phone_key(a['phone']) and phone_key(a['phone']) == phone_key(b['phone']):
+        total += 0.5
+        reasons.append('phone')
+    (a_local, a_domain), (b_local, b_domain) = email_parts(a['email']), email_parts(b['email'])
+    if a_local and a_local == b_local:
+        total += 0.4 if a_domain == b_domain else 0.2
+        reasons.append('email')
+    a_name, b_name = ' '.join(_ascii_words(a['name'])), ' '.join(_ascii_words(b['name']))
+    if a_name and b_name:
+        similarity = SequenceMatcher(None, a_name, b_name).ratio()
+        if similarity >= 0.8:
+            reasons.append('name')
+        total += 0.3 * similarity
+    return round(min(total, 1.0), 3), reasons
+
+
+def survivor_order(customer):
+    """Sort key putting the customer a merge should keep first."""
+    return (customer['user_id'] is None, -customer['purchase_count'], customer['created_at'])
+
+
+def score_pairs(pairs):
+    """
+    Score a batch of customer id pairs and store those scoring at least
+    CUSTOMER_DEDUP_MIN_SCORE that were never proposed before.
+
+    Returns:
+        Number of candidates stored
+    """
+    ids = {pk for pair in pairs for pk in pair}
+    customers = {
+        row['pk']: row
+        for row in Customer.objects.filter(pk__in=ids, is_deleted=False).values(
+            'pk', 'name', 'phone', 'email', 'user_id', 'purchase_count', 'created_at',
+        )
+    }
+    known = {
+        frozenset(pair)
+        for pair in DuplicateCandidate.objects
+        .filter(customer_id__in=ids, duplicate_id__in=ids)
+        .values_list('customer_id', 'duplicate_id')
+    }
+    candidates = []
+    for pair in pairs:
+        if frozenset(pair) in known or not all(pk in customers for pk in pair):
+            continue
+        kept, folded = sorted((customers[pk] for pk in pair), key=survivor_order)
+        pair_score, reasons = score(kept, folded)
+        if pair_score >= settings.CUSTOMER_DEDUP_MIN_SCORE:
+            candidates.append(DuplicateCandidate(
+                customer_id=kept['pk'],
+                duplicate_id=folded['pk'],
+                score=pair_score,
+                reasons=','.join(reasons),
+            ))
+    DuplicateCandidate.objects.bulk_create(candidates, ignore_conflicts=True)
+    return len(candidates)
+
+
+def find_candidates(batch_size=None):
+    """
+    Compare the customers of every block, BLOCK_BATCH blocks at a time,
+    scoring ``batch_size`` pairs at a time.
+
+    Returns:
+        Number of candidates stored
+    """
+    batch_size = batch_size or settings.CUSTOMER_DEDUP_CHUNK
+    blocks = (
+        CustomerMatchKey.objects
+        .values('key')
+        .annotate(size=Count('customer'))
+        .filter(size__gte=2, size__lte=settings.CUSTOMER_DEDUP_MAX_BLOCK)
+        .order_by('key')
+    )
+    found, last = 0, None
+    while True:
+        batch = blocks.filter(key__gt=last) if last is not None else blocks
+        keys = list(batch.values_list('key', flat=True)[:BLOCK_BATCH])
+        if not keys:
+            return found
+        members = {}
+        for key, customer_id in CustomerMatchKey.objects.filter(key__in=keys).values_list('key', 'customer_id'):
+            members.setdefault(key, []).append(customer_id)
+        pairs = sorted({
+            tuple(sorted(pair))
+            for block in members.values()
+            for pair in combinations(block, 2)
+        })
+        for start in range(0, len(pairs), batch_size):
+            found += score_pairs(pairs[start:start + batch_size])
+        last = keys[-1]
+
+
+def run(chunk_size=None):
+    """
+    Rebuild every customer's blocking keys, then find candidate pairs.
+
+    Returns:
+        Tuple of customers indexed and candidates stored
+    """
+    chunk_size = chunk_size or settings.CUSTOMER_DEDUP_CHUNK
+    indexed = 0
+    for chunk in customer_chunks(chunk_size):
+        index_keys(chunk)
+        indexed += len(chunk)
+    CustomerMatchKey.objects.filter(customer__is_deleted=True).delete()
+    return indexed, find_candidates(chunk_size)
@@ -0,0 +1,149 @@
+"""
+Customer lookup at the till by phone prefix.
+
+Cashiers find loyalty members by typing phone digits. Each worker process
+keeps every customer's phone number in a sorted in-memory array, so the
+matches for the digits typed so far are a binary search and a short scan
+away and no keystroke reaches the database.
+
+Numbers are normalized to their digits, as allowed by the accounts phone
+format (``+8801712345678``). Numbers starting with CUSTOMER_PHONE_COUNTRY_CODE
+are also indexed in national form (``01712345678``), which is how they are
+usually typed at the till.
+
+Customer saves update the index of the worker that made them once the
+transaction commits (see ``signals``). Every worker also picks up the
+customers written elsewhere, reading rows updated since its last sync at
+most once every CUSTOMER_LOOKUP_SYNC_SECONDS.
+"""
+
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Customer
+
+FIELDS = ('pk', 'name', 'phone', 'is_deleted')
+
+# Customers saved just before a sync may commit after it with an earlier
+# updated_at; each sync looks back this much further
+OVERLAP = timedelta(minutes=1)
+
+_NON_DIGITS = re.compile(r'\D')
+
+
+def normalize(phone):
+    """Digits of a phone number or typed prefix, without the ``+``, spaces or dashes."""
+    return _NON_DIGITS.sub('', phone or '')
+
+
+def phone_keys(phone):
+    """Forms a phone number is indexed under."""
+    digits = normalize(phone)
+    if not digits:
+        return []
+    keys = [digits]
+    country = settings.CUSTOMER_PHONE_COUNTRY_CODE
+    if country and digits.startswith(country) and len(digits) > len(country):
+        keys.append(digits[len(country):] if digits[len(country)] == '0' else '0' + digits[len(country):])
+    return keys
+
+
+class PhoneIndex:
+    """
+    Sorted array of ``(phone key, customer id)`` with each customer's
+    match entry; one instance is shared by the threads of a worker.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.keys = []
+        self.entries = {}
+        self.loaded = False
+        self.synced_at = None
+        self.checked = 0.0
+
+    def _remove(self, customer_id):
+        entry = self.entries.pop(customer_id, None)
+        if entry is None:
+            return
+        for key in phone_keys(entry['phone']):
+            position = bisect_left(self.keys, (key, customer_id))
+            if position < len(self.keys) and self.keys[position] == (key, customer_id):
+                del self.keys[position]
+
+    def _add(self, customer_id, name, phone):
+        self.entries[customer_id] = {'id': str(customer_id), 'name': name, 'phone': phone}
+        for key in phone_keys(phone):
+            insort(self.keys, (key, customer_id))
+
+    def apply(self, rows):
+        """Add, move or drop the customers in ``rows`` of FIELDS."""
+        with self.lock:
+            for customer_id, name, phone, is_deleted in rows:
+                self._remove(customer_id)
+                if not is_deleted and phone:
+                    self._add(customer_id, name, phone)
+
+    def load(self):
+        """Replace the index with every customer from the database."""
+        synced_at = timezone.now()
+        keys, entries = [], {}
+        rows = Customer.objects.filter(is_deleted=False).exclude(phone='').values_list(*FIELDS[:-1])
+        for customer_id, name, phone in rows.iterator(chunk_size=5000):
+            entries[customer_id] = {'id': str(customer_id), 'name': name, 'phone': phone}
+            keys.extend((key, customer_id) for key in phone_keys(phone))
+        keys.sort()
+        with self.lock:
+            self.keys, self.entries = keys, entries
+            self.loaded, self.synced_at, self.checked = True, synced_at, time.monotonic()
+
+    def sync(self):
+        """Load the index on first use, then apply customers written since the last sync."""
+        if not self.loaded:
+            self.load()
+            return
+        if time.monotonic() - self.checked < settings.CUSTOMER_LOOKUP_SYNC_SECONDS:
+            return
+        since, synced_at = self.synced_at, timezone.now()
+        self.checked = time.monotonic()
+        self.apply(Customer.objects.filter(updated_at__gte=since - OVERLAP).values_list(*FIELDS))
+        self.synced_at = synced_at
+
+    def search(self, prefix, limit):
+        """Entries of up to ``limit`` customers whose number starts with ``prefix``."""
+        found = {}
+        with self.lock:
+            position = bisect_left(self.keys, (prefix,))
+            while position < len(self.keys) and len(found) < limit:
+                key, customer_id = self.keys[position]
+                if not key.startswith(prefix):
+                    break
+                found.setdefault(customer_id, self.entries[customer_id])
+                position += 1
+        return list(found.values())
+
+    def clear(self):
+        """Forget every customer; the next search loads the index again."""
+        with self.lock:
+            self.keys, self.entries, self.loaded = [], {}, False
+
+
+index = PhoneIndex()
+
+
+def search(typed, limit=None):
+    """
+    Customers whose phone number starts with the typed digits, in number
+    order; nothing until CUSTOMER_LOOKUP_MIN_DIGITS digits are typed.
+    """
+    prefix = normalize(typed)
+    if len(prefix) < settings.CUSTOMER_LOOKUP_MIN_DIGITS:
+        return []
+    index.sync()
+    return index.search(prefix, limit or settings.CUSTOMER_LOOKUP_LIMIT)
@@ -0,0 +1,45 @@
+"""
+Find duplicate customers, and optionally merge the surest matches.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.customers import dedup
+from apps.customers.models import DuplicateCandidate
+from apps.customers.services import CustomerService
+from core.exceptions import InvalidOperationError
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds blocking keys, stores duplicate candidates and with --merge merges the surest ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk', type=int, default=None, help='Customers keyed or pairs scored per chunk')
+        parser.add_argument(
+            '--merge', action='store_true',
+            help='Merge pending candidates scoring at least CUSTOMER_DEDUP_MERGE_SCORE',
+        )
+
+    def handle(self, *args, **options):
+        indexed, found = dedup.run(chunk_size=options['chunk'])
+        self.stdout.write(f'Keyed {indexed} customers, found {found} new duplicate candidates.')
+        if not options['merge']:
+            return
+
+        merged = skipped = 0
+        candidates = (
+            DuplicateCandidate.objects
+            .filter(status=DuplicateCandidate.STATUS_PENDING, score__gte=settings.CUSTOMER_DEDUP_MERGE_SCORE)
+            .select_related('customer', 'duplicate')
+            .order_by('-score', 'pk')
+        )
+        for candidate in candidates.iterator(chunk_size=500):
+            try:
+                CustomerService.merge(candidate.customer, candidate.duplicate)
+            except InvalidOperationError as exc:
+                skipped += 1
+                self.stderr.write(f'Skipped {candidate}: {exc}')
+            else:
+                merged += 1
+        self.stdout.write(self.style.SUCCESS(f'Merged {merged} duplicates, skipped {skipped}.'))
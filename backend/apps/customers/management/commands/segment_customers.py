@@ -0,0 +1,23 @@
+"""
+Rescore customers' RFM segments and loyalty tiers.
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.customers import segmentation
+
+
+class Command(BaseCommand):
+    help = 'Scores customers whose purchases changed since the last run, or everyone with --full'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rescore every customer')
+        parser.add_argument('--chunk', type=int, default=None, help='Customers scored per chunk')
+
+    def handle(self, *args, **options):
+        segmentation_run = segmentation.run(full=options['full'], chunk_size=options['chunk'])
+        elapsed = (segmentation_run.finished_at - segmentation_run.started_at).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {segmentation_run.customers} customers ({'full' if segmentation_run.is_full else 'changed only'}) "
+            f"in {elapsed:.1f}s."
+        ))
@@ -0,0 +1,178 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:59
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Customer",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                ("name", models.CharField(help_text="Customer name", max_length=150)),
+                (
+                    "phone",
+                    models.CharField(
+                        blank=True, db_index=True, help_text="Phone number", max_length=17
+                    ),
+                ),
+                ("email", models.EmailField(blank=True, help_text="Email address", max_length=254)),
+                (
+                    "points_balance",
+                    models.IntegerField(
+                        default=0, help_text="Loyalty points applied from the ledger"
+                    ),
+                ),
+                (
+                    "user",
+                    models.OneToOneField(
+                        blank=True,
+                        help_text="Online shop account, if any",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="customer",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "customers",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="LoyaltyAccrual",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "points",
+                    models.IntegerField(help_text="Points earned; negative when a sale is voided"),
+                ),
+                (
+                    "reference",
+                    models.CharField(help_text="Sale or order the points are for", max_length=64),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, help_text="When the points were earned"
+                    ),
+                ),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        help_text="Customer earning the points",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pending_accruals",
+                        to="customers.customer",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "loyalty_accruals",
+            },
+        ),
+        migrations.CreateModel(
+            name="LoyaltyTransaction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("earn", "Earn"),
+                            ("redeem", "Redeem"),
+                            ("expire", "Expire"),
+                            ("adjustment", "Adjustment"),
+                        ],
+                        help_text="Kind of change",
+                        max_length=20,
+                    ),
+                ),
+                ("points", models.IntegerField(help_text="Signed change in points")),
+                (
+                    "reference",
+                    models.CharField(blank=True, help_text="Sale, order or reason", max_length=64),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, help_text="When the points changed"
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Staff member who recorded a redemption or adjustment",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="loyalty_transactions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        help_text="Customer",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="loyalty_transactions",
+                        to="customers.customer",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "loyalty_transactions",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["customer", "created_at"], name="loyalty_tra_custome_dab941_idx"
+                    ),
+                    models.Index(fields=["kind", "created_at"], name="loyalty_tra_kind_87a219_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,124 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SegmentationRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("started_at", models.DateTimeField(help_text="When the run started")),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, help_text="When the run finished", null=True),
+                ),
+                (
+                    "is_full",
+                    models.BooleanField(
+                        default=False, help_text="Whether every customer was rescored"
+                    ),
+                ),
+                ("customers", models.IntegerField(default=0, help_text="Customers scored")),
+            ],
+            options={
+                "db_table": "customer_segmentation_runs",
+                "ordering": ["-started_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="frequency_score",
+            field=models.PositiveSmallIntegerField(default=0, help_text="1-5, 0 without purchases"),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="last_purchase_at",
+            field=models.DateTimeField(
+                blank=True, help_text="Latest till sale or online order", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="monetary_score",
+            field=models.PositiveSmallIntegerField(default=0, help_text="1-5, 0 without purchases"),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="purchase_count",
+            field=models.IntegerField(default=0, help_text="Till sales and online orders"),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="recency_score",
+            field=models.PositiveSmallIntegerField(default=0, help_text="1-5, 0 without purchases"),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="scored_at",
+            field=models.DateTimeField(
+                blank=True, help_text="Last segmentation run that scored the customer", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="segment",
+            field=models.CharField(
+                choices=[
+                    ("none", "No purchases"),
+                    ("champions", "Champions"),
+                    ("loyal", "Loyal"),
+                    ("new", "New"),
+                    ("promising", "Promising"),
+                    ("at_risk", "At risk"),
+                    ("hibernating", "Hibernating"),
+                ],
+                default="none",
+                help_text="RFM segment",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="tier",
+            field=models.CharField(
+                choices=[
+                    ("bronze", "Bronze"),
+                    ("silver", "Silver"),
+                    ("gold", "Gold"),
+                    ("platinum", "Platinum"),
+                ],
+                default="bronze",
+                help_text="Loyalty tier",
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name="customer",
+            name="total_spent",
+            field=models.DecimalField(
+                decimal_places=2, default=0, help_text="Lifetime spend", max_digits=14
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(fields=["last_purchase_at"], name="customers_last_pu_21be2a_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="customer",
+            index=models.Index(fields=["segment", "tier"], name="customers_segment_262853_idx"),
+        ),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:11
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0002_segmentation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="customer",
+            name="merged_into",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Customer this duplicate was merged into",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="merged",
+                to="customers.customer",
+            ),
+        ),
+        migrations.CreateModel(
+            name="CustomerMatchKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        help_text="Kind-prefixed normalized phone, email or name", max_length=80
+                    ),
+                ),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        help_text="Customer",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="match_keys",
+                        to="customers.customer",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "customer_match_keys",
+                "indexes": [
+                    models.Index(fields=["key", "customer"], name="customer_ma_key_bab41a_idx")
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="DuplicateCandidate",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                ("score", models.FloatField(help_text="Match score from 0 to 1")),
+                ("reasons", models.CharField(help_text="Fields that matched", max_length=100)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("merged", "Merged"),
+                            ("dismissed", "Dismissed"),
+                        ],
+                        default="pending",
+                        help_text="Review status",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "customer",
+                    models.ForeignKey(
+                        help_text="Customer kept by a merge",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="duplicate_candidates",
+                        to="customers.customer",
+                    ),
+                ),
+                (
+                    "duplicate",
+                    models.ForeignKey(
+                        help_text="Customer folded into the other by a merge",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="customers.customer",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "customer_duplicate_candidates",
+                "ordering": ["-score"],
+                "indexes": [
+                    models.Index(fields=["status", "score"], name="customer_du_status_af2002_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="duplicatecandidate",
+            constraint=models.UniqueConstraint(
+                fields=("customer", "duplicate"), name="unique_duplicate_candidate"
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:56
+
+from django.db import migrations, models
+
+
+def relabel_reversals(apps, schema_editor):
+    """Record voided-sale reversals applied as negative earnings as reversals."""
+    LoyaltyTransaction = apps.get_model('customers', 'LoyaltyTransaction')
+    LoyaltyTransaction.objects.filter(kind='earn', points__lt=0).update(kind='reversal')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0004_customer_updated_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="loyaltytransaction",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("earn", "Earn"),
+                    ("redeem", "Redeem"),
+                    ("expire", "Expire"),
+                    ("reversal", "Reversal"),
+                    ("adjustment", "Adjustment"),
+                ],
+                help_text="Kind of change",
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(relabel_reversals, migrations.RunPython.noop),
+    ]
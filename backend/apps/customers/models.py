@@ -0,0 +1,268 @@
+"""
+Customer and loyalty models for the Supermarket Management System.
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from core.models import BaseModel
+
+
+class Customer(BaseModel):
+    """
+    Shopper known to the till or the online shop.
+
+    ``points_balance`` is a cached running total of the customer's loyalty
+    ledger, kept by LoyaltyService; the ledger is the record. Purchase
+    figures, RFM scores, segment and tier are written by the batch job in
+    ``apps.customers.segmentation``. A duplicate merged into another customer
+    is soft-deleted and points to it through ``merged_into``.
+    """
+    TIER_BRONZE = 'bronze'
+    TIER_SILVER = 'silver'
+    TIER_GOLD = 'gold'
+    TIER_PLATINUM = 'platinum'
+    TIER_CHOICES = [
+        (TIER_BRONZE, 'Bronze'),
+        (TIER_SILVER, 'Silver'),
+        (TIER_GOLD, 'Gold'),
+        (TIER_PLATINUM, 'Platinum'),
+    ]
+
+    SEGMENT_NONE = 'none'
+    SEGMENT_CHAMPIONS = 'champions'
+    SEGMENT_LOYAL = 'loyal'
+    SEGMENT_NEW = 'new'
+    SEGMENT_PROMISING = 'promising'
+    SEGMENT_AT_RISK = 'at_risk'
+    SEGMENT_HIBERNATING = 'hibernating'
+    SEGMENT_CHOICES = [
+        (SEGMENT_NONE, 'No purchases'),
+        (SEGMENT_CHAMPIONS, 'Champions'),
+        (SEGMENT_LOYAL, 'Loyal'),
+        (SEGMENT_NEW, 'New'),
+        (SEGMENT_PROMISING, 'Promising'),
+        (SEGMENT_AT_RISK, 'At risk'),
+        (SEGMENT_HIBERNATING, 'Hibernating'),
+    ]
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='customer',
+        help_text="Online shop account, if any"
+    )
+    name = models.CharField(max_length=150, help_text="Customer name")
+    phone = models.CharField(max_length=17, blank=True, db_index=True, help_text="Phone number")
+    email = models.EmailField(blank=True, help_text="Email address")
+    points_balance = models.IntegerField(default=0, help_text="Loyalty points applied from the ledger")
+    last_purchase_at = models.DateTimeField(null=True, blank=True, help_text="Latest till sale or online order")
+    purchase_count = models.IntegerField(default=0, help_text="Till sales and online orders")
+    total_spent = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Lifetime spend")
+    recency_score = models.PositiveSmallIntegerField(default=0, help_text="1-5, 0 without purchases")
+    frequency_score = models.PositiveSmallIntegerField(default=0, help_text="1-5, 0 without purchases")
+    monetary_score = models.PositiveSmallIntegerField(default=0, help_text="1-5, 0 without purchases")
+    segment = models.CharField(
+        max_length=20,
+        choices=SEGMENT_CHOICES,
+        default=SEGMENT_NONE,
+        help_text="RFM segment"
+    )
+    tier = models.CharField(max_length=20, choices=TIER_CHOICES, default=TIER_BRONZE, help_text="Loyalty tier")
+    scored_at = models.DateTimeField(null=True, blank=True, help_text="Last segmentation run that scored the customer")
+    merged_into = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='merged',
+        help_text="Customer this duplicate was merged into"
+    )
+
+    class Meta:
+        db_table = 'customers'
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['last_purchase_at']),
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['segment', 'tier']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.phone or self.email or self.pk})"
+
+
+class SegmentationRun(models.Model):
+    """
+    One run of the customer segmentation job.
+
+    The next incremental run rescores customers whose purchases changed
+    since this run started.
+    """
+    started_at = models.DateTimeField(help_text="When the run started")
+    finished_at = models.DateTimeField(null=True, blank=True, help_text="When the run finished")
+    is_full = models.BooleanField(default=False, help_text="Whether every customer was rescored")
+    customers = models.IntegerField(default=0, help_text="Customers scored")
+
+    class Meta:
+        db_table = 'customer_segmentation_runs'
+        ordering = ['-started_at']
+
+    def __str__(self) -> str:
+        return f"Segmentation {self.started_at:%Y-%m-%d %H:%M} ({self.customers})"
+
+
+class CustomerMatchKey(models.Model):
+    """
+    Normalized blocking key of a customer for duplicate detection.
+
+    Customers sharing a key are compared with each other; see
+    ``apps.customers.dedup``.
+    """
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        related_name='match_keys',
+        help_text="Customer"
+    )
+    key = models.CharField(max_length=80, help_text="Kind-prefixed normalized phone, email or name")
+
+    class Meta:
+        db_table = 'customer_match_keys'
+        indexes = [
+            models.Index(fields=['key', 'customer']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.key} ({self.customer_id})"
+
+
+class DuplicateCandidate(BaseModel):
+    """
+    Pair of customers that may be the same person.
+
+    ``customer`` is the one a merge keeps. Pairs are stored once, whatever
+    their status, so a dismissed pair is not proposed again.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_MERGED = 'merged'
+    STATUS_DISMISSED = 'dismissed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_MERGED, 'Merged'),
+        (STATUS_DISMISSED, 'Dismissed'),
+    ]
+
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        related_name='duplicate_candidates',
+        help_text="Customer kept by a merge"
+    )
+    duplicate = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text="Customer folded into the other by a merge"
+    )
+    score = models.FloatField(help_text="Match score from 0 to 1")
+    reasons = models.CharField(max_length=100, help_text="Fields that matched")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        help_text="Review status"
+    )
+
+    class Meta:
+        db_table = 'customer_duplicate_candidates'
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(fields=['customer', 'duplicate'], name='unique_duplicate_candidate'),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'score']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.duplicate_id} -> {self.customer_id} ({self.score:.2f})"
+
+
+class LoyaltyAccrual(models.Model):
+    """
+    Points earned by a sale or order and not yet applied to the ledger.
+
+    Written in the sale's own transaction as a single insert that locks
+    nothing else; LoyaltyService.apply_accruals moves them into the ledger
+    and the customers' balances in batches.
+    """
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        related_name='pending_accruals',
+        help_text="Customer earning the points"
+    )
+    points = models.IntegerField(help_text="Points earned; negative when a sale is voided")
+    reference = models.CharField(max_length=64, help_text="Sale or order the points are for")
+    created_at = models.DateTimeField(default=timezone.now, help_text="When the points were earned")
+
+    class Meta:
+        db_table = 'loyalty_accruals'
+
+    def __str__(self) -> str:
+        return f"{self.points:+d} for {self.customer_id} ({self.reference})"
+
+
+class LoyaltyTransaction(models.Model):
+    """
+    Append-only ledger entry for a change in a customer's points.
+
+    ``points`` is signed: earned points and positive adjustments add,
+    redemptions, expiries, reversals of voided sales and negative
+    adjustments take away. Redemptions and expiries are taken from the
+    oldest points first.
+    """
+    KIND_EARN = 'earn'
+    KIND_REDEEM = 'redeem'
+    KIND_EXPIRE = 'expire'
+    KIND_REVERSAL = 'reversal'
+    KIND_ADJUSTMENT = 'adjustment'
+    KIND_CHOICES = [
+        (KIND_EARN, 'Earn'),
+        (KIND_REDEEM, 'Redeem'),
+        (KIND_EXPIRE, 'Expire'),
+        (KIND_REVERSAL, 'Reversal'),
+        (KIND_ADJUSTMENT, 'Adjustment'),
+    ]
+
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.PROTECT,
+        related_name='loyalty_transactions',
+        help_text="Customer"
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, help_text="Kind of change")
+    points = models.IntegerField(help_text="Signed change in points")
+    reference = models.CharField(max_length=64, blank=True, help_text="Sale, order or reason")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='loyalty_transactions',
+        help_text="Staff member who recorded a redemption or adjustment"
+    )
+    created_at = models.DateTimeField(default=timezone.now, help_text="When the points changed")
+
+    class Meta:
+        db_table = 'loyalty_transactions'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer', 'created_at']),
+            models.Index(fields=['kind', 'created_at']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} {self.points:+d} for {self.customer_id}"
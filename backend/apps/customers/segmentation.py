@@ -0,0 +1,232 @@
+"""
+Batch RFM scoring, segments and loyalty tiers.
+
+Each run rescores only the customers whose purchases changed since the
+previous run started, plus those whose last purchase has since aged past a
+recency breakpoint; a full run rescores everyone. Customers are handled a
+chunk at a time: one aggregate query per sales channel loads the chunk's
+last purchase, purchase count and spend, NumPy scores the whole chunk with
+array operations, and the results are written back with ``bulk_update``.
+
+Scores come from fixed breakpoints rather than population quantiles, so a
+customer's scores stay valid until their own purchases change or their
+last purchase crosses a recency breakpoint. Tiers follow lifetime spend.
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from apps.ecommerce.models import Order
+from apps.pos.models import POSTransaction
+from .models import Customer, SegmentationRun
+
+# Order statuses that count as a purchase
+PURCHASED = [Order.STATUS_CONFIRMED, Order.STATUS_PAID]
+
+# Sales committed just before the previous run started may have been
+# stamped earlier than their commit; look back this much further
+OVERLAP = timedelta(hours=1)
+
+TIERS = [Customer.TIER_BRONZE, Customer.TIER_SILVER, Customer.TIER_GOLD, Customer.TIER_PLATINUM]
+
+SEGMENTS = [
+    Customer.SEGMENT_CHAMPIONS,
+    Customer.SEGMENT_LOYAL,
+    Customer.SEGMENT_NEW,
+    Customer.SEGMENT_PROMISING,
+    Customer.SEGMENT_AT_RISK,
+]
+
+
+def changed_customers(since, now):
+    """
+    Ids of customers to rescore for the period from ``since`` to ``now``.
+
+    Customers never scored, customers with a till sale or online order
+    written in the period, and customers whose last purchase crossed a
+    recency breakpoint in it.
+    """
+    since = since - OVERLAP
+    aged = Q()
+    for days in settings.CUSTOMER_RECENCY_DAYS:
+        aged |= Q(
+            last_purchase_at__gte=since - timedelta(days=days),
+            last_purchase_at__lt=now - timedelta(days=days),
+        )
+    customer_ids = set(
+        Customer.objects.filter(Q(scored_at__isnull=True) | aged).values_list('pk', flat=True)
+    )
+    customer_ids.update(
+        POSTransaction.objects
+        .filter(customer__isnull=False, updated_at__gte=since)
+        .values_list('customer_id', flat=True)
+        .distinct()
+    )
+    customer_ids.update(
+        Order.objects
+        .filter(updated_at__gte=since, user__customer__isnull=False)
+        .values_list('user__customer', flat=True)
+        .distinct()
+    )
+    return sorted(customer_ids)
+
+
+def load_activity(customer_ids):
+    """
+    Purchase figures of a chunk of customers, both channels combined.
+
+    Returns:
+        Tuple of ``last_purchase`` (list of datetimes or None),
+        ``frequency`` (``int64`` array) and ``monetary`` (``float64`` array),
+        in ``customer_ids`` order
+    """
+    index = {pk: row for row, pk in enumerate(customer_ids)}
+    last_purchase = [None] * len(customer_ids)
+    frequency = np.zeros(len(customer_ids), dtype=np.int64)
+    monetary = np.zeros(len(customer_ids), dtype=np.float64)
+    channels = [
+        (
+            POSTransaction.objects
+            .filter(customer_id__in=customer_ids, status=POSTransaction.STATUS_COMPLETED)
+            .values_list('customer_id'),
+            'occurred_at',
+        ),
+        (
+            Order.objects
+            .filter(user__customer__in=customer_ids, status__in=PURCHASED)
+            .values_list('user__customer'),
+            'created_at',
+        ),
+    ]
+    for rows, timestamp in channels:
+        for pk, last, count, spent in rows.annotate(Max(timestamp), Count('pk'), Sum('total')).order_by():
+            row = index[pk]
+            if last_purchase[row] is None or last > last_purchase[row]:
+                last_purchase[row] = last
+            frequency[row] += count
+            monetary[row] += float(spent)
+    return last_purchase, frequency, monetary
+
+
+def score(recency_days, frequency, monetary):
+    """
+    Vectorised RFM scores, segment and tier for one chunk of customers.
+
+    Args:
+        recency_days: ``(n,)`` days since the last purchase, ``inf`` for none
+        frequency: ``(n,)`` number of purchases
+        monetary: ``(n,)`` lifetime spend
+
+    Returns:
+        Dict of ``(n,)`` arrays: ``recency``, ``frequency`` and ``monetary``
+        scores from 1 (lowest) to 5, 0 for customers without purchases, and
+        ``segment`` and ``tier`` names
+    """
+    bought = frequency > 0
+    recency_breaks = np.asarray(settings.CUSTOMER_RECENCY_DAYS, dtype=np.float64)
+    recency = len(recency_breaks) + 1 - np.searchsorted(recency_breaks, recency_days, side='left')
+    frequency_score = 1 + np.searchsorted(settings.CUSTOMER_FREQUENCY_BREAKS, frequency, side='right')
+    monetary_score = 1 + np.searchsorted(settings.CUSTOMER_MONETARY_BREAKS, monetary, side='right')
+    recency, frequency_score, monetary_score = (
+        np.where(bought, scores, 0) for scores in (recency, frequency_score, monetary_score)
+    )
+
+    segment = np.select(
+        [
+            (recency >= 4) & (frequency_score >= 4),
+            (recency >= 3) & (frequency_score >= 3),
+            (recency >= 4) & (frequency_score == 1),
+            recency >= 3,
+            frequency_score >= 3,
+        ],
+        SEGMENTS,
+        default=Customer.SEGMENT_HIBERNATING,
+    )
+    segment = np.where(bought, segment, Customer.SEGMENT_NONE)
+    tier = np.asarray(TIERS)[np.searchsorted(settings.CUSTOMER_TIER_THRESHOLDS, monetary, side='right')]
+    return {
+        'recency': recency,
+        'frequency': frequency_score,
+        'monetary': monetary_score,
+        'segment': segment,
+        'tier': tier,
+    }
+
+
+def score_chunk(customer_ids, now):
+    """Load, score and write back one chunk of customers; returns the count."""
+    last_purchase, frequency, monetary = load_activity(customer_ids)
+    recency_days = np.array(
+        [(now - last).total_seconds() / 86400 if last else np.inf for last in last_purchase],
+        dtype=np.float64,
+    )
+    scores = score(recency_days, frequency, monetary)
+    customers = [
+        Customer(
+            pk=pk,
+            last_purchase_at=last_purchase[row],
+            purchase_count=int(frequency[row]),
+            total_spent=Decimal(f'{monetary[row]:.2f}'),
+            recency_score=int(scores['recency'][row]),
+            frequency_score=int(scores['frequency'][row]),
+            monetary_score=int(scores['monetary'][row]),
+            segment=str(scores['segment'][row]),
+            tier=str(scores['tier'][row]),
+            scored_at=now,
+        )
+        for row, pk in enumerate(customer_ids)
+    ]
+    Customer.objects.bulk_update(
+        customers,
+        [
+            'last_purchase_at', 'purchase_count', 'total_spent', 'recency_score', 'frequency_score',
+            'monetary_score', 'segment', 'tier', 'scored_at',
+        ],
+        batch_size=1000,
+    )
+    return len(customers)
+
+
+def _all_customers(chunk_size):
+    """Every customer id, a chunk at a time in key order."""
+    last = None
+    while True:
+        customers = Customer.objects.order_by('pk')
+        if last is not None:
+            customers = customers.filter(pk__gt=last)
+        chunk = list(customers.values_list('pk', flat=True)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+
+
+def run(full=False, chunk_size=None, now=None):
+    """
+    Rescore the customers that need it, or everyone with ``full``.
+
+    Falls back to a full run when no run has finished yet.
+
+    Returns:
+        The finished SegmentationRun
+    """
+    now = now or timezone.now()
+    chunk_size = chunk_size or settings.CUSTOMER_SEGMENT_CHUNK
+    previous = SegmentationRun.objects.filter(finished_at__isnull=False).order_by('-started_at').first()
+    full = full or previous is None
+    segmentation_run = SegmentationRun.objects.create(started_at=now, is_full=full)
+    if full:
+        chunks = _all_customers(chunk_size)
+    else:
+        customer_ids = changed_customers(previous.started_at, now)
+        chunks = (customer_ids[start:start + chunk_size] for start in range(0, len(customer_ids), chunk_size))
+    for chunk in chunks:
+        segmentation_run.customers += score_chunk(chunk, now)
+    segmentation_run.finished_at = timezone.now()
+    segmentation_run.save(update_fields=['customers', 'finished_at'])
+    return segmentation_run
@@ -0,0 +1,36 @@
+from rest_framework import serializers
+
+from .models import Customer, LoyaltyTransaction
+
+
+class CustomerSerializer(serializers.ModelSerializer):
+    """Serializer for customers with their cached points balance"""
+
+    class Meta:
+        model = Customer
+        fields = ['id', 'name', 'phone', 'email', 'points_balance', 'tier', 'segment', 'created_at']
+        read_only_fields = ['id', 'points_balance', 'tier', 'segment', 'created_at']
+
+
+class LoyaltyTransactionSerializer(serializers.ModelSerializer):
+    """Serializer for loyalty ledger entries"""
+
+    class Meta:
+        model = LoyaltyTransaction
+        fields = ['id', 'kind', 'points', 'reference', 'created_at']
+        read_only_fields = fields
+
+
+class RedeemSerializer(serializers.Serializer):
+    """Serializer for spending loyalty points"""
+
+    points = serializers.IntegerField(min_value=1)
+    reference = serializers.CharField(max_length=64, required=False, allow_blank=True, default='')
+
+
+class CustomerMatchSerializer(serializers.Serializer):
+    """Serializer for one customer found by phone prefix"""
+
+    id = serializers.UUIDField()
+    name = serializers.CharField()
+    phone = serializers.CharField()
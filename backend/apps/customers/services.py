@@ -0,0 +1,369 @@
+"""
+Business logic for customers and loyalty points.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Exists, F, IntegerField, OuterRef, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Concat
+from django.utils import timezone
+
+from apps.accounts.models import UserProfile
+from apps.ecommerce.models import Order
+from apps.pos.models import POSTransaction
+from core.exceptions import InsufficientPointsError, InvalidOperationError
+from .models import Customer, CustomerMatchKey, DuplicateCandidate, LoyaltyAccrual, LoyaltyTransaction
+
+logger = logging.getLogger(__name__)
+
+
+def _batches(items, size):
+    """Split ``items`` into lists of at most ``size``."""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _add_to_balances(deltas, now):
+    """Add ``deltas`` (customer id -> points) to cached balances with one UPDATE."""
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    Customer.objects.filter(pk__in=deltas).update(
+        points_balance=F('points_balance') + Case(
+            *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+            default=Value(0),
+            output_field=IntegerField(),
+        ),
+        updated_at=now,
+    )
+
+
+def _fold_profile(user, duplicate_user):
+    """
+    Give ``user``'s profile what the duplicate account's profile holds and it lacks.
+
+    The address moves as a whole, with its city, postal code and country.
+    A user without a profile takes the duplicate's.
+    """
+    profiles = {
+        profile.user_id: profile
+        for profile in UserProfile.objects.select_for_update().filter(user__in=[user, duplicate_user])
+    }
+    source, target = profiles.get(duplicate_user.pk), profiles.get(user.pk)
+    if source is None:
+        return
+    if target is None:
+        source.user = user
+        source.save(update_fields=['user', 'updated_at'])
+        return
+    changed = []
+    if not target.address and source.address:
+        changed += ['address', 'city', 'postal_code', 'country']
+    if not target.avatar and source.avatar:
+        changed.append('avatar')
+    if target.date_of_birth is None and source.date_of_birth is not None:
+        changed.append('date_of_birth')
+    for field in changed:
+        setattr(target, field, getattr(source, field))
+    if changed:
+        target.save(update_fields=[*changed, 'updated_at'])
+
+
+class CustomerService:
+    """
+    Customer records.
+    """
+
+    @staticmethod
+    def for_user(user):
+        """Return the customer record of an online shop account, creating it on first use."""
+        customer, _ = Customer.objects.get_or_create(
+            user=user,
+            defaults={'name': user.get_full_name(), 'phone': user.phone, 'email': user.email},
+        )
+        return customer
+
+    @staticmethod
+    def merge(customer, duplicate):
+        """
+        Fold a duplicate customer into ``customer`` in one transaction.
+
+        Till sales, loyalty ledger entries, queued points and the points
+        balance move to ``customer``, which also takes the duplicate's phone,
+        email and shop account where it has none. When both have a shop
+        account the duplicate's orders move to ``customer``'s, its profile
+        fills in the address, avatar and birth date ``customer``'s profile
+        lacks, and its account is deactivated. The duplicate is soft-deleted and left pointing at
+        ``customer``; ``customer`` is rescored by the next segmentation run.
+
+        Returns:
+            The merged customer
+
+        Raises:
+            InvalidOperationError: The customers are the same, one is already
+                merged or deleted, or an account to fold is not a customer's
+        """
+        if customer.pk == duplicate.pk:
+            raise InvalidOperationError('A customer cannot be merged into itself.')
+        with transaction.atomic():
+            locked = {
+                locked.pk: locked
+                for locked in Customer.objects.select_for_update(of=('self',)).select_related('user')
+                .filter(pk__in=[customer.pk, duplicate.pk]).order_by('pk')
+            }
+            customer, duplicate = locked.get(customer.pk), locked.get(duplicate.pk)
+            if customer is None or duplicate is None or customer.is_deleted or duplicate.is_deleted:
+                raise InvalidOperationError('Only live customers can be merged.')
+
+            if duplicate.user is not None and customer.user is not None:
+                if duplicate.user.role != 'customer' or customer.user.role != 'customer':
+                    raise InvalidOperationError('Only shop customer accounts can be merged.')
+                Order.objects.filter(user=duplicate.user).update(user=customer.user, updated_at=timezone.now())
+                _fold_profile(customer.user, duplicate.user)
+                duplicate.user.is_active = False
+                duplicate.user.save(update_fields=['is_active'])
+            elif duplicate.user is not None:
+                customer.user, duplicate.user = duplicate.user, None
+                duplicate.save(update_fields=['user'])
+
+            POSTransaction.objects.filter(customer=duplicate).update(customer=customer, updated_at=timezone.now())
+            LoyaltyTransaction.objects.filter(customer=duplicate).update(customer=customer)
+            LoyaltyAccrual.objects.filter(customer=duplicate).update(customer=customer)
+            customer.points_balance += duplicate.points_balance
+            customer.phone = customer.phone or duplicate.phone
+            customer.email = customer.email or duplicate.email
+            customer.scored_at = None
+            customer.save(update_fields=['user', 'points_balance', 'phone', 'email', 'scored_at', 'updated_at'])
+
+            duplicate.points_balance = 0
+            duplicate.merged_into = customer
+            duplicate.is_deleted = True
+            duplicate.save(update_fields=['points_balance', 'merged_into', 'is_deleted', 'updated_at'])
+
+            CustomerMatchKey.objects.filter(customer=duplicate).delete()
+            DuplicateCandidate.objects.filter(
+                Q(customer=customer, duplicate=duplicate) | Q(customer=duplicate, duplicate=customer)
+            ).update(status=DuplicateCandidate.STATUS_MERGED, updated_at=timezone.now())
+            DuplicateCandidate.objects.filter(
+                Q(customer=duplicate) | Q(duplicate=duplicate), status=DuplicateCandidate.STATUS_PENDING,
+            ).delete()
+        logger.info('Merged customer %s into %s', duplicate.pk, customer.pk)
+        return customer
+
+
+class LoyaltyService:
+    """
+    Loyalty points kept off the sale's critical path.
+
+    A sale or paid order only queues its points as a LoyaltyAccrual row.
+    ``apply_accruals`` moves queued points into the LoyaltyTransaction
+    ledger and the customers' cached balances a batch at a time, and
+    ``expire`` retires unspent points in bulk. Redemptions lock the
+    customer and are checked against the ledger itself.
+    """
+
+    @staticmethod
+    def points_for(amount):
+        """Points earned by spending ``amount``."""
+        return int(Decimal(amount) // settings.LOYALTY_SPEND_PER_POINT)
+
+    @staticmethod
+    def enqueue(accruals):
+        """
+        Queue points for the batch worker; call inside the sale's transaction.
+
+        Args:
+            accruals: Iterable of ``(customer_id, points, reference)``; rows
+                without a customer or points are skipped
+
+        Returns:
+            Number of accruals queued
+        """
+        rows = [
+            LoyaltyAccrual(customer_id=customer_id, points=points, reference=reference)
+            for customer_id, points, reference in accruals
+            if customer_id and points
+        ]
+        LoyaltyAccrual.objects.bulk_create(rows)
+        return len(rows)
+
+    @staticmethod
+    def apply_accruals():
+        """
+        Move queued accruals into the ledger and the cached balances.
+
+        Negative accruals, queued by voids, are written as reversals so they
+        count as points taken away rather than as negative earnings.
+
+        Each batch of LOYALTY_BATCH_SIZE accruals is one transaction of one
+        ledger insert, one balance UPDATE and one delete. Accruals locked by
+        another worker are skipped, so workers can drain the queue together.
+
+        Returns:
+            Number of accruals applied
+        """
+        applied = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    LoyaltyAccrual.objects
+                    .select_for_update(skip_locked=True)
+                    .order_by('pk')[:settings.LOYALTY_BATCH_SIZE]
+                )
+                if not batch:
+                    return applied
+                LoyaltyTransaction.objects.bulk_create([
+                    LoyaltyTransaction(
+                        customer_id=accrual.customer_id,
+                        kind=LoyaltyTransaction.KIND_EARN if accrual.points > 0 else LoyaltyTransaction.KIND_REVERSAL,
+                        points=accrual.points,
+                        reference=accrual.reference,
+                        created_at=accrual.created_at,
+                    )
+                    for accrual in batch
+                ])
+                deltas = defaultdict(int)
+                for accrual in batch:
+                    deltas[accrual.customer_id] += accrual.points
+                _add_to_balances(deltas, timezone.now())
+                LoyaltyAccrual.objects.filter(pk__in=[accrual.pk for accrual in batch]).delete()
+            applied += len(batch)
+
+    @staticmethod
+    def ledger_balance(customer_id):
+        """Points the customer holds according to the ledger."""
+        return (
+            LoyaltyTransaction.objects
+            .filter(customer_id=customer_id)
+            .aggregate(total=Coalesce(Sum('points'), 0))['total']
+        )
+
+    @staticmethod
+    def redeem(customer, points, reference='', user=None):
+        """
+        Spend a customer's points.
+
+        The customer row is locked for the transaction, so redemptions,
+        expiries and applied accruals of one customer never interleave, and
+        the points available are summed from the ledger rather than taken
+        from the cached balance, which is corrected if it drifted.
+
+        Returns:
+            The redemption's LoyaltyTransaction
+
+        Raises:
+            InvalidOperationError: ``points`` is not positive
+            InsufficientPointsError: The ledger holds fewer points
+        """
+        if points <= 0:
+            raise InvalidOperationError('Points to redeem must be positive.')
+        with transaction.atomic():
+            customer = Customer.objects.select_for_update().get(pk=customer.pk)
+            available = LoyaltyService.ledger_balance(customer.pk)
+            if available != customer.points_balance:
+                logger.warning(
+                    'Loyalty balance of customer %s was %d, ledger holds %d',
+                    customer.pk, customer.points_balance, available,
+                )
+            if points > available:
+                raise InsufficientPointsError(f'Only {available} points available, {points} requested.')
+            entry = LoyaltyTransaction.objects.create(
+                customer=customer,
+                kind=LoyaltyTransaction.KIND_REDEEM,
+                points=-points,
+                reference=reference,
+                created_by=user,
+            )
+            customer.points_balance = available - points
+            customer.save(update_fields=['points_balance', 'updated_at'])
+        return entry
+
+    @staticmethod
+    def expire(now=None):
+        """
+        Expire points earned over LOYALTY_POINTS_TTL_DAYS ago and not spent since.
+
+        Points are spent oldest first, so what expires is everything earned
+        before the cutoff less everything taken away since the first point
+        was earned. A reversal cancels the points of the sale it voids
+        rather than spending the oldest, so it only counts against earnings
+        from before the cutoff. Customers are handled LOYALTY_BATCH_SIZE at a time with
+        one locking read, one aggregate, one ledger insert and one balance
+        UPDATE per batch.
+
+        Returns:
+            Number of points expired
+        """
+        now = now or timezone.now()
+        cutoff = now - timedelta(days=settings.LOYALTY_POINTS_TTL_DAYS)
+        reverses_old = Exists(
+            LoyaltyTransaction.objects
+            .filter(customer_id=OuterRef('customer_id'), kind=LoyaltyTransaction.KIND_EARN, created_at__lt=cutoff)
+            .annotate(void_reference=Concat(Value('VOID-'), 'reference'))
+            .filter(void_reference=OuterRef('reference'))
+        )
+        candidates = (
+            Customer.objects
+            .filter(
+                points_balance__gt=0,
+                loyalty_transactions__kind=LoyaltyTransaction.KIND_EARN,
+                loyalty_transactions__created_at__lt=cutoff,
+            )
+            .order_by('pk')
+            .values_list('pk', flat=True)
+            .distinct()
+        )
+        expired = 0
+        for batch in _batches(candidates, settings.LOYALTY_BATCH_SIZE):
+            with transaction.atomic():
+                locked = list(
+                    Customer.objects.select_for_update().filter(pk__in=batch).order_by('pk').values_list('pk', flat=True)
+                )
+                totals = (
+                    LoyaltyTransaction.objects
+                    .filter(customer_id__in=locked)
+                    .values('customer_id')
+                    .annotate(
+                        earned=Coalesce(Sum('points', filter=Q(
+                            kind=LoyaltyTransaction.KIND_EARN, created_at__lt=cutoff,
+                        ) | (Q(kind=LoyaltyTransaction.KIND_REVERSAL) & reverses_old)), 0),
+                        taken=Coalesce(Sum('points', filter=Q(points__lt=0) & ~Q(
+                            kind__in=[LoyaltyTransaction.KIND_EARN, LoyaltyTransaction.KIND_REVERSAL],
+                        )), 0),
+                        balance=Coalesce(Sum('points'), 0),
+                    )
+                )
+                expiring = {
+                    row['customer_id']: min(row['earned'] + row['taken'], row['balance'])
+                    for row in totals
+                }
+                expiring = {pk: points for pk, points in expiring.items() if points > 0}
+                LoyaltyTransaction.objects.bulk_create([
+                    LoyaltyTransaction(
+                        customer_id=pk,
+                        kind=LoyaltyTransaction.KIND_EXPIRE,
+                        points=-points,
+                        reference=f'EXPIRY-{cutoff:%Y%m%d}',
+                        created_at=now,
+                    )
+                    for pk, points in expiring.items()
+                ])
+                _add_to_balances({pk: -points for pk, points in expiring.items()}, now)
+            expired += sum(expiring.values())
+        return expired
+
+    @staticmethod
+    def verify():
+        """Customers whose cached balance differs from their ledger."""
+        return list(
+            Customer.objects
+            .annotate(ledger=Coalesce(Sum('loyalty_transactions__points'), 0))
+            .exclude(points_balance=F('ledger'))
+            .values('pk', 'points_balance', 'ledger')
+        )
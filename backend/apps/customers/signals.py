@@ -0,0 +1,28 @@
+"""
+Signal receivers that keep this worker's phone lookup index current.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import lookup
+from .models import Customer
+
+
+@receiver(post_save, sender=Customer)
+def index_phone(sender, instance, update_fields=None, **kwargs):
+    """
+    Re-index a customer once the save commits, if its name, number or
+    deletion flag may have changed.
+    """
+    if update_fields is None or {'name', 'phone', 'is_deleted'} & set(update_fields):
+        row = (instance.pk, instance.name, instance.phone, instance.is_deleted)
+        transaction.on_commit(lambda: lookup.index.apply([row]))
+
+
+@receiver(post_delete, sender=Customer)
+def unindex_phone(sender, instance, **kwargs):
+    """Drop a deleted customer from the index once the delete commits."""
+    row = (instance.pk, instance.name, instance.phone, True)
+    transaction.on_commit(lambda: lookup.index.apply([row]))
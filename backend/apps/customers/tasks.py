@@ -0,0 +1,39 @@
+"""
+Celery tasks for the customers app.
+"""
+
+import logging
+
+from celery import shared_task
+
+from . import segmentation
+from .services import LoyaltyService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def apply_loyalty_accruals():
+    """Move queued loyalty points into the ledger and balances."""
+    return LoyaltyService.apply_accruals()
+
+
+@shared_task
+def expire_loyalty_points():
+    """Expire points that went unspent for too long."""
+    return LoyaltyService.expire()
+
+
+@shared_task
+def verify_loyalty_balances():
+    """Log customers whose cached balance disagrees with the ledger."""
+    mismatches = LoyaltyService.verify()
+    for mismatch in mismatches:
+        logger.error('Loyalty balance mismatch: %s', mismatch)
+    return len(mismatches)
+
+
+@shared_task
+def segment_customers():
+    """Rescore customers whose purchases changed since the last run."""
+    return segmentation.run().customers
@@ -0,0 +1,127 @@
+import uuid
+from datetime import date
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from apps.accounts.models import UserProfile
+from apps.customers import dedup
+from apps.customers.models import Customer, DuplicateCandidate, LoyaltyAccrual, LoyaltyTransaction
+from apps.customers.services import CustomerService, LoyaltyService
+from apps.pos.models import POSTransaction
+from core.exceptions import InvalidOperationError
+
+
+def test_blocking_keys():
+    """Test phone formats, email variants and spellings of a name share keys"""
+    assert dedup.soundex('robert') == dedup.soundex('rupert') == 'r163'
+    assert dedup.blocking_keys('Rahim Uddin', '+880 1711-111111', 'Rahim.Uddin+shop@Mail.com') == [
+        'p:1711111111', 'e:rahimuddin', 'n:r500 u350',
+    ]
+    assert dedup.blocking_keys('Rahim Udin', '01711111111', '') == ['p:1711111111', 'n:r500 u350']
+
+
+@pytest.mark.django_db
+class TestCandidates:
+    """Test candidate pairs are drawn from blocks and scored"""
+
+    def test_run(self, create_customer):
+        """Test only pairs scoring high enough are stored, once"""
+        kept = create_customer(name='Rahim Uddin', phone='+8801711111111', email='rahim.uddin@mail.com')
+        duplicate = create_customer(name='Rahim Udin', phone='01711111111', email='rahimuddin+shop@mail.com')
+        create_customer(name='Rahim Uddin', phone='+8801822222222')
+        create_customer(name='Karim Ali', phone='+8801933333333')
+
+        assert dedup.run(chunk_size=2) == (4, 1)
+        assert dedup.run(chunk_size=2) == (4, 0)
+
+        candidate = DuplicateCandidate.objects.get()
+        assert (candidate.customer, candidate.duplicate) == (kept, duplicate)
+        assert candidate.reasons == 'phone,email,name'
+        assert candidate.score >= 0.9
+
+    def test_large_blocks_skipped(self, settings, create_customer):
+        """Test blocks over the size limit are not compared"""
+        settings.CUSTOMER_DEDUP_MAX_BLOCK = 2
+        for name in ('Shop Front', 'Shop Desk', 'Shop Till'):
+            create_customer(name=name, phone='+8801744444444')
+
+        assert dedup.run() == (3, 0)
+
+
+def sale(session, customer):
+    return POSTransaction.objects.create(
+        session=session,
+        transaction_number=uuid.uuid4().hex,
+        idempotency_key=uuid.uuid4().hex,
+        customer=customer,
+        total='250.00',
+    )
+
+
+@pytest.mark.django_db
+class TestMerge:
+    """Test folding a duplicate into the customer kept"""
+
+    def test_merge(self, create_session, create_user, create_customer):
+        """Test sales, points and the shop account move to the kept customer in one go"""
+        session = create_session()
+        kept = create_customer(email='')
+        account = create_user()
+        duplicate = create_customer(user=account, email='shop@example.com')
+        sold = sale(session, duplicate)
+        LoyaltyTransaction.objects.create(customer=duplicate, kind=LoyaltyTransaction.KIND_EARN, points=7)
+        Customer.objects.filter(pk=duplicate.pk).update(points_balance=7)
+        LoyaltyAccrual.objects.create(customer=duplicate, points=2, reference=sold.transaction_number)
+        DuplicateCandidate.objects.create(customer=kept, duplicate=duplicate, score=0.95, reasons='phone')
+
+        CustomerService.merge(kept, duplicate)
+
+        kept.refresh_from_db()
+        duplicate.refresh_from_db()
+        assert (kept.user, kept.email, kept.points_balance) == (account, 'shop@example.com', 7)
+        assert duplicate.user is None
+        assert (duplicate.is_deleted, duplicate.merged_into, duplicate.points_balance) == (True, kept, 0)
+        assert POSTransaction.objects.get().customer == kept
+        assert LoyaltyAccrual.objects.get().customer == kept
+        assert DuplicateCandidate.objects.get().status == DuplicateCandidate.STATUS_MERGED
+        LoyaltyService.apply_accruals()
+        assert LoyaltyService.verify() == []
+
+    def test_two_accounts(self, create_user, create_customer):
+        """Test the duplicate's profile fills the gaps and its account is deactivated; staff are never folded"""
+        kept = create_customer(user=create_user())
+        duplicate = create_customer(user=create_user())
+        staff = create_customer(user=create_user(role='cashier'))
+
+        UserProfile.objects.filter(user=kept.user).update(city='Sylhet')
+        UserProfile.objects.filter(user=duplicate.user).update(
+            address='House 1, Road 2', city='Dhaka', postal_code='1207', date_of_birth=date(1990, 5, 1),
+        )
+
+        CustomerService.merge(kept, duplicate)
+
+        duplicate.user.refresh_from_db()
+        assert not duplicate.user.is_active
+        profile = UserProfile.objects.get(user=kept.user)
+        assert (profile.address, profile.city, profile.postal_code) == ('House 1, Road 2', 'Dhaka', '1207')
+        assert profile.date_of_birth == date(1990, 5, 1)
+        with pytest.raises(InvalidOperationError):
+            CustomerService.merge(kept, staff)
+        with pytest.raises(InvalidOperationError):
+            CustomerService.merge(kept, duplicate)
+
+
+@pytest.mark.django_db
+def test_command_merges_surest(create_customer):
+    """Test --merge folds candidates scoring at least the merge score"""
+    kept = create_customer(name='Nusrat Jahan', phone='+8801755555555', email='nusrat@mail.com')
+    create_customer(name='Nusrat Jahan', phone='01755555555', email='nusrat@mail.com')
+    out = StringIO()
+
+    call_command('dedupe_customers', '--merge', stdout=out)
+
+    assert 'found 1 new duplicate candidates' in out.getvalue()
+    assert 'Merged 1 duplicates' in out.getvalue()
+    assert list(Customer.objects.filter(is_deleted=False)) == [kept]
@@ -0,0 +1,80 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from apps.customers import lookup
+
+
+@pytest.fixture(autouse=True)
+def empty_index(settings):
+    """Start every test from an unloaded index that never resyncs on its own"""
+    settings.CUSTOMER_LOOKUP_SYNC_SECONDS = 3600
+    lookup.index.clear()
+    yield
+    lookup.index.clear()
+
+
+def phones(matches):
+    return [match['phone'] for match in matches]
+
+
+def test_phone_keys():
+    """Test numbers are indexed by their digits and in national form"""
+    assert lookup.phone_keys('+880 1712-345678') == ['8801712345678', '01712345678']
+    assert lookup.phone_keys('01712345678') == ['01712345678']
+    assert lookup.phone_keys('') == []
+
+
+@pytest.mark.django_db
+class TestLookup:
+    """Test prefix search over the in-memory index"""
+
+    def test_prefix_without_queries(self, create_customer, django_assert_num_queries):
+        """Test matches narrow as digits are typed and only the first search loads the index"""
+        create_customer(phone='+8801712345678')
+        create_customer(phone='+8801712999999')
+        create_customer(phone='+8801812345678')
+
+        with django_assert_num_queries(1):
+            assert len(lookup.search('017')) == 2
+        with django_assert_num_queries(0):
+            assert phones(lookup.search('0171234')) == ['+8801712345678']
+            assert phones(lookup.search('+880 18')) == ['+8801812345678']
+            assert lookup.search('01') == []
+            assert len(lookup.search('880', limit=2)) == 2
+
+    def test_saves_update_index(self, create_customer, django_capture_on_commit_callbacks):
+        """Test committed saves and deletes update this worker's index"""
+        moved, dropped = create_customer(phone='+8801711111111'), create_customer(phone='+8801722222222')
+        lookup.search('017')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            added = create_customer(phone='+8801733333333')
+            moved.phone = '+8801944444444'
+            moved.save(update_fields=['phone'])
+            dropped.soft_delete()
+
+        assert phones(lookup.search('017')) == [added.phone]
+        assert phones(lookup.search('019')) == [moved.phone]
+
+    def test_sync_picks_up_other_workers(self, settings, create_customer):
+        """Test customers saved without this worker's signals appear after the next sync"""
+        lookup.search('017')
+        create_customer(phone='+8801755555555')
+
+        assert lookup.search('0175') == []
+        settings.CUSTOMER_LOOKUP_SYNC_SECONDS = 0
+        assert phones(lookup.search('0175')) == ['+8801755555555']
+
+
+@pytest.mark.django_db
+def test_endpoint(client_for, create_user, create_customer):
+    """Test cashiers get the matches for the digits typed"""
+    customer = create_customer(phone='+8801766666666')
+
+    response = client_for(create_user(role='cashier')).get(
+        reverse('customers:customer-lookup'), {'phone': '01766'}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == [{'id': str(customer.pk), 'name': customer.name, 'phone': customer.phone}]
@@ -0,0 +1,165 @@
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from apps.customers.models import LoyaltyAccrual, LoyaltyTransaction
+from apps.customers.services import LoyaltyService
+from apps.pos.models import POSPayment
+from apps.pos.services import POSTransactionService
+from core.exceptions import InvalidOperationError
+
+
+def sell(session, stock, customer, quantity=10):
+    """Commit a cash sale of 10.00 a unit rung up for a customer"""
+    sale_transaction, _ = POSTransactionService.complete_sale(
+        session,
+        {
+            'idempotency_key': uuid.uuid4().hex,
+            'customer': customer.pk,
+            'items': [{'product': stock.product_id, 'quantity': quantity}],
+            'payments': [{'method': POSPayment.METHOD_CASH, 'amount': Decimal('500.00'), 'reference': ''}],
+        },
+        cashier=session.cashier,
+    )
+    return sale_transaction
+
+
+def earn(customer, points, days_ago=0):
+    """Record applied points earned some days ago"""
+    LoyaltyTransaction.objects.create(
+        customer=customer,
+        kind=LoyaltyTransaction.KIND_EARN,
+        points=points,
+        created_at=timezone.now() - timedelta(days=days_ago),
+    )
+    customer.points_balance += points
+    customer.save(update_fields=['points_balance'])
+
+
+@pytest.mark.django_db
+class TestAccrual:
+    """Test points queued by sales and applied in batches"""
+
+    def test_sale_queues_points(self, settings, create_session, create_stock, create_customer):
+        """Test sales only queue their points and the worker applies them to ledger and balance"""
+        settings.LOYALTY_BATCH_SIZE = 2
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse, quantity=100)
+        customer = create_customer()
+        sales = [sell(session, stock, customer, quantity) for quantity in (10, 25, 30, 5)]
+
+        assert LoyaltyAccrual.objects.count() == 3
+        assert not LoyaltyTransaction.objects.exists()
+
+        assert LoyaltyService.apply_accruals() == 3
+
+        customer.refresh_from_db()
+        assert customer.points_balance == 1 + 2 + 3
+        assert not LoyaltyAccrual.objects.exists()
+        assert sorted(customer.loyalty_transactions.values_list('reference', flat=True)) == sorted(
+            sale.transaction_number for sale in sales[:3]
+        )
+        assert LoyaltyService.verify() == []
+
+    def test_void_takes_points_back(self, create_session, create_stock, create_customer):
+        """Test voiding a sale queues the reverse of its points"""
+        session = create_session()
+        customer = create_customer()
+        sale_transaction = sell(session, create_stock(warehouse=session.warehouse), customer)
+
+        POSTransactionService.void(sale_transaction, user=session.cashier)
+        LoyaltyService.apply_accruals()
+
+        customer.refresh_from_db()
+        assert customer.points_balance == 0
+        assert sorted(customer.loyalty_transactions.values_list('kind', 'points')) == [
+            (LoyaltyTransaction.KIND_EARN, 1), (LoyaltyTransaction.KIND_REVERSAL, -1),
+        ]
+
+    def test_unknown_customer(self, create_session, create_stock, create_customer):
+        """Test a sale for a customer that does not exist is refused"""
+        session = create_session()
+        customer = create_customer()
+        customer.pk = uuid.uuid4()
+
+        with pytest.raises(InvalidOperationError, match='Unknown customer'):
+            sell(session, create_stock(warehouse=session.warehouse), customer)
+
+
+@pytest.mark.django_db
+class TestRedemption:
+    """Test spending points"""
+
+    def test_checked_against_ledger(self, client_for, create_user, create_customer):
+        """Test redemptions are limited by the ledger and repair a drifted balance"""
+        customer = create_customer()
+        earn(customer, 50)
+        customer.points_balance = 500
+        customer.save(update_fields=['points_balance'])
+        client = client_for(create_user(role='cashier'))
+        url = reverse('customers:customer-redeem', args=[customer.pk])
+
+        refused = client.post(url, {'points': 60})
+        spent = client.post(url, {'points': 20, 'reference': 'VOUCHER-1'})
+
+        assert refused.status_code == status.HTTP_409_CONFLICT
+        assert spent.status_code == status.HTTP_201_CREATED
+        assert spent.data['points'] == -20
+        customer.refresh_from_db()
+        assert customer.points_balance == 30
+        history = client.get(reverse('customers:customer-loyalty', args=[customer.pk]))
+        assert [entry['kind'] for entry in history.data['results']] == ['redeem', 'earn']
+
+
+@pytest.mark.django_db
+class TestExpiry:
+    """Test bulk expiry of unspent points"""
+
+    def test_oldest_points_expire_first(self, settings, create_customer):
+        """Test only points earned before the cutoff and not spent since expire"""
+        settings.LOYALTY_POINTS_TTL_DAYS = 365
+        customer, spender = create_customer(), create_customer()
+        earn(customer, 100, days_ago=400)
+        earn(customer, 40, days_ago=10)
+        earn(spender, 100, days_ago=400)
+        earn(spender, 50, days_ago=10)
+        LoyaltyService.redeem(customer, 30)
+        LoyaltyService.redeem(spender, 120)
+
+        assert LoyaltyService.expire() == 70
+        assert LoyaltyService.expire() == 0
+
+        customer.refresh_from_db()
+        spender.refresh_from_db()
+        assert (customer.points_balance, spender.points_balance) == (40, 30)
+        assert LoyaltyService.verify() == []
+
+    def test_reversals_cancel_their_sale(self, settings, create_session, create_stock, create_customer):
+        """Test a void takes back its own sale's points, not the oldest ones, when expiring"""
+        settings.LOYALTY_POINTS_TTL_DAYS = 365
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse, quantity=100)
+        old, recent = create_customer(), create_customer()
+        for customer in (old, recent):
+            earn(customer, 10, days_ago=400)
+        old_sale, recent_sale = sell(session, stock, old), sell(session, stock, recent)
+        LoyaltyService.apply_accruals()
+        LoyaltyTransaction.objects.filter(reference=old_sale.transaction_number).update(
+            created_at=timezone.now() - timedelta(days=390),
+        )
+        for sale_transaction in (old_sale, recent_sale):
+            POSTransactionService.void(sale_transaction, user=session.cashier)
+        LoyaltyService.apply_accruals()
+        earn(old, 50)
+
+        assert LoyaltyService.expire() == 20
+
+        old.refresh_from_db()
+        recent.refresh_from_db()
+        assert (old.points_balance, recent.points_balance) == (50, 0)
+        assert LoyaltyService.verify() == []
@@ -0,0 +1,123 @@
+import uuid
+from datetime import timedelta
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from apps.customers import segmentation
+from apps.customers.models import Customer, SegmentationRun
+from apps.pos.models import POSTransaction
+
+
+def sale(session, customer, total, days_ago=0):
+    """Record a completed till sale for a customer some days ago"""
+    occurred_at = timezone.now() - timedelta(days=days_ago)
+    sale_transaction = POSTransaction.objects.create(
+        session=session,
+        transaction_number=uuid.uuid4().hex,
+        idempotency_key=uuid.uuid4().hex,
+        cashier=session.cashier,
+        customer=customer,
+        status=POSTransaction.STATUS_COMPLETED,
+        subtotal=total,
+        total=total,
+        occurred_at=occurred_at,
+    )
+    POSTransaction.objects.filter(pk=sale_transaction.pk).update(updated_at=occurred_at)
+    return sale_transaction
+
+
+def test_score():
+    """Test scores, segments and tiers come from the breakpoints a whole chunk at a time"""
+    scores = segmentation.score(
+        np.array([5.0, 10.0, 200.0, 400.0, np.inf]),
+        np.array([20, 1, 10, 3, 0]),
+        np.array([60000.0, 500.0, 12000.0, 900.0, 0.0]),
+    )
+
+    assert scores['recency'].tolist() == [5, 5, 2, 1, 0]
+    assert scores['frequency'].tolist() == [5, 1, 4, 2, 0]
+    assert scores['monetary'].tolist() == [5, 1, 3, 1, 0]
+    assert scores['segment'].tolist() == [
+        Customer.SEGMENT_CHAMPIONS,
+        Customer.SEGMENT_NEW,
+        Customer.SEGMENT_AT_RISK,
+        Customer.SEGMENT_HIBERNATING,
+        Customer.SEGMENT_NONE,
+    ]
+    assert scores['tier'].tolist() == [
+        Customer.TIER_GOLD, Customer.TIER_BRONZE, Customer.TIER_SILVER, Customer.TIER_BRONZE, Customer.TIER_BRONZE,
+    ]
+
+
+@pytest.mark.django_db
+class TestSegmentationRun:
+    """Test batch rescoring of customers"""
+
+    def test_full_run(self, create_session, create_customer):
+        """Test the first run scores every customer from both purchase channels' aggregates"""
+        session = create_session()
+        regular, lapsed, browser = create_customer(), create_customer(), create_customer()
+        for days_ago in (1, 2, 3, 5, 8, 13, 20, 25):
+            sale(session, regular, '2000.00', days_ago)
+        sale(session, lapsed, '150.00', 300)
+
+        segmentation_run = segmentation.run(chunk_size=2)
+
+        assert (segmentation_run.is_full, segmentation_run.customers) == (True, 3)
+        for customer in (regular, lapsed, browser):
+            customer.refresh_from_db()
+        assert (regular.purchase_count, regular.total_spent) == (8, 16000)
+        assert (regular.segment, regular.tier) == (Customer.SEGMENT_CHAMPIONS, Customer.TIER_SILVER)
+        assert (lapsed.recency_score, lapsed.segment) == (2, Customer.SEGMENT_HIBERNATING)
+        assert (browser.segment, browser.scored_at) == (Customer.SEGMENT_NONE, segmentation_run.started_at)
+
+    def test_incremental_run(self, create_session, create_customer):
+        """Test later runs only rescore customers with new purchases"""
+        session = create_session()
+        quiet, buyer = create_customer(), create_customer()
+        sale(session, quiet, '100.00', 10)
+        first = segmentation.run()
+        sale(session, buyer, '60000.00')
+
+        second = segmentation.run()
+
+        assert (second.is_full, second.customers) == (False, 1)
+        quiet.refresh_from_db()
+        buyer.refresh_from_db()
+        assert quiet.scored_at == first.started_at
+        assert (buyer.scored_at, buyer.tier) == (second.started_at, Customer.TIER_GOLD)
+
+    def test_command(self, create_customer):
+        """Test the command rescores everyone with --full"""
+        create_customer()
+        segmentation.run()
+        out = StringIO()
+
+        call_command('segment_customers', '--full', stdout=out)
+
+        assert 'Scored 1 customers (full)' in out.getvalue()
+        assert SegmentationRun.objects.filter(is_full=True).count() == 2
+
+
+@pytest.mark.django_db
+def test_report(manager_client, create_session, create_customer):
+    """Test the report groups customers by segment and tier"""
+    session = create_session()
+    sale(session, create_customer(), '500.00', 2)
+    create_customer()
+    create_customer()
+    segmentation.run()
+
+    response = manager_client.get(reverse('reports:customer-segmentation'))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [(row['segment'], row['tier'], row['customers']) for row in response.data] == [
+        (Customer.SEGMENT_NEW, Customer.TIER_BRONZE, 1),
+        (Customer.SEGMENT_NONE, Customer.TIER_BRONZE, 2),
+    ]
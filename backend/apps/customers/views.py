@@ -0,0 +1,55 @@
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core.pagination import StandardResultsSetPagination
+from core.permissions import IsCashier
+from . import lookup
+from .models import Customer
+from .serializers import (
+    CustomerMatchSerializer, CustomerSerializer, LoyaltyTransactionSerializer, RedeemSerializer,
+)
+from .services import LoyaltyService
+
+
+class CustomerViewSet(mixins.CreateModelMixin,
+                      mixins.ListModelMixin,
+                      mixins.RetrieveModelMixin,
+                      viewsets.GenericViewSet):
+    """
+    Customers and their loyalty points, for till and shop staff.
+
+    Balances are the cached running totals and include points queued by
+    sales once the next batch has been applied.
+    """
+    queryset = Customer.objects.filter(is_deleted=False)
+    serializer_class = CustomerSerializer
+    permission_classes = [IsCashier]
+    pagination_class = StandardResultsSetPagination
+    search_fields = ['name', 'phone', 'email']
+
+    @extend_schema(
+        parameters=[OpenApiParameter('phone', str, description='Phone digits typed so far')],
+        responses={200: CustomerMatchSerializer(many=True)},
+    )
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """Customers whose phone number starts with the digits typed, from this worker's memory"""
+        return Response(lookup.search(request.query_params.get('phone', '')))
+
+    @extend_schema(responses={200: LoyaltyTransactionSerializer(many=True)})
+    @action(detail=True, methods=['get'])
+    def loyalty(self, request, pk=None):
+        """Ledger entries of the customer, newest first"""
+        page = self.paginate_queryset(self.get_object().loyalty_transactions.order_by('-created_at', '-pk'))
+        return self.get_paginated_response(LoyaltyTransactionSerializer(page, many=True).data)
+
+    @extend_schema(request=RedeemSerializer, responses={201: LoyaltyTransactionSerializer})
+    @action(detail=True, methods=['post'], url_path='loyalty/redeem')
+    def redeem(self, request, pk=None):
+        """Spend points, checked against the ledger"""
+        serializer = RedeemSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        entry = LoyaltyService.redeem(self.get_object(), user=request.user, **serializer.validated_data)
+        return Response(LoyaltyTransactionSerializer(entry).data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,57 @@
+"""
+Admin configuration for ecommerce app.
+"""
+
+from django.contrib import admin
+from .models import Cart, CartItem, FlashSale, Order, OrderItem, OrderStage
+
+
+class CartItemInline(admin.TabularInline):
+    """Inline admin for CartItem."""
+    model = CartItem
+    extra = 0
+    raw_id_fields = ('product',)
+
+
+@admin.register(Cart)
+class CartAdmin(admin.ModelAdmin):
+    """Admin for Cart model."""
+    list_display = ('user', 'flushed_at', 'updated_at')
+    search_fields = ('user__email',)
+    raw_id_fields = ('user',)
+    inlines = [CartItemInline]
+
+
+class OrderItemInline(admin.TabularInline):
+    """Inline admin for OrderItem."""
+    model = OrderItem
+    extra = 0
+    raw_id_fields = ('product',)
+
+
+class OrderStageInline(admin.TabularInline):
+    """Inline admin for OrderStage."""
+    model = OrderStage
+    extra = 0
+    readonly_fields = ('stage', 'status', 'attempts', 'last_error', 'updated_at')
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    """Admin for Order model."""
+    list_display = ('order_number', 'user', 'status', 'payment_method', 'total', 'created_at')
+    list_filter = ('status', 'payment_method', 'warehouse')
+    search_fields = ('order_number', 'user__email')
+    raw_id_fields = ('user', 'reservation')
+    inlines = [OrderItemInline, OrderStageInline]
+
+
+@admin.register(FlashSale)
+class FlashSaleAdmin(admin.ModelAdmin):
+    """Admin for FlashSale model."""
+    list_display = (
+        'name', 'product', 'starts_at', 'ends_at', 'admissions_per_minute', 'max_concurrent_checkouts', 'is_active'
+    )
+    list_filter = ('is_active',)
+    search_fields = ('name', 'product__name', 'product__sku')
+    raw_id_fields = ('product',)
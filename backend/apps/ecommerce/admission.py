@@ -0,0 +1,322 @@
+"""
+Admission control for flash sales.
+
+A live FlashSale puts its product behind three gates, all served from the
+admission store without touching the database:
+
+- A virtual queue. Shoppers take a numbered ticket; a sliding-window
+  limiter advances the head of the queue by at most
+  ``admissions_per_minute`` per minute. A shopper whose ticket the head has
+  passed receives an admission token.
+- Admission tokens. Adding the product to a cart or checking it out needs
+  a token for its sale in the ``X-Admission-Token`` header. Tokens and
+  tickets are signed and name the signed-in shopper they were issued to,
+  so they can neither be forged, moved up the queue nor passed on to other
+  shoppers, and tokens expire after ADMISSION_TOKEN_TTL seconds.
+- A per-product concurrency limit. At most ``max_concurrent_checkouts``
+  checkouts of the product hold its stock rows at once; the rest are told
+  to retry straight away instead of queueing on row locks.
+
+Refusals raise AdmissionRequiredError (429) carrying the shopper's place in
+line and a Retry-After hint. ``RedisAdmissionStore`` keeps the queues,
+windows and slots in Redis, shared by every web worker; ``LocalAdmissionStore``
+is an in-process stand-in for development and tests. ADMISSION_STORE selects
+the class.
+"""
+
+import math
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from django_redis import get_redis_connection
+
+from core.exceptions import AdmissionRequiredError
+from .models import FlashSale
+
+TOKEN_SALT = 'ecommerce.admission.token'
+TICKET_SALT = 'ecommerce.admission.ticket'
+
+# Seconds the admission rate is measured over
+WINDOW = 60
+
+# KEYS: head, tail, window; ARGV: now (ms), window (ms), limit
+_ADVANCE = """
+local head = tonumber(redis.call('GET', KEYS[1]) or '0')
+local tail = tonumber(redis.call('GET', KEYS[2]) or '0')
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', tonumber(ARGV[1]) - tonumber(ARGV[2]))
+local admit = math.min(tonumber(ARGV[3]) - redis.call('ZCARD', KEYS[3]), tail - head)
+if admit <= 0 then
+    return head
+end
+for ticket = head + 1, head + admit do
+    redis.call('ZADD', KEYS[3], ARGV[1], 'ticket:' .. ticket)
+end
+redis.call('PEXPIRE', KEYS[3], ARGV[2])
+return redis.call('INCRBY', KEYS[1], admit)
+"""
+
+# KEYS: slots; ARGV: now (ms), ttl (ms), limit, holder
+_ACQUIRE = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[3]) then
+    redis.call('ZADD', KEYS[1], tonumber(ARGV[1]) + tonumber(ARGV[2]), ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+class RedisAdmissionStore:
+    """
+    Queues, admission windows and checkout slots in Redis; each operation
+    is one atomic script or pipeline.
+    """
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    @property
+    def redis(self):
+        return get_redis_connection(self.alias)
+
+    @staticmethod
+    def _now_ms():
+        return int(time.time() * 1000)
+
+    def join(self, queue):
+        """Take the next ticket number in the queue."""
+        pipe = self.redis.pipeline()
+        pipe.incr(f'{queue}:tail')
+        pipe.expire(f'{queue}:tail', settings.ADMISSION_QUEUE_TTL)
+        return pipe.execute()[0]
+
+    def advance(self, queue, limit, window):
+        """Let in as many waiting tickets as the window allows; returns the head ticket."""
+        return int(self.redis.eval(
+            _ADVANCE, 3, f'{queue}:head', f'{queue}:tail', f'{queue}:window',
+            self._now_ms(), window * 1000, limit,
+        ))
+
+    def acquire(self, key, limit, ttl):
+        """Take one of ``limit`` slots for at most ``ttl`` seconds; returns the holder id or None."""
+        holder = uuid.uuid4().hex
+        taken = self.redis.eval(_ACQUIRE, 1, f'{key}:slots', self._now_ms(), ttl * 1000, limit, holder)
+        return holder if taken else None
+
+    def release(self, key, holder):
+        """Give a slot back."""
+        self.redis.zrem(f'{key}:slots', holder)
+
+
+class LocalAdmissionStore:
+    """
+    In-process stand-in for RedisAdmissionStore.
+    """
+
+    def __init__(self):
+        self.windows = defaultdict(deque)
+        self.heads = defaultdict(int)
+        self.tails = defaultdict(int)
+        self.slots = defaultdict(dict)
+        self.lock = threading.Lock()
+
+    def _trim(self, key, window):
+        events = self.windows[key]
+        while events and events[0] <= time.monotonic() - window:
+            events.popleft()
+        return events
+
+    def join(self, queue):
+        with self.lock:
+            self.tails[queue] += 1
+            return self.tails[queue]
+
+    def advance(self, queue, limit, window):
+        with self.lock:
+            events = self._trim(queue, window)
+            admit = min(limit - len(events), self.tails[queue] - self.heads[queue])
+            if admit > 0:
+                events.extend([time.monotonic()] * admit)
+                self.heads[queue] += admit
+            return self.heads[queue]
+
+    def acquire(self, key, limit, ttl):
+        with self.lock:
+            holders = self.slots[key]
+            now = time.monotonic()
+            for holder in [holder for holder, expires in holders.items() if expires <= now]:
+                del holders[holder]
+            if len(holders) >= limit:
+                return None
+            holder = uuid.uuid4().hex
+            holders[holder] = now + ttl
+            return holder
+
+    def release(self, key, holder):
+        with self.lock:
+            self.slots[key].pop(holder, None)
+
+
+_stores = {}
+
+
+def get_store():
+    """Return the configured admission store, one instance per process."""
+    path = settings.ADMISSION_STORE
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
+
+
+_sales = {'expires': 0.0, 'by_product': {}}
+
+
+def live_sales():
+    """
+    Live flash sales by product id.
+
+    Read from the database at most every ADMISSION_SALES_REFRESH seconds per
+    process, and again after a sale is saved in this process.
+    """
+    if _sales['expires'] <= time.monotonic():
+        now = timezone.now()
+        _sales['by_product'] = {
+            str(sale.product_id): sale
+            for sale in FlashSale.objects.filter(
+                is_active=True, is_deleted=False, starts_at__lte=now, ends_at__gt=now
+            )
+        }
+        _sales['expires'] = time.monotonic() + settings.ADMISSION_SALES_REFRESH
+    return {product_id: sale for product_id, sale in _sales['by_product'].items() if sale.is_live}
+
+
+def forget_sales():
+    """Make the next ``live_sales`` read the sales again."""
+    _sales['expires'] = 0.0
+
+
+def _queue(sale):
+    return f'flash:{sale.pk}'
+
+
+def _retry_after(sale, position):
+    """Seconds until a shopper ``position`` places back is likely let in."""
+    seconds = math.ceil(position * WINDOW / max(1, sale.admissions_per_minute))
+    return min(settings.ADMISSION_MAX_RETRY_AFTER, max(1, seconds))
+
+
+def enter(sale, shopper, ticket=None):
+    """
+    Join the sale's queue, or check on a ticket taken earlier.
+
+    Args:
+        shopper: Id of the signed-in user the ticket and token are issued to
+
+    Returns:
+        ``{'status': 'admitted', 'token': ...}`` once let in, otherwise
+        ``{'status': 'queued', 'ticket': ..., 'position': ..., 'retry_after': ...}``
+
+    Raises:
+        AdmissionRequiredError: The ticket is not valid for this sale and shopper
+    """
+    shopper = str(shopper)
+    store = get_store()
+    if ticket is None:
+        number = store.join(_queue(sale))
+    else:
+        try:
+            payload = signing.loads(ticket, salt=TICKET_SALT, max_age=settings.ADMISSION_QUEUE_TTL)
+        except signing.BadSignature:
+            raise AdmissionRequiredError('Queue ticket is not valid; join the queue again.')
+        if payload['s'] != str(sale.pk):
+            raise AdmissionRequiredError('Queue ticket is for another sale.')
+        if payload.get('u') != shopper:
+            raise AdmissionRequiredError('Queue ticket was issued to another shopper.')
+        number = payload['n']
+
+    head = store.advance(_queue(sale), max(1, sale.admissions_per_minute), WINDOW)
+    if number <= head:
+        return {'status': 'admitted', 'token': signing.dumps({'s': str(sale.pk), 'u': shopper}, salt=TOKEN_SALT)}
+    position = number - head
+    return {
+        'status': 'queued',
+        'ticket': signing.dumps({'s': str(sale.pk), 'u': shopper, 'n': number}, salt=TICKET_SALT),
+        'position': position,
+        'retry_after': _retry_after(sale, position),
+    }
+
+
+def _admitted_sales(header, shopper):
+    """Ids of the sales the ``X-Admission-Token`` header holds valid tokens of ``shopper`` for."""
+    admitted = set()
+    for token in filter(None, (part.strip() for part in (header or '').split(','))):
+        try:
+            payload = signing.loads(token, salt=TOKEN_SALT, max_age=settings.ADMISSION_TOKEN_TTL)
+        except signing.BadSignature:
+            continue
+        if shopper is not None and payload.get('u') == str(shopper):
+            admitted.add(payload['s'])
+    return admitted
+
+
+def require_admission(header, product_ids, shopper):
+    """
+    Check the shopper was let in to every live sale among ``product_ids``.
+
+    Args:
+        shopper: Id of the signed-in user, or None for an anonymous shopper,
+            who is never admitted
+
+    Returns:
+        The live sales involved
+
+    Raises:
+        AdmissionRequiredError: A token is missing, has expired or was issued
+            to another shopper
+    """
+    sales = live_sales()
+    involved = [sales[str(product_id)] for product_id in product_ids if str(product_id) in sales]
+    if not involved:
+        return []
+    admitted = _admitted_sales(header, shopper)
+    for sale in involved:
+        if str(sale.pk) not in admitted:
+            raise AdmissionRequiredError(
+                f'{sale.name} is running a queue; sign in and join it first.',
+                errors={'flash_sale': str(sale.pk)},
+            )
+    return involved
+
+
+@contextmanager
+def checkout_slots(sales):
+    """
+    Hold a checkout slot of each sale for the duration of the block.
+
+    Raises:
+        AdmissionRequiredError: A sale already runs its maximum of checkouts
+    """
+    store = get_store()
+    held = []
+    try:
+        for sale in sorted(sales, key=lambda sale: str(sale.pk)):
+            holder = store.acquire(_queue(sale), sale.max_concurrent_checkouts, settings.ADMISSION_SLOT_TTL)
+            if holder is None:
+                raise AdmissionRequiredError(
+                    f'{sale.name} is busy; you are still in line.',
+                    errors={'flash_sale': str(sale.pk)},
+                    retry_after=1,
+                )
+            held.append((sale, holder))
+        yield
+    finally:
+        for sale, holder in held:
+            store.release(_queue(sale), holder)
@@ -5,3 +5,7 @@ class EcommerceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.ecommerce'
     label = 'ecommerce'
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import apps.ecommerce.signals
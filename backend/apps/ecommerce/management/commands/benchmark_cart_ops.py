@@ -0,0 +1,117 @@
+"""
+Throughput benchmark for cart operations.
+
+Replays the same random stream of add, change and remove operations for a
+set of customers twice: through CartService, which touches only the cart
+store and persists on a later flush, and through the row-per-change approach
+that writes a cart item for every operation. Both validate the product the
+same way. Reports operations per second and latency for each, and the time
+the write-behind flush takes to persist the final carts. Uses the configured
+cart store; run against PostgreSQL and Redis for production figures.
+"""
+
+import random
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from apps.accounts.models import User
+from apps.ecommerce.models import Cart, CartItem
+from apps.ecommerce.services import CartService
+from apps.ecommerce.tasks import flush_carts
+from apps.products.models import Product
+from core.benchmark import format_summary, latency_summary, timed
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks cart operations per second: cart store versus a database row per change'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--customers', type=int, default=200, help='Customers shopping')
+        parser.add_argument('--operations', type=int, default=20000, help='Cart operations replayed')
+        parser.add_argument('--products', type=int, default=500, help='Products to shop from')
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8].upper()
+        products = Product.objects.bulk_create([
+            Product(name=f'Benchmark {tag} {n}', sku=f'BENCH-{tag}-{n}', selling_price=2)
+            for n in range(options['products'])
+        ])
+        customers = User.objects.bulk_create([
+            User(
+                email=f'bench-{tag}-{n}@example.com'.lower(),
+                username=f'bench-{tag}-{n}'.lower(),
+                phone=f'+8804{n:04d}{int(tag, 16) % 10 ** 5:05d}',
+                role='customer',
+            )
+            for n in range(options['customers'])
+        ])
+        rng = random.Random(0)
+        operations = [
+            (rng.choice(customers), rng.choice(products[:50] if rng.random() < 0.5 else products),
+             rng.choices(['add', 'update', 'remove'], weights=[6, 2, 2])[0], rng.randint(1, 3))
+            for _ in range(options['operations'])
+        ]
+
+        try:
+            store_latencies, store_elapsed = self.replay(operations, self.store_operation)
+            started = time.perf_counter()
+            carts = flush_carts()
+            flushed = time.perf_counter() - started
+            persisted = CartItem.objects.filter(cart__user__in=customers).count()
+            CartItem.objects.filter(cart__user__in=customers).delete()
+            db_latencies, db_elapsed = self.replay(operations, self.row_operation)
+        finally:
+            Cart.objects.filter(user__in=customers).delete()
+            User.objects.filter(pk__in=[customer.pk for customer in customers]).delete()
+            Product.objects.filter(pk__in=[product.pk for product in products]).delete()
+
+        self.stdout.write(f"Operations: {len(operations)}  customers: {len(customers)}  products: {len(products)}")
+        self.stdout.write(
+            f'Cart store:    {len(operations) / store_elapsed:8.0f} ops/s  '
+            f'{format_summary(latency_summary(store_latencies))}'
+        )
+        self.stdout.write(
+            f'Row per change:{len(operations) / db_elapsed:8.0f} ops/s  '
+            f'{format_summary(latency_summary(db_latencies))}'
+        )
+        self.stdout.write(f'Write-behind flush: {carts} carts, {persisted} lines in {flushed * 1000:.1f}ms')
+        self.stdout.write(self.style.SUCCESS(f'Cart store speed-up: {db_elapsed / store_elapsed:.1f}x'))
+
+    @staticmethod
+    def replay(operations, apply):
+        latencies = []
+        started = time.perf_counter()
+        for operation in operations:
+            with timed(latencies):
+                apply(*operation)
+        return latencies, time.perf_counter() - started
+
+    @staticmethod
+    def store_operation(customer, product, kind, quantity):
+        cart_id = CartService.cart_id(user=customer)
+        if kind == 'add':
+            CartService.add(cart_id, product.pk, quantity)
+        else:
+            CartService.update(cart_id, product.pk, quantity if kind == 'update' else 0)
+
+    @staticmethod
+    def row_operation(customer, product, kind, quantity):
+        """The cart as database rows, written on every change"""
+        if kind != 'remove':
+            CartService._check_product(product.pk)
+        with transaction.atomic():
+            cart, _ = Cart.objects.get_or_create(user=customer)
+            if kind == 'add':
+                item, created = CartItem.objects.get_or_create(
+                    cart=cart, product=product, defaults={'quantity': quantity}
+                )
+                if not created:
+                    CartItem.objects.filter(pk=item.pk).update(quantity=F('quantity') + quantity)
+            elif kind == 'update':
+                CartItem.objects.update_or_create(cart=cart, product=product, defaults={'quantity': quantity})
+            else:
+                CartItem.objects.filter(cart=cart, product=product).delete()
@@ -0,0 +1,148 @@
+"""
+Latency benchmark for online checkout under concurrent load.
+
+Several customers check out carts against one branch at the same time. The
+command times checkout twice: as the API runs it, with payment and
+notification queued as background stages, and with the same stages run
+inside the request as a fully synchronous checkout would. Queued stages
+are held in memory and drained afterwards, timing each stage, so no Celery
+broker is needed. Reports p95 for both against a target. Orders post stock
+movements to the ledger, so run it against a scratch PostgreSQL database;
+SQLite serialises writers and reports lock waits instead.
+"""
+
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.test.utils import override_settings
+
+from apps.accounts.models import User
+from apps.ecommerce import tasks
+from apps.ecommerce.services import CartService, OrderService
+from apps.inventory.models import Stock, Warehouse
+from apps.inventory.services import StockSummaryService
+from apps.products.models import Product
+from core.benchmark import format_summary, latency_summary, timed
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks p95 latency of online checkout with background stages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skus', type=int, default=500, help='SKUs stocked in the branch')
+        parser.add_argument('--customers', type=int, default=8, help='Concurrent customers')
+        parser.add_argument('--orders', type=int, default=50, help='Orders per customer per run')
+        parser.add_argument('--cart-size', type=int, default=6, help='Lines per cart')
+        parser.add_argument('--payment-method', default='cod', help='Payment method used at checkout')
+        parser.add_argument('--target-ms', type=float, default=100.0, help='p95 checkout latency target')
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8].upper()
+        warehouse = Warehouse.objects.create(name=f'Benchmark {tag}', code=f'BM{tag}')
+        products = Product.objects.bulk_create([
+            Product(name=f'Benchmark {tag} {n}', sku=f'BENCH-{tag}-{n}', selling_price=2)
+            for n in range(options['skus'])
+        ])
+        Stock.objects.bulk_create([
+            Stock(product=product, warehouse=warehouse, quantity=10 ** 6) for product in products
+        ])
+        StockSummaryService.rebuild()
+        customers = [
+            User.objects.create_user(
+                email=f'bench-{tag}-{n}@example.com'.lower(),
+                username=f'bench-{tag}-{n}'.lower(),
+                phone=f'+8802{n:03d}{int(tag, 16) % 10 ** 6:06d}',
+                password=uuid.uuid4().hex,
+            )
+            for n in range(options['customers'])
+        ]
+
+        queued = deque()
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.dummy.EmailBackend'), \
+                mock.patch.object(tasks, 'dispatch_order_stage', lambda order_id, stage: queued.append((order_id, stage))):
+            staged = self.run(customers, products, warehouse, options, 'staged')
+            stage_latencies = self.drain(queued)
+
+            def inline(order_id, stage):
+                while stage:
+                    stage = OrderService.run_stage(order_id, stage)
+
+            with mock.patch.object(tasks, 'dispatch_order_stage', inline):
+                synchronous = self.run(customers, products, warehouse, options, 'inline')
+
+        self.stdout.write(
+            f"Customers: {options['customers']}  orders per run: {options['customers'] * options['orders']}  "
+            f"cart: {options['cart_size']} lines  payment: {options['payment_method']}"
+        )
+        for label, (latencies, errors, elapsed) in (('Staged', staged), ('Inline', synchronous)):
+            self.stdout.write(
+                f'{label} checkout ({elapsed:.2f}s, {errors} errors): {format_summary(latency_summary(latencies))}'
+            )
+        for stage, latencies in stage_latencies.items():
+            self.stdout.write(f'Stage {stage}: {format_summary(latency_summary(latencies))}')
+
+        p95 = latency_summary(staged[0])['p95_ms']
+        if p95 > options['target_ms']:
+            self.stdout.write(self.style.ERROR(f"p95 {p95:.2f}ms is over the {options['target_ms']:.0f}ms target."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"p95 {p95:.2f}ms is within the {options['target_ms']:.0f}ms target."))
+
+    def run(self, customers, products, warehouse, options, run):
+        """Check out concurrently; returns latencies, error count and elapsed time"""
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(len(customers))
+
+        def customer(index):
+            user = customers[index]
+            rng = random.Random(f'{run}-{index}')
+            cart_id = CartService.cart_id(user=user)
+            local_latencies, local_errors = [], 0
+            try:
+                barrier.wait()
+                for _ in range(options['orders']):
+                    for product in rng.sample(products, options['cart_size']):
+                        CartService.add(cart_id, product.pk, rng.randint(1, 3))
+                    start = time.perf_counter()
+                    try:
+                        OrderService.checkout(
+                            user,
+                            warehouse,
+                            idempotency_key=uuid.uuid4().hex,
+                            payment_method=options['payment_method'],
+                            shipping_address='Benchmark',
+                        )
+                        local_latencies.append(time.perf_counter() - start)
+                    except DatabaseError:
+                        local_errors += 1
+                        CartService.clear(cart_id)
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(local_latencies)
+                    errors.append(local_errors)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(customers)) as pool:
+            for index in range(len(customers)):
+                pool.submit(customer, index)
+        return latencies, sum(errors), time.perf_counter() - started
+
+    def drain(self, queued):
+        """Run queued stages in order as a worker would; returns latencies per stage"""
+        latencies = {stage: [] for stage in OrderService.STAGES}
+        while queued:
+            order_id, stage = queued.popleft()
+            with timed(latencies[stage]):
+                following = OrderService.run_stage(order_id, stage)
+            if following:
+                queued.append((order_id, following))
+        return latencies
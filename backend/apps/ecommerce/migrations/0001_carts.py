@@ -0,0 +1,104 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:31
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("products", "0003_catalog_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Cart",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                (
+                    "flushed_at",
+                    models.DateTimeField(
+                        blank=True, help_text="When the cart was last written behind", null=True
+                    ),
+                ),
+                (
+                    "user",
+                    models.OneToOneField(
+                        help_text="Customer the cart belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cart",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "carts",
+            },
+        ),
+        migrations.CreateModel(
+            name="CartItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField(help_text="Units in the cart")),
+                (
+                    "cart",
+                    models.ForeignKey(
+                        help_text="Parent cart",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="ecommerce.cart",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        help_text="Product in the cart",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="cart_items",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "cart_items",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="cartitem",
+            constraint=models.UniqueConstraint(
+                fields=("cart", "product"), name="unique_cart_product"
+            ),
+        ),
+    ]
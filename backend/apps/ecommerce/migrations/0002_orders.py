@@ -0,0 +1,268 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:38
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ecommerce", "0001_carts"),
+        ("inventory", "0007_stock_lots"),
+        ("products", "0003_catalog_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Order",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                (
+                    "order_number",
+                    models.CharField(
+                        help_text="Human-readable order number", max_length=40, unique=True
+                    ),
+                ),
+                (
+                    "idempotency_key",
+                    models.CharField(help_text="Client-generated checkout key", max_length=64),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("awaiting_payment", "Awaiting payment"),
+                            ("confirmed", "Confirmed"),
+                            ("paid", "Paid"),
+                            ("cancelled", "Cancelled"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        help_text="Order status",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "payment_method",
+                    models.CharField(help_text="Payment gateway chosen at checkout", max_length=20),
+                ),
+                ("shipping_address", models.TextField(help_text="Delivery address")),
+                (
+                    "subtotal",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Total before tax", max_digits=12
+                    ),
+                ),
+                (
+                    "tax_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Tax charged", max_digits=12
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Amount due", max_digits=12
+                    ),
+                ),
+                (
+                    "reservation",
+                    models.OneToOneField(
+                        blank=True,
+                        help_text="Stock held for the order",
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="order",
+                        to="inventory.stockreservation",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        help_text="Customer who placed the order",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="orders",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        help_text="Branch the order is fulfilled from",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="orders",
+                        to="inventory.warehouse",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "orders",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="OrderItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField(help_text="Units ordered")),
+                (
+                    "unit_price",
+                    models.DecimalField(
+                        decimal_places=2, help_text="Price per unit before tax", max_digits=12
+                    ),
+                ),
+                (
+                    "tax_rate",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Tax rate in percent", max_digits=5
+                    ),
+                ),
+                (
+                    "tax_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Tax on the line", max_digits=12
+                    ),
+                ),
+                (
+                    "line_total",
+                    models.DecimalField(
+                        decimal_places=2, help_text="Quantity times unit price", max_digits=12
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        help_text="Parent order",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="ecommerce.order",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        help_text="Product ordered",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="order_items",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "order_items",
+            },
+        ),
+        migrations.CreateModel(
+            name="OrderStage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "stage",
+                    models.CharField(
+                        choices=[
+                            ("payment", "Initiate payment"),
+                            ("notification", "Notify customer"),
+                        ],
+                        help_text="Pipeline stage",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        help_text="Stage status",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Times a worker has claimed the stage"
+                    ),
+                ),
+                (
+                    "last_error",
+                    models.TextField(blank=True, help_text="Error from the last failed attempt"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, help_text="When the stage last changed"),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        help_text="Order the stage belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stages",
+                        to="ecommerce.order",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "order_stages",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["user", "created_at"], name="orders_user_id_51663a_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["status"], name="orders_status_762191_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="order",
+            constraint=models.UniqueConstraint(
+                fields=("user", "idempotency_key"), name="unique_order_checkout_key"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="orderstage",
+            constraint=models.UniqueConstraint(
+                fields=("order", "stage"), name="unique_order_stage"
+            ),
+        ),
+    ]
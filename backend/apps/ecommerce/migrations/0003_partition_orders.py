@@ -0,0 +1,44 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:47
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+from core.partitioning import partition_table
+
+
+def copy_order_dates(apps, schema_editor):
+    """Give existing lines their order's creation time."""
+    Order = apps.get_model('ecommerce', 'Order')
+    OrderItem = apps.get_model('ecommerce', 'OrderItem')
+    OrderItem.objects.update(
+        created_at=Subquery(Order.objects.filter(pk=OuterRef('order_id')).values('created_at')[:1])
+    )
+
+
+def partition(apps, schema_editor):
+    """Partition orders and their lines by month on PostgreSQL."""
+    partition_table(schema_editor, 'orders', unique=[('order_number',), ('user_id', 'idempotency_key')])
+    partition_table(schema_editor, 'order_items')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ecommerce", "0002_orders"),
+        # Tables referencing orders must exist before their keys are dropped
+        ("payments", "0001_payments"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="orderitem",
+            name="created_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                help_text="Copy of the order's; the partition key",
+            ),
+        ),
+        migrations.RunPython(copy_order_dates, migrations.RunPython.noop),
+        migrations.RunPython(partition, migrations.RunPython.noop),
+    ]
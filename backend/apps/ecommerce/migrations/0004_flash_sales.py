@@ -0,0 +1,78 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:50
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ecommerce", "0003_partition_orders"),
+        ("products", "0003_catalog_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FlashSale",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                ("name", models.CharField(help_text="Sale name shown to shoppers", max_length=200)),
+                ("starts_at", models.DateTimeField(help_text="When the queue opens")),
+                ("ends_at", models.DateTimeField(help_text="When admission control stops")),
+                (
+                    "admissions_per_minute",
+                    models.PositiveIntegerField(
+                        default=600, help_text="Shoppers let in per minute"
+                    ),
+                ),
+                (
+                    "max_concurrent_checkouts",
+                    models.PositiveIntegerField(
+                        default=20, help_text="Checkouts of the product allowed to run at once"
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True, help_text="Whether the sale runs")),
+                (
+                    "product",
+                    models.ForeignKey(
+                        help_text="Product on sale",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="flash_sales",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "flash_sales",
+                "ordering": ["-starts_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["starts_at", "ends_at"], name="flash_sales_starts__c8e92e_idx"
+                    )
+                ],
+            },
+        ),
+    ]
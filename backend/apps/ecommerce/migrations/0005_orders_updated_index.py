@@ -0,0 +1,20 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ecommerce", "0004_flash_sales"),
+        ("inventory", "0007_stock_lots"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["updated_at"], name="orders_updated_idx"),
+        ),
+    ]
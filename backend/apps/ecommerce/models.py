@@ -0,0 +1,259 @@
+"""
+Online shop models for the Supermarket Management System.
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from core.models import BaseModel
+
+
+class Cart(BaseModel):
+    """
+    Persisted copy of a signed-in customer's cart.
+
+    Live carts are kept in the cart store; this row is written behind, when
+    the customer checks out or the periodic flush runs, and is read back
+    when the store no longer holds the cart.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='cart',
+        help_text="Customer the cart belongs to"
+    )
+    flushed_at = models.DateTimeField(null=True, blank=True, help_text="When the cart was last written behind")
+
+    class Meta:
+        db_table = 'carts'
+
+    def __str__(self) -> str:
+        return f"Cart of {self.user}"
+
+
+class CartItem(models.Model):
+    """
+    One product line in a persisted cart.
+    """
+    cart = models.ForeignKey(
+        Cart,
+        on_delete=models.CASCADE,
+        related_name='items',
+        help_text="Parent cart"
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='cart_items',
+        help_text="Product in the cart"
+    )
+    quantity = models.PositiveIntegerField(help_text="Units in the cart")
+
+    class Meta:
+        db_table = 'cart_items'
+        constraints = [
+            models.UniqueConstraint(fields=['cart', 'product'], name='unique_cart_product'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.quantity} x {self.product_id}"
+
+
+
+class FlashSale(BaseModel):
+    """
+    A time-boxed sale on one product that runs behind admission control.
+
+    While the sale is live, shoppers join a virtual queue and are let in at
+    ``admissions_per_minute``; only admitted shoppers can add the product
+    or check it out, and at most ``max_concurrent_checkouts`` checkouts of
+    it run at once (see apps.ecommerce.admission).
+    """
+    name = models.CharField(max_length=200, help_text="Sale name shown to shoppers")
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='flash_sales',
+        help_text="Product on sale"
+    )
+    starts_at = models.DateTimeField(help_text="When the queue opens")
+    ends_at = models.DateTimeField(help_text="When admission control stops")
+    admissions_per_minute = models.PositiveIntegerField(default=600, help_text="Shoppers let in per minute")
+    max_concurrent_checkouts = models.PositiveIntegerField(
+        default=20,
+        help_text="Checkouts of the product allowed to run at once"
+    )
+    is_active = models.BooleanField(default=True, help_text="Whether the sale runs")
+
+    class Meta:
+        db_table = 'flash_sales'
+        ordering = ['-starts_at']
+        indexes = [
+            models.Index(fields=['starts_at', 'ends_at']),
+        ]
+
+    def __str__(self) -> str:
+        return self.name
+
+    @property
+    def is_live(self) -> bool:
+        """Whether admission control applies now."""
+        return self.is_active and not self.is_deleted and self.starts_at <= timezone.now() < self.ends_at
+
+
+class Order(BaseModel):
+    """
+    An online order, fulfilled from one branch.
+
+    Checkout creates the order with its stock reserved; the remaining
+    stages (see OrderStage) run in the background. On PostgreSQL the table
+    is partitioned by month of ``created_at`` (see core.partitioning).
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_AWAITING_PAYMENT = 'awaiting_payment'
+    STATUS_CONFIRMED = 'confirmed'
+    STATUS_PAID = 'paid'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_AWAITING_PAYMENT, 'Awaiting payment'),
+        (STATUS_CONFIRMED, 'Confirmed'),
+        (STATUS_PAID, 'Paid'),
+        (STATUS_CANCELLED, 'Cancelled'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    order_number = models.CharField(max_length=40, unique=True, help_text="Human-readable order number")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name='orders',
+        help_text="Customer who placed the order"
+    )
+    warehouse = models.ForeignKey(
+        'inventory.Warehouse',
+        on_delete=models.PROTECT,
+        related_name='orders',
+        help_text="Branch the order is fulfilled from"
+    )
+    idempotency_key = models.CharField(max_length=64, help_text="Client-generated checkout key")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        help_text="Order status"
+    )
+    payment_method = models.CharField(max_length=20, help_text="Payment gateway chosen at checkout")
+    shipping_address = models.TextField(help_text="Delivery address")
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Total before tax")
+    tax_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Tax charged")
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Amount due")
+    reservation = models.OneToOneField(
+        'inventory.StockReservation',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='order',
+        help_text="Stock held for the order"
+    )
+
+    class Meta:
+        db_table = 'orders'
+        ordering = ['-created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'idempotency_key'], name='unique_order_checkout_key'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+            models.Index(fields=['status']),
+            models.Index(fields=['updated_at'], name='orders_updated_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.order_number} ({self.total})"
+
+
+class OrderItem(models.Model):
+    """
+    One product line on an order.
+    """
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='items',
+        help_text="Parent order"
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.PROTECT,
+        related_name='order_items',
+        help_text="Product ordered"
+    )
+    quantity = models.PositiveIntegerField(help_text="Units ordered")
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2, help_text="Price per unit before tax")
+    tax_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0, help_text="Tax rate in percent")
+    tax_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Tax on the line")
+    line_total = models.DecimalField(max_digits=12, decimal_places=2, help_text="Quantity times unit price")
+    created_at = models.DateTimeField(default=timezone.now, help_text="Copy of the order's; the partition key")
+
+    class Meta:
+        db_table = 'order_items'
+
+    def __str__(self) -> str:
+        return f"{self.quantity} x {self.product_id}"
+
+
+class OrderStage(models.Model):
+    """
+    Progress of one background checkout stage of an order.
+
+    A stage runs at most once to completion: a worker claims it by moving it
+    to running, and a duplicate or redelivered task finds it running or done
+    and stops. A claim older than ORDER_STAGE_LEASE seconds is treated as
+    abandoned by a crashed worker and may be taken again.
+    """
+    STAGE_PAYMENT = 'payment'
+    STAGE_NOTIFICATION = 'notification'
+    STAGE_CHOICES = [
+        (STAGE_PAYMENT, 'Initiate payment'),
+        (STAGE_NOTIFICATION, 'Notify customer'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name='stages',
+        help_text="Order the stage belongs to"
+    )
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, help_text="Pipeline stage")
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        help_text="Stage status"
+    )
+    attempts = models.PositiveIntegerField(default=0, help_text="Times a worker has claimed the stage")
+    last_error = models.TextField(blank=True, help_text="Error from the last failed attempt")
+    updated_at = models.DateTimeField(auto_now=True, help_text="When the stage last changed")
+
+    class Meta:
+        db_table = 'order_stages'
+        constraints = [
+            models.UniqueConstraint(fields=['order', 'stage'], name='unique_order_stage'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.order_id} {self.stage}: {self.status}"
@@ -0,0 +1,135 @@
+"""
+Serializers for the ecommerce app.
+"""
+
+from django.conf import settings
+from rest_framework import serializers
+
+from apps.inventory.models import Warehouse
+from .models import FlashSale, Order, OrderItem, OrderStage
+
+
+class CartAddSerializer(serializers.Serializer):
+    """Serializer for adding a product to the cart"""
+
+    product = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1, max_value=999, default=1)
+
+
+class CartUpdateSerializer(serializers.Serializer):
+    """Serializer for setting a cart line's quantity; zero removes it"""
+
+    quantity = serializers.IntegerField(min_value=0, max_value=999)
+
+
+class CartLineSerializer(serializers.Serializer):
+    """Serializer for one cart line priced from the catalog"""
+
+    product = serializers.UUIDField()
+    name = serializers.CharField()
+    sku = serializers.CharField()
+    unit_price = serializers.DecimalField(max_digits=12, decimal_places=2)
+    quantity = serializers.IntegerField()
+    line_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    is_active = serializers.BooleanField()
+
+
+class CartSerializer(serializers.Serializer):
+    """Serializer for a cart; ``cart_token`` is set for anonymous carts"""
+
+    cart_token = serializers.CharField(allow_null=True)
+    items = CartLineSerializer(many=True)
+    item_count = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class CheckoutSerializer(serializers.Serializer):
+    """Serializer for checking out the customer's cart"""
+
+    idempotency_key = serializers.CharField(max_length=64)
+    warehouse = serializers.PrimaryKeyRelatedField(queryset=Warehouse.objects.filter(is_active=True))
+    payment_method = serializers.CharField(max_length=20)
+    shipping_address = serializers.CharField()
+
+    def validate_payment_method(self, value):
+        if value not in settings.PAYMENT_GATEWAYS:
+            raise serializers.ValidationError(f'Choose one of: {", ".join(settings.PAYMENT_GATEWAYS)}.')
+        return value
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    """Serializer for order lines"""
+
+    class Meta:
+        model = OrderItem
+        fields = ['id', 'product', 'quantity', 'unit_price', 'tax_rate', 'tax_amount', 'line_total']
+        read_only_fields = fields
+
+
+class OrderStageSerializer(serializers.ModelSerializer):
+    """Serializer for the progress of an order's background stages"""
+
+    class Meta:
+        model = OrderStage
+        fields = ['stage', 'status', 'attempts', 'updated_at']
+        read_only_fields = fields
+
+
+class OrderSerializer(serializers.ModelSerializer):
+    """Serializer for orders with their lines, stages and payment link"""
+
+    items = OrderItemSerializer(many=True, read_only=True)
+    stages = OrderStageSerializer(many=True, read_only=True)
+    payment_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = [
+            'id',
+            'order_number',
+            'idempotency_key',
+            'status',
+            'warehouse',
+            'payment_method',
+            'payment_url',
+            'shipping_address',
+            'subtotal',
+            'tax_amount',
+            'total',
+            'created_at',
+            'items',
+            'stages',
+        ]
+        read_only_fields = fields
+
+    def get_payment_url(self, obj) -> str:
+        """Where an order awaiting payment is paid"""
+        if obj.status != Order.STATUS_AWAITING_PAYMENT:
+            return ''
+        payment = next((payment for payment in obj.payments.all() if payment.redirect_url), None)
+        return payment.redirect_url if payment else ''
+
+
+class FlashSaleSerializer(serializers.ModelSerializer):
+    """Serializer for flash sales shown to shoppers"""
+
+    class Meta:
+        model = FlashSale
+        fields = ['id', 'name', 'product', 'starts_at', 'ends_at']
+        read_only_fields = fields
+
+
+class AdmissionRequestSerializer(serializers.Serializer):
+    """Serializer for joining a flash sale queue or checking on a ticket"""
+
+    ticket = serializers.CharField(required=False)
+
+
+class AdmissionSerializer(serializers.Serializer):
+    """Serializer for a shopper's place in a flash sale queue"""
+
+    status = serializers.ChoiceField(choices=['admitted', 'queued'])
+    token = serializers.CharField(required=False, help_text="Send as X-Admission-Token once admitted")
+    ticket = serializers.CharField(required=False, help_text="Send back to check on the place in line")
+    position = serializers.IntegerField(required=False)
+    retry_after = serializers.IntegerField(required=False)
@@ -0,0 +1,529 @@
+"""
+Business logic for the online shop.
+"""
+
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.customers.services import CustomerService, LoyaltyService
+from apps.inventory.models import StockMovement, StockReservation
+from apps.inventory.services import StockLotService, StockReservationService, StockService
+from apps.payments.models import Payment
+from apps.payments.services import PaymentService
+from apps.products.models import Product
+from core.exceptions import InvalidOperationError, PaymentFailedError
+from core.numbering import NumberAllocator
+from core.partitioning import guard_keys
+from . import tasks
+from .models import Cart, CartItem, Order, OrderItem, OrderStage
+from .store import get_store
+
+USER_PREFIX = 'user:'
+ANONYMOUS_PREFIX = 'anon:'
+
+CENT = Decimal('0.01')
+
+ORDER_NUMBERS = NumberAllocator('order', 'ORD')
+
+
+def _money(value):
+    """Round to whole cents."""
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+class CartService:
+    """
+    Carts kept in the cart store and written behind to the database.
+
+    A cart is addressed by a cart id: ``user:<pk>`` for a signed-in
+    customer and ``anon:<token>`` for a visitor, whose token the client keeps
+    and sends back. Only customers' carts are persisted.
+    """
+
+    @staticmethod
+    def cart_id(user=None, token=None):
+        """Cart id for a signed-in customer, or for an anonymous token."""
+        if user is not None and user.is_authenticated:
+            return f'{USER_PREFIX}{user.pk}'
+        return f'{ANONYMOUS_PREFIX}{token}'
+
+    @staticmethod
+    def items(cart_id):
+        """
+        Return the cart as ``{product_id: quantity}``.
+
+        A customer's cart the store no longer holds is read back from its
+        persisted copy and put in the store again.
+        """
+        store = get_store()
+        items = store.get(cart_id)
+        if items is None:
+            items = {}
+            if cart_id.startswith(USER_PREFIX):
+                items = {
+                    str(product_id): quantity
+                    for product_id, quantity in CartItem.objects
+                    .filter(cart__user_id=cart_id[len(USER_PREFIX):])
+                    .values_list('product_id', 'quantity')
+                }
+            store.replace(cart_id, items)
+        return items
+
+    @staticmethod
+    def _check_product(product_id):
+        if not Product.objects.filter(pk=product_id, is_active=True, is_deleted=False).exists():
+            raise InvalidOperationError('Product is not available.')
+
+    @staticmethod
+    def _changed(cart_id):
+        if cart_id.startswith(USER_PREFIX):
+            get_store().mark_dirty(cart_id)
+
+    @staticmethod
+    def add(cart_id, product_id, quantity=1):
+        """Add units of a product; returns the quantity now in the cart."""
+        CartService._check_product(product_id)
+        CartService.items(cart_id)
+        quantity = get_store().add(cart_id, product_id, quantity)
+        CartService._changed(cart_id)
+        return quantity
+
+    @staticmethod
+    def update(cart_id, product_id, quantity):
+        """Set a product's quantity; zero removes it from the cart."""
+        if quantity:
+            CartService._check_product(product_id)
+        CartService.items(cart_id)
+        get_store().set(cart_id, product_id, quantity)
+        CartService._changed(cart_id)
+
+    @staticmethod
+    def clear(cart_id):
+        """Empty the cart, e.g. once it has been checked out."""
+        get_store().replace(cart_id, {})
+        CartService._changed(cart_id)
+
+    @staticmethod
+    def merge(token, user):
+        """Fold a visitor's anonymous cart into the customer's cart on sign-in."""
+        store = get_store()
+        anonymous = CartService.cart_id(token=token)
+        lines = store.get(anonymous)
+        if not lines:
+            return
+        cart_id = CartService.cart_id(user=user)
+        CartService.items(cart_id)
+        for product_id, quantity in lines.items():
+            store.add(cart_id, product_id, quantity)
+        store.delete(anonymous)
+        CartService._changed(cart_id)
+
+    @staticmethod
+    def detail(cart_id):
+        """The cart's lines priced from the catalog, with its subtotal."""
+        items = CartService.items(cart_id)
+        products = Product.objects.filter(pk__in=list(items), is_deleted=False)
+        lines = [
+            {
+                'product': product.pk,
+                'name': product.name,
+                'sku': product.sku,
+                'unit_price': product.selling_price,
+                'quantity': items[str(product.pk)],
+                'line_total': product.selling_price * items[str(product.pk)],
+                'is_active': product.is_active,
+            }
+            for product in products
+        ]
+        return {
+            'items': lines,
+            'item_count': sum(line['quantity'] for line in lines),
+            'subtotal': sum((line['line_total'] for line in lines), Decimal('0')),
+        }
+
+    @staticmethod
+    def flush(cart_ids=None):
+        """
+        Write customers' carts from the store to the database.
+
+        Args:
+            cart_ids: Carts to write; by default up to CART_FLUSH_BATCH of the
+                carts changed since they were last written
+
+        Returns:
+            Number of carts written
+        """
+        store = get_store()
+        if cart_ids is None:
+            cart_ids = store.pop_dirty(settings.CART_FLUSH_BATCH)
+        carts = {}
+        for cart_id in cart_ids:
+            if cart_id.startswith(USER_PREFIX):
+                items = store.get(cart_id)
+                # An expired cart has nothing newer than its persisted copy
+                if items is not None:
+                    carts[cart_id[len(USER_PREFIX):]] = items
+        if not carts:
+            return 0
+
+        try:
+            CartService._write(carts)
+        except Exception:
+            # Queue them again so the next flush retries
+            for user_id in carts:
+                store.mark_dirty(f'{USER_PREFIX}{user_id}')
+            raise
+        return len(carts)
+
+    @staticmethod
+    def _write(carts):
+        """Replace the persisted lines of ``{user_id: items}`` in one transaction."""
+        now = timezone.now()
+        with transaction.atomic():
+            Cart.objects.bulk_create([Cart(user_id=user_id) for user_id in carts], ignore_conflicts=True)
+            cart_pks = {
+                str(user_id): pk
+                for user_id, pk in Cart.objects.filter(user_id__in=list(carts)).values_list('user_id', 'pk')
+            }
+            known = {
+                str(pk) for pk in Product.objects
+                .filter(pk__in={product_id for items in carts.values() for product_id in items})
+                .values_list('pk', flat=True)
+            }
+            CartItem.objects.filter(cart_id__in=cart_pks.values()).delete()
+            CartItem.objects.bulk_create(
+                [
+                    CartItem(cart_id=cart_pks[user_id], product_id=product_id, quantity=quantity)
+                    for user_id, items in carts.items()
+                    for product_id, quantity in items.items()
+                    if product_id in known
+                ],
+                batch_size=1000,
+            )
+            Cart.objects.filter(pk__in=cart_pks.values()).update(flushed_at=now, updated_at=now)
+
+
+class OrderService:
+    """
+    Checkout and the background stages that follow it.
+
+    Checkout itself only validates the cart, reserves its stock and stores
+    the order. Payment initiation and the customer notification then run as
+    Celery stages, each recorded in an OrderStage row so a retried or
+    duplicated task never repeats a completed stage. A payment stage that
+    fails for good is compensated: the order fails and its stock is
+    released. A notification that fails for good is only recorded, since
+    the order behind it stands either way. An order still unpaid when its
+    reservation expires fails with it.
+    """
+    STAGES = [OrderStage.STAGE_PAYMENT, OrderStage.STAGE_NOTIFICATION]
+
+    OPEN_STATUSES = [Order.STATUS_PENDING, Order.STATUS_AWAITING_PAYMENT]
+
+    @staticmethod
+    def generate_order_number(warehouse):
+        """Return a new order number for the fulfilling branch."""
+        return ORDER_NUMBERS.next(warehouse.code)
+
+    @staticmethod
+    def checkout(user, warehouse, idempotency_key, payment_method, shipping_address):
+        """
+        Turn the customer's cart into an order with its stock reserved.
+
+        A repeated checkout with the same idempotency key returns the order
+        the first one created. The cart is emptied and the stages are queued
+        once the order commits; a cart store that cannot be reached leaves
+        the cart filled rather than failing the committed order.
+
+        Returns:
+            Tuple of the Order and whether it was created
+
+        Raises:
+            InvalidOperationError: Empty cart, unavailable product or
+                unknown payment method
+            OutOfStockError, InsufficientStockError: A line cannot be reserved
+        """
+        existing = Order.objects.filter(user=user, idempotency_key=idempotency_key).first()
+        if existing is not None:
+            return existing, False
+        if payment_method not in settings.PAYMENT_GATEWAYS:
+            raise InvalidOperationError(f'Payment method {payment_method} is not available.')
+
+        cart_id = CartService.cart_id(user=user)
+        cart = CartService.items(cart_id)
+        if not cart:
+            raise InvalidOperationError('Cart is empty.')
+        catalog = {
+            str(pk): (pk, price, tax_rate)
+            for pk, price, tax_rate in Product.objects
+            .filter(pk__in=list(cart), is_active=True, is_deleted=False)
+            .values_list('pk', 'selling_price', 'tax_rate')
+        }
+        if len(catalog) != len(cart):
+            raise InvalidOperationError('Cart holds products that are no longer available.')
+
+        order = Order(
+            order_number=OrderService.generate_order_number(warehouse),
+            user=user,
+            warehouse=warehouse,
+            idempotency_key=idempotency_key,
+            payment_method=payment_method,
+            shipping_address=shipping_address,
+        )
+        items = []
+        for key, quantity in cart.items():
+            product_id, price, tax_rate = catalog[key]
+            line_total = _money(price * quantity)
+            items.append(OrderItem(
+                order=order,
+                product_id=product_id,
+                quantity=quantity,
+                unit_price=price,
+                tax_rate=tax_rate,
+                tax_amount=_money(line_total * tax_rate / 100),
+                line_total=line_total,
+            ))
+        order.subtotal = sum((item.line_total for item in items), Decimal('0'))
+        order.tax_amount = sum((item.tax_amount for item in items), Decimal('0'))
+        order.total = order.subtotal + order.tax_amount
+
+        try:
+            with transaction.atomic():
+                if guard_keys('order', [f'{user.pk}:{idempotency_key}']):
+                    existing = Order.objects.filter(user=user, idempotency_key=idempotency_key).first()
+                    if existing is not None:
+                        return existing, False
+                order.reservation = StockReservationService.reserve(
+                    [(item.product_id, warehouse.pk, item.quantity) for item in items],
+                    reference=order.order_number,
+                    ttl=settings.ORDER_RESERVATION_TTL,
+                )
+                order.save(force_insert=True)
+                for item in items:
+                    item.created_at = order.created_at
+                OrderItem.objects.bulk_create(items)
+                OrderStage.objects.bulk_create([OrderStage(order=order, stage=stage) for stage in OrderService.STAGES])
+                transaction.on_commit(lambda: CartService.clear(cart_id), robust=True)
+                transaction.on_commit(
+                    lambda: tasks.dispatch_order_stage(order.pk, OrderService.STAGES[0]), robust=True
+                )
+        except IntegrityError:
+            existing = Order.objects.filter(user=user, idempotency_key=idempotency_key).first()
+            if existing is None:
+                raise
+            return existing, False
+        return order, True
+
+    @staticmethod
+    def run_stage(order_id, stage):
+        """
+        Run one stage of an order unless another worker has it or it is done.
+
+        Returns:
+            The stage to run next, or None
+
+        Raises:
+            Any error of the stage other than a declined payment, after
+            putting the stage back to pending so the retry can claim it
+        """
+        now = timezone.now()
+        claimed = OrderStage.objects.filter(order_id=order_id, stage=stage).filter(
+            Q(status=OrderStage.STATUS_PENDING)
+            | Q(status=OrderStage.STATUS_RUNNING, updated_at__lt=now - timedelta(seconds=settings.ORDER_STAGE_LEASE))
+        ).update(status=OrderStage.STATUS_RUNNING, attempts=F('attempts') + 1, updated_at=now)
+        if not claimed:
+            return None
+
+        order = Order.objects.select_related('user', 'reservation').get(pk=order_id)
+        try:
+            getattr(OrderService, f'_stage_{stage}')(order)
+        except PaymentFailedError as exc:
+            OrderService.compensate(order_id, stage, str(exc))
+            return OrderStage.STAGE_NOTIFICATION
+        except Exception as exc:
+            OrderStage.objects.filter(order_id=order_id, stage=stage).update(
+                status=OrderStage.STATUS_PENDING, last_error=str(exc), updated_at=timezone.now()
+            )
+            raise
+        OrderStage.objects.filter(order_id=order_id, stage=stage).update(
+            status=OrderStage.STATUS_DONE, last_error='', updated_at=timezone.now()
+        )
+        following = OrderService.STAGES.index(stage) + 1
+        return OrderService.STAGES[following] if following < len(OrderService.STAGES) else None
+
+    @staticmethod
+    def resume_stalled(now=None):
+        """
+        Queue again the stages left waiting ORDER_STAGE_LEASE seconds, in case
+        their task was never queued or their worker died.
+
+        Only the first unfinished stage of an order is queued, so a customer
+        is never told about an order whose payment has not started.
+
+        Returns:
+            Number of stages queued
+        """
+        cutoff = (now or timezone.now()) - timedelta(seconds=settings.ORDER_STAGE_LEASE)
+        unfinished = OrderStage.objects.filter(
+            status__in=[OrderStage.STATUS_PENDING, OrderStage.STATUS_RUNNING],
+            order__in=OrderStage.objects.filter(
+                status__in=[OrderStage.STATUS_PENDING, OrderStage.STATUS_RUNNING], updated_at__lt=cutoff
+            ).values('order_id'),
+        ).values_list('order_id', 'stage', 'updated_at')
+        first = {}
+        for order_id, stage, updated_at in unfinished:
+            rank = OrderService.STAGES.index(stage)
+            if order_id not in first or rank < first[order_id][0]:
+                first[order_id] = (rank, stage, updated_at)
+        stalled = [(order_id, stage) for order_id, (_, stage, updated_at) in first.items() if updated_at < cutoff]
+        for order_id, stage in stalled:
+            tasks.dispatch_order_stage(order_id, stage)
+        return len(stalled)
+
+    @staticmethod
+    def _stage_payment(order):
+        """Start the payment; cash-on-delivery orders are confirmed at once."""
+        _, gateway = PaymentService.initiate(order, idempotency_key=f'order-{order.pk}-payment')
+        if gateway.collects_on_delivery:
+            OrderService.fulfil(order, Order.STATUS_CONFIRMED)
+        else:
+            Order.objects.filter(pk=order.pk, status=Order.STATUS_PENDING).update(
+                status=Order.STATUS_AWAITING_PAYMENT, updated_at=timezone.now()
+            )
+
+    @staticmethod
+    def _stage_notification(order):
+        """Tell the customer how the order stands."""
+        order.refresh_from_db(fields=['status'])
+        payment = order.payments.filter(status=Payment.STATUS_PENDING).first()
+        if order.status == Order.STATUS_FAILED:
+            body = f'We could not process order {order.order_number}. No payment has been taken.'
+        elif order.status == Order.STATUS_AWAITING_PAYMENT and payment is not None:
+            body = f'Order {order.order_number} for {order.total} is waiting for payment: {payment.redirect_url}'
+        else:
+            body = f'Order {order.order_number} for {order.total} is {order.get_status_display().lower()}.'
+        send_mail(f'Your order {order.order_number}', body, None, [order.user.email])
+
+    @staticmethod
+    def give_up(order_id, stage, error):
+        """
+        Settle a stage whose retries are used up.
+
+        Returns:
+            The stage to run next, or None
+        """
+        if stage == OrderStage.STAGE_PAYMENT:
+            OrderService.compensate(order_id, stage, error)
+            return OrderStage.STAGE_NOTIFICATION
+        OrderStage.objects.filter(order_id=order_id, stage=stage).update(
+            status=OrderStage.STATUS_FAILED, last_error=error, updated_at=timezone.now()
+        )
+        return None
+
+    @staticmethod
+    def compensate(order_id, stage, error):
+        """
+        Undo checkout after a stage has failed for good.
+
+        The stage is marked failed, an order that was still open fails and
+        its reserved stock is released.
+        """
+        with transaction.atomic():
+            OrderStage.objects.filter(order_id=order_id, stage=stage).update(
+                status=OrderStage.STATUS_FAILED, last_error=error, updated_at=timezone.now()
+            )
+            failed = Order.objects.filter(pk=order_id, status__in=OrderService.OPEN_STATUSES).update(
+                status=Order.STATUS_FAILED, updated_at=timezone.now()
+            )
+            if failed:
+                OrderService._release(Order.objects.select_related('reservation').get(pk=order_id))
+
+    @staticmethod
+    def expire(reservation_ids):
+        """
+        Fail the open orders whose reservations have expired, and their
+        unsettled payments, so no payment is taken for stock given back.
+
+        Returns:
+            Number of orders failed
+        """
+        orders = Order.objects.filter(reservation_id__in=reservation_ids, status__in=OrderService.OPEN_STATUSES)
+        order_ids = list(orders.values_list('pk', flat=True))
+        if not order_ids:
+            return 0
+        now = timezone.now()
+        Payment.objects.filter(
+            order_id__in=order_ids, status__in=[Payment.STATUS_CREATED, Payment.STATUS_PENDING]
+        ).update(status=Payment.STATUS_FAILED, updated_at=now)
+        return Order.objects.filter(pk__in=order_ids, status__in=OrderService.OPEN_STATUSES).update(
+            status=Order.STATUS_FAILED, updated_at=now
+        )
+
+    @staticmethod
+    def fulfil(order, status):
+        """
+        Move an open order to confirmed or paid and take its reserved stock.
+
+        Paid orders queue their loyalty points; cash-on-delivery orders are
+        only confirmed here and earn nothing yet.
+
+        Raises:
+            InvalidOperationError: The order is no longer open, or its
+                reservation has lapsed
+        """
+        with transaction.atomic():
+            updated = Order.objects.filter(pk=order.pk, status__in=OrderService.OPEN_STATUSES).update(
+                status=status, updated_at=timezone.now()
+            )
+            if not updated:
+                raise InvalidOperationError(f'Order {order.order_number} is no longer open.')
+            StockReservationService.commit(order.reservation)
+            if status == Order.STATUS_PAID:
+                customer = CustomerService.for_user(order.user)
+                LoyaltyService.enqueue([(customer.pk, LoyaltyService.points_for(order.total), order.order_number)])
+        order.status = status
+        return order
+
+    @staticmethod
+    def cancel(order, user=None):
+        """
+        Cancel an order that has not been paid; its stock goes back, and a
+        confirmed order's units go back to the lots they were drawn from.
+
+        Raises:
+            InvalidOperationError: The order is paid, failed or already cancelled
+        """
+        with transaction.atomic():
+            order = Order.objects.select_for_update(of=('self',)).select_related('reservation').get(pk=order.pk)
+            if order.status not in [*OrderService.OPEN_STATUSES, Order.STATUS_CONFIRMED]:
+                raise InvalidOperationError(f'A {order.get_status_display().lower()} order cannot be cancelled.')
+            was_confirmed = order.status == Order.STATUS_CONFIRMED
+            order.status = Order.STATUS_CANCELLED
+            order.save(update_fields=['status', 'updated_at'])
+            if was_confirmed:
+                StockService.apply_movements(
+                    [
+                        (item.product_id, order.warehouse_id, StockMovement.TYPE_RETURN, item.quantity)
+                        for item in order.items.all()
+                    ],
+                    reference=f'CANCEL-{order.order_number}',
+                    user=user,
+                )
+                reservation = order.reservation
+                if reservation is not None:
+                    StockLotService.restore([reservation.reference or str(reservation.pk)])
+            else:
+                OrderService._release(order)
+        return order
+
+    @staticmethod
+    def _release(order):
+        """Release the order's reservation unless it has already lapsed."""
+        if order.reservation is not None and order.reservation.status == StockReservation.STATUS_ACTIVE:
+            StockReservationService.release(order.reservation)
@@ -0,0 +1,38 @@
+"""
+Signal receivers for the ecommerce app.
+"""
+
+from django.contrib.auth.signals import user_logged_in
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.inventory.signals import reservations_expired
+from . import admission
+from .models import FlashSale
+from .services import CartService, OrderService
+
+
+@receiver(user_logged_in)
+def merge_anonymous_cart(sender, request, user, **kwargs):
+    """
+    Merge the visitor's anonymous cart into the customer's cart on login.
+    """
+    token = request.headers.get('X-Cart-Token') if request is not None else None
+    if token:
+        CartService.merge(token, user)
+
+
+@receiver([post_save, post_delete], sender=FlashSale)
+def refresh_flash_sales(sender, **kwargs):
+    """
+    Pick up a changed flash sale in this process straight away.
+    """
+    admission.forget_sales()
+
+
+@receiver(reservations_expired)
+def fail_expired_orders(sender, reservation_ids, **kwargs):
+    """
+    Fail the orders still waiting on reservations that have expired.
+    """
+    OrderService.expire(reservation_ids)
@@ -0,0 +1,161 @@
+"""
+Live cart storage.
+
+Adding to and removing from a cart only touches the cart store; the
+database copy is written behind (see CartService.flush). A cart is a map of
+product id to quantity that expires CART_TTL seconds after its last change.
+Carts of signed-in customers are also marked dirty so the next flush
+persists them.
+
+``RedisCartStore`` keeps each cart as a Redis hash and the dirty marks as a
+set, shared by every web worker. ``LocalCartStore`` is an in-process
+stand-in for development and tests; like the in-memory channel layer it
+only works within a single process. CART_STORE selects the class.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from django_redis import get_redis_connection
+
+# Hash field present in every stored cart, so a cart emptied by the customer
+# is told apart from one the store does not hold
+LOADED = '~'
+
+
+class RedisCartStore:
+    """
+    Carts as Redis hashes of product id to quantity.
+    """
+    DIRTY_KEY = 'cart:dirty'
+
+    def __init__(self, alias='default'):
+        self.alias = alias
+
+    @property
+    def redis(self):
+        return get_redis_connection(self.alias)
+
+    @staticmethod
+    def _key(cart_id):
+        return f'cart:{cart_id}'
+
+    def get(self, cart_id):
+        """Return the cart's lines, or None if the store does not hold it."""
+        data = self.redis.hgetall(self._key(cart_id))
+        if not data:
+            return None
+        return {field.decode(): int(value) for field, value in data.items() if field.decode() != LOADED}
+
+    def add(self, cart_id, product_id, quantity):
+        """Add units of a product; returns the new quantity."""
+        key = self._key(cart_id)
+        pipe = self.redis.pipeline()
+        pipe.hincrby(key, str(product_id), quantity)
+        pipe.hset(key, LOADED, 1)
+        pipe.expire(key, settings.CART_TTL)
+        return pipe.execute()[0]
+
+    def set(self, cart_id, product_id, quantity):
+        """Set a product's quantity; zero removes the line."""
+        key = self._key(cart_id)
+        pipe = self.redis.pipeline()
+        if quantity:
+            pipe.hset(key, str(product_id), quantity)
+        else:
+            pipe.hdel(key, str(product_id))
+        pipe.hset(key, LOADED, 1)
+        pipe.expire(key, settings.CART_TTL)
+        pipe.execute()
+
+    def replace(self, cart_id, items):
+        """Store ``items`` as the whole cart."""
+        key = self._key(cart_id)
+        pipe = self.redis.pipeline()
+        pipe.delete(key)
+        pipe.hset(key, mapping={LOADED: 1, **{str(product_id): quantity for product_id, quantity in items.items()}})
+        pipe.expire(key, settings.CART_TTL)
+        pipe.execute()
+
+    def delete(self, cart_id):
+        """Drop the cart from the store."""
+        self.redis.delete(self._key(cart_id))
+
+    def mark_dirty(self, cart_id):
+        """Queue the cart for the next write-behind flush."""
+        self.redis.sadd(self.DIRTY_KEY, cart_id)
+
+    def pop_dirty(self, count):
+        """Take up to ``count`` carts queued for flushing."""
+        return [cart_id.decode() for cart_id in self.redis.spop(self.DIRTY_KEY, count) or []]
+
+
+class LocalCartStore:
+    """
+    In-process stand-in for RedisCartStore.
+    """
+
+    def __init__(self):
+        self.carts = {}
+        self.dirty = set()
+        self.lock = threading.Lock()
+
+    def _live(self, cart_id):
+        entry = self.carts.get(cart_id)
+        if entry is None or entry[0] < time.monotonic():
+            self.carts.pop(cart_id, None)
+            return None
+        return entry[1]
+
+    def _touch(self, cart_id, items):
+        self.carts[cart_id] = (time.monotonic() + settings.CART_TTL, items)
+
+    def get(self, cart_id):
+        with self.lock:
+            items = self._live(cart_id)
+            return None if items is None else dict(items)
+
+    def add(self, cart_id, product_id, quantity):
+        with self.lock:
+            items = self._live(cart_id) or {}
+            items[str(product_id)] = items.get(str(product_id), 0) + quantity
+            self._touch(cart_id, items)
+            return items[str(product_id)]
+
+    def set(self, cart_id, product_id, quantity):
+        with self.lock:
+            items = self._live(cart_id) or {}
+            if quantity:
+                items[str(product_id)] = quantity
+            else:
+                items.pop(str(product_id), None)
+            self._touch(cart_id, items)
+
+    def replace(self, cart_id, items):
+        with self.lock:
+            self._touch(cart_id, {str(product_id): quantity for product_id, quantity in items.items()})
+
+    def delete(self, cart_id):
+        with self.lock:
+            self.carts.pop(cart_id, None)
+
+    def mark_dirty(self, cart_id):
+        with self.lock:
+            self.dirty.add(cart_id)
+
+    def pop_dirty(self, count):
+        with self.lock:
+            return [self.dirty.pop() for _ in range(min(count, len(self.dirty)))]
+
+
+_stores = {}
+
+
+def get_store():
+    """Return the configured cart store, one instance per process."""
+    path = settings.CART_STORE
+    if path not in _stores:
+        _stores[path] = import_string(path)()
+    return _stores[path]
@@ -0,0 +1,53 @@
+"""
+Celery tasks for the ecommerce app.
+"""
+
+from celery import shared_task
+from django.conf import settings
+
+from . import services
+from .store import get_store
+
+
+@shared_task
+def flush_carts():
+    """Write carts changed since the last flush to the database."""
+    written = 0
+    while cart_ids := get_store().pop_dirty(settings.CART_FLUSH_BATCH):
+        written += services.CartService.flush(cart_ids)
+    return written
+
+
+@shared_task(bind=True)
+def run_order_stage(self, order_id, stage):
+    """
+    Run a checkout stage, then queue the next one.
+
+    Failures are retried with exponential backoff; once the retries are
+    used up the stage is given up: a failed payment compensates the order
+    and the customer is told, a failed notification is only recorded.
+    """
+    try:
+        following = services.OrderService.run_stage(order_id, stage)
+    except Exception as exc:
+        if self.request.retries >= settings.ORDER_STAGE_MAX_RETRIES:
+            following = services.OrderService.give_up(order_id, stage, str(exc))
+        else:
+            raise self.retry(exc=exc, countdown=2 ** self.request.retries * 10)
+    if following:
+        dispatch_order_stage(order_id, following)
+    return following
+
+
+@shared_task
+def resume_order_stages():
+    """Queue again checkout stages that have been waiting too long."""
+    return services.OrderService.resume_stalled()
+
+
+def dispatch_order_stage(order_id, stage):
+    """Queue a checkout stage, or run it in-process when ORDER_STAGES_EAGER is set."""
+    if settings.ORDER_STAGES_EAGER:
+        run_order_stage.apply(args=[str(order_id), stage])
+    else:
+        run_order_stage.delay(str(order_id), stage)
@@ -0,0 +1,176 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from apps.ecommerce import admission, store
+from apps.ecommerce.models import FlashSale, Order
+from apps.ecommerce.services import CartService
+
+
+@pytest.fixture(autouse=True)
+def fresh_stores():
+    """Start every test with empty in-process cart and admission stores"""
+    store._stores.clear()
+    admission._stores.clear()
+    yield
+    store._stores.clear()
+    admission._stores.clear()
+
+
+@pytest.fixture
+def create_flash_sale(create_product):
+    """Factory to create live flash sales"""
+    def make_flash_sale(**kwargs):
+        if 'product' not in kwargs:
+            kwargs['product'] = create_product()
+        defaults = {
+            'name': 'Midnight deal',
+            'starts_at': timezone.now() - timedelta(minutes=1),
+            'ends_at': timezone.now() + timedelta(hours=1),
+        }
+        defaults.update(kwargs)
+        return FlashSale.objects.create(**defaults)
+    return make_flash_sale
+
+
+@pytest.fixture
+def shopper_client(client_for, create_user):
+    """API client signed in as a customer"""
+    return client_for(create_user())
+
+
+def enter(client, sale, ticket=None):
+    return client.post(reverse('ecommerce:flash-sale-enter', args=[sale.pk]), {'ticket': ticket} if ticket else {})
+
+
+@pytest.mark.django_db
+class TestVirtualQueue:
+    """Test joining flash sale queues"""
+
+    def test_admitted_at_the_sale_rate(self, shopper_client, create_flash_sale):
+        """Test shoppers beyond the admission rate are queued in order with a retry hint"""
+        sale = create_flash_sale(admissions_per_minute=2)
+
+        places = [enter(shopper_client, sale) for _ in range(4)]
+
+        assert [place.data['status'] for place in places] == ['admitted', 'admitted', 'queued', 'queued']
+        assert [place.data['position'] for place in places[2:]] == [1, 2]
+        assert places[2]['Retry-After'] == '30'
+        again = enter(shopper_client, sale, places[2].data['ticket'])
+        assert (again.data['status'], again.data['position']) == ('queued', 1)
+
+    def test_ticket_admitted_once_window_frees(self, shopper_client, create_flash_sale, monkeypatch):
+        """Test a queued ticket is let in when the rate window moves on"""
+        sale = create_flash_sale(admissions_per_minute=1)
+        enter(shopper_client, sale)
+        ticket = enter(shopper_client, sale).data['ticket']
+        monkeypatch.setattr(admission, 'WINDOW', 0)
+
+        response = enter(shopper_client, sale, ticket)
+
+        assert response.data['status'] == 'admitted'
+        assert response.data['token']
+
+    def test_forged_ticket(self, shopper_client, create_flash_sale):
+        """Test a ticket that was not issued for the sale is refused"""
+        sale, other = create_flash_sale(), create_flash_sale(admissions_per_minute=1)
+        enter(shopper_client, other)
+        ticket = enter(shopper_client, other).data['ticket']
+
+        moved = enter(shopper_client, sale, ticket)
+        forged = enter(shopper_client, sale, 'forged')
+
+        assert moved.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert forged.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.django_db
+class TestAdmissionGates:
+    """Test the cart and checkout gates of live sales"""
+
+    def test_cart_needs_admission(self, shopper_client, create_flash_sale, create_product):
+        """Test the sale product can only be added with a token while other products are unaffected"""
+        sale = create_flash_sale()
+        url = reverse('ecommerce:cart-add')
+
+        refused = shopper_client.post(url, {'product': str(sale.product_id)})
+        other = shopper_client.post(url, {'product': str(create_product().pk)})
+        token = enter(shopper_client, sale).data['token']
+        admitted = shopper_client.post(url, {'product': str(sale.product_id)}, HTTP_X_ADMISSION_TOKEN=token)
+
+        assert refused.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert refused.data['errors'] == {'flash_sale': str(sale.pk)}
+        assert other.status_code == status.HTTP_200_OK
+        assert admitted.status_code == status.HTTP_200_OK
+
+    def test_cart_update_needs_admission(self, shopper_client, create_flash_sale):
+        """Test raising a sale product's quantity needs a token while removing it does not"""
+        sale = create_flash_sale()
+        url = reverse('ecommerce:cart-update-item', args=[sale.product_id])
+
+        refused = shopper_client.put(url, {'quantity': 5})
+        removed = shopper_client.put(url, {'quantity': 0})
+        token = enter(shopper_client, sale).data['token']
+        admitted = shopper_client.put(url, {'quantity': 5}, HTTP_X_ADMISSION_TOKEN=token)
+
+        assert refused.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert refused.data['errors'] == {'flash_sale': str(sale.pk)}
+        assert removed.status_code == status.HTTP_200_OK
+        assert admitted.status_code == status.HTTP_200_OK
+
+    def test_tokens_are_personal(self, client_for, create_user, create_flash_sale):
+        """Test a ticket or token passed to another shopper, or to an anonymous one, is refused"""
+        sale = create_flash_sale(admissions_per_minute=1)
+        url = reverse('ecommerce:cart-add')
+        first = client_for(create_user())
+        token = enter(first, sale).data['token']
+        ticket = enter(first, sale).data['ticket']
+        second = client_for(create_user())
+
+        shared = second.post(url, {'product': str(sale.product_id)}, HTTP_X_ADMISSION_TOKEN=token)
+        passed_on = enter(second, sale, ticket)
+        second.credentials()
+        anonymous = second.post(url, {'product': str(sale.product_id)}, HTTP_X_ADMISSION_TOKEN=token)
+        unsigned = enter(second, sale)
+
+        assert shared.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert passed_on.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert anonymous.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert unsigned.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_checkout_slots(self, client_for, create_user, create_stock, create_flash_sale):
+        """Test checkouts beyond the sale's concurrency are turned away before touching stock"""
+        user = create_user()
+        stock = create_stock()
+        sale = create_flash_sale(product=stock.product, max_concurrent_checkouts=1)
+        CartService.add(CartService.cart_id(user=user), stock.product_id, 1)
+        client = client_for(user)
+        token = enter(client, sale).data['token']
+        payload = {
+            'idempotency_key': 'flash-1',
+            'warehouse': str(stock.warehouse_id),
+            'payment_method': 'cod',
+            'shipping_address': 'Dhaka',
+        }
+        url = reverse('ecommerce:order-checkout')
+
+        with admission.checkout_slots([sale]):
+            busy = client.post(url, payload, HTTP_X_ADMISSION_TOKEN=token)
+        placed = client.post(url, payload, HTTP_X_ADMISSION_TOKEN=token)
+
+        assert busy.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+        assert busy['Retry-After'] == '1'
+        assert placed.status_code == status.HTTP_201_CREATED
+        assert Order.objects.count() == 1
+
+    def test_ended_sale_is_open(self, api_client, create_flash_sale):
+        """Test a sale that has ended no longer gates its product"""
+        sale = create_flash_sale(ends_at=timezone.now() - timedelta(seconds=1))
+
+        response = api_client.post(reverse('ecommerce:cart-add'), {'product': str(sale.product_id)})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not api_client.get(reverse('ecommerce:flash-sale-list')).data
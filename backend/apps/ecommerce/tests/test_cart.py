@@ -0,0 +1,96 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from apps.ecommerce import store
+from apps.ecommerce.models import CartItem
+from apps.ecommerce.services import CartService
+from apps.ecommerce.tasks import flush_carts
+
+
+@pytest.fixture(autouse=True)
+def fresh_store():
+    """Start every test with an empty in-process cart store"""
+    store._stores.clear()
+    yield
+    store._stores.clear()
+
+
+@pytest.mark.django_db
+class TestAnonymousCart:
+    """Test visitors' carts"""
+
+    def test_add_keeps_token(self, api_client, create_product):
+        """Test an anonymous cart lives under the returned token and never hits the database"""
+        product = create_product()
+        first = api_client.post(reverse('ecommerce:cart-add'), {'product': str(product.pk), 'quantity': 2})
+        token = first.data['cart_token']
+
+        again = api_client.post(
+            reverse('ecommerce:cart-add'), {'product': str(product.pk)}, HTTP_X_CART_TOKEN=token
+        )
+
+        assert first.status_code == status.HTTP_200_OK
+        assert again.data['cart_token'] == token
+        assert again.data['item_count'] == 3
+        assert again.data['subtotal'] == '30.00'
+        assert CartService.flush([CartService.cart_id(token=token)]) == 0
+        assert not CartItem.objects.exists()
+
+    def test_unavailable_product(self, api_client, create_product):
+        """Test inactive products cannot be added"""
+        product = create_product(is_active=False)
+
+        response = api_client.post(reverse('ecommerce:cart-add'), {'product': str(product.pk)})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_merged_on_login(self, api_client, create_user, create_product):
+        """Test logging in with the cart token folds the visitor's cart into the customer's"""
+        user = create_user()
+        kept, added = create_product(), create_product()
+        CartService.add(CartService.cart_id(user=user), kept.pk, 1)
+        token = api_client.post(reverse('ecommerce:cart-add'), {'product': str(kept.pk)}).data['cart_token']
+        api_client.post(reverse('ecommerce:cart-add'), {'product': str(added.pk)}, HTTP_X_CART_TOKEN=token)
+
+        response = api_client.post(
+            reverse('accounts:login'), {'email': user.email, 'password': 'testpass123'}, HTTP_X_CART_TOKEN=token
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert CartService.items(CartService.cart_id(user=user)) == {str(kept.pk): 2, str(added.pk): 1}
+        assert CartService.items(CartService.cart_id(token=token)) == {}
+
+
+@pytest.mark.django_db
+class TestCustomerCart:
+    """Test signed-in customers' carts and write-behind"""
+
+    def test_changes_are_written_behind(self, client_for, create_user, create_product):
+        """Test edits stay in the store until the flush persists the final cart"""
+        client = client_for(create_user())
+        kept, dropped = create_product(), create_product()
+        client.post(reverse('ecommerce:cart-add'), {'product': str(kept.pk)})
+        client.post(reverse('ecommerce:cart-add'), {'product': str(dropped.pk)})
+        client.put(reverse('ecommerce:cart-update-item', args=[kept.pk]), {'quantity': 4})
+        response = client.delete(reverse('ecommerce:cart-remove-item', args=[dropped.pk]))
+
+        assert response.data['cart_token'] is None
+        assert [(line['sku'], line['quantity']) for line in response.data['items']] == [(kept.sku, 4)]
+        assert not CartItem.objects.exists()
+        assert flush_carts() == 1
+        assert list(CartItem.objects.values_list('product_id', 'quantity')) == [(kept.pk, 4)]
+        assert flush_carts() == 0
+
+    def test_read_back_after_expiry(self, client_for, create_user, create_product):
+        """Test a persisted cart is restored once the store has dropped it"""
+        user = create_user()
+        product = create_product()
+        client = client_for(user)
+        client.post(reverse('ecommerce:cart-add'), {'product': str(product.pk), 'quantity': 3})
+        flush_carts()
+        store.get_store().delete(CartService.cart_id(user=user))
+
+        response = client.get(reverse('ecommerce:cart-list'))
+
+        assert response.data['item_count'] == 3
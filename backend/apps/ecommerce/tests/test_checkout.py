@@ -0,0 +1,272 @@
+from datetime import timedelta
+
+import pytest
+from django.core import mail
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from apps.ecommerce import store, tasks
+from apps.ecommerce.models import Order, OrderStage
+from apps.ecommerce.services import CartService, OrderService
+from apps.inventory.models import Stock, StockLot, StockReservation
+from apps.inventory.services import StockLotService, StockReservationService
+from apps.payments.models import Payment
+from core.exceptions import InvalidOperationError, PaymentFailedError
+
+
+@pytest.fixture(autouse=True)
+def fresh_store():
+    """Start every test with an empty in-process cart store"""
+    store._stores.clear()
+    yield
+    store._stores.clear()
+
+
+@pytest.fixture
+def shopper(create_user, create_stock):
+    """A customer with two units of a stocked product in their cart"""
+    user = create_user()
+    stock = create_stock()
+    CartService.add(CartService.cart_id(user=user), stock.product_id, 2)
+    return user, stock
+
+
+def checkout(client, stock, key='key-1', payment_method='cod'):
+    return client.post(reverse('ecommerce:order-checkout'), {
+        'idempotency_key': key,
+        'warehouse': str(stock.warehouse_id),
+        'payment_method': payment_method,
+        'shipping_address': 'House 1, Road 2, Dhaka',
+    })
+
+
+@pytest.mark.django_db
+class TestCheckout:
+    """Test the synchronous checkout core"""
+
+    def test_cash_on_delivery(self, client_for, shopper, django_capture_on_commit_callbacks):
+        """Test checkout reserves stock, then the stages confirm the order and tell the customer"""
+        user, stock = shopper
+        with django_capture_on_commit_callbacks(execute=True):
+            response = checkout(client_for(user), stock)
+
+        order = Order.objects.get(pk=response.data['id'])
+        stock.refresh_from_db()
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['total'] == '20.00'
+        assert order.status == Order.STATUS_CONFIRMED
+        assert order.reservation.status == StockReservation.STATUS_COMMITTED
+        assert (stock.quantity, stock.reserved_quantity) == (8, 0)
+        assert set(order.stages.values_list('status', flat=True)) == {OrderStage.STATUS_DONE}
+        assert CartService.items(CartService.cart_id(user=user)) == {}
+        assert order.order_number in mail.outbox[0].subject
+
+    def test_repeated_key(self, client_for, shopper):
+        """Test retrying a checkout returns the first order without reserving again"""
+        user, stock = shopper
+        client = client_for(user)
+
+        first = checkout(client, stock)
+        again = checkout(client, stock)
+
+        stock.refresh_from_db()
+        assert again.status_code == status.HTTP_200_OK
+        assert again.data['id'] == first.data['id']
+        assert stock.reserved_quantity == 2
+        assert Order.objects.count() == 1
+
+    def test_insufficient_stock(self, client_for, create_user, create_stock):
+        """Test checkout fails without an order when the cart cannot be reserved"""
+        user = create_user()
+        stock = create_stock(quantity=1)
+        CartService.add(CartService.cart_id(user=user), stock.product_id, 2)
+
+        response = checkout(client_for(user), stock)
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert not Order.objects.exists()
+        assert CartService.items(CartService.cart_id(user=user)) == {str(stock.product_id): 2}
+
+    def test_unreachable_cart_store(self, client_for, shopper, monkeypatch, django_capture_on_commit_callbacks):
+        """Test a cart that cannot be cleared after commit does not fail the order"""
+        user, stock = shopper
+
+        def store_down(cart_id):
+            raise ConnectionError('Cart store unreachable')
+
+        monkeypatch.setattr(CartService, 'clear', store_down)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = checkout(client_for(user), stock)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Order.objects.get(pk=response.data['id']).status == Order.STATUS_CONFIRMED
+
+    def test_empty_cart_and_unknown_method(self, client_for, create_user, create_stock):
+        """Test an empty cart and an unavailable payment method are rejected"""
+        client = client_for(create_user())
+        stock = create_stock()
+
+        assert checkout(client, stock).status_code == status.HTTP_400_BAD_REQUEST
+        assert checkout(client, stock, payment_method='cheque').status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+class TestCheckoutStages:
+    """Test the background payment and notification stages"""
+
+    def test_online_payment_waits(self, client_for, shopper, django_capture_on_commit_callbacks):
+        """Test an online order keeps its reservation until paid and carries the payment link"""
+        user, stock = shopper
+        with django_capture_on_commit_callbacks(execute=True):
+            response = checkout(client_for(user), stock, payment_method='bkash')
+
+        order = Order.objects.get(pk=response.data['id'])
+        assert order.status == Order.STATUS_AWAITING_PAYMENT
+        assert order.reservation.status == StockReservation.STATUS_ACTIVE
+        payment = order.payments.get()
+        assert payment.status == Payment.STATUS_PENDING
+        assert payment.redirect_url in mail.outbox[0].body
+
+        OrderService.fulfil(order, Order.STATUS_PAID)
+        stock.refresh_from_db()
+        assert (stock.quantity, stock.reserved_quantity) == (8, 0)
+
+    def test_expired_reservation_fails_order(self, client_for, shopper, settings,
+                                             django_capture_on_commit_callbacks):
+        """Test an order left unpaid past its reservation fails and its payment can no longer complete"""
+        user, stock = shopper
+        with django_capture_on_commit_callbacks(execute=True):
+            order_id = checkout(client_for(user), stock, payment_method='bkash').data['id']
+
+        later = timezone.now() + timedelta(seconds=settings.ORDER_RESERVATION_TTL + 1)
+        assert StockReservationService.expire_stale(now=later) == 1
+
+        order = Order.objects.get(pk=order_id)
+        stock.refresh_from_db()
+        assert order.status == Order.STATUS_FAILED
+        assert order.payments.get().status == Payment.STATUS_FAILED
+        assert (stock.quantity, stock.reserved_quantity) == (10, 0)
+        with pytest.raises(InvalidOperationError):
+            OrderService.fulfil(order, Order.STATUS_PAID)
+
+    def test_stage_runs_once(self, client_for, shopper, django_capture_on_commit_callbacks):
+        """Test a redelivered stage task neither pays nor notifies twice"""
+        user, stock = shopper
+        with django_capture_on_commit_callbacks(execute=True):
+            response = checkout(client_for(user), stock, payment_method='card')
+
+        assert OrderService.run_stage(response.data['id'], OrderStage.STAGE_PAYMENT) is None
+        assert Payment.objects.count() == 1
+        assert len(mail.outbox) == 1
+
+    def test_declined_payment_is_compensated(self, client_for, shopper, monkeypatch,
+                                             django_capture_on_commit_callbacks):
+        """Test a declined payment fails the order, releases its stock and tells the customer"""
+        user, stock = shopper
+
+        def decline(self, payment):
+            raise PaymentFailedError('Card declined')
+
+        monkeypatch.setattr('apps.payments.gateways.SimulatedGateway.initiate', decline)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = checkout(client_for(user), stock, payment_method='card')
+
+        order = Order.objects.get(pk=response.data['id'])
+        assert order.status == Order.STATUS_FAILED
+        assert order.reservation.status == StockReservation.STATUS_RELEASED
+        assert order.stages.get(stage=OrderStage.STAGE_PAYMENT).status == OrderStage.STATUS_FAILED
+        assert Stock.objects.get(pk=stock.pk).reserved_quantity == 0
+        assert 'could not process' in mail.outbox[0].body
+
+    def test_failing_stage_is_retried(self, client_for, shopper, monkeypatch, settings,
+                                      django_capture_on_commit_callbacks):
+        """Test a stage that keeps erroring is retried, then compensated"""
+        settings.ORDER_STAGE_MAX_RETRIES = 2
+        user, stock = shopper
+        calls = []
+
+        def unreachable(self, payment):
+            calls.append(payment.pk)
+            raise ConnectionError('Gateway unreachable')
+
+        monkeypatch.setattr('apps.payments.gateways.SimulatedGateway.initiate', unreachable)
+        monkeypatch.setattr(tasks.run_order_stage, 'retry', lambda exc, countdown: exc)
+        with django_capture_on_commit_callbacks(execute=True):
+            order_id = checkout(client_for(user), stock, payment_method='card').data['id']
+        for retries in (1, 2):
+            tasks.run_order_stage.apply(args=[order_id, OrderStage.STAGE_PAYMENT], retries=retries)
+
+        assert len(calls) == 3
+        assert Order.objects.get(pk=order_id).status == Order.STATUS_FAILED
+        stage = OrderStage.objects.get(order_id=order_id, stage=OrderStage.STAGE_PAYMENT)
+        assert (stage.status, stage.attempts) == (OrderStage.STATUS_FAILED, 3)
+
+    def test_failing_notification_keeps_order(self, client_for, shopper, monkeypatch, settings,
+                                              django_capture_on_commit_callbacks):
+        """Test a notification that keeps erroring is recorded failed; the confirmed order stands"""
+        settings.ORDER_STAGE_MAX_RETRIES = 1
+        user, stock = shopper
+
+        def unreachable(*args, **kwargs):
+            raise ConnectionError('Mail server unreachable')
+
+        monkeypatch.setattr('apps.ecommerce.services.send_mail', unreachable)
+        monkeypatch.setattr(tasks.run_order_stage, 'retry', lambda exc, countdown: exc)
+        with django_capture_on_commit_callbacks(execute=True):
+            order_id = checkout(client_for(user), stock).data['id']
+        tasks.run_order_stage.apply(args=[order_id, OrderStage.STAGE_NOTIFICATION], retries=1)
+
+        order = Order.objects.select_related('reservation').get(pk=order_id)
+        stock.refresh_from_db()
+        assert order.status == Order.STATUS_CONFIRMED
+        assert order.reservation.status == StockReservation.STATUS_COMMITTED
+        assert (stock.quantity, stock.reserved_quantity) == (8, 0)
+        stage = OrderStage.objects.get(order_id=order_id, stage=OrderStage.STAGE_NOTIFICATION)
+        assert (stage.status, stage.last_error) == (OrderStage.STATUS_FAILED, 'Mail server unreachable')
+
+    def test_stalled_stages_are_resumed(self, client_for, shopper, monkeypatch, settings,
+                                        django_capture_on_commit_callbacks):
+        """Test an order whose first stage was never queued is picked up once its lease has passed"""
+        user, stock = shopper
+
+        def broker_down(order_id, stage):
+            raise ConnectionError('Broker unreachable')
+
+        with monkeypatch.context() as patch:
+            patch.setattr(tasks, 'dispatch_order_stage', broker_down)
+            with django_capture_on_commit_callbacks(execute=True):
+                response = checkout(client_for(user), stock)
+        order_id = response.data['id']
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Order.objects.get(pk=order_id).status == Order.STATUS_PENDING
+        assert OrderService.resume_stalled() == 0
+
+        later = timezone.now() + timedelta(seconds=settings.ORDER_STAGE_LEASE + 1)
+        assert OrderService.resume_stalled(now=later) == 1
+        assert Order.objects.get(pk=order_id).status == Order.STATUS_CONFIRMED
+        assert len(mail.outbox) == 1
+        assert OrderService.resume_stalled(now=later) == 0
+
+
+@pytest.mark.django_db
+class TestCancel:
+    """Test cancelling orders"""
+
+    def test_cancel_confirmed_order(self, client_for, shopper, django_capture_on_commit_callbacks):
+        """Test cancelling a confirmed order returns its stock and lots; a second cancel is refused"""
+        user, stock = shopper
+        client = client_for(user)
+        StockLotService.receive_lots([(stock.product_id, stock.warehouse_id, 'L-1', None, 10)])
+        with django_capture_on_commit_callbacks(execute=True):
+            order_id = checkout(client, stock).data['id']
+
+        response = client.post(reverse('ecommerce:order-cancel', args=[order_id]))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['status'] == Order.STATUS_CANCELLED
+        assert Stock.objects.get(pk=stock.pk).quantity == 10
+        assert StockLot.objects.get(stock=stock).quantity == 10
+        assert client.post(reverse('ecommerce:order-cancel', args=[order_id])).status_code == \
+            status.HTTP_400_BAD_REQUEST
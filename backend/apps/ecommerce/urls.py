@@ -0,0 +1,15 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import CartViewSet, FlashSaleViewSet, OrderViewSet
+
+app_name = 'ecommerce'
+
+# Router for viewsets
+router = DefaultRouter()
+router.register(r'cart', CartViewSet, basename='cart')
+router.register(r'orders', OrderViewSet, basename='order')
+router.register(r'flash-sales', FlashSaleViewSet, basename='flash-sale')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
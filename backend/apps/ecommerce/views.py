@@ -0,0 +1,214 @@
+"""
+Views for the ecommerce app.
+"""
+
+import re
+import uuid
+
+from drf_spectacular.utils import OpenApiParameter, extend_schema
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+
+from core.pagination import StandardResultsSetPagination
+from . import admission
+from .models import FlashSale, Order
+from .serializers import (
+    AdmissionRequestSerializer,
+    AdmissionSerializer,
+    CartAddSerializer,
+    CartSerializer,
+    CartUpdateSerializer,
+    CheckoutSerializer,
+    FlashSaleSerializer,
+    OrderSerializer,
+)
+from .services import CartService, OrderService
+
+CART_TOKEN = re.compile(r'^[0-9a-f]{32}$')
+
+ADMISSION_TOKEN_HEADER = OpenApiParameter(
+    'X-Admission-Token',
+    str,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description='Comma-separated admission tokens for live flash sales, issued to the signed-in shopper',
+)
+
+CART_TOKEN_HEADER = OpenApiParameter(
+    'X-Cart-Token',
+    str,
+    location=OpenApiParameter.HEADER,
+    required=False,
+    description='Anonymous cart token returned by an earlier cart response',
+)
+
+
+def _cart(request):
+    """Cart id for the caller, and the token an anonymous caller should keep"""
+    if request.user.is_authenticated:
+        return CartService.cart_id(user=request.user), None
+    token = request.headers.get('X-Cart-Token', '')
+    if not CART_TOKEN.match(token):
+        token = uuid.uuid4().hex
+    return CartService.cart_id(token=token), token
+
+
+def _shopper(request):
+    """Id admission tokens are checked against; anonymous shoppers have none"""
+    return request.user.pk if request.user.is_authenticated else None
+
+
+def _cart_response(cart_id, token):
+    return Response(CartSerializer({'cart_token': token, **CartService.detail(cart_id)}).data)
+
+
+@extend_schema(parameters=[CART_TOKEN_HEADER])
+class CartViewSet(viewsets.ViewSet):
+    """
+    ViewSet for the shopping cart.
+
+    Visitors shop with an anonymous cart identified by ``X-Cart-Token``; it
+    is merged into the customer's cart when they log in with the same header.
+    """
+    permission_classes = [AllowAny]
+
+    @extend_schema(description='Get the cart', responses={200: CartSerializer})
+    def list(self, request):
+        """Return the caller's cart"""
+        return _cart_response(*_cart(request))
+
+    @extend_schema(
+        description='Add a product to the cart; flash sale products need an admission token',
+        request=CartAddSerializer,
+        parameters=[ADMISSION_TOKEN_HEADER],
+        responses={200: CartSerializer}
+    )
+    @action(detail=False, methods=['post'])
+    def add(self, request):
+        """Add units of a product"""
+        serializer = CartAddSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        admission.require_admission(
+            request.headers.get('X-Admission-Token'), [serializer.validated_data['product']], _shopper(request)
+        )
+        cart_id, token = _cart(request)
+        CartService.add(cart_id, serializer.validated_data['product'], serializer.validated_data['quantity'])
+        return _cart_response(cart_id, token)
+
+    @extend_schema(
+        description='Set the quantity of a product in the cart',
+        request=CartUpdateSerializer,
+        responses={200: CartSerializer}
+    )
+    @action(detail=False, methods=['put'], url_path=r'update/(?P<product_id>[0-9a-f-]{36})')
+    def update_item(self, request, product_id=None):
+        """Change a line's quantity; zero removes it"""
+        serializer = CartUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        if serializer.validated_data['quantity'] > 0:
+            admission.require_admission(request.headers.get('X-Admission-Token'), [product_id], _shopper(request))
+        cart_id, token = _cart(request)
+        CartService.update(cart_id, product_id, serializer.validated_data['quantity'])
+        return _cart_response(cart_id, token)
+
+    @extend_schema(description='Remove a product from the cart', request=None, responses={200: CartSerializer})
+    @action(detail=False, methods=['delete'], url_path=r'remove/(?P<product_id>[0-9a-f-]{36})')
+    def remove_item(self, request, product_id=None):
+        """Remove a line"""
+        cart_id, token = _cart(request)
+        CartService.update(cart_id, product_id, 0)
+        return _cart_response(cart_id, token)
+
+
+class OrderViewSet(mixins.ListModelMixin,
+                   mixins.RetrieveModelMixin,
+                   viewsets.GenericViewSet):
+    """
+    ViewSet for online orders.
+
+    Checkout answers once the stock is reserved and the order stored;
+    payment and notification follow in the background, and their progress
+    shows in the order's ``stages``.
+    """
+    serializer_class = OrderSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+    # Filtering on created_at limits the scan to the matching monthly partitions
+    filterset_fields = {
+        'status': ['exact'],
+        'payment_method': ['exact'],
+        'created_at': ['gte', 'lt'],
+    }
+    ordering = ['-created_at']
+
+    def get_queryset(self):
+        """Return the customer's own orders; managers see every order"""
+        queryset = Order.objects.prefetch_related('items', 'stages', 'payments')
+        if self.request.user.is_admin_or_manager:
+            return queryset
+        return queryset.filter(user=self.request.user)
+
+    @extend_schema(
+        description='Check out the cart; repeating a key returns the first order',
+        request=CheckoutSerializer,
+        parameters=[ADMISSION_TOKEN_HEADER],
+        responses={201: OrderSerializer, 200: OrderSerializer}
+    )
+    @action(detail=False, methods=['post'])
+    def checkout(self, request):
+        """Reserve the cart's stock and place the order"""
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        sales = admission.require_admission(
+            request.headers.get('X-Admission-Token'),
+            CartService.items(CartService.cart_id(user=request.user)),
+            request.user.pk,
+        )
+        with admission.checkout_slots(sales):
+            order, created = OrderService.checkout(request.user, **serializer.validated_data)
+        return Response(
+            OrderSerializer(self.get_queryset().get(pk=order.pk)).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @extend_schema(description='Cancel an unpaid order', request=None, responses={200: OrderSerializer})
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel the order and return its stock"""
+        order = OrderService.cancel(self.get_object(), user=request.user)
+        return Response(OrderSerializer(self.get_queryset().get(pk=order.pk)).data)
+
+
+class FlashSaleViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    ViewSet for live flash sales and their queues.
+
+    Signed-in shoppers ``enter`` a sale's queue and poll with the returned
+    ticket until they are admitted; the admission token then goes in the
+    ``X-Admission-Token`` header of their own cart and checkout requests.
+    """
+    serializer_class = FlashSaleSerializer
+    permission_classes = [AllowAny]
+    pagination_class = None
+
+    def get_queryset(self):
+        """Return sales running now"""
+        return FlashSale.objects.filter(pk__in=[sale.pk for sale in admission.live_sales().values()])
+
+    @extend_schema(
+        description='Join the queue, or check on a ticket',
+        request=AdmissionRequestSerializer,
+        responses={200: AdmissionSerializer}
+    )
+    @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated])
+    def enter(self, request, pk=None):
+        """Take a place in line, or the admission token once it is the shopper's turn"""
+        serializer = AdmissionRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        place = admission.enter(self.get_object(), request.user.pk, serializer.validated_data.get('ticket'))
+        response = Response(AdmissionSerializer(place).data)
+        if place['status'] == 'queued':
+            response['Retry-After'] = str(place['retry_after'])
+        return response
@@ -0,0 +1,134 @@
+"""
+Admin configuration for inventory app.
+"""
+
+from django.contrib import admin
+from .models import (
+    CycleCount, CycleCountLine, PurchaseOrder, PurchaseOrderItem, Stock, StockAlert, StockLot, StockLotAllocation,
+    StockMovement, StockReservation, StockReservationItem, StockSnapshot, Supplier, Warehouse,
+)
+
+
+@admin.register(Warehouse)
+class WarehouseAdmin(admin.ModelAdmin):
+    """Admin for Warehouse model."""
+    list_display = ('name', 'code', 'is_active')
+    search_fields = ('name', 'code')
+    list_filter = ('is_active',)
+
+
+@admin.register(Stock)
+class StockAdmin(admin.ModelAdmin):
+    """Admin for Stock model."""
+    list_display = (
+        'product', 'warehouse', 'quantity', 'reserved_quantity', 'reorder_level', 'is_low_stock', 'updated_at',
+    )
+    search_fields = ('product__name', 'product__sku', 'warehouse__code')
+    list_filter = ('warehouse', 'is_low_stock')
+    readonly_fields = ('is_low_stock',)
+    list_select_related = ('product', 'warehouse')
+
+
+class StockReservationItemInline(admin.TabularInline):
+    """Inline admin for StockReservationItem."""
+    model = StockReservationItem
+    extra = 0
+    raw_id_fields = ('stock',)
+
+
+@admin.register(StockReservation)
+class StockReservationAdmin(admin.ModelAdmin):
+    """Admin for StockReservation model."""
+    inlines = (StockReservationItemInline,)
+    list_display = ('id', 'reference', 'status', 'expires_at', 'created_at')
+    search_fields = ('reference',)
+    list_filter = ('status',)
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    """Read-only admin for the append-only stock ledger."""
+    list_display = ('id', 'product', 'warehouse', 'movement_type', 'quantity', 'reference', 'created_at')
+    search_fields = ('product__sku', 'reference')
+    list_filter = ('movement_type', 'warehouse')
+    list_select_related = ('product', 'warehouse')
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    """Admin for StockSnapshot model."""
+    list_display = ('product', 'warehouse', 'quantity', 'last_movement_id', 'as_of')
+    search_fields = ('product__sku',)
+    list_filter = ('warehouse',)
+
+
+@admin.register(StockAlert)
+class StockAlertAdmin(admin.ModelAdmin):
+    """Admin for StockAlert model."""
+    list_display = ('stock', 'kind', 'quantity', 'reorder_level', 'created_at')
+    list_filter = ('kind',)
+    raw_id_fields = ('stock',)
+
+
+@admin.register(Supplier)
+class SupplierAdmin(admin.ModelAdmin):
+    """Admin for Supplier model."""
+    list_display = ('name', 'code', 'lead_time_days', 'is_active')
+    search_fields = ('name', 'code')
+    list_filter = ('is_active',)
+
+
+class PurchaseOrderItemInline(admin.TabularInline):
+    """Inline admin for PurchaseOrderItem."""
+    model = PurchaseOrderItem
+    extra = 0
+    raw_id_fields = ('product',)
+
+
+@admin.register(PurchaseOrder)
+class PurchaseOrderAdmin(admin.ModelAdmin):
+    """Admin for PurchaseOrder model."""
+    inlines = (PurchaseOrderItemInline,)
+    list_display = ('po_number', 'supplier', 'warehouse', 'status', 'is_auto_generated', 'expected_at')
+    search_fields = ('po_number', 'supplier__name')
+    list_filter = ('status', 'is_auto_generated', 'warehouse')
+
+
+class CycleCountLineInline(admin.TabularInline):
+    """Inline admin for CycleCountLine."""
+    model = CycleCountLine
+    extra = 0
+    raw_id_fields = ('product',)
+    readonly_fields = ('system_quantity', 'variance')
+
+
+@admin.register(CycleCount)
+class CycleCountAdmin(admin.ModelAdmin):
+    """Admin for CycleCount model."""
+    inlines = (CycleCountLineInline,)
+    list_display = ('reference', 'warehouse', 'status', 'counted_by', 'posted_at', 'created_at')
+    search_fields = ('reference',)
+    list_filter = ('status', 'warehouse')
+
+
+@admin.register(StockLot)
+class StockLotAdmin(admin.ModelAdmin):
+    """Admin for StockLot model."""
+    list_display = ('lot_number', 'stock', 'expiry_date', 'quantity', 'received_quantity', 'received_at')
+    search_fields = ('lot_number', 'stock__product__sku')
+    list_filter = ('expiry_date',)
+    raw_id_fields = ('stock',)
+
+
+@admin.register(StockLotAllocation)
+class StockLotAllocationAdmin(admin.ModelAdmin):
+    """Admin for StockLotAllocation model."""
+    list_display = ('lot', 'quantity', 'reference', 'created_at')
+    search_fields = ('reference', 'lot__lot_number')
+    raw_id_fields = ('lot',)
@@ -0,0 +1,212 @@
+"""
+Batch demand forecasting and reorder suggestions.
+
+Sales history is loaded from the stock ledger one chunk of SKUs at a time as
+a ``(skus, days)`` NumPy matrix. Demand, safety stock and reorder points are
+computed for the whole chunk with array operations in a process pool while
+the parent loads the next chunk, and the resulting order quantities are
+turned into draft purchase orders per supplier and warehouse.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import PurchaseOrder, PurchaseOrderItem, Stock, StockMovement
+
+METHOD_MOVING_AVERAGE = 'moving_average'
+METHOD_EXPONENTIAL = 'exponential'
+
+
+def load_sales_matrix(keys, start, days):
+    """
+    Daily units sold per ``(product_id, warehouse_id)`` key.
+
+    Returns:
+        ``float64`` array of shape ``(len(keys), days)``; column 0 is ``start``
+    """
+    sales = np.zeros((len(keys), days), dtype=np.float64)
+    if not keys:
+        return sales
+    index = {key: row for row, key in enumerate(keys)}
+    rows = (
+        StockMovement.objects
+        .filter(
+            movement_type=StockMovement.TYPE_SALE,
+            created_at__date__gte=start,
+            created_at__date__lt=start + timedelta(days=days),
+            product_id__in={product_id for product_id, _ in keys},
+            warehouse_id__in={warehouse_id for _, warehouse_id in keys},
+        )
+        .annotate(day=TruncDate('created_at'))
+        .values('product_id', 'warehouse_id', 'day')
+        .annotate(units=Sum('quantity'))
+        .order_by()
+    )
+    for row in rows:
+        position = index.get((row['product_id'], row['warehouse_id']))
+        if position is not None:
+            sales[position, (row['day'] - start).days] = -row['units']
+    return sales
+
+
+def forecast_chunk(sales, lead_times, on_hand, on_order, method=METHOD_MOVING_AVERAGE,
+                   window=28, alpha=0.3, service_z=1.65, review_days=7):
+    """
+    Vectorised reorder calculation for one chunk of SKUs.
+
+    Args:
+        sales: ``(n, days)`` daily units sold, oldest first
+        lead_times: ``(n,)`` supplier lead time in days
+        on_hand: ``(n,)`` current on-hand quantity
+        on_order: ``(n,)`` quantity already on open purchase orders
+        method: ``moving_average`` or ``exponential`` smoothing
+        window: Days of history used for the average and the variability
+        alpha: Smoothing factor for exponential smoothing
+        service_z: Safety factor for the target service level (1.65 ~ 95%)
+        review_days: Days until the next ordering opportunity
+
+    Returns:
+        Dict of ``(n,)`` arrays: ``demand``, ``safety_stock``,
+        ``reorder_point`` and ``order_quantity``
+    """
+    recent = sales[:, -window:]
+    if method == METHOD_EXPONENTIAL:
+        periods = sales.shape[1]
+        weights = alpha * (1 - alpha) ** np.arange(periods - 1, -1, -1)
+        weights[0] = (1 - alpha) ** (periods - 1)
+        demand = sales @ weights
+    else:
+        demand = recent.mean(axis=1)
+
+    sigma = recent.std(axis=1)
+    safety_stock = service_z * sigma * np.sqrt(lead_times)
+    reorder_point = demand * lead_times + safety_stock
+    order_up_to = reorder_point + demand * review_days
+    position = on_hand + on_order
+    order_quantity = np.where(
+        position <= reorder_point,
+        np.ceil(np.maximum(order_up_to - position, 0)),
+        0,
+    )
+    return {
+        'demand': demand,
+        'safety_stock': safety_stock,
+        'reorder_point': reorder_point,
+        'order_quantity': order_quantity.astype(np.int64),
+    }
+
+
+class ReorderForecaster:
+    """
+    Compute reorder suggestions for every stocked SKU with a supplier.
+    """
+
+    def __init__(self, method=METHOD_MOVING_AVERAGE, history_days=56, window=28, alpha=0.3,
+                 service_z=1.65, review_days=7, chunk_size=2000, workers=None):
+        self.method = method
+        self.history_days = history_days
+        self.window = min(window, history_days)
+        self.alpha = alpha
+        self.service_z = service_z
+        self.review_days = review_days
+        self.chunk_size = chunk_size
+        self.workers = workers
+
+    def suggestions(self, warehouse_ids=None, today=None):
+        """
+        Return reorder suggestions as a list of dicts.
+
+        Each suggestion has ``product_id``, ``warehouse_id``, ``supplier_id``,
+        ``quantity`` and ``unit_cost``; SKUs that do not need ordering are
+        omitted.
+        """
+        today = today or timezone.localdate()
+        start = today - timedelta(days=self.history_days)
+        stock = (
+            Stock.objects
+            .filter(product__supplier__isnull=False, product__is_active=True, product__is_deleted=False)
+            .order_by('pk')
+            .values_list(
+                'product_id', 'warehouse_id', 'quantity',
+                'product__supplier_id', 'product__supplier__lead_time_days', 'product__cost_price',
+            )
+        )
+        if warehouse_ids:
+            stock = stock.filter(warehouse_id__in=warehouse_ids)
+
+        options = {
+            'method': self.method,
+            'window': self.window,
+            'alpha': self.alpha,
+            'service_z': self.service_z,
+            'review_days': self.review_days,
+        }
+        results = []
+        if self.workers == 1:
+            for chunk in self._chunks(stock):
+                arrays = self._load(chunk, start)
+                results.append((chunk, forecast_chunk(*arrays, **options)))
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                pending = []
+                for chunk in self._chunks(stock):
+                    arrays = self._load(chunk, start)
+                    pending.append((chunk, pool.submit(forecast_chunk, *arrays, **options)))
+                results = [(chunk, future.result()) for chunk, future in pending]
+
+        suggestions = []
+        for chunk, forecast in results:
+            for row, quantity in zip(chunk, forecast['order_quantity']):
+                if quantity > 0:
+                    product_id, warehouse_id, _, supplier_id, _, unit_cost = row
+                    suggestions.append({
+                        'product_id': product_id,
+                        'warehouse_id': warehouse_id,
+                        'supplier_id': supplier_id,
+                        'quantity': int(quantity),
+                        'unit_cost': unit_cost,
+                    })
+        return suggestions
+
+    def _chunks(self, queryset):
+        """Yield lists of stock rows, ``chunk_size`` at a time."""
+        chunk = []
+        for row in queryset.iterator(chunk_size=self.chunk_size):
+            chunk.append(row)
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _load(self, chunk, start):
+        """Build the input arrays for one chunk with two grouped queries."""
+        keys = [(row[0], row[1]) for row in chunk]
+        sales = load_sales_matrix(keys, start, self.history_days)
+        lead_times = np.array([row[4] for row in chunk], dtype=np.float64)
+        on_hand = np.array([row[2] for row in chunk], dtype=np.float64)
+
+        index = {key: position for position, key in enumerate(keys)}
+        on_order = np.zeros(len(chunk), dtype=np.float64)
+        open_items = (
+            PurchaseOrderItem.objects
+            .filter(
+                purchase_order__status__in=PurchaseOrder.OPEN_STATUSES,
+                product_id__in={key[0] for key in keys},
+                purchase_order__warehouse_id__in={key[1] for key in keys},
+            )
+            .values('product_id', 'purchase_order__warehouse_id')
+            .annotate(outstanding=Sum(F('quantity_ordered') - F('quantity_received')))
+            .order_by()
+        )
+        for item in open_items:
+            position = index.get((item['product_id'], item['purchase_order__warehouse_id']))
+            if position is not None:
+                on_order[position] = max(item['outstanding'], 0)
+        return sales, lead_times, on_hand, on_order
+
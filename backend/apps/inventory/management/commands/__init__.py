@@ -0,0 +1 @@
+# Empty __init__.py to make this a Python package
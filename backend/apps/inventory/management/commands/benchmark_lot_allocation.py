@@ -0,0 +1,120 @@
+"""
+Throughput benchmark for first-expiry-first-out lot allocation.
+
+Simulates POS load: many tills allocate small baskets of lot-tracked SKUs at
+once, with several lots per SKU expiring on different days. Run it against
+PostgreSQL; SQLite serialises writers and will report lock errors instead of
+throughput.
+"""
+
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from apps.inventory.models import Stock, StockLot, StockLotAllocation, Warehouse
+from apps.inventory.services import StockLotService
+from apps.products.models import Product
+from core.benchmark import format_summary, latency_summary
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks FEFO lot allocation under concurrent POS load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skus', type=int, default=200, help='Lot-tracked SKUs')
+        parser.add_argument('--lots', type=int, default=8, help='Lots per SKU')
+        parser.add_argument('--workers', type=int, default=20, help='Concurrent tills')
+        parser.add_argument('--baskets', type=int, default=100, help='Baskets per till')
+        parser.add_argument('--basket-size', type=int, default=5, help='Lines per basket')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark rows')
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8].upper()
+        warehouse = Warehouse.objects.create(name=f'Benchmark {tag}', code=f'BM{tag}')
+        products = Product.objects.bulk_create([
+            Product(name=f'Benchmark {tag} {n}', sku=f'BENCH-{tag}-{n}', selling_price=1)
+            for n in range(options['skus'])
+        ])
+        today = timezone.localdate()
+        StockLotService.receive_lots(
+            (product.pk, warehouse.pk, f'L{lot}', today + timedelta(days=lot + 1), 1000)
+            for product in products
+            for lot in range(options['lots'])
+        )
+
+        latencies = []
+        counts = {'baskets': 0, 'errors': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['workers'])
+
+        def till(seed):
+            rng = random.Random(seed)
+            local_latencies, local_counts = [], {'baskets': 0, 'errors': 0}
+            try:
+                barrier.wait()
+                for _ in range(options['baskets']):
+                    basket = [
+                        (product.pk, warehouse.pk, rng.randint(1, 3))
+                        for product in rng.sample(products, options['basket_size'])
+                    ]
+                    start = time.perf_counter()
+                    try:
+                        StockLotService.allocate(basket, reference=f'bench-{tag}')
+                        local_counts['baskets'] += 1
+                    except DatabaseError:
+                        local_counts['errors'] += 1
+                    local_latencies.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(local_latencies)
+                    for key, value in local_counts.items():
+                        counts[key] += value
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for seed in range(options['workers']):
+                pool.submit(till, seed)
+        elapsed = time.perf_counter() - started
+
+        total = options['workers'] * options['baskets']
+        self.stdout.write(f"Tills: {options['workers']}  baskets: {total}  elapsed: {elapsed:.2f}s")
+        self.stdout.write(f"Throughput: {counts['baskets'] / elapsed:.0f} baskets/s  errors: {counts['errors']}")
+        self.stdout.write(f'Latency: {format_summary(latency_summary(latencies))}')
+
+        lots = StockLot.objects.filter(stock__warehouse=warehouse)
+        allocated = sum(StockLotAllocation.objects.filter(reference=f'bench-{tag}').values_list('quantity', flat=True))
+        consumed = sum(lot.received_quantity - lot.quantity for lot in lots)
+        if allocated != consumed:
+            self.stdout.write(self.style.ERROR(f'Allocated {allocated} units but lots lost {consumed}.'))
+        elif not self._fefo_respected(lots):
+            self.stdout.write(self.style.ERROR('A lot was used while an earlier-expiring lot had stock left.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Consistent: {allocated} units allocated in expiry order.'))
+
+        if not options['keep']:
+            StockLotAllocation.objects.filter(lot__in=lots).delete()
+            lots.delete()
+            Stock.objects.filter(warehouse=warehouse).delete()
+            Product.objects.filter(pk__in=[product.pk for product in products]).delete()
+            warehouse.delete()
+
+    def _fefo_respected(self, lots):
+        """Check every SKU used its lots front to back by expiry"""
+        previous_stock, earlier_left = None, False
+        for stock_id, quantity, received in lots.order_by('stock_id', 'expiry_date').values_list(
+            'stock_id', 'quantity', 'received_quantity'
+        ):
+            if stock_id != previous_stock:
+                previous_stock, earlier_left = stock_id, False
+            if earlier_left and quantity < received:
+                return False
+            earlier_left = earlier_left or quantity > 0
+        return True
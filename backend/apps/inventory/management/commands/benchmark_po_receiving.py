@@ -0,0 +1,92 @@
+"""
+Benchmark batch purchase-order receiving against line-by-line receiving.
+
+Two identical sets of ordered purchase orders are created. One is received
+with a single PurchaseOrderService.receive call covering every line, the
+other with one call per line, which is how the per-PO flow behaves. Receipts
+are written to the append-only ledger, so run it against a scratch database.
+"""
+
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.inventory.models import PurchaseOrder, PurchaseOrderItem, Supplier, Warehouse
+from apps.inventory.services import PurchaseOrderService
+from apps.products.models import Product
+from core.benchmark import format_summary, latency_summary
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks batch purchase-order receiving against line-by-line receiving'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orders', type=int, default=5, help='Purchase orders per delivery')
+        parser.add_argument('--lines', type=int, default=100, help='Lines per purchase order')
+        parser.add_argument('--quantity', type=int, default=12, help='Units received per line')
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8].upper()
+        warehouse = Warehouse.objects.create(name=f'Benchmark {tag}', code=f'BM{tag}')
+        supplier = Supplier.objects.create(name=f'Benchmark {tag}', code=f'BM{tag}')
+        products = Product.objects.bulk_create([
+            Product(name=f'Benchmark {tag} {n}', sku=f'BENCH-{tag}-{n}', selling_price=2, cost_price=1)
+            for n in range(options['orders'] * options['lines'])
+        ])
+
+        batch_lines = self._delivery(tag, 'B', warehouse, supplier, products, options)
+        single_lines = self._delivery(tag, 'L', warehouse, supplier, products, options)
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            PurchaseOrderService.receive(batch_lines)
+            batch_elapsed = time.perf_counter() - start
+        batch_queries = len(queries)
+
+        latencies = []
+        single_queries = 0
+        start = time.perf_counter()
+        for line in single_lines:
+            with CaptureQueriesContext(connection) as queries:
+                line_start = time.perf_counter()
+                PurchaseOrderService.receive([line])
+                latencies.append(time.perf_counter() - line_start)
+            single_queries += len(queries)
+        single_elapsed = time.perf_counter() - start
+
+        self.stdout.write(f'Delivery: {options["orders"]} orders x {options["lines"]} lines')
+        self.stdout.write(f'Batch:        {batch_elapsed * 1000:.1f}ms  {batch_queries} queries')
+        self.stdout.write(f'Line-by-line: {single_elapsed * 1000:.1f}ms  {single_queries} queries')
+        self.stdout.write(f'Per line: {format_summary(latency_summary(latencies))}')
+        self.stdout.write(self.style.SUCCESS(f'Speed-up: {single_elapsed / batch_elapsed:.1f}x'))
+
+        unfinished = PurchaseOrder.objects.filter(po_number__startswith=f'BENCH-{tag}').exclude(
+            status=PurchaseOrder.STATUS_RECEIVED
+        )
+        if unfinished.exists():
+            self.stdout.write(self.style.ERROR('Some benchmark orders were not fully received.'))
+
+    def _delivery(self, tag, label, warehouse, supplier, products, options):
+        """Create ordered POs covering ``products`` and return their receipt lines"""
+        orders = PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(
+                po_number=f'BENCH-{tag}-{label}{n}',
+                supplier=supplier,
+                warehouse=warehouse,
+                status=PurchaseOrder.STATUS_ORDERED,
+            )
+            for n in range(options['orders'])
+        ])
+        items = PurchaseOrderItem.objects.bulk_create([
+            PurchaseOrderItem(
+                purchase_order=orders[n // options['lines']],
+                product=product,
+                quantity_ordered=options['quantity'],
+                unit_cost=1 + n % 7,
+            )
+            for n, product in enumerate(products)
+        ])
+        return [(item.purchase_order_id, item.product_id, item.quantity_ordered) for item in items]
@@ -0,0 +1,104 @@
+"""
+Contention benchmark for StockReservationService.
+
+Many workers reserve the same SKU at once, which is the worst case for a
+fast-moving product during a promotion. Run it against PostgreSQL; SQLite
+serialises writers and will report lock errors instead of throughput.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+
+from apps.inventory.models import Stock, StockReservation, StockReservationItem, Warehouse
+from apps.inventory.services import StockReservationService
+from apps.products.models import Product
+from core.benchmark import format_summary, latency_summary
+from core.exceptions import InsufficientStockError, OutOfStockError
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks concurrent stock reservations against a single SKU'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=100, help='Concurrent workers')
+        parser.add_argument('--attempts', type=int, default=20, help='Reservations per worker')
+        parser.add_argument('--quantity', type=int, default=1, help='Units per reservation')
+        parser.add_argument('--stock', type=int, default=1500, help='Starting on-hand quantity')
+        parser.add_argument('--keep', action='store_true', help='Keep the benchmark rows')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        attempts = options['attempts']
+        quantity = options['quantity']
+        tag = uuid.uuid4().hex[:8].upper()
+
+        warehouse = Warehouse.objects.create(name=f'Benchmark {tag}', code=f'BM{tag}')
+        product = Product.objects.create(name=f'Benchmark {tag}', sku=f'BENCH-{tag}', selling_price=1)
+        stock = Stock.objects.create(product=product, warehouse=warehouse, quantity=options['stock'])
+
+        latencies = []
+        counts = {'reserved': 0, 'rejected': 0, 'errors': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(workers)
+
+        def worker():
+            local_latencies = []
+            local_counts = {'reserved': 0, 'rejected': 0, 'errors': 0}
+            try:
+                barrier.wait()
+                for _ in range(attempts):
+                    start = time.perf_counter()
+                    try:
+                        StockReservationService.reserve(
+                            [(product.pk, warehouse.pk, quantity)],
+                            reference=f'bench-{tag}',
+                        )
+                        local_counts['reserved'] += 1
+                    except (InsufficientStockError, OutOfStockError):
+                        local_counts['rejected'] += 1
+                    except DatabaseError:
+                        local_counts['errors'] += 1
+                    local_latencies.append(time.perf_counter() - start)
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(local_latencies)
+                    for key, value in local_counts.items():
+                        counts[key] += value
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _ in range(workers):
+                pool.submit(worker)
+        elapsed = time.perf_counter() - started
+
+        stock.refresh_from_db()
+        total = workers * attempts
+        self.stdout.write(f'Workers: {workers}  attempts: {total}  elapsed: {elapsed:.2f}s')
+        self.stdout.write(f'Throughput: {total / elapsed:.0f} reservations/s')
+        self.stdout.write(
+            f"Reserved: {counts['reserved']}  rejected: {counts['rejected']}  errors: {counts['errors']}"
+        )
+        self.stdout.write(f'Latency: {format_summary(latency_summary(latencies))}')
+        self.stdout.write(f'Final stock: quantity={stock.quantity} reserved={stock.reserved_quantity}')
+
+        expected = counts['reserved'] * quantity
+        if stock.reserved_quantity != expected or stock.reserved_quantity > stock.quantity:
+            self.stdout.write(self.style.ERROR(
+                f'Inconsistent stock: expected {expected} reserved units.'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS('No oversell: reserved units match successful reservations.'))
+
+        if not options['keep']:
+            reservations = StockReservation.objects.filter(reference=f'bench-{tag}')
+            StockReservationItem.objects.filter(reservation__in=reservations).delete()
+            reservations.delete()
+            stock.delete()
+            product.delete()
+            warehouse.delete()
@@ -0,0 +1,36 @@
+"""
+Verify stock snapshots and stock rows against the movement ledger.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.inventory.services import StockLedgerService
+
+
+class Command(BaseCommand):
+    help = 'Compacts the stock ledger and checks snapshots and stock rows against it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--compact', action='store_true', help='Take new snapshots before checking')
+        parser.add_argument(
+            '--settle-seconds',
+            type=int,
+            default=60,
+            help='Only compact movements older than this',
+        )
+
+    def handle(self, *args, **options):
+        if options['compact']:
+            written = StockLedgerService.compact(settle_seconds=options['settle_seconds'])
+            self.stdout.write(f'Wrote {written} snapshots.')
+
+        mismatches = StockLedgerService.verify()
+        for mismatch in mismatches:
+            self.stdout.write(self.style.ERROR(
+                f"{mismatch['kind']}: product={mismatch['product_id']} "
+                f"warehouse={mismatch['warehouse_id']} recorded={mismatch['quantity']} "
+                f"ledger={mismatch['ledger']}"
+            ))
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} stock ledger mismatches found.')
+        self.stdout.write(self.style.SUCCESS('Stock ledger is consistent.'))
@@ -0,0 +1,58 @@
+"""
+Forecast demand and create draft purchase orders for the catalog.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.inventory.forecasting import METHOD_EXPONENTIAL, METHOD_MOVING_AVERAGE, ReorderForecaster
+from apps.inventory.services import PurchaseOrderService
+
+
+class Command(BaseCommand):
+    help = 'Forecasts demand per SKU and creates draft purchase orders per supplier'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--method',
+            choices=[METHOD_MOVING_AVERAGE, METHOD_EXPONENTIAL],
+            default=METHOD_MOVING_AVERAGE,
+            help='Demand estimator',
+        )
+        parser.add_argument('--history-days', type=int, default=56, help='Days of sales history')
+        parser.add_argument('--window', type=int, default=28, help='Averaging window in days')
+        parser.add_argument('--alpha', type=float, default=0.3, help='Exponential smoothing factor')
+        parser.add_argument('--service-z', type=float, default=1.65, help='Safety stock factor')
+        parser.add_argument('--review-days', type=int, default=7, help='Days until the next order')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='SKUs per chunk')
+        parser.add_argument('--workers', type=int, default=None, help='Process pool size')
+        parser.add_argument('--warehouse', action='append', default=[], help='Limit to warehouse id')
+        parser.add_argument('--dry-run', action='store_true', help='Only print the suggestions count')
+
+    def handle(self, *args, **options):
+        forecaster = ReorderForecaster(
+            method=options['method'],
+            history_days=options['history_days'],
+            window=options['window'],
+            alpha=options['alpha'],
+            service_z=options['service_z'],
+            review_days=options['review_days'],
+            chunk_size=options['chunk_size'],
+            workers=options['workers'],
+        )
+        started = time.perf_counter()
+        if options['dry_run']:
+            suggestions = forecaster.suggestions(warehouse_ids=options['warehouse'] or None)
+            self.stdout.write(
+                f'{len(suggestions)} SKUs need ordering ({time.perf_counter() - started:.1f}s).'
+            )
+            return
+
+        orders = PurchaseOrderService.generate_reorder_drafts(
+            forecaster,
+            warehouse_ids=options['warehouse'] or None,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(orders)} draft purchase orders in {time.perf_counter() - started:.1f}s.'
+        ))
@@ -0,0 +1,30 @@
+"""
+Rebuild or verify the per-product and per-region stock aggregates.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.inventory.services import StockSummaryService
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds ProductStockSummary and RegionalStock from the stock table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', help='Only report summaries that drifted')
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            mismatches = StockSummaryService.verify()
+            for mismatch in mismatches:
+                self.stdout.write(self.style.ERROR(
+                    f"product={mismatch['product_id']} summary={mismatch['total_quantity']}/"
+                    f"{mismatch['total_reserved']} stock={mismatch['quantity']}/{mismatch['reserved']}"
+                ))
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} stock summaries out of date.')
+            self.stdout.write(self.style.SUCCESS('Stock summaries are consistent.'))
+            return
+
+        written = StockSummaryService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} product stock summaries.'))
@@ -0,0 +1,224 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:28
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Warehouse",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                ("name", models.CharField(help_text="Warehouse name", max_length=100)),
+                (
+                    "code",
+                    models.CharField(help_text="Short warehouse code", max_length=20, unique=True),
+                ),
+                ("address", models.TextField(blank=True, help_text="Street address")),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=True, help_text="Whether the warehouse holds stock"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "warehouses",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Stock",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                ("quantity", models.IntegerField(default=0, help_text="Quantity on hand")),
+                (
+                    "reserved_quantity",
+                    models.IntegerField(default=0, help_text="Quantity held by reservations"),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        help_text="Stocked product",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="stock_levels",
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        help_text="Warehouse holding the stock",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="stock_levels",
+                        to="inventory.warehouse",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "stock",
+                "ordering": ["product", "warehouse"],
+            },
+        ),
+        migrations.CreateModel(
+            name="StockReservation",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                (
+                    "reference",
+                    models.CharField(
+                        blank=True,
+                        db_index=True,
+                        help_text="Order, cart or POS basket the reservation belongs to",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("active", "Active"),
+                            ("committed", "Committed"),
+                            ("released", "Released"),
+                            ("expired", "Expired"),
+                        ],
+                        default="active",
+                        help_text="Reservation status",
+                        max_length=20,
+                    ),
+                ),
+                ("expires_at", models.DateTimeField(help_text="When an active reservation lapses")),
+            ],
+            options={
+                "db_table": "stock_reservations",
+                "ordering": ["-created_at"],
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("status", "active")),
+                        fields=["expires_at"],
+                        name="stock_resv_active_expiry_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StockReservationItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField(help_text="Reserved quantity")),
+                (
+                    "reservation",
+                    models.ForeignKey(
+                        help_text="Parent reservation",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="inventory.stockreservation",
+                    ),
+                ),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        help_text="Stock row the quantity is held against",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="reservation_items",
+                        to="inventory.stock",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "stock_reservation_items",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="stock",
+            constraint=models.UniqueConstraint(
+                fields=("product", "warehouse"), name="unique_stock_product_warehouse"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="stock",
+            constraint=models.CheckConstraint(
+                check=models.Q(("reserved_quantity__gte", 0)), name="stock_reserved_non_negative"
+            ),
+        ),
+    ]
@@ -0,0 +1,161 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0001_initial"),
+        ("products", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockMovement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "movement_type",
+                    models.CharField(
+                        choices=[
+                            ("sale", "Sale"),
+                            ("return", "Return"),
+                            ("receipt", "Receipt"),
+                            ("adjustment", "Adjustment"),
+                            ("transfer_in", "Transfer In"),
+                            ("transfer_out", "Transfer Out"),
+                        ],
+                        help_text="Kind of stock movement",
+                        max_length=20,
+                    ),
+                ),
+                ("quantity", models.IntegerField(help_text="Signed change in on-hand quantity")),
+                (
+                    "reference",
+                    models.CharField(
+                        blank=True,
+                        db_index=True,
+                        help_text="Document that caused the movement (order, PO, count)",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        db_index=True,
+                        default=django.utils.timezone.now,
+                        help_text="When the movement happened",
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="User who recorded the movement",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="stock_movements",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        help_text="Product moved",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="stock_movements",
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        help_text="Warehouse whose stock changed",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="stock_movements",
+                        to="inventory.warehouse",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "stock_movements",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["product", "warehouse", "id"], name="stock_mvmt_key_position_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="StockSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "quantity",
+                    models.IntegerField(help_text="On-hand quantity at the snapshot position"),
+                ),
+                (
+                    "last_movement_id",
+                    models.BigIntegerField(help_text="Last ledger entry included in the snapshot"),
+                ),
+                ("as_of", models.DateTimeField(help_text="Time of the last ledger entry included")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="When the snapshot was taken"
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        help_text="Product",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="stock_snapshots",
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        help_text="Warehouse",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="stock_snapshots",
+                        to="inventory.warehouse",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "stock_snapshots",
+                "ordering": ["-last_movement_id"],
+                "indexes": [
+                    models.Index(
+                        fields=["product", "warehouse", "as_of"], name="stock_snap_key_as_of_idx"
+                    ),
+                    models.Index(fields=["last_movement_id"], name="stock_snap_position_idx"),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="stocksnapshot",
+            constraint=models.UniqueConstraint(
+                fields=("product", "warehouse", "last_movement_id"),
+                name="unique_stock_snapshot_position",
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0002_stock_ledger"),
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockAlert",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("low", "Low Stock"), ("restored", "Restored")],
+                        help_text="Direction of the crossing",
+                        max_length=20,
+                    ),
+                ),
+                ("quantity", models.IntegerField(help_text="On-hand quantity after the crossing")),
+                (
+                    "reorder_level",
+                    models.IntegerField(help_text="Reorder level at the time of the crossing"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, db_index=True, help_text="When the crossing happened"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "stock_alerts",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="stock",
+            name="is_low_stock",
+            field=models.BooleanField(
+                default=False,
+                help_text="Maintained by StockService whenever quantity crosses the reorder level",
+            ),
+        ),
+        migrations.AddField(
+            model_name="stock",
+            name="reorder_level",
+            field=models.IntegerField(
+                default=0,
+                help_text="On-hand quantity at or below which the product is low on stock; 0 disables alerts",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stock",
+            index=models.Index(
+                condition=models.Q(("is_low_stock", True)),
+                fields=["warehouse", "quantity"],
+                name="stock_low_stock_idx",
+            ),
+        ),
+        migrations.AddField(
+            model_name="stockalert",
+            name="stock",
+            field=models.ForeignKey(
+                help_text="Stock row that crossed its reorder level",
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="alerts",
+                to="inventory.stock",
+            ),
+        ),
+    ]
@@ -0,0 +1,228 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:34
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0003_low_stock_index"),
+        ("products", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Supplier",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                ("name", models.CharField(help_text="Supplier name", max_length=150)),
+                (
+                    "code",
+                    models.CharField(help_text="Short supplier code", max_length=20, unique=True),
+                ),
+                (
+                    "email",
+                    models.EmailField(
+                        blank=True, help_text="Ordering email address", max_length=254
+                    ),
+                ),
+                (
+                    "phone",
+                    models.CharField(blank=True, help_text="Contact phone number", max_length=17),
+                ),
+                (
+                    "lead_time_days",
+                    models.PositiveIntegerField(
+                        default=7, help_text="Days between placing an order and receiving it"
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(default=True, help_text="Whether orders can be placed"),
+                ),
+            ],
+            options={
+                "db_table": "suppliers",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="PurchaseOrder",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                (
+                    "po_number",
+                    models.CharField(help_text="Purchase order number", max_length=40, unique=True),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("draft", "Draft"),
+                            ("ordered", "Ordered"),
+                            ("partially_received", "Partially Received"),
+                            ("received", "Received"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        default="draft",
+                        help_text="Purchase order status",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "is_auto_generated",
+                    models.BooleanField(
+                        default=False, help_text="Created by the reorder forecasting job"
+                    ),
+                ),
+                (
+                    "expected_at",
+                    models.DateField(blank=True, help_text="Expected delivery date", null=True),
+                ),
+                (
+                    "notes",
+                    models.TextField(blank=True, help_text="Notes for the supplier or receiver"),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="User who created the order",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="purchase_orders",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        help_text="Warehouse receiving the goods",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="purchase_orders",
+                        to="inventory.warehouse",
+                    ),
+                ),
+                (
+                    "supplier",
+                    models.ForeignKey(
+                        help_text="Supplier the order is placed with",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="purchase_orders",
+                        to="inventory.supplier",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "purchase_orders",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="PurchaseOrderItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("quantity_ordered", models.PositiveIntegerField(help_text="Quantity ordered")),
+                (
+                    "quantity_received",
+                    models.PositiveIntegerField(default=0, help_text="Quantity received so far"),
+                ),
+                (
+                    "unit_cost",
+                    models.DecimalField(
+                        decimal_places=2, help_text="Agreed unit cost", max_digits=12
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        help_text="Ordered product",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="purchase_order_items",
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "purchase_order",
+                    models.ForeignKey(
+                        help_text="Parent purchase order",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="inventory.purchaseorder",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "purchase_order_items",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="purchaseorderitem",
+            constraint=models.UniqueConstraint(
+                fields=("purchase_order", "product"), name="unique_po_item_product"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="purchaseorder",
+            index=models.Index(fields=["status"], name="purchase_or_status_5ac239_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="purchaseorder",
+            index=models.Index(
+                fields=["supplier", "status"], name="purchase_or_supplie_8a71bd_idx"
+            ),
+        ),
+    ]
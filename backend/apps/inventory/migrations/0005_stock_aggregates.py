@@ -0,0 +1,131 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_aggregates(apps, schema_editor):
+    """Build the aggregates from existing stock rows."""
+    Stock = apps.get_model('inventory', 'Stock')
+    ProductStockSummary = apps.get_model('inventory', 'ProductStockSummary')
+    RegionalStock = apps.get_model('inventory', 'RegionalStock')
+    ProductStockSummary.objects.bulk_create(
+        [
+            ProductStockSummary(
+                product_id=row['product_id'],
+                total_quantity=row['quantity'],
+                total_reserved=row['reserved'],
+            )
+            for row in Stock.objects.values('product_id').annotate(
+                quantity=Sum('quantity'), reserved=Sum('reserved_quantity')
+            ).order_by()
+        ],
+        batch_size=1000,
+    )
+    RegionalStock.objects.bulk_create(
+        [
+            RegionalStock(
+                product_id=row['product_id'],
+                region=row['warehouse__region'],
+                quantity=row['quantity'],
+                reserved_quantity=row['reserved'],
+            )
+            for row in Stock.objects.values('product_id', 'warehouse__region').annotate(
+                quantity=Sum('quantity'), reserved=Sum('reserved_quantity')
+            ).order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0004_purchase_orders"),
+        ("products", "0002_product_supplier"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductStockSummary",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        help_text="Product",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stock_summary",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "total_quantity",
+                    models.IntegerField(default=0, help_text="On-hand quantity in all warehouses"),
+                ),
+                (
+                    "total_reserved",
+                    models.IntegerField(default=0, help_text="Reserved quantity in all warehouses"),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True, help_text="Last change")),
+            ],
+            options={
+                "db_table": "product_stock_summaries",
+            },
+        ),
+        migrations.AddField(
+            model_name="warehouse",
+            name="region",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                help_text="Delivery region served; run rebuild_stock_summaries after changing it",
+                max_length=50,
+            ),
+        ),
+        migrations.CreateModel(
+            name="RegionalStock",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("region", models.CharField(help_text="Warehouse region", max_length=50)),
+                (
+                    "quantity",
+                    models.IntegerField(default=0, help_text="On-hand quantity in the region"),
+                ),
+                (
+                    "reserved_quantity",
+                    models.IntegerField(default=0, help_text="Reserved quantity in the region"),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True, help_text="Last change")),
+                (
+                    "product",
+                    models.ForeignKey(
+                        help_text="Product",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="regional_stock",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "regional_stock",
+                "indexes": [
+                    models.Index(fields=["region", "product"], name="regional_st_region_ecf046_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="regionalstock",
+            constraint=models.UniqueConstraint(
+                fields=("product", "region"), name="unique_regional_stock"
+            ),
+        ),
+        migrations.RunPython(backfill_aggregates, migrations.RunPython.noop),
+    ]
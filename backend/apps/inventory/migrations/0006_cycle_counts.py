@@ -0,0 +1,150 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:40
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0005_stock_aggregates"),
+        ("products", "0002_product_supplier"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CycleCount",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                (
+                    "reference",
+                    models.CharField(help_text="Count sheet or aisle reference", max_length=100),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("counted", "Counted"),
+                            ("posted", "Posted"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        default="counted",
+                        help_text="Cycle count status",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "posted_at",
+                    models.DateTimeField(
+                        blank=True, help_text="When adjustments were posted", null=True
+                    ),
+                ),
+                (
+                    "counted_by",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="User who uploaded the count",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="cycle_counts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        help_text="Warehouse that was counted",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="cycle_counts",
+                        to="inventory.warehouse",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "cycle_counts",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="CycleCountLine",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("counted_quantity", models.IntegerField(help_text="Quantity found on the shelf")),
+                (
+                    "system_quantity",
+                    models.IntegerField(
+                        blank=True, help_text="On-hand quantity when compared", null=True
+                    ),
+                ),
+                (
+                    "variance",
+                    models.IntegerField(
+                        blank=True, help_text="Counted minus system quantity", null=True
+                    ),
+                ),
+                (
+                    "cycle_count",
+                    models.ForeignKey(
+                        help_text="Parent cycle count",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lines",
+                        to="inventory.cyclecount",
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        help_text="Counted product",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="cycle_count_lines",
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "cycle_count_lines",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="cyclecount",
+            index=models.Index(
+                fields=["warehouse", "status"], name="cycle_count_warehou_1e2beb_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="cyclecountline",
+            constraint=models.UniqueConstraint(
+                fields=("cycle_count", "product"), name="unique_cycle_count_product"
+            ),
+        ),
+    ]
@@ -0,0 +1,128 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0006_cycle_counts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockLot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "lot_number",
+                    models.CharField(help_text="Supplier batch or lot number", max_length=64),
+                ),
+                (
+                    "expiry_date",
+                    models.DateField(blank=True, help_text="Best-before or use-by date", null=True),
+                ),
+                (
+                    "quantity",
+                    models.IntegerField(default=0, help_text="Units of the lot still on hand"),
+                ),
+                (
+                    "received_quantity",
+                    models.IntegerField(default=0, help_text="Units received into the lot"),
+                ),
+                (
+                    "received_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="When the lot was first received",
+                    ),
+                ),
+                (
+                    "stock",
+                    models.ForeignKey(
+                        help_text="Stock row the lot belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="lots",
+                        to="inventory.stock",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "stock_lots",
+            },
+        ),
+        migrations.CreateModel(
+            name="StockLotAllocation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("quantity", models.IntegerField(help_text="Units taken")),
+                (
+                    "reference",
+                    models.CharField(
+                        blank=True,
+                        db_index=True,
+                        help_text="Sale or order reference",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, help_text="When the units were allocated"
+                    ),
+                ),
+                (
+                    "lot",
+                    models.ForeignKey(
+                        help_text="Lot the units were taken from",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="allocations",
+                        to="inventory.stocklot",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "stock_lot_allocations",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="stocklot",
+            index=models.Index(
+                condition=models.Q(("quantity__gt", 0)),
+                fields=["stock", "expiry_date", "received_at"],
+                name="stock_lot_fefo_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stocklot",
+            index=models.Index(
+                condition=models.Q(("quantity__gt", 0)),
+                fields=["expiry_date"],
+                name="stock_lot_expiry_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="stocklot",
+            constraint=models.UniqueConstraint(
+                fields=("stock", "lot_number"), name="unique_stock_lot"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="stocklot",
+            constraint=models.CheckConstraint(
+                check=models.Q(("quantity__gte", 0)), name="stock_lot_quantity_gte_0"
+            ),
+        ),
+    ]
@@ -0,0 +1,659 @@
+"""
+Inventory models for the Supermarket Management System.
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from core.exceptions import InvalidOperationError
+from core.models import BaseModel
+
+
+class Warehouse(BaseModel):
+    """
+    Physical stock location: a branch store or a distribution warehouse.
+    """
+    name = models.CharField(max_length=100, help_text="Warehouse name")
+    code = models.CharField(max_length=20, unique=True, help_text="Short warehouse code")
+    address = models.TextField(blank=True, help_text="Street address")
+    region = models.CharField(
+        max_length=50,
+        blank=True,
+        db_index=True,
+        help_text="Delivery region served; run rebuild_stock_summaries after changing it"
+    )
+    is_active = models.BooleanField(default=True, help_text="Whether the warehouse holds stock")
+
+    class Meta:
+        db_table = 'warehouses'
+        ordering = ['name']
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.code})"
+
+
+class Supplier(BaseModel):
+    """
+    Vendor that products are purchased from.
+    """
+    name = models.CharField(max_length=150, help_text="Supplier name")
+    code = models.CharField(max_length=20, unique=True, help_text="Short supplier code")
+    email = models.EmailField(blank=True, help_text="Ordering email address")
+    phone = models.CharField(max_length=17, blank=True, help_text="Contact phone number")
+    lead_time_days = models.PositiveIntegerField(
+        default=7,
+        help_text="Days between placing an order and receiving it"
+    )
+    is_active = models.BooleanField(default=True, help_text="Whether orders can be placed")
+
+    class Meta:
+        db_table = 'suppliers'
+        ordering = ['name']
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.code})"
+
+
+class Stock(BaseModel):
+    """
+    On-hand and reserved quantity of a product in a warehouse.
+
+    ``reserved_quantity`` is held by open reservations and is never allowed
+    to exceed ``quantity``; see ``StockReservationService``.
+    """
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.PROTECT,
+        related_name='stock_levels',
+        help_text="Stocked product"
+    )
+    warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.PROTECT,
+        related_name='stock_levels',
+        help_text="Warehouse holding the stock"
+    )
+    quantity = models.IntegerField(default=0, help_text="Quantity on hand")
+    reserved_quantity = models.IntegerField(default=0, help_text="Quantity held by reservations")
+    reorder_level = models.IntegerField(
+        default=0,
+        help_text="On-hand quantity at or below which the product is low on stock; 0 disables alerts"
+    )
+    is_low_stock = models.BooleanField(
+        default=False,
+        help_text="Maintained by StockService whenever quantity crosses the reorder level"
+    )
+
+    class Meta:
+        db_table = 'stock'
+        ordering = ['product', 'warehouse']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'warehouse'], name='unique_stock_product_warehouse'),
+            models.CheckConstraint(check=models.Q(reserved_quantity__gte=0), name='stock_reserved_non_negative'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['warehouse', 'quantity'],
+                condition=models.Q(is_low_stock=True),
+                name='stock_low_stock_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id} @ {self.warehouse_id}: {self.quantity}"
+
+    @property
+    def available_quantity(self) -> int:
+        """Quantity that can still be reserved or sold."""
+        return self.quantity - self.reserved_quantity
+
+    @staticmethod
+    def below_threshold(quantity, reorder_level) -> bool:
+        """Whether ``quantity`` counts as low stock for ``reorder_level``."""
+        return reorder_level > 0 and quantity <= reorder_level
+
+
+class StockReservation(BaseModel):
+    """
+    A hold on stock for one order or basket, covering one or more lines.
+    """
+    STATUS_ACTIVE = 'active'
+    STATUS_COMMITTED = 'committed'
+    STATUS_RELEASED = 'released'
+    STATUS_EXPIRED = 'expired'
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, 'Active'),
+        (STATUS_COMMITTED, 'Committed'),
+        (STATUS_RELEASED, 'Released'),
+        (STATUS_EXPIRED, 'Expired'),
+    ]
+
+    reference = models.CharField(
+        max_length=100,
+        blank=True,
+        db_index=True,
+        help_text="Order, cart or POS basket the reservation belongs to"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_ACTIVE,
+        help_text="Reservation status"
+    )
+    expires_at = models.DateTimeField(help_text="When an active reservation lapses")
+
+    class Meta:
+        db_table = 'stock_reservations'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(status='active'),
+                name='stock_resv_active_expiry_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Reservation {self.id} ({self.status})"
+
+
+class StockReservationItem(models.Model):
+    """
+    One reserved line: a quantity held against a single stock row.
+    """
+    reservation = models.ForeignKey(
+        StockReservation,
+        on_delete=models.CASCADE,
+        related_name='items',
+        help_text="Parent reservation"
+    )
+    stock = models.ForeignKey(
+        Stock,
+        on_delete=models.PROTECT,
+        related_name='reservation_items',
+        help_text="Stock row the quantity is held against"
+    )
+    quantity = models.PositiveIntegerField(help_text="Reserved quantity")
+
+    class Meta:
+        db_table = 'stock_reservation_items'
+
+    def __str__(self) -> str:
+        return f"{self.quantity} x {self.stock_id}"
+
+
+class StockLot(models.Model):
+    """
+    Received batch of a product in a warehouse, with its expiry date.
+
+    ``quantity`` is what is left of the batch. Lots with stock left are kept
+    in a per-stock-row index ordered by expiry, so first-expiry-first-out
+    allocation reads lots in order without sorting.
+    """
+    stock = models.ForeignKey(
+        Stock,
+        on_delete=models.CASCADE,
+        related_name='lots',
+        help_text="Stock row the lot belongs to"
+    )
+    lot_number = models.CharField(max_length=64, help_text="Supplier batch or lot number")
+    expiry_date = models.DateField(null=True, blank=True, help_text="Best-before or use-by date")
+    quantity = models.IntegerField(default=0, help_text="Units of the lot still on hand")
+    received_quantity = models.IntegerField(default=0, help_text="Units received into the lot")
+    received_at = models.DateTimeField(default=timezone.now, help_text="When the lot was first received")
+
+    class Meta:
+        db_table = 'stock_lots'
+        constraints = [
+            models.UniqueConstraint(fields=['stock', 'lot_number'], name='unique_stock_lot'),
+            models.CheckConstraint(check=models.Q(quantity__gte=0), name='stock_lot_quantity_gte_0'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['stock', 'expiry_date', 'received_at'],
+                condition=models.Q(quantity__gt=0),
+                name='stock_lot_fefo_idx',
+            ),
+            models.Index(
+                fields=['expiry_date'],
+                condition=models.Q(quantity__gt=0),
+                name='stock_lot_expiry_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.lot_number} ({self.expiry_date or 'no expiry'}): {self.quantity}"
+
+
+class StockLotAllocation(models.Model):
+    """
+    Units of a lot consumed by a sale or order line, kept for traceability.
+
+    Units put back by a void or cancellation are recorded as a negative row
+    under the same reference.
+    """
+    lot = models.ForeignKey(
+        StockLot,
+        on_delete=models.CASCADE,
+        related_name='allocations',
+        help_text="Lot the units were taken from"
+    )
+    quantity = models.IntegerField(help_text="Units taken")
+    reference = models.CharField(max_length=100, blank=True, db_index=True, help_text="Sale or order reference")
+    created_at = models.DateTimeField(default=timezone.now, help_text="When the units were allocated")
+
+    class Meta:
+        db_table = 'stock_lot_allocations'
+
+    def __str__(self) -> str:
+        return f"{self.quantity} x {self.lot_id} for {self.reference}"
+
+
+class StockMovementQuerySet(models.QuerySet):
+    """
+    QuerySet that refuses to rewrite ledger history.
+    """
+
+    def update(self, **kwargs):
+        raise InvalidOperationError('Stock movements are append-only.')
+
+    def delete(self):
+        raise InvalidOperationError('Stock movements are append-only.')
+
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger entry for a change in on-hand quantity.
+
+    ``quantity`` is signed: receipts, returns and inbound transfers are
+    positive, sales and outbound transfers negative. Rows are never updated
+    or deleted; corrections are recorded as adjustments. The auto-increment
+    ``id`` is the ledger position snapshots are taken at.
+    """
+    TYPE_SALE = 'sale'
+    TYPE_RETURN = 'return'
+    TYPE_RECEIPT = 'receipt'
+    TYPE_ADJUSTMENT = 'adjustment'
+    TYPE_TRANSFER_IN = 'transfer_in'
+    TYPE_TRANSFER_OUT = 'transfer_out'
+    TYPE_CHOICES = [
+        (TYPE_SALE, 'Sale'),
+        (TYPE_RETURN, 'Return'),
+        (TYPE_RECEIPT, 'Receipt'),
+        (TYPE_ADJUSTMENT, 'Adjustment'),
+        (TYPE_TRANSFER_IN, 'Transfer In'),
+        (TYPE_TRANSFER_OUT, 'Transfer Out'),
+    ]
+
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.PROTECT,
+        related_name='stock_movements',
+        help_text="Product moved"
+    )
+    warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.PROTECT,
+        related_name='stock_movements',
+        help_text="Warehouse whose stock changed"
+    )
+    movement_type = models.CharField(
+        max_length=20,
+        choices=TYPE_CHOICES,
+        help_text="Kind of stock movement"
+    )
+    quantity = models.IntegerField(help_text="Signed change in on-hand quantity")
+    reference = models.CharField(
+        max_length=100,
+        blank=True,
+        db_index=True,
+        help_text="Document that caused the movement (order, PO, count)"
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='stock_movements',
+        help_text="User who recorded the movement"
+    )
+    created_at = models.DateTimeField(default=timezone.now, db_index=True, help_text="When the movement happened")
+
+    objects = StockMovementQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'stock_movements'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['product', 'warehouse', 'id'], name='stock_mvmt_key_position_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.get_movement_type_display()} {self.quantity:+d} of {self.product_id}"
+
+    def save(self, *args, **kwargs):
+        """Only allow inserting new ledger entries."""
+        if not self._state.adding:
+            raise InvalidOperationError('Stock movements are append-only.')
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise InvalidOperationError('Stock movements are append-only.')
+
+
+class StockSnapshot(models.Model):
+    """
+    Quantity of a product in a warehouse as of a ledger position.
+
+    The snapshot covers every movement with ``id <= last_movement_id``, so the
+    stock at any later point is the snapshot plus the movements after it.
+    """
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.PROTECT,
+        related_name='stock_snapshots',
+        help_text="Product"
+    )
+    warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.PROTECT,
+        related_name='stock_snapshots',
+        help_text="Warehouse"
+    )
+    quantity = models.IntegerField(help_text="On-hand quantity at the snapshot position")
+    last_movement_id = models.BigIntegerField(help_text="Last ledger entry included in the snapshot")
+    as_of = models.DateTimeField(help_text="Time of the last ledger entry included")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="When the snapshot was taken")
+
+    class Meta:
+        db_table = 'stock_snapshots'
+        ordering = ['-last_movement_id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['product', 'warehouse', 'last_movement_id'],
+                name='unique_stock_snapshot_position',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['product', 'warehouse', 'as_of'], name='stock_snap_key_as_of_idx'),
+            models.Index(fields=['last_movement_id'], name='stock_snap_position_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id} @ {self.warehouse_id}: {self.quantity} (#{self.last_movement_id})"
+
+
+class StockAlert(models.Model):
+    """
+    A stock row crossing its reorder level, in either direction.
+
+    One alert is written per crossing, not per movement, so repeated sales
+    of an already-low product stay silent.
+    """
+    KIND_LOW = 'low'
+    KIND_RESTORED = 'restored'
+    KIND_CHOICES = [
+        (KIND_LOW, 'Low Stock'),
+        (KIND_RESTORED, 'Restored'),
+    ]
+
+    stock = models.ForeignKey(
+        Stock,
+        on_delete=models.CASCADE,
+        related_name='alerts',
+        help_text="Stock row that crossed its reorder level"
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, help_text="Direction of the crossing")
+    quantity = models.IntegerField(help_text="On-hand quantity after the crossing")
+    reorder_level = models.IntegerField(help_text="Reorder level at the time of the crossing")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, help_text="When the crossing happened")
+
+    class Meta:
+        db_table = 'stock_alerts'
+        ordering = ['-created_at']
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()}: {self.stock_id} at {self.quantity}"
+
+
+class PurchaseOrder(BaseModel):
+    """
+    Order placed with a supplier for delivery to a warehouse.
+    """
+    STATUS_DRAFT = 'draft'
+    STATUS_ORDERED = 'ordered'
+    STATUS_PARTIALLY_RECEIVED = 'partially_received'
+    STATUS_RECEIVED = 'received'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (STATUS_DRAFT, 'Draft'),
+        (STATUS_ORDERED, 'Ordered'),
+        (STATUS_PARTIALLY_RECEIVED, 'Partially Received'),
+        (STATUS_RECEIVED, 'Received'),
+        (STATUS_CANCELLED, 'Cancelled'),
+    ]
+    OPEN_STATUSES = [STATUS_DRAFT, STATUS_ORDERED, STATUS_PARTIALLY_RECEIVED]
+
+    po_number = models.CharField(max_length=40, unique=True, help_text="Purchase order number")
+    supplier = models.ForeignKey(
+        Supplier,
+        on_delete=models.PROTECT,
+        related_name='purchase_orders',
+        help_text="Supplier the order is placed with"
+    )
+    warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.PROTECT,
+        related_name='purchase_orders',
+        help_text="Warehouse receiving the goods"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_DRAFT,
+        help_text="Purchase order status"
+    )
+    is_auto_generated = models.BooleanField(
+        default=False,
+        help_text="Created by the reorder forecasting job"
+    )
+    expected_at = models.DateField(null=True, blank=True, help_text="Expected delivery date")
+    notes = models.TextField(blank=True, help_text="Notes for the supplier or receiver")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='purchase_orders',
+        help_text="User who created the order"
+    )
+
+    class Meta:
+        db_table = 'purchase_orders'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status']),
+            models.Index(fields=['supplier', 'status']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.po_number} ({self.get_status_display()})"
+
+
+class PurchaseOrderItem(models.Model):
+    """
+    One product line on a purchase order.
+    """
+    purchase_order = models.ForeignKey(
+        PurchaseOrder,
+        on_delete=models.CASCADE,
+        related_name='items',
+        help_text="Parent purchase order"
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.PROTECT,
+        related_name='purchase_order_items',
+        help_text="Ordered product"
+    )
+    quantity_ordered = models.PositiveIntegerField(help_text="Quantity ordered")
+    quantity_received = models.PositiveIntegerField(default=0, help_text="Quantity received so far")
+    unit_cost = models.DecimalField(max_digits=12, decimal_places=2, help_text="Agreed unit cost")
+
+    class Meta:
+        db_table = 'purchase_order_items'
+        constraints = [
+            models.UniqueConstraint(fields=['purchase_order', 'product'], name='unique_po_item_product'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.quantity_ordered} x {self.product_id}"
+
+    @property
+    def quantity_outstanding(self) -> int:
+        """Quantity still expected from the supplier."""
+        return max(self.quantity_ordered - self.quantity_received, 0)
+
+
+class ProductStockSummary(models.Model):
+    """
+    Per-product stock totals across all warehouses.
+
+    Maintained by StockSummaryService in the same transaction as every stock
+    change, so product listings read availability with a single join.
+    """
+    product = models.OneToOneField(
+        'products.Product',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stock_summary',
+        help_text="Product"
+    )
+    total_quantity = models.IntegerField(default=0, help_text="On-hand quantity in all warehouses")
+    total_reserved = models.IntegerField(default=0, help_text="Reserved quantity in all warehouses")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Last change")
+
+    class Meta:
+        db_table = 'product_stock_summaries'
+
+    def __str__(self) -> str:
+        return f"{self.product_id}: {self.total_quantity}"
+
+    @property
+    def available_quantity(self) -> int:
+        """Quantity available anywhere."""
+        return self.total_quantity - self.total_reserved
+
+
+class RegionalStock(models.Model):
+    """
+    Per-product stock totals for the warehouses of one region.
+    """
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.CASCADE,
+        related_name='regional_stock',
+        help_text="Product"
+    )
+    region = models.CharField(max_length=50, help_text="Warehouse region")
+    quantity = models.IntegerField(default=0, help_text="On-hand quantity in the region")
+    reserved_quantity = models.IntegerField(default=0, help_text="Reserved quantity in the region")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Last change")
+
+    class Meta:
+        db_table = 'regional_stock'
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'region'], name='unique_regional_stock'),
+        ]
+        indexes = [
+            models.Index(fields=['region', 'product']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id} in {self.region or '-'}: {self.quantity}"
+
+    @property
+    def available_quantity(self) -> int:
+        """Quantity available in the region."""
+        return self.quantity - self.reserved_quantity
+
+
+class CycleCount(BaseModel):
+    """
+    Physical count of part of a warehouse, uploaded as one scanner file.
+    """
+    STATUS_COUNTED = 'counted'
+    STATUS_POSTED = 'posted'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (STATUS_COUNTED, 'Counted'),
+        (STATUS_POSTED, 'Posted'),
+        (STATUS_CANCELLED, 'Cancelled'),
+    ]
+
+    reference = models.CharField(max_length=100, help_text="Count sheet or aisle reference")
+    warehouse = models.ForeignKey(
+        Warehouse,
+        on_delete=models.PROTECT,
+        related_name='cycle_counts',
+        help_text="Warehouse that was counted"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_COUNTED,
+        help_text="Cycle count status"
+    )
+    counted_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='cycle_counts',
+        help_text="User who uploaded the count"
+    )
+    posted_at = models.DateTimeField(null=True, blank=True, help_text="When adjustments were posted")
+
+    class Meta:
+        db_table = 'cycle_counts'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['warehouse', 'status']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.reference} ({self.get_status_display()})"
+
+
+class CycleCountLine(models.Model):
+    """
+    Counted quantity of one product, with the system quantity it is compared to.
+
+    ``system_quantity`` and ``variance`` are filled for the whole count by one
+    UPDATE, first on upload and again when the count is posted.
+    """
+    cycle_count = models.ForeignKey(
+        CycleCount,
+        on_delete=models.CASCADE,
+        related_name='lines',
+        help_text="Parent cycle count"
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.PROTECT,
+        related_name='cycle_count_lines',
+        help_text="Counted product"
+    )
+    counted_quantity = models.IntegerField(help_text="Quantity found on the shelf")
+    system_quantity = models.IntegerField(null=True, blank=True, help_text="On-hand quantity when compared")
+    variance = models.IntegerField(null=True, blank=True, help_text="Counted minus system quantity")
+
+    class Meta:
+        db_table = 'cycle_count_lines'
+        constraints = [
+            models.UniqueConstraint(fields=['cycle_count', 'product'], name='unique_cycle_count_product'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.product_id}: {self.counted_quantity}"
@@ -0,0 +1,85 @@
+from rest_framework import serializers
+
+from .models import CycleCount, CycleCountLine, PurchaseOrder, Warehouse
+
+
+class CycleCountUploadSerializer(serializers.Serializer):
+    """Serializer for uploading a cycle-count file"""
+
+    warehouse = serializers.PrimaryKeyRelatedField(queryset=Warehouse.objects.filter(is_active=True))
+    reference = serializers.CharField(max_length=100)
+    file = serializers.FileField(help_text='CSV with sku/barcode and quantity columns')
+
+
+class CycleCountSerializer(serializers.ModelSerializer):
+    """Serializer for cycle counts with their variance totals"""
+
+    warehouse_code = serializers.CharField(source='warehouse.code', read_only=True)
+    line_count = serializers.IntegerField(read_only=True)
+    variance_count = serializers.IntegerField(read_only=True)
+    net_variance = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = CycleCount
+        fields = [
+            'id',
+            'reference',
+            'warehouse',
+            'warehouse_code',
+            'status',
+            'counted_by',
+            'posted_at',
+            'line_count',
+            'variance_count',
+            'net_variance',
+            'created_at',
+        ]
+        read_only_fields = fields
+
+
+class CycleCountLineSerializer(serializers.ModelSerializer):
+    """Serializer for one counted product"""
+
+    sku = serializers.CharField(source='product.sku', read_only=True)
+    product_name = serializers.CharField(source='product.name', read_only=True)
+
+    class Meta:
+        model = CycleCountLine
+        fields = ['id', 'product', 'sku', 'product_name', 'counted_quantity', 'system_quantity', 'variance']
+        read_only_fields = fields
+
+
+class ShrinkageSerializer(serializers.Serializer):
+    """Serializer for per-category shrinkage rows"""
+
+    category = serializers.CharField()
+    lines = serializers.IntegerField()
+    shrink_units = serializers.IntegerField()
+    overage_units = serializers.IntegerField()
+    shrink_value = serializers.DecimalField(max_digits=14, decimal_places=2)
+    net_value = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class ReceiptLineSerializer(serializers.Serializer):
+    """Serializer for one received purchase-order line"""
+
+    purchase_order = serializers.UUIDField()
+    product = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1)
+    lot_number = serializers.CharField(max_length=64, required=False, allow_blank=True)
+    expiry_date = serializers.DateField(required=False, allow_null=True)
+
+
+class PurchaseOrderReceiveSerializer(serializers.Serializer):
+    """Serializer for a delivery covering lines of several purchase orders"""
+
+    lines = ReceiptLineSerializer(many=True, allow_empty=False, max_length=5000)
+
+
+class PurchaseOrderStatusSerializer(serializers.ModelSerializer):
+    """Serializer for purchase orders after receiving"""
+
+    class Meta:
+        model = PurchaseOrder
+        fields = ['id', 'po_number', 'status', 'warehouse', 'supplier']
+        read_only_fields = fields
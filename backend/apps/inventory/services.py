@@ -0,0 +1,1383 @@
+"""
+Business logic for stock operations.
+"""
+
+import csv
+import io
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Case, Count, DecimalField, ExpressionWrapper, F, IntegerField, Max, OuterRef, Q, Subquery, Sum,
+    Value, When,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.exceptions import InsufficientStockError, InvalidOperationError, OutOfStockError
+from apps.products.models import Product
+from .models import (
+    CycleCount, CycleCountLine, ProductStockSummary, PurchaseOrder, PurchaseOrderItem, RegionalStock, Stock,
+    StockAlert, StockLot, StockLotAllocation, StockMovement, StockReservation, StockReservationItem,
+    StockSnapshot, Supplier,
+)
+from .signals import reservations_expired, stock_availability_changed, stock_threshold_crossed
+
+
+BATCH_SIZE = 1000
+
+
+def _batches(items, size=BATCH_SIZE):
+    """Split ``items`` into lists of at most ``size`` so statements stay bounded."""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _key_lookup(keys):
+    """Build a filter matching stock rows by ``(product_id, warehouse_id)``."""
+    products = defaultdict(list)
+    for product_id, warehouse_id in keys:
+        products[warehouse_id].append(product_id)
+    lookup = Q()
+    for warehouse_id, product_ids in products.items():
+        lookup |= Q(warehouse_id=warehouse_id, product_id__in=product_ids)
+    return lookup
+
+
+def _resolve_stock_ids(keys, create=False):
+    """
+    Map ``(product_id, warehouse_id)`` keys to stock row ids.
+
+    One query per batch of keys. With ``create`` missing rows are inserted
+    at zero quantity first.
+    """
+    keys = list(keys)
+    stock_ids = {}
+    for batch in _batches(keys):
+        rows = Stock.objects.filter(_key_lookup(batch)).values_list('product_id', 'warehouse_id', 'id')
+        stock_ids.update({(product_id, warehouse_id): pk for product_id, warehouse_id, pk in rows})
+    missing = [key for key in keys if key not in stock_ids]
+    if missing and create:
+        Stock.objects.bulk_create(
+            [Stock(product_id=product_id, warehouse_id=warehouse_id) for product_id, warehouse_id in missing],
+            ignore_conflicts=True,
+        )
+        stock_ids.update(_resolve_stock_ids(missing))
+    return stock_ids
+
+
+def _raise_shortage(stock_id, quantity):
+    """Raise the error that best describes why ``quantity`` could not be taken."""
+    stock = Stock.objects.get(pk=stock_id)
+    available = stock.available_quantity
+    if available <= 0:
+        raise OutOfStockError(f'Product {stock.product_id} is out of stock.')
+    raise InsufficientStockError(
+        f'Only {available} of product {stock.product_id} available, {quantity} requested.'
+    )
+
+
+class _Shortage(Exception):
+    """Internal signal that a conditional stock update matched too few rows."""
+
+
+def _case(pairs, default=0):
+    """``CASE WHEN`` expression mapping filters to integer values."""
+    return Case(
+        *[When(condition, then=Value(value)) for condition, value in pairs],
+        default=Value(default),
+        output_field=IntegerField(),
+    )
+
+
+def _any(conditions):
+    """Combine filters with OR."""
+    combined = Q()
+    for condition in conditions:
+        combined |= condition
+    return combined
+
+
+def _grouped(key_fields, keys, value=None):
+    """
+    ``(filter, value)`` pairs covering ``keys`` with as few conditions as possible.
+
+    Keys that share every field but the first (and the same ``value(key)``)
+    collapse into one ``first__in`` filter, so a batch of thousands of rows
+    compiles to a handful of conditions instead of one per row.
+    """
+    groups = defaultdict(list)
+    for key in keys:
+        groups[(key[1:], value(key) if value else None)].append(key[0])
+    return [
+        (Q(**{f'{key_fields[0]}__in': heads}, **dict(zip(key_fields[1:], rest))), grouped_value)
+        for (rest, grouped_value), heads in groups.items()
+    ]
+
+
+class StockSummaryService:
+    """
+    Keep ProductStockSummary and RegionalStock in step with Stock.
+
+    Called inside the transaction that changes the stock rows. Each call
+    issues one multi-row UPDATE per table and batch of rows; rows are only
+    inserted the first time a product (or product and region) is seen.
+    """
+
+    @staticmethod
+    def apply(quantity_deltas=None, reserved_deltas=None):
+        """
+        Fold stock row changes into the aggregates.
+
+        Args:
+            quantity_deltas: Mapping of stock id to on-hand change
+            reserved_deltas: Mapping of stock id to reserved change
+        """
+        quantity_deltas = quantity_deltas or {}
+        reserved_deltas = reserved_deltas or {}
+        stock_ids = set(quantity_deltas) | set(reserved_deltas)
+        if not stock_ids:
+            return
+
+        products = defaultdict(lambda: [0, 0])
+        regions = defaultdict(lambda: [0, 0])
+        for batch in _batches(stock_ids):
+            for pk, product_id, region in Stock.objects.filter(pk__in=batch).values_list(
+                'pk', 'product_id', 'warehouse__region'
+            ):
+                for totals in (products[product_id], regions[(product_id, region)]):
+                    totals[0] += quantity_deltas.get(pk, 0)
+                    totals[1] += reserved_deltas.get(pk, 0)
+
+        StockSummaryService._update(
+            ProductStockSummary,
+            ('product_id',),
+            {(product_id,): totals for product_id, totals in products.items()},
+            ('total_quantity', 'total_reserved'),
+        )
+        StockSummaryService._update(
+            RegionalStock,
+            ('product_id', 'region'),
+            regions,
+            ('quantity', 'reserved_quantity'),
+        )
+
+    @staticmethod
+    def rebuild():
+        """
+        Recompute every aggregate from the stock table.
+
+        Returns:
+            Number of product summaries written
+        """
+        with transaction.atomic():
+            ProductStockSummary.objects.all().delete()
+            RegionalStock.objects.all().delete()
+            summaries = ProductStockSummary.objects.bulk_create(
+                [
+                    ProductStockSummary(
+                        product_id=row['product_id'],
+                        total_quantity=row['quantity'],
+                        total_reserved=row['reserved'],
+                    )
+                    for row in Stock.objects.values('product_id').annotate(
+                        quantity=Sum('quantity'), reserved=Sum('reserved_quantity')
+                    ).order_by()
+                ],
+                batch_size=1000,
+            )
+            RegionalStock.objects.bulk_create(
+                [
+                    RegionalStock(
+                        product_id=row['product_id'],
+                        region=row['warehouse__region'],
+                        quantity=row['quantity'],
+                        reserved_quantity=row['reserved'],
+                    )
+                    for row in Stock.objects.values('product_id', 'warehouse__region').annotate(
+                        quantity=Sum('quantity'), reserved=Sum('reserved_quantity')
+                    ).order_by()
+                ],
+                batch_size=1000,
+            )
+        return len(summaries)
+
+    @staticmethod
+    def verify():
+        """
+        Product summaries that disagree with the stock table.
+
+        Returns:
+            List of mismatch dicts; empty when everything agrees
+        """
+        totals = Stock.objects.filter(product_id=OuterRef('product_id')).values('product_id')
+        summaries = ProductStockSummary.objects.annotate(
+            quantity=Coalesce(Subquery(totals.annotate(total=Sum('quantity')).values('total')), Value(0)),
+            reserved=Coalesce(Subquery(totals.annotate(total=Sum('reserved_quantity')).values('total')), Value(0)),
+        )
+        return list(
+            summaries
+            .exclude(total_quantity=F('quantity'), total_reserved=F('reserved'))
+            .values('product_id', 'total_quantity', 'total_reserved', 'quantity', 'reserved')
+        )
+
+    @staticmethod
+    def _update(model, key_fields, deltas, fields):
+        """
+        Add ``deltas`` (key tuple -> per-field deltas) to ``fields``.
+
+        One multi-row UPDATE per batch of keys; rows that do not exist yet
+        are inserted at zero and updated again.
+        """
+        def matching(batch):
+            return model.objects.filter(_any(condition for condition, _ in _grouped(key_fields, batch)))
+
+        def run(keys):
+            updated = 0
+            for batch in _batches(keys):
+                updated += matching(batch).update(**{
+                    field: F(field) + _case(_grouped(key_fields, batch, lambda key: deltas[key][position]))
+                    for position, field in enumerate(fields)
+                })
+            return updated
+
+        keys = list(deltas)
+        if run(keys) == len(keys):
+            return
+        existing = set()
+        for batch in _batches(keys):
+            existing.update(matching(batch).values_list(*key_fields))
+        missing = [key for key in keys if key not in existing]
+        model.objects.bulk_create(
+            [model(**dict(zip(key_fields, key))) for key in missing],
+            ignore_conflicts=True,
+        )
+        run(missing)
+
+
+class StockService:
+    """
+    Single entry point for changing on-hand quantity.
+
+    Every change is appended to the StockMovement ledger and applied to the
+    matching Stock rows in the same transaction.
+    """
+
+    SIGNS = {
+        StockMovement.TYPE_SALE: -1,
+        StockMovement.TYPE_TRANSFER_OUT: -1,
+        StockMovement.TYPE_RETURN: 1,
+        StockMovement.TYPE_RECEIPT: 1,
+        StockMovement.TYPE_TRANSFER_IN: 1,
+    }
+
+    @staticmethod
+    def apply_movements(entries, reference='', user=None, allow_negative=False):
+        """
+        Record ledger entries and update stock with one statement per batch.
+
+        Args:
+            entries: Iterable of ``(product_id, warehouse_id, movement_type, quantity)``
+                tuples where ``quantity`` is signed; a fifth element overrides
+                ``reference`` for that entry
+            reference: Document that caused the movements
+            user: User recording the movements
+            allow_negative: Skip the availability check, e.g. for sales made
+                while a till was offline
+
+        Returns:
+            The created StockMovement rows
+
+        Raises:
+            InsufficientStockError: An outbound line exceeds unreserved stock
+        """
+        entries = list(entries)
+        if not entries:
+            return []
+
+        deltas = defaultdict(int)
+        for product_id, warehouse_id, movement_type, quantity, *_ in entries:
+            sign = StockService.SIGNS.get(movement_type)
+            if not quantity or (sign and quantity * sign < 0):
+                raise InvalidOperationError(f'Invalid quantity {quantity} for a {movement_type} movement.')
+            deltas[(product_id, warehouse_id)] += quantity
+
+        now = timezone.now()
+        try:
+            with transaction.atomic():
+                stock_ids = _resolve_stock_ids(deltas, create=True)
+                changes = {stock_ids[key]: delta for key, delta in deltas.items() if delta}
+                if changes:
+                    StockService._apply_deltas(changes, allow_negative, now)
+                    StockService._refresh_thresholds(changes, deltas=changes)
+                movements = StockMovement.objects.bulk_create([
+                    StockMovement(
+                        product_id=product_id,
+                        warehouse_id=warehouse_id,
+                        movement_type=movement_type,
+                        quantity=quantity,
+                        reference=entry_reference[0] if entry_reference else reference,
+                        created_by=user,
+                        created_at=now,
+                    )
+                    for product_id, warehouse_id, movement_type, quantity, *entry_reference in entries
+                ])
+        except _Shortage as shortage:
+            for stock_id, delta in shortage.args[0].items():
+                if delta < 0 and Stock.objects.get(pk=stock_id).available_quantity < -delta:
+                    _raise_shortage(stock_id, -delta)
+            raise InsufficientStockError()
+        return movements
+
+    @staticmethod
+    def transfer(product_id, from_warehouse_id, to_warehouse_id, quantity, reference='', user=None):
+        """Move stock between warehouses as a pair of ledger entries."""
+        return StockService.apply_movements(
+            [
+                (product_id, from_warehouse_id, StockMovement.TYPE_TRANSFER_OUT, -quantity),
+                (product_id, to_warehouse_id, StockMovement.TYPE_TRANSFER_IN, quantity),
+            ],
+            reference=reference,
+            user=user,
+        )
+
+    @staticmethod
+    def set_reorder_level(stock_id, reorder_level):
+        """Change a reorder level and re-evaluate the low-stock flag."""
+        with transaction.atomic():
+            Stock.objects.filter(pk=stock_id).update(reorder_level=reorder_level, updated_at=timezone.now())
+            return StockService._refresh_thresholds([stock_id])
+
+    @staticmethod
+    def rebuild_thresholds():
+        """
+        Recompute every low-stock flag with two set-based updates.
+
+        Used to backfill the flag; does not emit crossing alerts.
+        """
+        low = Q(reorder_level__gt=0, quantity__lte=F('reorder_level'))
+        flagged = Stock.objects.filter(low, is_low_stock=False).update(is_low_stock=True)
+        cleared = Stock.objects.filter(~low, is_low_stock=True).update(is_low_stock=False)
+        return flagged + cleared
+
+    @staticmethod
+    def _refresh_thresholds(stock_ids, deltas=None):
+        """
+        Flip ``is_low_stock`` on rows whose quantity crossed the reorder level.
+
+        The rows were just updated in this transaction, so they are locked and
+        the read below sees their final quantity. Only rows that change state
+        are written, and each one produces a single StockAlert that is
+        broadcast through ``stock_threshold_crossed`` after commit. A failing
+        receiver is logged; it never reaches the caller, whose write has
+        already committed.
+
+        With ``deltas`` (stock id -> change in available quantity, on hand or
+        through reservations) the same read also finds rows whose available
+        quantity crossed zero and broadcasts them through
+        ``stock_availability_changed`` after commit.
+        """
+        rows = (
+            row
+            for batch in _batches(stock_ids)
+            for row in Stock.objects.filter(pk__in=batch).values_list(
+                'pk', 'quantity', 'reorder_level', 'is_low_stock', 'reserved_quantity', 'product_id', 'warehouse_id'
+            )
+        )
+        alerts = []
+        availability = []
+        for pk, quantity, reorder_level, is_low_stock, reserved, product_id, warehouse_id in rows:
+            low = Stock.below_threshold(quantity, reorder_level)
+            if low != is_low_stock:
+                alerts.append(StockAlert(
+                    stock_id=pk,
+                    kind=StockAlert.KIND_LOW if low else StockAlert.KIND_RESTORED,
+                    quantity=quantity,
+                    reorder_level=reorder_level,
+                ))
+            if deltas:
+                available = quantity - reserved
+                if (available <= 0) != (available - deltas.get(pk, 0) <= 0):
+                    availability.append({
+                        'product_id': product_id,
+                        'warehouse_id': warehouse_id,
+                        'available': available,
+                        'out_of_stock': available <= 0,
+                    })
+        if availability:
+            transaction.on_commit(
+                lambda: stock_availability_changed.send(sender=Stock, changes=availability), robust=True
+            )
+        if not alerts:
+            return []
+
+        for kind, flag in ((StockAlert.KIND_LOW, True), (StockAlert.KIND_RESTORED, False)):
+            ids = [alert.stock_id for alert in alerts if alert.kind == kind]
+            for batch in _batches(ids):
+                Stock.objects.filter(pk__in=batch).update(is_low_stock=flag)
+        alerts = StockAlert.objects.bulk_create(alerts)
+        transaction.on_commit(
+            lambda: stock_threshold_crossed.send(sender=StockAlert, alerts=alerts), robust=True
+        )
+        return alerts
+
+    @staticmethod
+    def _apply_deltas(changes, allow_negative, now):
+        """
+        Add ``changes`` (stock id -> delta) to on-hand quantity.
+
+        One multi-row UPDATE per batch of rows. Outbound rows only match while
+        they keep ``quantity >= reserved``, so a short row makes the matched
+        count fall below the number of rows.
+        """
+        updated = 0
+        for batch in _batches(changes):
+            groups = _grouped(('pk',), [(stock_id,) for stock_id in batch], lambda key: changes[key[0]])
+            condition = _any(
+                rows & Q(quantity__gte=F('reserved_quantity') - delta) if delta < 0 and not allow_negative else rows
+                for rows, delta in groups
+            )
+            updated += Stock.objects.filter(condition).update(
+                quantity=F('quantity') + _case(groups),
+                updated_at=now,
+            )
+        if updated != len(changes):
+            raise _Shortage(changes)
+        StockSummaryService.apply(quantity_deltas=changes)
+
+
+class StockLedgerService:
+    """
+    Snapshot + delta reads over the StockMovement ledger.
+    """
+
+    @staticmethod
+    def quantity_at(product_id, warehouse_id, at=None):
+        """
+        On-hand quantity from the latest snapshot plus later movements.
+
+        Args:
+            at: Point in time to evaluate; defaults to now
+        """
+        snapshots = StockSnapshot.objects.filter(product_id=product_id, warehouse_id=warehouse_id)
+        movements = StockMovement.objects.filter(product_id=product_id, warehouse_id=warehouse_id)
+        if at is not None:
+            snapshots = snapshots.filter(as_of__lte=at)
+            movements = movements.filter(created_at__lte=at)
+        snapshot = snapshots.order_by('-last_movement_id').first()
+        if snapshot is not None:
+            movements = movements.filter(id__gt=snapshot.last_movement_id)
+        delta = movements.aggregate(total=Sum('quantity'))['total'] or 0
+        return (snapshot.quantity if snapshot else 0) + delta
+
+    @staticmethod
+    def compact(settle_seconds=60, batch_size=1000):
+        """
+        Roll ledger entries since the last run into new snapshots.
+
+        Only movements older than ``settle_seconds`` are compacted, so rows
+        whose ids were allocated by transactions still in flight are not
+        skipped. Snapshots are computed for all touched keys with a single
+        grouped query and written with ``bulk_create``.
+
+        Returns:
+            Number of snapshots written
+        """
+        start = StockSnapshot.objects.aggregate(position=Max('last_movement_id'))['position'] or 0
+        horizon = (
+            StockMovement.objects
+            .filter(id__gt=start, created_at__lte=timezone.now() - timedelta(seconds=settle_seconds))
+            .aggregate(position=Max('id'))['position']
+        )
+        if horizon is None:
+            return 0
+
+        previous = StockSnapshot.objects.filter(
+            product_id=OuterRef('product_id'),
+            warehouse_id=OuterRef('warehouse_id'),
+        ).order_by('-last_movement_id').values('quantity')[:1]
+        rows = (
+            StockMovement.objects
+            .filter(id__gt=start, id__lte=horizon)
+            .values('product_id', 'warehouse_id')
+            .annotate(
+                delta=Sum('quantity'),
+                as_of=Max('created_at'),
+                previous=Coalesce(Subquery(previous), Value(0)),
+            )
+            .order_by()
+        )
+        snapshots = StockSnapshot.objects.bulk_create(
+            [
+                StockSnapshot(
+                    product_id=row['product_id'],
+                    warehouse_id=row['warehouse_id'],
+                    quantity=row['previous'] + row['delta'],
+                    last_movement_id=horizon,
+                    as_of=row['as_of'],
+                )
+                for row in rows
+            ],
+            batch_size=batch_size,
+        )
+        return len(snapshots)
+
+    @staticmethod
+    def verify():
+        """
+        Check snapshots and stock rows against a full replay of the ledger.
+
+        Returns:
+            List of mismatch dicts; empty when everything agrees
+        """
+        mismatches = []
+
+        ledger_upto_snapshot = StockMovement.objects.filter(
+            product_id=OuterRef('product_id'),
+            warehouse_id=OuterRef('warehouse_id'),
+            id__lte=OuterRef('last_movement_id'),
+        ).values('product_id').annotate(total=Sum('quantity')).values('total')
+        latest = StockSnapshot.objects.filter(
+            last_movement_id=Subquery(
+                StockSnapshot.objects.filter(
+                    product_id=OuterRef('product_id'),
+                    warehouse_id=OuterRef('warehouse_id'),
+                ).order_by('-last_movement_id').values('last_movement_id')[:1]
+            )
+        ).annotate(ledger=Coalesce(Subquery(ledger_upto_snapshot), Value(0)))
+        for snapshot in latest.exclude(quantity=F('ledger')).values(
+            'product_id', 'warehouse_id', 'quantity', 'ledger', 'last_movement_id'
+        ):
+            mismatches.append({'kind': 'snapshot', **snapshot})
+
+        ledger_total = StockMovement.objects.filter(
+            product_id=OuterRef('product_id'),
+            warehouse_id=OuterRef('warehouse_id'),
+        ).values('product_id').annotate(total=Sum('quantity')).values('total')
+        stocks = Stock.objects.annotate(ledger=Coalesce(Subquery(ledger_total), Value(0)))
+        for stock in stocks.exclude(quantity=F('ledger')).values(
+            'product_id', 'warehouse_id', 'quantity', 'ledger'
+        ):
+            mismatches.append({'kind': 'stock', **stock})
+        return mismatches
+
+
+class StockReservationService:
+    """
+    Reserve, commit and release stock without read-modify-write cycles.
+
+    Every change to ``reserved_quantity`` is a single conditional UPDATE, so
+    concurrent POS sales and online checkouts on the same SKU only contend
+    for the row lock for the duration of one statement per line. Lines are
+    always touched in stock id order, which rules out deadlocks between
+    multi-line reservations. Reserving the last available units, or getting
+    them back, is broadcast through ``stock_availability_changed``.
+    """
+
+    @staticmethod
+    def reserve(lines, reference='', ttl=None):
+        """
+        Reserve all lines or none of them.
+
+        Args:
+            lines: Iterable of ``(product_id, warehouse_id, quantity)`` tuples
+            reference: Order, cart or basket identifier
+            ttl: Lifetime in seconds; defaults to ``STOCK_RESERVATION_TTL``
+
+        Returns:
+            The active StockReservation
+
+        Raises:
+            OutOfStockError: A product is not stocked or has nothing available
+            InsufficientStockError: A line asks for more than is available
+        """
+        requested = defaultdict(int)
+        for product_id, warehouse_id, quantity in lines:
+            if quantity <= 0:
+                raise InvalidOperationError('Reserved quantity must be positive.')
+            requested[(product_id, warehouse_id)] += quantity
+        if not requested:
+            raise InvalidOperationError('Nothing to reserve.')
+
+        stock_ids = _resolve_stock_ids(requested)
+        missing = [key for key in requested if key not in stock_ids]
+        if missing:
+            raise OutOfStockError(f'Product {missing[0][0]} is not stocked in this warehouse.')
+
+        quantities = {stock_ids[key]: quantity for key, quantity in requested.items()}
+        ttl = settings.STOCK_RESERVATION_TTL if ttl is None else ttl
+
+        with transaction.atomic():
+            for stock_id in sorted(quantities):
+                quantity = quantities[stock_id]
+                updated = Stock.objects.filter(
+                    pk=stock_id,
+                    quantity__gte=F('reserved_quantity') + quantity,
+                ).update(
+                    reserved_quantity=F('reserved_quantity') + quantity,
+                    updated_at=timezone.now(),
+                )
+                if not updated:
+                    _raise_shortage(stock_id, quantity)
+            StockSummaryService.apply(reserved_deltas=quantities)
+            StockService._refresh_thresholds(
+                quantities, deltas={stock_id: -quantity for stock_id, quantity in quantities.items()}
+            )
+
+            reservation = StockReservation.objects.create(
+                reference=reference,
+                expires_at=timezone.now() + timedelta(seconds=ttl),
+            )
+            StockReservationItem.objects.bulk_create([
+                StockReservationItem(reservation=reservation, stock_id=stock_id, quantity=quantity)
+                for stock_id, quantity in quantities.items()
+            ])
+        return reservation
+
+    @staticmethod
+    def commit(reservation, movement_type=StockMovement.TYPE_SALE, user=None):
+        """
+        Convert an active reservation into ledgered stock deductions.
+
+        Raises:
+            InvalidOperationError: The reservation is no longer active
+        """
+        with transaction.atomic():
+            StockReservationService._transition(reservation, StockReservation.STATUS_COMMITTED)
+            totals = StockReservationService._item_totals([reservation.pk])
+            StockReservationService._unreserve(totals)
+            keys = Stock.objects.filter(pk__in=totals).values_list('pk', 'product_id', 'warehouse_id')
+            StockService.apply_movements(
+                [
+                    (product_id, warehouse_id, movement_type, -totals[pk])
+                    for pk, product_id, warehouse_id in keys
+                ],
+                reference=reservation.reference or str(reservation.pk),
+                user=user,
+            )
+            StockLotService.allocate(
+                [(product_id, warehouse_id, totals[pk]) for pk, product_id, warehouse_id in keys],
+                reference=reservation.reference or str(reservation.pk),
+            )
+        return reservation
+
+    @staticmethod
+    def release(reservation):
+        """
+        Give the reserved quantity back without touching on-hand stock.
+
+        Raises:
+            InvalidOperationError: The reservation is no longer active
+        """
+        with transaction.atomic():
+            StockReservationService._transition(reservation, StockReservation.STATUS_RELEASED)
+            totals = StockReservationService._item_totals([reservation.pk])
+            StockReservationService._unreserve(totals)
+            StockService._refresh_thresholds(totals, deltas=totals)
+        return reservation
+
+    @staticmethod
+    def expire_stale(now=None, batch_size=500):
+        """
+        Release every active reservation whose TTL has passed.
+
+        Reservations are claimed in batches with ``SKIP LOCKED`` so several
+        workers can sweep at once, and reserved quantities are returned with
+        one UPDATE per affected stock row rather than per reservation line.
+        ``reservations_expired`` lets the holders close what they reserved
+        for in the same transaction.
+
+        Returns:
+            Number of reservations expired
+        """
+        now = now or timezone.now()
+        expired = 0
+        while True:
+            with transaction.atomic():
+                ids = list(
+                    StockReservation.objects
+                    .select_for_update(skip_locked=True)
+                    .filter(status=StockReservation.STATUS_ACTIVE, expires_at__lte=now)
+                    .order_by('expires_at')
+                    .values_list('id', flat=True)[:batch_size]
+                )
+                if not ids:
+                    return expired
+                StockReservation.objects.filter(pk__in=ids).update(
+                    status=StockReservation.STATUS_EXPIRED,
+                    updated_at=now,
+                )
+                totals = StockReservationService._item_totals(ids)
+                StockReservationService._unreserve(totals)
+                StockService._refresh_thresholds(totals, deltas=totals)
+                reservations_expired.send(sender=StockReservationService, reservation_ids=ids)
+            expired += len(ids)
+
+    @staticmethod
+    def _transition(reservation, status):
+        """Move an active reservation to ``status`` exactly once."""
+        updated = StockReservation.objects.filter(
+            pk=reservation.pk,
+            status=StockReservation.STATUS_ACTIVE,
+        ).update(status=status, updated_at=timezone.now())
+        if not updated:
+            raise InvalidOperationError('Reservation is no longer active.')
+        reservation.status = status
+
+    @staticmethod
+    def _item_totals(reservation_ids):
+        """Reserved quantity per stock row across the given reservations."""
+        rows = (
+            StockReservationItem.objects
+            .filter(reservation_id__in=reservation_ids)
+            .values('stock_id')
+            .annotate(total=Sum('quantity'))
+        )
+        return {row['stock_id']: row['total'] for row in rows}
+
+    @staticmethod
+    def _unreserve(totals):
+        """Subtract reserved quantities, one statement per stock row."""
+        now = timezone.now()
+        for stock_id in sorted(totals):
+            Stock.objects.filter(pk=stock_id).update(
+                reserved_quantity=F('reserved_quantity') - totals[stock_id],
+                updated_at=now,
+            )
+        StockSummaryService.apply(reserved_deltas={pk: -total for pk, total in totals.items()})
+
+
+class StockLotService:
+    """
+    Lot and expiry tracking with first-expiry-first-out allocation.
+
+    Lots with stock left are indexed per stock row by ``(expiry_date,
+    received_at)``, so allocation reads each SKU's lots already in FEFO order
+    from the index and walks them; nothing is sorted per call. Lots without
+    an expiry date are used last.
+    """
+
+    FEFO_ORDER = (F('expiry_date').asc(nulls_last=True), 'received_at', 'pk')
+
+    @staticmethod
+    def receive_lots(entries, now=None):
+        """
+        Add received units to lots, creating lots seen for the first time.
+
+        Args:
+            entries: Iterable of ``(product_id, warehouse_id, lot_number,
+                expiry_date, quantity)``
+
+        Returns:
+            Number of lots created
+        """
+        lots = {}
+        for product_id, warehouse_id, lot_number, expiry_date, quantity in entries:
+            key = (product_id, warehouse_id, lot_number)
+            lots[key] = (expiry_date, quantity + (lots[key][1] if key in lots else 0))
+        if not lots:
+            return 0
+
+        with transaction.atomic():
+            stock_ids = _resolve_stock_ids({key[:2] for key in lots}, create=True)
+            incoming = {(stock_ids[key[:2]], key[2]): value for key, value in lots.items()}
+            existing = {}
+            for batch in _batches(incoming):
+                lookup = _any(
+                    condition for condition, _ in _grouped(
+                        ('lot_number', 'stock_id'), [(lot_number, stock_id) for stock_id, lot_number in batch]
+                    )
+                )
+                existing.update(
+                    ((stock_id, lot_number), pk)
+                    for pk, stock_id, lot_number in StockLot.objects.filter(lookup).values_list(
+                        'pk', 'stock_id', 'lot_number'
+                    )
+                )
+            amounts = {pk: incoming[key][1] for key, pk in existing.items()}
+            for batch in _batches(amounts):
+                added = _case(_grouped(('pk',), [(pk,) for pk in batch], lambda key: amounts[key[0]]))
+                StockLot.objects.filter(pk__in=batch).update(
+                    quantity=F('quantity') + added,
+                    received_quantity=F('received_quantity') + added,
+                )
+            created = StockLot.objects.bulk_create([
+                StockLot(
+                    stock_id=stock_id,
+                    lot_number=lot_number,
+                    expiry_date=expiry_date,
+                    quantity=quantity,
+                    received_quantity=quantity,
+                    received_at=now or timezone.now(),
+                )
+                for (stock_id, lot_number), (expiry_date, quantity) in incoming.items()
+                if (stock_id, lot_number) not in existing
+            ])
+        return len(created)
+
+    @staticmethod
+    def allocate(lines, reference='', strict=False, now=None):
+        """
+        Take units from lots in first-expiry-first-out order.
+
+        Each SKU's lots are read from the FEFO index under a row lock and
+        consumed front to back; lots are then decremented with one UPDATE per
+        batch and the allocations recorded with one insert.
+
+        Args:
+            lines: Iterable of ``(product_id, warehouse_id, quantity)``,
+                optionally followed by a per-line reference overriding
+                ``reference``; lines of one SKU draw on its lots in order
+            reference: Sale or order the units went to
+            strict: Raise when lots cannot cover a line instead of
+                allocating what they can; stock that predates lot tracking
+                has no lots
+
+        Returns:
+            The created StockLotAllocation rows
+
+        Raises:
+            InsufficientStockError: ``strict`` and a line exceeds its lots
+        """
+        wanted = defaultdict(lambda: defaultdict(int))
+        for product_id, warehouse_id, quantity, *line_reference in lines:
+            wanted[(product_id, warehouse_id)][line_reference[0] if line_reference else reference] += quantity
+        if not wanted:
+            return []
+
+        with transaction.atomic():
+            stock_ids = _resolve_stock_ids(wanted)
+            remaining = {
+                stock_ids[key]: [list(line) for line in references.items()]
+                for key, references in wanted.items() if key in stock_ids
+            }
+            taken = defaultdict(int)
+            split = defaultdict(int)
+            lots = (
+                StockLot.objects
+                .select_for_update()
+                .filter(stock_id__in=remaining, quantity__gt=0)
+                .order_by('stock_id', *StockLotService.FEFO_ORDER)
+                .values_list('pk', 'stock_id', 'quantity')
+            )
+            for pk, stock_id, quantity in lots:
+                queue = remaining[stock_id]
+                while quantity and queue:
+                    used = min(quantity, queue[0][1])
+                    taken[pk] += used
+                    split[(pk, queue[0][0])] += used
+                    quantity -= used
+                    queue[0][1] -= used
+                    if not queue[0][1]:
+                        queue.pop(0)
+
+            short = [stock_id for stock_id, queue in remaining.items() if queue]
+            if strict and (short or len(remaining) < len(wanted)):
+                raise InsufficientStockError('Lots do not cover every line.')
+
+            for batch in _batches(taken):
+                used = _case(_grouped(('pk',), [(pk,) for pk in batch], lambda key: taken[key[0]]))
+                StockLot.objects.filter(pk__in=batch).update(quantity=F('quantity') - used)
+            return StockLotAllocation.objects.bulk_create([
+                StockLotAllocation(
+                    lot_id=pk, quantity=quantity, reference=line_reference, created_at=now or timezone.now()
+                )
+                for (pk, line_reference), quantity in split.items()
+            ])
+
+    @staticmethod
+    def restore(references, now=None):
+        """
+        Put units allocated to voided sales or cancelled orders back on their lots.
+
+        What is still out under each reference is returned to the lot it was
+        taken from and recorded as a negative allocation, so restoring a
+        reference again finds nothing left to return.
+
+        Args:
+            references: Sale or order references passed to ``allocate``
+
+        Returns:
+            Units returned to lots
+        """
+        references = list(references)
+        if not references:
+            return 0
+
+        with transaction.atomic():
+            outstanding = {
+                (lot_id, reference): quantity
+                for lot_id, reference, quantity in StockLotAllocation.objects
+                .filter(reference__in=references)
+                .values('lot_id', 'reference')
+                .annotate(out=Sum('quantity'))
+                .filter(out__gt=0)
+                .values_list('lot_id', 'reference', 'out')
+            }
+            returned = defaultdict(int)
+            for (lot_id, _), quantity in outstanding.items():
+                returned[lot_id] += quantity
+            locked = list(
+                StockLot.objects.select_for_update().filter(pk__in=returned).order_by('pk').values_list('pk', flat=True)
+            )
+            for batch in _batches(locked):
+                added = _case(_grouped(('pk',), [(pk,) for pk in batch], lambda key: returned[key[0]]))
+                StockLot.objects.filter(pk__in=batch).update(quantity=F('quantity') + added)
+            StockLotAllocation.objects.bulk_create([
+                StockLotAllocation(
+                    lot_id=lot_id, quantity=-quantity, reference=reference, created_at=now or timezone.now()
+                )
+                for (lot_id, reference), quantity in outstanding.items()
+            ])
+        return sum(returned.values())
+
+    @staticmethod
+    def near_expiry(days=None, today=None):
+        """
+        Lots with stock left that expire within ``days``, including expired ones.
+
+        A range scan over the partial expiry index.
+        """
+        days = settings.LOT_NEAR_EXPIRY_DAYS if days is None else days
+        today = today or timezone.localdate()
+        return (
+            StockLot.objects
+            .filter(quantity__gt=0, expiry_date__lte=today + timedelta(days=days))
+            .select_related('stock__product', 'stock__warehouse')
+            .order_by('expiry_date', 'pk')
+        )
+
+
+class PurchaseOrderService:
+    """
+    Business logic for purchase orders.
+    """
+
+    @staticmethod
+    def generate_po_number():
+        """Return a new purchase order number."""
+        return f"PO-{timezone.localdate():%Y%m%d}-{uuid.uuid4().hex[:8].upper()}"
+
+    RECEIVABLE_STATUSES = [PurchaseOrder.STATUS_ORDERED, PurchaseOrder.STATUS_PARTIALLY_RECEIVED]
+
+    @staticmethod
+    def receive(receipts, user=None):
+        """
+        Receive deliveries against many purchase orders in one transaction.
+
+        Rows are locked in a fixed order (orders, items, stock, products, each
+        by primary key) so overlapping deliveries queue instead of
+        deadlocking. Receipts are written as one ledger batch, received
+        quantities and order statuses with bulk updates, and product cost
+        prices move to the weighted average of stock on hand and the
+        delivery.
+
+        Args:
+            receipts: Iterable of ``(purchase_order_id, product_id, quantity)``,
+                optionally followed by ``lot_number`` and ``expiry_date`` for
+                lot-tracked goods
+            user: User receiving the goods
+
+        Returns:
+            The received PurchaseOrder instances with their new status
+
+        Raises:
+            InvalidOperationError: Unknown or closed order, product not on the
+                order, or more than the outstanding quantity
+        """
+        quantities = defaultdict(int)
+        lots = []
+        for purchase_order_id, product_id, quantity, *lot in receipts:
+            if quantity <= 0:
+                raise InvalidOperationError(f'Invalid received quantity {quantity}.')
+            quantities[(purchase_order_id, product_id)] += quantity
+            if lot and lot[0]:
+                lots.append((purchase_order_id, product_id, lot[0], lot[1] if len(lot) > 1 else None, quantity))
+        if not quantities:
+            return []
+        order_ids = {purchase_order_id for purchase_order_id, _ in quantities}
+
+        with transaction.atomic():
+            orders = {
+                order.pk: order
+                for order in PurchaseOrder.objects.select_for_update().filter(pk__in=order_ids).order_by('pk')
+            }
+            for purchase_order_id in order_ids:
+                order = orders.get(purchase_order_id)
+                if order is None or order.status not in PurchaseOrderService.RECEIVABLE_STATUSES:
+                    raise InvalidOperationError(f'Purchase order {purchase_order_id} cannot be received.')
+
+            items = {
+                (item.purchase_order_id, item.product_id): item
+                for item in PurchaseOrderItem.objects.select_for_update().filter(
+                    purchase_order_id__in=order_ids,
+                    product_id__in={product_id for _, product_id in quantities},
+                ).order_by('pk')
+            }
+            for key, quantity in quantities.items():
+                item = items.get(key)
+                if item is None:
+                    raise InvalidOperationError(f'Product {key[1]} is not on purchase order {key[0]}.')
+                if quantity > item.quantity_outstanding:
+                    raise InvalidOperationError(
+                        f'Only {item.quantity_outstanding} of product {key[1]} outstanding on '
+                        f'{orders[key[0]].po_number}, {quantity} received.'
+                    )
+
+            stock_ids = _resolve_stock_ids(
+                {(product_id, orders[purchase_order_id].warehouse_id) for purchase_order_id, product_id in quantities},
+                create=True,
+            )
+            for batch in _batches(sorted(stock_ids.values())):
+                list(Stock.objects.select_for_update().filter(pk__in=batch).order_by('pk').values_list('pk'))
+            PurchaseOrderService._update_costs(quantities, items)
+
+            StockService.apply_movements(
+                [
+                    (
+                        product_id,
+                        orders[purchase_order_id].warehouse_id,
+                        StockMovement.TYPE_RECEIPT,
+                        quantity,
+                        orders[purchase_order_id].po_number,
+                    )
+                    for (purchase_order_id, product_id), quantity in quantities.items()
+                ],
+                user=user,
+            )
+            StockLotService.receive_lots([
+                (product_id, orders[purchase_order_id].warehouse_id, lot_number, expiry_date, quantity)
+                for purchase_order_id, product_id, lot_number, expiry_date, quantity in lots
+            ])
+            for key, quantity in quantities.items():
+                items[key].quantity_received += quantity
+            PurchaseOrderItem.objects.bulk_update(
+                [items[key] for key in quantities], ['quantity_received'], batch_size=BATCH_SIZE
+            )
+
+            now = timezone.now()
+            open_ids = set(
+                PurchaseOrderItem.objects
+                .filter(purchase_order_id__in=order_ids, quantity_received__lt=F('quantity_ordered'))
+                .values_list('purchase_order_id', flat=True)
+            )
+            for status, ids in (
+                (PurchaseOrder.STATUS_PARTIALLY_RECEIVED, order_ids & open_ids),
+                (PurchaseOrder.STATUS_RECEIVED, order_ids - open_ids),
+            ):
+                if ids:
+                    PurchaseOrder.objects.filter(pk__in=ids).update(status=status, updated_at=now)
+                for purchase_order_id in ids:
+                    orders[purchase_order_id].status = status
+        return [orders[purchase_order_id] for purchase_order_id in sorted(order_ids)]
+
+    @staticmethod
+    def _update_costs(quantities, items):
+        """
+        Move received products to the weighted average cost, vectorised.
+
+        ``new = (on_hand * cost + sum(received * unit_cost)) / (on_hand + sum(received))``
+        per product, where on-hand is the stock across all warehouses before
+        the delivery. Negative on-hand counts as zero.
+        """
+        product_ids = sorted({product_id for _, product_id in quantities})
+        position = {product_id: index for index, product_id in enumerate(product_ids)}
+        lines = list(quantities.items())
+        rows = np.array([position[product_id] for (_, product_id), _ in lines])
+        received = np.array([quantity for _, quantity in lines], dtype=np.float64)
+        unit_costs = np.array([float(items[key].unit_cost) for key, _ in lines], dtype=np.float64)
+
+        products = list(Product.objects.select_for_update().filter(pk__in=product_ids).order_by('pk'))
+        on_hand_by_product = dict(
+            ProductStockSummary.objects.filter(product_id__in=product_ids).values_list('product_id', 'total_quantity')
+        )
+        on_hand = np.array(
+            [max(on_hand_by_product.get(product.pk, 0), 0) for product in products], dtype=np.float64
+        )
+        costs = np.array([float(product.cost_price) for product in products], dtype=np.float64)
+        order = np.array([position[product.pk] for product in products])
+
+        received_units = np.bincount(rows, weights=received, minlength=len(product_ids))[order]
+        received_value = np.bincount(rows, weights=received * unit_costs, minlength=len(product_ids))[order]
+        averaged = np.round((on_hand * costs + received_value) / (on_hand + received_units), 2)
+
+        changed = []
+        for product, cost in zip(products, averaged):
+            cost = Decimal(f'{cost:.2f}')
+            if cost != product.cost_price:
+                product.cost_price = cost
+                changed.append(product)
+        Product.objects.bulk_update(changed, ['cost_price'], batch_size=BATCH_SIZE)
+        return len(changed)
+
+    @staticmethod
+    def generate_reorder_drafts(forecaster, warehouse_ids=None, user=None):
+        """
+        Replace earlier automatic drafts with fresh reorder suggestions.
+
+        Args:
+            forecaster: A configured ``ReorderForecaster``
+
+        Returns:
+            The created PurchaseOrder instances
+        """
+        stale = PurchaseOrder.objects.filter(is_auto_generated=True, status=PurchaseOrder.STATUS_DRAFT)
+        if warehouse_ids:
+            stale = stale.filter(warehouse_id__in=warehouse_ids)
+        stale.update(status=PurchaseOrder.STATUS_CANCELLED, updated_at=timezone.now())
+        return PurchaseOrderService.create_draft_orders(
+            forecaster.suggestions(warehouse_ids=warehouse_ids),
+            user=user,
+        )
+
+    @staticmethod
+    def create_draft_orders(suggestions, user=None):
+        """
+        Turn reorder suggestions into draft purchase orders.
+
+        One draft is created per supplier and warehouse, with all headers and
+        all lines written by two ``bulk_create`` calls.
+
+        Args:
+            suggestions: Dicts with ``product_id``, ``warehouse_id``,
+                ``supplier_id``, ``quantity`` and ``unit_cost``
+
+        Returns:
+            The created PurchaseOrder instances
+        """
+        grouped = defaultdict(list)
+        for suggestion in suggestions:
+            grouped[(suggestion['supplier_id'], suggestion['warehouse_id'])].append(suggestion)
+        if not grouped:
+            return []
+
+        lead_times = dict(
+            Supplier.objects
+            .filter(pk__in={supplier_id for supplier_id, _ in grouped})
+            .values_list('pk', 'lead_time_days')
+        )
+        today = timezone.localdate()
+        orders = {
+            key: PurchaseOrder(
+                po_number=PurchaseOrderService.generate_po_number(),
+                supplier_id=key[0],
+                warehouse_id=key[1],
+                is_auto_generated=True,
+                expected_at=today + timedelta(days=lead_times.get(key[0], 0)),
+                created_by=user,
+            )
+            for key in grouped
+        }
+        with transaction.atomic():
+            PurchaseOrder.objects.bulk_create(orders.values())
+            PurchaseOrderItem.objects.bulk_create([
+                PurchaseOrderItem(
+                    purchase_order=orders[key],
+                    product_id=line['product_id'],
+                    quantity_ordered=line['quantity'],
+                    unit_cost=line['unit_cost'],
+                )
+                for key, lines in grouped.items()
+                for line in lines
+            ])
+        return list(orders.values())
+
+
+class CycleCountService:
+    """
+    Upload, compare and post whole-aisle stock counts.
+
+    Variances are computed for every line of a count by one UPDATE against
+    the stock table, and posting turns the non-zero variances into
+    ADJUSTMENT movements through StockService in one transaction.
+    """
+
+    CODE_COLUMNS = ('sku', 'barcode', 'code')
+    QUANTITY_COLUMNS = ('quantity', 'qty', 'count')
+
+    @staticmethod
+    def read_count_file(file):
+        """
+        Parse a scanner export into ``{code: quantity}``.
+
+        The file is CSV with a header naming a code column (``sku``,
+        ``barcode`` or ``code``) and a quantity column (``quantity``, ``qty``
+        or ``count``). Repeated codes, e.g. the same SKU on two shelves, are
+        summed.
+
+        Raises:
+            InvalidOperationError: Missing columns or a non-integer quantity
+        """
+        if isinstance(file, (bytes, str)):
+            file = io.BytesIO(file.encode() if isinstance(file, str) else file)
+        reader = csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+        header = [column.strip().lower() for column in next(reader, [])]
+        code_column = next((header.index(name) for name in CycleCountService.CODE_COLUMNS if name in header), None)
+        quantity_column = next(
+            (header.index(name) for name in CycleCountService.QUANTITY_COLUMNS if name in header), None
+        )
+        if code_column is None or quantity_column is None:
+            raise InvalidOperationError('Count file needs a sku/barcode column and a quantity column.')
+
+        counts = defaultdict(int)
+        for number, row in enumerate(reader, start=2):
+            if not any(cell.strip() for cell in row):
+                continue
+            try:
+                code = row[code_column].strip()
+                quantity = int(row[quantity_column])
+            except (IndexError, ValueError):
+                raise InvalidOperationError(f'Invalid count on line {number}.')
+            if not code or quantity < 0:
+                raise InvalidOperationError(f'Invalid count on line {number}.')
+            counts[code] += quantity
+        return dict(counts)
+
+    @staticmethod
+    def upload(warehouse, counts, reference, user=None):
+        """
+        Store a count and compute its variances.
+
+        Args:
+            warehouse: Warehouse that was counted
+            counts: Mapping of SKU or barcode to counted quantity
+            reference: Count sheet or aisle reference
+            user: User uploading the count
+
+        Returns:
+            Tuple of the CycleCount and the codes that matched no product
+        """
+        product_ids = CycleCountService._resolve_codes(counts)
+        quantities = defaultdict(int)
+        for code, quantity in counts.items():
+            if code in product_ids:
+                quantities[product_ids[code]] += quantity
+        unknown = sorted(code for code in counts if code not in product_ids)
+
+        with transaction.atomic():
+            cycle_count = CycleCount.objects.create(
+                reference=reference,
+                warehouse=warehouse,
+                counted_by=user,
+            )
+            CycleCountLine.objects.bulk_create(
+                [
+                    CycleCountLine(cycle_count=cycle_count, product_id=product_id, counted_quantity=quantity)
+                    for product_id, quantity in quantities.items()
+                ],
+                batch_size=2000,
+            )
+            CycleCountService.compute_variances(cycle_count)
+        return cycle_count, unknown
+
+    @staticmethod
+    def compute_variances(cycle_count):
+        """
+        Compare every line with current on-hand stock in one UPDATE.
+
+        Products without a stock row in the warehouse compare against zero.
+        """
+        on_hand = Coalesce(
+            Subquery(
+                Stock.objects
+                .filter(product_id=OuterRef('product_id'), warehouse_id=cycle_count.warehouse_id)
+                .values('quantity')[:1]
+            ),
+            Value(0),
+        )
+        return CycleCountLine.objects.filter(cycle_count=cycle_count).update(
+            system_quantity=on_hand,
+            variance=F('counted_quantity') - on_hand,
+        )
+
+    @staticmethod
+    def post(cycle_count, user=None):
+        """
+        Post the count's variances as stock adjustments.
+
+        Variances are recomputed under the count's row lock so sales made
+        since the upload are not counted twice. The counted quantity is
+        authoritative, so adjustments may take stock below reserved.
+
+        Returns:
+            Number of ADJUSTMENT movements recorded
+
+        Raises:
+            InvalidOperationError: The count was already posted or cancelled
+        """
+        with transaction.atomic():
+            locked = CycleCount.objects.select_for_update().get(pk=cycle_count.pk)
+            if locked.status != CycleCount.STATUS_COUNTED:
+                raise InvalidOperationError(f'Cycle count is already {locked.status}.')
+
+            CycleCountService.compute_variances(locked)
+            adjustments = [
+                (product_id, locked.warehouse_id, StockMovement.TYPE_ADJUSTMENT, variance)
+                for product_id, variance in (
+                    CycleCountLine.objects
+                    .filter(cycle_count=locked)
+                    .exclude(variance=0)
+                    .values_list('product_id', 'variance')
+                )
+            ]
+            StockService.apply_movements(
+                adjustments,
+                reference=f'CC-{locked.reference}',
+                user=user,
+                allow_negative=True,
+            )
+            locked.status = CycleCount.STATUS_POSTED
+            locked.posted_at = timezone.now()
+            locked.save(update_fields=['status', 'posted_at', 'updated_at'])
+        cycle_count.status, cycle_count.posted_at = locked.status, locked.posted_at
+        return len(adjustments)
+
+    @staticmethod
+    def shrinkage(cycle_count):
+        """
+        Variance per product category, largest loss first.
+
+        Returns:
+            List of dicts with ``category``, ``lines``, ``shrink_units``,
+            ``overage_units`` and ``shrink_value`` / ``net_value`` at cost
+        """
+        value = ExpressionWrapper(
+            F('variance') * F('product__cost_price'),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )
+        zero_units, zero_value = Value(0), Value(0, output_field=DecimalField(max_digits=14, decimal_places=2))
+        return list(
+            CycleCountLine.objects
+            .filter(cycle_count=cycle_count)
+            .values(category=Coalesce(F('product__category__name'), Value('Uncategorised')))
+            .annotate(
+                lines=Count('pk'),
+                shrink_units=Coalesce(Sum('variance', filter=Q(variance__lt=0)), zero_units),
+                overage_units=Coalesce(Sum('variance', filter=Q(variance__gt=0)), zero_units),
+                shrink_value=Coalesce(Sum(value, filter=Q(variance__lt=0)), zero_value),
+                net_value=Coalesce(Sum(value), zero_value),
+            )
+            .order_by('shrink_value', 'category')
+        )
+
+    @staticmethod
+    def _resolve_codes(codes):
+        """Map SKUs and barcodes to product ids, one query per batch; SKUs win."""
+        product_ids, by_barcode = {}, {}
+        for batch in _batches(codes, 2000):
+            for pk, sku, barcode in Product.objects.filter(
+                Q(sku__in=batch) | Q(barcode__in=batch), is_deleted=False
+            ).values_list('pk', 'sku', 'barcode'):
+                product_ids[sku] = pk
+                if barcode:
+                    by_barcode.setdefault(barcode, pk)
+        for barcode, pk in by_barcode.items():
+            product_ids.setdefault(barcode, pk)
+        return product_ids
@@ -0,0 +1,22 @@
+"""
+Signals for the inventory app.
+"""
+
+from django.dispatch import Signal
+
+# Sent after commit with ``alerts``: the StockAlert rows written when stock
+# rows crossed their reorder level. Fired once per crossing, not per sale.
+stock_threshold_crossed = Signal()
+
+# Sent after commit with ``changes``: one dict per stock row whose available
+# quantity crossed zero in either direction, with ``product_id``,
+# ``warehouse_id``, ``available`` and ``out_of_stock``.
+stock_availability_changed = Signal()
+
+# Sent inside the expiring transaction with ``reservation_ids``: the
+# reservations whose TTL passed before they were committed or released.
+reservations_expired = Signal()
+
+# Sent by the nightly sweep with ``lots``: the StockLot rows with stock left
+# that expire within LOT_NEAR_EXPIRY_DAYS, expired ones included.
+lots_near_expiry = Signal()
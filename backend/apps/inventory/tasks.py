@@ -0,0 +1,51 @@
+"""
+Celery tasks for the inventory app.
+"""
+
+import logging
+
+from celery import shared_task
+
+from .forecasting import ReorderForecaster
+from .services import PurchaseOrderService, StockLedgerService, StockLotService, StockReservationService
+from .signals import lots_near_expiry
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def expire_stock_reservations():
+    """Release reservations whose TTL has passed."""
+    return StockReservationService.expire_stale()
+
+
+@shared_task
+def compact_stock_ledger():
+    """Roll recent ledger entries into per-product/warehouse snapshots."""
+    return StockLedgerService.compact()
+
+
+@shared_task
+def verify_stock_ledger():
+    """Log snapshots or stock rows that disagree with the ledger."""
+    mismatches = StockLedgerService.verify()
+    for mismatch in mismatches:
+        logger.error('Stock ledger mismatch: %s', mismatch)
+    return len(mismatches)
+
+
+@shared_task
+def generate_purchase_order_drafts():
+    """Forecast demand for the whole catalog and draft purchase orders."""
+    orders = PurchaseOrderService.generate_reorder_drafts(ReorderForecaster())
+    return len(orders)
+
+
+@shared_task
+def sweep_expiring_lots():
+    """Announce lots that expire within the configured number of days."""
+    lots = list(StockLotService.near_expiry())
+    if lots:
+        lots_near_expiry.send(sender=StockLotService, lots=lots)
+    logger.info('%d lots near expiry', len(lots))
+    return len(lots)
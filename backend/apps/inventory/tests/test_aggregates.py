@@ -0,0 +1,96 @@
+import pytest
+
+from apps.inventory.models import ProductStockSummary, RegionalStock, Stock, StockMovement
+from apps.inventory.services import StockReservationService, StockService, StockSummaryService
+from apps.products.models import Product
+from core.exceptions import InsufficientStockError
+
+
+def receive(product, warehouse, quantity):
+    """Record a receipt movement"""
+    StockService.apply_movements([(product.pk, warehouse.pk, StockMovement.TYPE_RECEIPT, quantity)])
+
+
+@pytest.fixture
+def branches(create_warehouse):
+    """Two Dhaka branches and one Chattogram branch"""
+    return (
+        create_warehouse(region='dhaka'),
+        create_warehouse(region='dhaka'),
+        create_warehouse(region='chattogram'),
+    )
+
+
+@pytest.mark.django_db
+class TestStockAggregates:
+    """Test the maintained stock read model"""
+
+    def test_movements_update_totals(self, create_product, branches):
+        """Test receipts and sales roll up per product and region"""
+        product = create_product()
+        dhaka_a, dhaka_b, ctg = branches
+        receive(product, dhaka_a, 10)
+        receive(product, dhaka_b, 5)
+        receive(product, ctg, 7)
+        StockService.apply_movements([(product.pk, dhaka_a.pk, StockMovement.TYPE_SALE, -3)])
+
+        summary = ProductStockSummary.objects.get(product=product)
+        assert summary.total_quantity == 19
+        assert RegionalStock.objects.get(product=product, region='dhaka').quantity == 12
+        assert RegionalStock.objects.get(product=product, region='chattogram').quantity == 7
+
+    def test_reservations_update_totals(self, create_product, branches):
+        """Test reserved quantity is tracked in the aggregates"""
+        product = create_product()
+        dhaka_a, _, ctg = branches
+        receive(product, dhaka_a, 10)
+        receive(product, ctg, 10)
+
+        reservation = StockReservationService.reserve([(product.pk, dhaka_a.pk, 4)])
+        summary = ProductStockSummary.objects.get(product=product)
+        assert summary.total_reserved == 4
+        assert summary.available_quantity == 16
+
+        StockReservationService.commit(reservation)
+        summary.refresh_from_db()
+        regional = RegionalStock.objects.get(product=product, region='dhaka')
+        assert (summary.total_quantity, summary.total_reserved) == (16, 0)
+        assert (regional.quantity, regional.reserved_quantity) == (6, 0)
+
+    def test_failed_movement_leaves_totals(self, create_product, branches):
+        """Test a rejected sale does not touch the aggregates"""
+        product = create_product()
+        receive(product, branches[0], 2)
+
+        with pytest.raises(InsufficientStockError):
+            StockService.apply_movements([(product.pk, branches[0].pk, StockMovement.TYPE_SALE, -5)])
+
+        assert ProductStockSummary.objects.get(product=product).total_quantity == 2
+
+    def test_listing_availability(self, create_product, branches):
+        """Test product listings read availability with joins"""
+        dhaka_a, dhaka_b, ctg = branches
+        stocked, unstocked = create_product(), create_product()
+        receive(stocked, dhaka_a, 10)
+        receive(stocked, ctg, 4)
+
+        rows = {
+            product.pk: product
+            for product in Product.objects.with_availability(region='dhaka', warehouse=dhaka_b)
+        }
+
+        assert rows[stocked.pk].available_anywhere == 14
+        assert rows[stocked.pk].available_in_region == 10
+        assert rows[stocked.pk].available_in_branch == 0
+        assert rows[unstocked.pk].available_anywhere == 0
+
+    def test_rebuild_and_verify(self, create_stock, branches):
+        """Test rebuilding from stock rows written outside the service"""
+        stock = create_stock(warehouse=branches[0], quantity=9, reserved_quantity=2)
+        assert not ProductStockSummary.objects.exists()
+
+        assert StockSummaryService.rebuild() == 1
+        assert StockSummaryService.verify() == []
+
+        Stock.objects.filter(pk=stock.pk).update(quantity=1)
+        assert len(StockSummaryService.verify()) == 1
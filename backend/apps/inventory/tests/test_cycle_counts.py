@@ -0,0 +1,152 @@
+from decimal import Decimal
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework import status
+
+from apps.inventory.models import CycleCount, Stock, StockMovement
+from apps.inventory.services import CycleCountService, StockService
+from core.exceptions import InvalidOperationError
+
+
+def count_file(rows, header='sku,quantity'):
+    """Build a scanner export from ``(code, quantity)`` rows"""
+    lines = [header] + [f'{code},{quantity}' for code, quantity in rows]
+    return SimpleUploadedFile('count.csv', '\n'.join(lines).encode(), content_type='text/csv')
+
+
+@pytest.mark.django_db
+class TestCycleCountService:
+    """Test cycle-count upload, variance and posting"""
+
+    def test_read_count_file_sums_repeated_codes(self):
+        """Test a code scanned on two shelves is counted once"""
+        counts = CycleCountService.read_count_file(count_file([('A', 2), ('B', 1), ('A', 3)]))
+
+        assert counts == {'A': 5, 'B': 1}
+
+    def test_read_count_file_rejects_bad_rows(self):
+        """Test missing columns and bad quantities are rejected"""
+        with pytest.raises(InvalidOperationError):
+            CycleCountService.read_count_file(count_file([('A', 1)], header='item,amount'))
+        with pytest.raises(InvalidOperationError):
+            CycleCountService.read_count_file(count_file([('A', 'two')]))
+
+    def test_upload_computes_variances(self, create_stock, create_product, create_warehouse):
+        """Test variances compare against stock, unstocked products against zero"""
+        warehouse = create_warehouse()
+        short = create_stock(warehouse=warehouse, quantity=10)
+        exact = create_stock(warehouse=warehouse, quantity=4)
+        unstocked = create_product()
+
+        cycle_count, unknown = CycleCountService.upload(
+            warehouse,
+            {short.product.sku: 7, exact.product.barcode: 4, unstocked.sku: 2, 'NOPE': 1},
+            reference='AISLE-1',
+        )
+
+        variances = dict(cycle_count.lines.values_list('product_id', 'variance'))
+        assert variances == {short.product_id: -3, exact.product_id: 0, unstocked.pk: 2}
+        assert unknown == ['NOPE']
+
+    def test_post_adjusts_stock(self, create_stock, create_product, create_warehouse):
+        """Test posting records adjustments that bring stock to the count"""
+        warehouse = create_warehouse()
+        short = create_stock(warehouse=warehouse, quantity=10, reserved_quantity=9)
+        exact = create_stock(warehouse=warehouse, quantity=4)
+        unstocked = create_product()
+        cycle_count, _ = CycleCountService.upload(
+            warehouse, {short.product.sku: 7, exact.product.sku: 4, unstocked.sku: 2}, reference='AISLE-1'
+        )
+
+        assert CycleCountService.post(cycle_count) == 2
+
+        assert Stock.objects.get(pk=short.pk).quantity == 7
+        assert Stock.objects.get(product=unstocked, warehouse=warehouse).quantity == 2
+        assert set(StockMovement.objects.values_list('movement_type', 'quantity')) == {
+            (StockMovement.TYPE_ADJUSTMENT, -3),
+            (StockMovement.TYPE_ADJUSTMENT, 2),
+        }
+        assert cycle_count.status == CycleCount.STATUS_POSTED
+        with pytest.raises(InvalidOperationError):
+            CycleCountService.post(cycle_count)
+
+    def test_post_uses_current_stock(self, create_stock):
+        """Test sales after the upload are not adjusted away twice"""
+        stock = create_stock(quantity=10)
+        cycle_count, _ = CycleCountService.upload(stock.warehouse, {stock.product.sku: 8}, reference='A')
+        StockService.apply_movements([(stock.product_id, stock.warehouse_id, StockMovement.TYPE_SALE, -1)])
+
+        CycleCountService.post(cycle_count)
+
+        assert Stock.objects.get(pk=stock.pk).quantity == 8
+        assert cycle_count.lines.get().variance == -1
+
+    def test_shrinkage_per_category(self, create_category, create_product, create_stock, create_warehouse):
+        """Test shrinkage is totalled per category at cost"""
+        warehouse = create_warehouse()
+        dairy = create_category(name='Dairy')
+        milk = create_stock(warehouse=warehouse, quantity=10, product=create_product(category=dairy))
+        cheese = create_stock(warehouse=warehouse, quantity=5, product=create_product(category=dairy))
+        loose = create_stock(warehouse=warehouse, quantity=1)
+        cycle_count, _ = CycleCountService.upload(
+            warehouse,
+            {milk.product.sku: 6, cheese.product.sku: 6, loose.product.sku: 1},
+            reference='AISLE-2',
+        )
+
+        rows = {row['category']: row for row in CycleCountService.shrinkage(cycle_count)}
+
+        assert rows['Dairy']['lines'] == 2
+        assert rows['Dairy']['shrink_units'] == -4
+        assert rows['Dairy']['overage_units'] == 1
+        assert rows['Dairy']['shrink_value'] == Decimal('-28.00')
+        assert rows['Dairy']['net_value'] == Decimal('-21.00')
+        assert rows['Uncategorised']['shrink_units'] == 0
+
+
+@pytest.mark.django_db
+class TestCycleCountAPI:
+    """Test the cycle-count endpoints"""
+
+    def test_upload_and_post(self, manager_client, create_stock, create_warehouse):
+        """Test a count is uploaded, inspected and posted"""
+        warehouse = create_warehouse()
+        stock = create_stock(warehouse=warehouse, quantity=10)
+
+        response = manager_client.post(
+            reverse('inventory:cycle-count-list'),
+            {
+                'warehouse': str(warehouse.pk),
+                'reference': 'AISLE-3',
+                'file': count_file([(stock.product.sku, 6), ('UNKNOWN', 1)]),
+            },
+            format='multipart',
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data['line_count'] == 1
+        assert response.data['net_variance'] == -4
+        assert response.data['unknown_codes'] == ['UNKNOWN']
+
+        pk = response.data['id']
+        lines = manager_client.get(reverse('inventory:cycle-count-lines', args=[pk]), {'variance_only': 'true'})
+        assert lines.data['results'][0]['variance'] == -4
+
+        response = manager_client.post(reverse('inventory:cycle-count-post-adjustments', args=[pk]))
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['adjustments'] == 1
+        assert Stock.objects.get(pk=stock.pk).quantity == 6
+
+        response = manager_client.post(reverse('inventory:cycle-count-post-adjustments', args=[pk]))
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data['success'] is False
+
+    def test_requires_manager(self, client_for, create_user):
+        """Test customers cannot upload counts"""
+        client = client_for(create_user())
+
+        response = client.get(reverse('inventory:cycle-count-list'))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,123 @@
+from datetime import timedelta
+
+import numpy as np
+import pytest
+from django.utils import timezone
+
+from apps.inventory.forecasting import METHOD_EXPONENTIAL, ReorderForecaster, forecast_chunk
+from apps.inventory.models import PurchaseOrder, StockMovement, Supplier
+from apps.inventory.services import PurchaseOrderService
+
+
+class TestForecastChunk:
+    """Test the vectorised reorder calculation"""
+
+    def test_steady_demand(self):
+        """Test reorder point and order quantity for flat demand"""
+        sales = np.full((2, 28), 2.0)
+
+        result = forecast_chunk(
+            sales,
+            lead_times=np.array([5.0, 5.0]),
+            on_hand=np.array([8.0, 30.0]),
+            on_order=np.array([0.0, 0.0]),
+        )
+
+        assert result['demand'].tolist() == [2.0, 2.0]
+        assert result['safety_stock'].tolist() == [0.0, 0.0]
+        assert result['reorder_point'].tolist() == [10.0, 10.0]
+        assert result['order_quantity'].tolist() == [16, 0]
+
+    def test_on_order_counts_towards_position(self):
+        """Test open purchase orders suppress reordering"""
+        sales = np.full((1, 28), 2.0)
+
+        result = forecast_chunk(
+            sales,
+            lead_times=np.array([5.0]),
+            on_hand=np.array([2.0]),
+            on_order=np.array([20.0]),
+        )
+
+        assert result['order_quantity'].tolist() == [0]
+
+    def test_variable_demand_adds_safety_stock(self):
+        """Test demand variability raises the reorder point"""
+        sales = np.tile([0.0, 4.0], (1, 14))
+
+        result = forecast_chunk(
+            sales,
+            lead_times=np.array([4.0]),
+            on_hand=np.array([0.0]),
+            on_order=np.array([0.0]),
+        )
+
+        assert result['safety_stock'][0] == pytest.approx(1.65 * 2.0 * 2.0)
+        assert result['reorder_point'][0] > 8.0
+
+    def test_exponential_smoothing_weights(self):
+        """Test exponential smoothing tracks the latest level"""
+        flat = np.full((1, 30), 3.0)
+        step = np.concatenate([np.zeros((1, 20)), np.full((1, 10), 10.0)], axis=1)
+        args = {'lead_times': np.array([1.0]), 'on_hand': np.array([0.0]), 'on_order': np.array([0.0])}
+
+        assert forecast_chunk(flat, method=METHOD_EXPONENTIAL, **args)['demand'][0] == pytest.approx(3.0)
+        level = forecast_chunk(step, method=METHOD_EXPONENTIAL, alpha=0.5, **args)['demand'][0]
+        assert level == pytest.approx(10.0 * (1 - 0.5 ** 10))
+
+
+@pytest.fixture
+def supplied_stock(create_product, create_stock):
+    """Stock row whose product has a supplier and two weeks of daily sales"""
+    supplier = Supplier.objects.create(name='Fresh Farms', code='FF', lead_time_days=3)
+    product = create_product(supplier=supplier, cost_price='4.50')
+    stock = create_stock(product=product, quantity=5)
+    now = timezone.now()
+    StockMovement.objects.bulk_create([
+        StockMovement(
+            product=product,
+            warehouse=stock.warehouse,
+            movement_type=StockMovement.TYPE_SALE,
+            quantity=-3,
+            created_at=now - timedelta(days=day),
+        )
+        for day in range(1, 15)
+    ])
+    return stock
+
+
+@pytest.mark.django_db
+class TestReorderDrafts:
+    """Test generating draft purchase orders"""
+
+    def test_suggestions_and_drafts(self, supplied_stock):
+        """Test a short SKU produces one draft order"""
+        forecaster = ReorderForecaster(history_days=14, window=14, workers=1)
+
+        orders = PurchaseOrderService.generate_reorder_drafts(forecaster)
+
+        assert len(orders) == 1
+        order = PurchaseOrder.objects.get()
+        assert order.status == PurchaseOrder.STATUS_DRAFT
+        assert order.is_auto_generated
+        item = order.items.get()
+        # demand 3/day, lead 3 days, review 7 days: order up to 30
+        assert item.quantity_ordered == 25
+        assert str(item.unit_cost) == '4.50'
+
+    def test_rerun_replaces_drafts(self, supplied_stock):
+        """Test a second run cancels the previous automatic draft"""
+        forecaster = ReorderForecaster(history_days=14, window=14, workers=1)
+        PurchaseOrderService.generate_reorder_drafts(forecaster)
+
+        PurchaseOrderService.generate_reorder_drafts(forecaster)
+
+        assert PurchaseOrder.objects.filter(status=PurchaseOrder.STATUS_DRAFT).count() == 1
+        assert PurchaseOrder.objects.filter(status=PurchaseOrder.STATUS_CANCELLED).count() == 1
+
+    def test_process_pool(self, supplied_stock):
+        """Test chunks computed in worker processes give the same answer"""
+        inline = ReorderForecaster(history_days=14, window=14, workers=1).suggestions()
+        pooled = ReorderForecaster(history_days=14, window=14, workers=2, chunk_size=1).suggestions()
+
+        assert pooled == inline
@@ -0,0 +1,184 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.inventory.models import Stock, StockMovement, StockSnapshot
+from apps.inventory.services import StockLedgerService, StockService
+from core.exceptions import InsufficientStockError, InvalidOperationError
+
+
+def receive(product, warehouse, quantity):
+    """Record a receipt movement"""
+    return StockService.apply_movements(
+        [(product.pk, warehouse.pk, StockMovement.TYPE_RECEIPT, quantity)],
+        reference='PO-1',
+    )
+
+
+def sell(product, warehouse, quantity):
+    """Record a sale movement"""
+    return StockService.apply_movements(
+        [(product.pk, warehouse.pk, StockMovement.TYPE_SALE, -quantity)],
+        reference='SALE-1',
+    )
+
+
+@pytest.mark.django_db
+class TestApplyMovements:
+    """Test recording stock movements"""
+
+    def test_receipt_creates_stock_row(self, create_product, create_warehouse):
+        """Test a receipt for an unstocked product creates its stock row"""
+        product, warehouse = create_product(), create_warehouse()
+
+        receive(product, warehouse, 12)
+
+        stock = Stock.objects.get(product=product, warehouse=warehouse)
+        assert stock.quantity == 12
+        assert StockMovement.objects.get().quantity == 12
+
+    def test_sale_decrements_stock(self, create_product, create_warehouse):
+        """Test a sale reduces on-hand quantity"""
+        product, warehouse = create_product(), create_warehouse()
+        receive(product, warehouse, 12)
+
+        sell(product, warehouse, 5)
+
+        assert Stock.objects.get(product=product).quantity == 7
+
+    def test_sale_cannot_take_reserved_stock(self, create_product, create_warehouse):
+        """Test outbound movements leave reserved quantity alone"""
+        product, warehouse = create_product(), create_warehouse()
+        receive(product, warehouse, 10)
+        Stock.objects.filter(product=product).update(reserved_quantity=8)
+
+        with pytest.raises(InsufficientStockError):
+            sell(product, warehouse, 3)
+
+        assert Stock.objects.get(product=product).quantity == 10
+        assert StockMovement.objects.count() == 1
+
+    def test_multi_line_is_all_or_nothing(self, create_product, create_warehouse):
+        """Test one short line rolls back every line"""
+        warehouse = create_warehouse()
+        first, second = create_product(), create_product()
+        receive(first, warehouse, 10)
+        receive(second, warehouse, 1)
+
+        with pytest.raises(InsufficientStockError):
+            StockService.apply_movements([
+                (first.pk, warehouse.pk, StockMovement.TYPE_SALE, -4),
+                (second.pk, warehouse.pk, StockMovement.TYPE_SALE, -2),
+            ])
+
+        assert Stock.objects.get(product=first).quantity == 10
+        assert Stock.objects.get(product=second).quantity == 1
+
+    def test_allow_negative(self, create_product, create_warehouse):
+        """Test offline sales may drive stock negative"""
+        product, warehouse = create_product(), create_warehouse()
+
+        sell_offline = StockService.apply_movements(
+            [(product.pk, warehouse.pk, StockMovement.TYPE_SALE, -2)],
+            allow_negative=True,
+        )
+
+        assert len(sell_offline) == 1
+        assert Stock.objects.get(product=product).quantity == -2
+
+    def test_wrong_sign_rejected(self, create_product, create_warehouse):
+        """Test a sale with a positive quantity is invalid"""
+        product, warehouse = create_product(), create_warehouse()
+
+        with pytest.raises(InvalidOperationError):
+            StockService.apply_movements([(product.pk, warehouse.pk, StockMovement.TYPE_SALE, 2)])
+
+    def test_transfer(self, create_product, create_warehouse):
+        """Test a transfer moves stock between warehouses"""
+        product = create_product()
+        source, target = create_warehouse(), create_warehouse()
+        receive(product, source, 10)
+
+        StockService.transfer(product.pk, source.pk, target.pk, 4, reference='TR-1')
+
+        assert Stock.objects.get(product=product, warehouse=source).quantity == 6
+        assert Stock.objects.get(product=product, warehouse=target).quantity == 4
+
+    def test_ledger_is_append_only(self, create_product, create_warehouse):
+        """Test ledger rows cannot be changed or removed"""
+        product, warehouse = create_product(), create_warehouse()
+        movement = receive(product, warehouse, 5)[0]
+        movement = StockMovement.objects.get(pk=movement.pk)
+
+        with pytest.raises(InvalidOperationError):
+            movement.save()
+        with pytest.raises(InvalidOperationError):
+            movement.delete()
+        with pytest.raises(InvalidOperationError):
+            StockMovement.objects.filter(pk=movement.pk).update(quantity=1)
+
+
+@pytest.mark.django_db
+class TestSnapshots:
+    """Test snapshot compaction and snapshot + delta reads"""
+
+    def test_compact_and_read(self, create_product, create_warehouse):
+        """Test compaction rolls movements into snapshots"""
+        product, warehouse = create_product(), create_warehouse()
+        receive(product, warehouse, 10)
+        sell(product, warehouse, 3)
+
+        assert StockLedgerService.compact(settle_seconds=0) == 1
+        snapshot = StockSnapshot.objects.get()
+        assert snapshot.quantity == 7
+
+        sell(product, warehouse, 2)
+        assert StockLedgerService.quantity_at(product.pk, warehouse.pk) == 5
+
+        receive(product, warehouse, 4)
+        assert StockLedgerService.compact(settle_seconds=0) == 1
+        latest = StockSnapshot.objects.order_by('-last_movement_id').first()
+        assert latest.quantity == 9
+        assert StockLedgerService.quantity_at(product.pk, warehouse.pk) == 9
+
+    def test_compact_skips_unsettled(self, create_product, create_warehouse):
+        """Test recent movements wait for the settle window"""
+        product, warehouse = create_product(), create_warehouse()
+        receive(product, warehouse, 10)
+
+        assert StockLedgerService.compact(settle_seconds=3600) == 0
+
+    def test_point_in_time(self, create_product, create_warehouse):
+        """Test reading stock as of an earlier time"""
+        product, warehouse = create_product(), create_warehouse()
+        receive(product, warehouse, 10)
+        StockLedgerService.compact(settle_seconds=0)
+        checkpoint = timezone.now()
+        sell(product, warehouse, 4)
+
+        assert StockLedgerService.quantity_at(product.pk, warehouse.pk, at=checkpoint) == 10
+        assert StockLedgerService.quantity_at(product.pk, warehouse.pk, at=timezone.now()) == 6
+        assert StockLedgerService.quantity_at(
+            product.pk, warehouse.pk, at=checkpoint - timedelta(days=1)
+        ) == 0
+
+    def test_verify_consistent(self, create_product, create_warehouse):
+        """Test the checker passes when ledger, snapshots and stock agree"""
+        product, warehouse = create_product(), create_warehouse()
+        receive(product, warehouse, 10)
+        StockLedgerService.compact(settle_seconds=0)
+        sell(product, warehouse, 1)
+
+        assert StockLedgerService.verify() == []
+
+    def test_verify_detects_drift(self, create_product, create_warehouse):
+        """Test the checker flags stock and snapshots that drifted"""
+        product, warehouse = create_product(), create_warehouse()
+        receive(product, warehouse, 10)
+        StockLedgerService.compact(settle_seconds=0)
+        Stock.objects.filter(product=product).update(quantity=99)
+        StockSnapshot.objects.update(quantity=42)
+
+        kinds = sorted(mismatch['kind'] for mismatch in StockLedgerService.verify())
+        assert kinds == ['snapshot', 'stock']
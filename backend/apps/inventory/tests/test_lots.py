@@ -0,0 +1,170 @@
+from datetime import timedelta
+
+import pytest
+from django.db.models import Sum
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from apps.inventory.models import (
+    PurchaseOrder, PurchaseOrderItem, StockLot, StockLotAllocation, StockMovement, Supplier,
+)
+from apps.inventory.services import (
+    PurchaseOrderService, StockLotService, StockReservationService, StockService,
+)
+from apps.inventory.signals import lots_near_expiry
+from apps.inventory.tasks import sweep_expiring_lots
+from core.exceptions import InsufficientStockError
+
+
+def in_days(days):
+    """Return the date ``days`` from today"""
+    return timezone.localdate() + timedelta(days=days)
+
+
+@pytest.fixture
+def lots(create_product, create_warehouse):
+    """A product with three lots received out of expiry order"""
+    product, warehouse = create_product(), create_warehouse()
+    StockLotService.receive_lots([
+        (product.pk, warehouse.pk, 'LATE', in_days(30), 5),
+        (product.pk, warehouse.pk, 'SOON', in_days(2), 3),
+        (product.pk, warehouse.pk, 'NONE', None, 10),
+        (product.pk, warehouse.pk, 'MID', in_days(10), 4),
+    ])
+    return product, warehouse
+
+
+def remaining(product):
+    """Map lot numbers to units left"""
+    return dict(StockLot.objects.filter(stock__product=product).values_list('lot_number', 'quantity'))
+
+
+@pytest.mark.django_db
+class TestAllocate:
+    """Test first-expiry-first-out allocation"""
+
+    def test_earliest_expiry_first(self, lots):
+        """Test allocation drains lots in expiry order, undated lots last"""
+        product, warehouse = lots
+
+        allocations = StockLotService.allocate([(product.pk, warehouse.pk, 9)], reference='SALE-1')
+
+        assert remaining(product) == {'SOON': 0, 'MID': 0, 'LATE': 3, 'NONE': 10}
+        assert sorted(allocation.quantity for allocation in allocations) == [2, 3, 4]
+        assert {allocation.reference for allocation in allocations} == {'SALE-1'}
+
+    def test_receiving_into_existing_lot(self, lots):
+        """Test receiving a known lot number tops it up"""
+        product, warehouse = lots
+
+        created = StockLotService.receive_lots([(product.pk, warehouse.pk, 'SOON', in_days(2), 2)])
+
+        assert created == 0
+        lot = StockLot.objects.get(lot_number='SOON')
+        assert (lot.quantity, lot.received_quantity) == (5, 5)
+
+    def test_shortfall(self, lots):
+        """Test lenient allocation takes what lots cover, strict raises"""
+        product, warehouse = lots
+
+        with pytest.raises(InsufficientStockError):
+            StockLotService.allocate([(product.pk, warehouse.pk, 50)], strict=True)
+        assert remaining(product)['SOON'] == 3
+
+        StockLotService.allocate([(product.pk, warehouse.pk, 50)])
+        assert set(remaining(product).values()) == {0}
+
+    def test_untracked_stock(self, create_product, create_warehouse):
+        """Test products without lots allocate nothing"""
+        product, warehouse = create_product(), create_warehouse()
+
+        assert StockLotService.allocate([(product.pk, warehouse.pk, 1)]) == []
+
+    def test_reservation_commit_allocates(self, lots):
+        """Test committing a reservation consumes lots"""
+        product, warehouse = lots
+        StockService.apply_movements([(product.pk, warehouse.pk, StockMovement.TYPE_RECEIPT, 22)])
+        reservation = StockReservationService.reserve([(product.pk, warehouse.pk, 4)], reference='ORD-1')
+
+        StockReservationService.commit(reservation)
+
+        assert remaining(product)['SOON'] == 0
+        assert remaining(product)['MID'] == 3
+        assert StockLotAllocation.objects.filter(reference='ORD-1').count() == 2
+
+    def test_purchase_order_receipt_creates_lots(self, create_product, create_warehouse):
+        """Test receiving a purchase order line with a lot records the lot"""
+        product = create_product()
+        order = PurchaseOrder.objects.create(
+            po_number='PO-LOT-1',
+            supplier=Supplier.objects.create(name='Dairy Co', code='DAIRY'),
+            warehouse=create_warehouse(),
+            status=PurchaseOrder.STATUS_ORDERED,
+        )
+        PurchaseOrderItem.objects.create(purchase_order=order, product=product, quantity_ordered=6, unit_cost=1)
+
+        PurchaseOrderService.receive([(order.pk, product.pk, 6, 'B-77', in_days(5))])
+
+        lot = StockLot.objects.get()
+        assert (lot.lot_number, lot.expiry_date, lot.quantity) == ('B-77', in_days(5), 6)
+
+
+@pytest.mark.django_db
+class TestRestore:
+    """Test putting allocated units back on their lots"""
+
+    def test_per_line_references(self, lots):
+        """Test lines with their own references draw on the lots in turn"""
+        product, warehouse = lots
+
+        StockLotService.allocate([(product.pk, warehouse.pk, 4, 'SALE-1'), (product.pk, warehouse.pk, 2, 'SALE-2')])
+
+        taken = StockLotAllocation.objects.values_list('reference', 'lot__lot_number', 'quantity')
+        assert sorted(taken) == [('SALE-1', 'MID', 1), ('SALE-1', 'SOON', 3), ('SALE-2', 'MID', 2)]
+
+    def test_restore(self, lots):
+        """Test restoring a reference returns its units once, leaving other references drawn"""
+        product, warehouse = lots
+        StockLotService.allocate([(product.pk, warehouse.pk, 4, 'SALE-1'), (product.pk, warehouse.pk, 2, 'SALE-2')])
+
+        assert StockLotService.restore(['SALE-1']) == 4
+        assert StockLotService.restore(['SALE-1']) == 0
+
+        assert remaining(product) == {'SOON': 3, 'MID': 2, 'LATE': 5, 'NONE': 10}
+        assert StockLotAllocation.objects.filter(reference='SALE-1').aggregate(total=Sum('quantity'))['total'] == 0
+
+
+@pytest.mark.django_db
+class TestNearExpiry:
+    """Test the near-expiry sweep and report"""
+
+    def test_sweep(self, lots):
+        """Test the sweep announces lots inside the window only"""
+        product, warehouse = lots
+        StockLotService.receive_lots([(product.pk, warehouse.pk, 'GONE', in_days(-1), 1)])
+        received = []
+
+        def receiver(sender, lots, **kwargs):
+            received.extend(lot.lot_number for lot in lots)
+
+        lots_near_expiry.connect(receiver)
+        try:
+            assert sweep_expiring_lots() == 2
+        finally:
+            lots_near_expiry.disconnect(receiver)
+        assert received == ['GONE', 'SOON']
+
+    def test_sold_out_lots_are_skipped(self, lots):
+        """Test lots with nothing left are not reported"""
+        product, warehouse = lots
+        StockLotService.allocate([(product.pk, warehouse.pk, 3)])
+
+        assert not StockLotService.near_expiry(days=3).exists()
+
+    def test_report(self, manager_client, lots):
+        """Test the report lists lots expiring within the requested days"""
+        response = manager_client.get(reverse('reports:near-expiry'), {'days': 10})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['lot_number'] for row in response.data['results']] == ['SOON', 'MID']
@@ -0,0 +1,112 @@
+import pytest
+
+from apps.inventory.models import Stock, StockAlert, StockMovement
+from apps.inventory.services import StockService
+from apps.inventory.signals import stock_availability_changed, stock_threshold_crossed
+
+
+def sell(stock, quantity):
+    """Record a sale against a stock row"""
+    StockService.apply_movements(
+        [(stock.product_id, stock.warehouse_id, StockMovement.TYPE_SALE, -quantity)]
+    )
+
+
+def receive(stock, quantity):
+    """Record a receipt against a stock row"""
+    StockService.apply_movements(
+        [(stock.product_id, stock.warehouse_id, StockMovement.TYPE_RECEIPT, quantity)]
+    )
+
+
+@pytest.fixture
+def crossings():
+    """Collect alerts broadcast through stock_threshold_crossed"""
+    received = []
+
+    def receiver(sender, alerts, **kwargs):
+        received.extend(alerts)
+
+    stock_threshold_crossed.connect(receiver)
+    yield received
+    stock_threshold_crossed.disconnect(receiver)
+
+
+@pytest.mark.django_db
+class TestLowStockIndex:
+    """Test incremental low-stock tracking"""
+
+    def test_flag_set_when_crossing_down(self, create_stock, crossings, django_capture_on_commit_callbacks):
+        """Test dropping to the reorder level flags the row once"""
+        stock = create_stock(quantity=12, reorder_level=10)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            sell(stock, 1)
+            sell(stock, 1)
+            sell(stock, 1)
+
+        stock.refresh_from_db()
+        assert stock.is_low_stock
+        assert [alert.kind for alert in crossings] == [StockAlert.KIND_LOW]
+        assert StockAlert.objects.count() == 1
+
+    def test_flag_cleared_on_restock(self, create_stock, crossings, django_capture_on_commit_callbacks):
+        """Test a receipt above the reorder level clears the flag"""
+        stock = create_stock(quantity=11, reorder_level=10)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            sell(stock, 5)
+            receive(stock, 20)
+            receive(stock, 5)
+
+        stock.refresh_from_db()
+        assert not stock.is_low_stock
+        assert [alert.kind for alert in crossings] == [StockAlert.KIND_LOW, StockAlert.KIND_RESTORED]
+
+    def test_failing_receiver_is_contained(self, create_stock, crossings, django_capture_on_commit_callbacks):
+        """Test a failing availability receiver neither reaches the seller nor stops the alert broadcast"""
+        stock = create_stock(quantity=11, reorder_level=10)
+
+        def broken(sender, **kwargs):
+            raise ConnectionError('Receiver unreachable')
+
+        stock_availability_changed.connect(broken)
+        try:
+            with django_capture_on_commit_callbacks(execute=True):
+                sell(stock, 11)
+        finally:
+            stock_availability_changed.disconnect(broken)
+
+        stock.refresh_from_db()
+        assert stock.quantity == 0
+        assert [alert.kind for alert in crossings] == [StockAlert.KIND_LOW]
+
+    def test_zero_reorder_level_disables_alerts(self, create_stock):
+        """Test rows without a reorder level never alert"""
+        stock = create_stock(quantity=3)
+
+        sell(stock, 3)
+
+        stock.refresh_from_db()
+        assert not stock.is_low_stock
+        assert not StockAlert.objects.exists()
+
+    def test_set_reorder_level(self, create_stock):
+        """Test raising the reorder level re-evaluates the flag"""
+        stock = create_stock(quantity=5)
+
+        alerts = StockService.set_reorder_level(stock.pk, 8)
+
+        assert [alert.kind for alert in alerts] == [StockAlert.KIND_LOW]
+        assert Stock.objects.get(pk=stock.pk).is_low_stock
+
+    def test_rebuild_thresholds(self, create_stock):
+        """Test the backfill flags rows without emitting alerts"""
+        low = create_stock(quantity=2, reorder_level=5)
+        fine = create_stock(quantity=9, reorder_level=5, is_low_stock=True)
+
+        assert StockService.rebuild_thresholds() == 2
+
+        assert Stock.objects.get(pk=low.pk).is_low_stock
+        assert not Stock.objects.get(pk=fine.pk).is_low_stock
+        assert not StockAlert.objects.exists()
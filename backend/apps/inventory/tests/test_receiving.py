@@ -0,0 +1,127 @@
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from apps.inventory.models import PurchaseOrder, PurchaseOrderItem, Stock, StockMovement, Supplier
+from apps.inventory.services import PurchaseOrderService, StockService
+from core.exceptions import InvalidOperationError
+
+
+@pytest.fixture
+def create_order(db, create_warehouse):
+    """Factory to create an ordered purchase order with ``(product, quantity, unit_cost)`` lines"""
+    supplier = Supplier.objects.create(name='Acme', code='ACME')
+
+    def make_order(lines, warehouse=None, status=PurchaseOrder.STATUS_ORDERED):
+        order = PurchaseOrder.objects.create(
+            po_number=PurchaseOrderService.generate_po_number(),
+            supplier=supplier,
+            warehouse=warehouse or create_warehouse(),
+            status=status,
+        )
+        PurchaseOrderItem.objects.bulk_create([
+            PurchaseOrderItem(purchase_order=order, product=product, quantity_ordered=quantity, unit_cost=unit_cost)
+            for product, quantity, unit_cost in lines
+        ])
+        return order
+    return make_order
+
+
+@pytest.mark.django_db
+class TestReceive:
+    """Test batch purchase-order receiving"""
+
+    def test_receives_many_orders(self, create_order, create_product):
+        """Test one call receives lines of several orders, partially or fully"""
+        milk, bread = create_product(), create_product()
+        first = create_order([(milk, 10, '5.00'), (bread, 4, '2.00')])
+        second = create_order([(milk, 6, '5.00')])
+
+        orders = PurchaseOrderService.receive([
+            (first.pk, milk.pk, 10),
+            (first.pk, bread.pk, 1),
+            (second.pk, milk.pk, 6),
+        ])
+
+        statuses = {order.pk: order.status for order in orders}
+        assert statuses == {
+            first.pk: PurchaseOrder.STATUS_PARTIALLY_RECEIVED,
+            second.pk: PurchaseOrder.STATUS_RECEIVED,
+        }
+        assert PurchaseOrder.objects.get(pk=second.pk).status == PurchaseOrder.STATUS_RECEIVED
+        assert Stock.objects.get(product=milk, warehouse=first.warehouse).quantity == 10
+        assert Stock.objects.get(product=milk, warehouse=second.warehouse).quantity == 6
+        assert PurchaseOrderItem.objects.get(purchase_order=first, product=bread).quantity_received == 1
+        assert set(StockMovement.objects.values_list('reference', flat=True)) == {
+            first.po_number, second.po_number,
+        }
+
+    def test_weighted_average_cost(self, create_order, create_product, create_warehouse):
+        """Test cost price averages stock on hand with the delivery"""
+        product = create_product(cost_price='4.00')
+        warehouse = create_warehouse()
+        StockService.apply_movements([(product.pk, warehouse.pk, StockMovement.TYPE_RECEIPT, 10)])
+        first = create_order([(product, 5, '7.00')])
+        second = create_order([(product, 5, '10.00')])
+
+        PurchaseOrderService.receive([(first.pk, product.pk, 5), (second.pk, product.pk, 5)])
+
+        product.refresh_from_db()
+        assert product.cost_price == Decimal('6.25')
+
+    def test_rejects_over_receipt(self, create_order, create_product):
+        """Test receiving more than outstanding rolls back the delivery"""
+        milk, bread = create_product(), create_product()
+        order = create_order([(milk, 10, '5.00'), (bread, 2, '2.00')])
+
+        with pytest.raises(InvalidOperationError):
+            PurchaseOrderService.receive([(order.pk, milk.pk, 10), (order.pk, bread.pk, 3)])
+
+        assert not Stock.objects.exists()
+        assert PurchaseOrderItem.objects.get(product=milk).quantity_received == 0
+
+    def test_rejects_unreceivable_orders(self, create_order, create_product):
+        """Test drafts and products missing from the order are rejected"""
+        product, other = create_product(), create_product()
+        draft = create_order([(product, 1, '1.00')], status=PurchaseOrder.STATUS_DRAFT)
+        ordered = create_order([(product, 1, '1.00')])
+
+        with pytest.raises(InvalidOperationError):
+            PurchaseOrderService.receive([(draft.pk, product.pk, 1)])
+        with pytest.raises(InvalidOperationError):
+            PurchaseOrderService.receive([(ordered.pk, other.pk, 1)])
+
+
+@pytest.mark.django_db
+class TestReceiveAPI:
+    """Test the receiving endpoint"""
+
+    def test_receive(self, manager_client, create_order, create_product):
+        """Test a delivery is received through the API"""
+        product = create_product()
+        order = create_order([(product, 3, '1.50')])
+
+        response = manager_client.post(
+            reverse('inventory:purchase-order-receive'),
+            {'lines': [{'purchase_order': str(order.pk), 'product': str(product.pk), 'quantity': 3}]},
+            format='json',
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[0]['status'] == PurchaseOrder.STATUS_RECEIVED
+
+    def test_invalid_line(self, manager_client, create_order, create_product):
+        """Test an over-receipt returns a 400 with the reason"""
+        product = create_product()
+        order = create_order([(product, 3, '1.50')])
+
+        response = manager_client.post(
+            reverse('inventory:purchase-order-receive'),
+            {'lines': [{'purchase_order': str(order.pk), 'product': str(product.pk), 'quantity': 4}]},
+            format='json',
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'outstanding' in response.data['message']
@@ -0,0 +1,184 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.inventory.models import Stock, StockMovement, StockReservation
+from apps.inventory.services import StockReservationService
+from apps.inventory.signals import stock_availability_changed
+from apps.inventory.tasks import expire_stock_reservations
+from core.exceptions import InsufficientStockError, InvalidOperationError, OutOfStockError
+
+
+def line(stock, quantity):
+    """Build a reservation line for a stock row"""
+    return (stock.product_id, stock.warehouse_id, quantity)
+
+
+@pytest.mark.django_db
+class TestReserve:
+    """Test stock reservation"""
+
+    def test_reserve_holds_quantity(self, create_stock):
+        """Test reserving increments reserved quantity only"""
+        stock = create_stock(quantity=10)
+        reservation = StockReservationService.reserve([line(stock, 3)], reference='order-1')
+
+        stock.refresh_from_db()
+        assert stock.quantity == 10
+        assert stock.reserved_quantity == 3
+        assert reservation.status == StockReservation.STATUS_ACTIVE
+        assert reservation.items.get().quantity == 3
+
+    def test_duplicate_lines_are_merged(self, create_stock):
+        """Test repeated product lines become one reserved item"""
+        stock = create_stock(quantity=10)
+        reservation = StockReservationService.reserve([line(stock, 2), line(stock, 4)])
+
+        assert reservation.items.count() == 1
+        stock.refresh_from_db()
+        assert stock.reserved_quantity == 6
+
+    def test_insufficient_stock(self, create_stock):
+        """Test reserving more than available is rejected"""
+        stock = create_stock(quantity=5, reserved_quantity=3)
+
+        with pytest.raises(InsufficientStockError):
+            StockReservationService.reserve([line(stock, 3)])
+
+        stock.refresh_from_db()
+        assert stock.reserved_quantity == 3
+
+    def test_out_of_stock(self, create_stock):
+        """Test reserving a fully reserved product"""
+        stock = create_stock(quantity=2, reserved_quantity=2)
+
+        with pytest.raises(OutOfStockError):
+            StockReservationService.reserve([line(stock, 1)])
+
+    def test_unstocked_product(self, create_product, create_warehouse):
+        """Test reserving a product without a stock row"""
+        product, warehouse = create_product(), create_warehouse()
+
+        with pytest.raises(OutOfStockError):
+            StockReservationService.reserve([(product.pk, warehouse.pk, 1)])
+
+    def test_all_or_nothing(self, create_stock):
+        """Test a failing line rolls back the lines before it"""
+        plenty = create_stock(quantity=100)
+        scarce = create_stock(quantity=1)
+
+        with pytest.raises(InsufficientStockError):
+            StockReservationService.reserve([line(plenty, 5), line(scarce, 2)])
+
+        assert Stock.objects.get(pk=plenty.pk).reserved_quantity == 0
+        assert Stock.objects.get(pk=scarce.pk).reserved_quantity == 0
+        assert not StockReservation.objects.exists()
+
+    def test_rejects_non_positive_quantity(self, create_stock):
+        """Test zero quantity lines are invalid"""
+        stock = create_stock()
+
+        with pytest.raises(InvalidOperationError):
+            StockReservationService.reserve([line(stock, 0)])
+
+
+@pytest.mark.django_db
+class TestCommitAndRelease:
+    """Test finishing reservations"""
+
+    def test_commit_deducts_stock(self, create_stock):
+        """Test commit moves reserved quantity out of on-hand stock"""
+        stock = create_stock(quantity=10)
+        reservation = StockReservationService.reserve([line(stock, 4)])
+
+        StockReservationService.commit(reservation)
+
+        stock.refresh_from_db()
+        assert stock.quantity == 6
+        assert stock.reserved_quantity == 0
+        assert reservation.status == StockReservation.STATUS_COMMITTED
+        movement = StockMovement.objects.get()
+        assert movement.movement_type == StockMovement.TYPE_SALE
+        assert movement.quantity == -4
+
+    def test_release_returns_reserved(self, create_stock):
+        """Test release leaves on-hand stock untouched"""
+        stock = create_stock(quantity=10)
+        reservation = StockReservationService.reserve([line(stock, 4)])
+
+        StockReservationService.release(reservation)
+
+        stock.refresh_from_db()
+        assert stock.quantity == 10
+        assert stock.reserved_quantity == 0
+
+    def test_cannot_commit_twice(self, create_stock):
+        """Test a reservation is only finished once"""
+        stock = create_stock(quantity=10)
+        reservation = StockReservationService.reserve([line(stock, 4)])
+        StockReservationService.commit(reservation)
+
+        with pytest.raises(InvalidOperationError):
+            StockReservationService.release(reservation)
+
+        stock.refresh_from_db()
+        assert stock.quantity == 6
+        assert stock.reserved_quantity == 0
+
+
+@pytest.mark.django_db
+class TestExpiry:
+    """Test reservation TTL expiry"""
+
+    def test_expire_stale(self, create_stock):
+        """Test only lapsed reservations are expired"""
+        stock = create_stock(quantity=10)
+        stale = StockReservationService.reserve([line(stock, 2)], ttl=60)
+        StockReservationService.reserve([line(stock, 3)], ttl=600)
+
+        expired = StockReservationService.expire_stale(now=timezone.now() + timedelta(seconds=120))
+
+        assert expired == 1
+        stale.refresh_from_db()
+        assert stale.status == StockReservation.STATUS_EXPIRED
+        stock.refresh_from_db()
+        assert stock.reserved_quantity == 3
+
+    def test_expired_reservation_cannot_commit(self, create_stock):
+        """Test committing after expiry fails"""
+        stock = create_stock(quantity=10)
+        reservation = StockReservationService.reserve([line(stock, 2)], ttl=0)
+        expire_stock_reservations()
+
+        with pytest.raises(InvalidOperationError):
+            StockReservationService.commit(reservation)
+
+
+@pytest.mark.django_db
+def test_availability_signals(create_stock, django_capture_on_commit_callbacks):
+    """Test reserving the last units and getting them back both report the availability change"""
+    stock = create_stock(quantity=3)
+    received = []
+
+    def record(sender, changes, **kwargs):
+        received.extend((change['available'], change['out_of_stock']) for change in changes)
+
+    stock_availability_changed.connect(record)
+    try:
+        with django_capture_on_commit_callbacks(execute=True):
+            first = StockReservationService.reserve([line(stock, 1)])
+        with django_capture_on_commit_callbacks(execute=True):
+            last = StockReservationService.reserve([line(stock, 2)])
+        with django_capture_on_commit_callbacks(execute=True):
+            StockReservationService.release(last)
+        with django_capture_on_commit_callbacks(execute=True):
+            StockReservationService.reserve([line(stock, 2)], ttl=0)
+        with django_capture_on_commit_callbacks(execute=True):
+            StockReservationService.expire_stale()
+        with django_capture_on_commit_callbacks(execute=True):
+            StockReservationService.release(first)
+    finally:
+        stock_availability_changed.disconnect(record)
+
+    assert received == [(0, True), (2, False), (0, True), (2, False)]
@@ -0,0 +1,14 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import CycleCountViewSet, PurchaseOrderReceiveView
+
+app_name = 'inventory'
+
+# Router for viewsets
+router = DefaultRouter()
+router.register(r'cycle-counts', CycleCountViewSet, basename='cycle-count')
+
+urlpatterns = [
+    path('purchase-orders/receive/', PurchaseOrderReceiveView.as_view(), name='purchase-order-receive'),
+    path('', include(router.urls)),
+]
@@ -0,0 +1,145 @@
+from django.db.models import Count, Q, Sum
+from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
+from rest_framework import mixins, status, views, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.response import Response
+
+from core.pagination import StandardResultsSetPagination
+from core.permissions import IsAdminOrManager
+from .models import CycleCount
+from .serializers import (
+    CycleCountLineSerializer,
+    CycleCountSerializer,
+    CycleCountUploadSerializer,
+    PurchaseOrderReceiveSerializer,
+    PurchaseOrderStatusSerializer,
+    ShrinkageSerializer,
+)
+from .services import CycleCountService, PurchaseOrderService
+
+
+@extend_schema_view(
+    list=extend_schema(description='List cycle counts (Admin/Manager only)'),
+    retrieve=extend_schema(description='Get a cycle count with its variance totals'),
+)
+class CycleCountViewSet(mixins.CreateModelMixin,
+                        mixins.ListModelMixin,
+                        mixins.RetrieveModelMixin,
+                        viewsets.GenericViewSet):
+    """
+    ViewSet for cycle counts.
+
+    A count file is uploaded in one request; variances against system stock
+    are computed on upload and posted as adjustments on request.
+    """
+    serializer_class = CycleCountSerializer
+    permission_classes = [IsAdminOrManager]
+    pagination_class = StandardResultsSetPagination
+    filterset_fields = ['warehouse', 'status']
+    ordering = ['-created_at']
+
+    def get_queryset(self):
+        """Return counts annotated with their line and variance totals"""
+        return (
+            CycleCount.objects
+            .select_related('warehouse')
+            .annotate(
+                line_count=Count('lines'),
+                variance_count=Count('lines', filter=~Q(lines__variance=0)),
+                net_variance=Sum('lines__variance'),
+            )
+        )
+
+    parser_classes = [MultiPartParser, FormParser, JSONParser]
+
+    @extend_schema(
+        description='Upload a count file and compute variances',
+        request=CycleCountUploadSerializer,
+        responses={201: CycleCountSerializer}
+    )
+    def create(self, request, *args, **kwargs):
+        """Store the uploaded count and report unknown codes"""
+        serializer = CycleCountUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        counts = CycleCountService.read_count_file(serializer.validated_data['file'])
+        cycle_count, unknown = CycleCountService.upload(
+            serializer.validated_data['warehouse'],
+            counts,
+            serializer.validated_data['reference'],
+            user=request.user,
+        )
+        data = CycleCountSerializer(self.get_queryset().get(pk=cycle_count.pk)).data
+        data['unknown_codes'] = unknown
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        description='Post variances as stock adjustments',
+        request=None,
+        responses={200: CycleCountSerializer}
+    )
+    @action(detail=True, methods=['post'], url_path='post')
+    def post_adjustments(self, request, pk=None):
+        """Post the count's non-zero variances"""
+        adjustments = CycleCountService.post(self.get_object(), user=request.user)
+        data = CycleCountSerializer(self.get_object()).data
+        data['adjustments'] = adjustments
+        return Response(data)
+
+    @extend_schema(
+        description='Counted lines, optionally only those with a variance',
+        parameters=[OpenApiParameter('variance_only', bool)],
+        responses={200: CycleCountLineSerializer(many=True)}
+    )
+    @action(detail=True, methods=['get'])
+    def lines(self, request, pk=None):
+        """List counted lines, largest shortage first"""
+        queryset = self.get_object().lines.select_related('product').order_by('variance', 'product__sku')
+        if request.query_params.get('variance_only') in ('1', 'true', 'True'):
+            queryset = queryset.exclude(variance=0)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(CycleCountLineSerializer(page, many=True).data)
+
+    @extend_schema(
+        description='Shrinkage per product category',
+        responses={200: ShrinkageSerializer(many=True)}
+    )
+    @action(detail=True, methods=['get'])
+    def shrinkage(self, request, pk=None):
+        """Report variance per category at cost price"""
+        rows = CycleCountService.shrinkage(self.get_object())
+        return Response(ShrinkageSerializer(rows, many=True).data)
+
+
+class PurchaseOrderReceiveView(views.APIView):
+    """
+    Receive a delivery that covers lines of several purchase orders.
+
+    Accepts partial quantities; every line is applied in one transaction
+    and the call fails as a whole if any line is invalid.
+    """
+    permission_classes = [IsAdminOrManager]
+
+    @extend_schema(
+        description='Receive many purchase-order lines at once',
+        request=PurchaseOrderReceiveSerializer,
+        responses={200: PurchaseOrderStatusSerializer(many=True)}
+    )
+    def post(self, request):
+        """Apply received quantities and return the orders' new status"""
+        serializer = PurchaseOrderReceiveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        orders = PurchaseOrderService.receive(
+            [
+                (
+                    line['purchase_order'],
+                    line['product'],
+                    line['quantity'],
+                    line.get('lot_number', ''),
+                    line.get('expiry_date'),
+                )
+                for line in serializer.validated_data['lines']
+            ],
+            user=request.user,
+        )
+        return Response(PurchaseOrderStatusSerializer(orders, many=True).data)
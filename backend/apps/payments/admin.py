@@ -0,0 +1,25 @@
+"""
+Admin configuration for payments app.
+"""
+
+from django.contrib import admin
+from .models import GatewayEvent, Payment
+
+
+@admin.register(Payment)
+class PaymentAdmin(admin.ModelAdmin):
+    """Admin for Payment model."""
+    list_display = ('order', 'gateway', 'amount', 'status', 'created_at')
+    list_filter = ('gateway', 'status')
+    search_fields = ('order__order_number', 'gateway_reference')
+    raw_id_fields = ('order',)
+
+
+@admin.register(GatewayEvent)
+class GatewayEventAdmin(admin.ModelAdmin):
+    """Admin for gateway callbacks and how they were applied."""
+    list_display = ('gateway', 'event_id', 'reference', 'payment_status', 'status', 'attempts', 'received_at')
+    list_filter = ('gateway', 'status', 'payment_status')
+    search_fields = ('event_id', 'reference')
+    raw_id_fields = ('payment',)
+    readonly_fields = ('payload',)
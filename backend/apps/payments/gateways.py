@@ -0,0 +1,117 @@
+"""
+Payment gateway adapters.
+
+PAYMENT_GATEWAYS maps each payment method offered at checkout to an adapter
+class. An adapter starts a payment and returns the gateway's reference and,
+for online gateways, the URL the customer completes the payment at.
+Adapters raise PaymentFailedError when the gateway declines, and let
+connection errors propagate so the checkout stage retries.
+
+Online gateways also report payments back through callbacks. An adapter
+checks a callback's signature and reads the event out of it; callbacks are
+signed with the gateway's secret from PAYMENT_WEBHOOK_SECRETS.
+"""
+
+import hashlib
+import hmac
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from core.exceptions import InvalidCallbackError
+
+
+class PaymentGateway:
+    """
+    Base adapter.
+    """
+    #: Money is collected on delivery, so the order is confirmed right away
+    collects_on_delivery = False
+
+    def __init__(self, name):
+        self.name = name
+
+    def initiate(self, payment):
+        """Start ``payment``; returns ``{'reference': ..., 'redirect_url': ...}``."""
+        raise NotImplementedError
+
+    def sign(self, body):
+        """HMAC-SHA256 signature of a callback body with the gateway's secret."""
+        secret = settings.PAYMENT_WEBHOOK_SECRETS.get(self.name)
+        if not secret:
+            raise InvalidCallbackError(f'No callback secret configured for {self.name}.', status_code=404)
+        return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+    def verify(self, body, signature):
+        """
+        Raises:
+            InvalidCallbackError: ``signature`` is not the body's signature
+        """
+        if not hmac.compare_digest(self.sign(body), signature or ''):
+            raise InvalidCallbackError('Invalid callback signature.', status_code=403)
+
+    def parse_callback(self, body, headers):
+        """
+        Check a callback and read its event.
+
+        Returns:
+            Dict of ``event_id``, ``reference`` (the gateway's payment id),
+            ``status`` (``completed``, ``failed`` or ``pending``) and ``amount``
+
+        Raises:
+            InvalidCallbackError: The gateway sends no callbacks, or the
+                callback is unsigned or malformed
+        """
+        raise InvalidCallbackError(f'{self.name} does not send callbacks.', status_code=404)
+
+
+class CashOnDeliveryGateway(PaymentGateway):
+    """
+    Cash collected by the rider; nothing to call.
+    """
+    collects_on_delivery = True
+
+    def initiate(self, payment):
+        return {'reference': '', 'redirect_url': ''}
+
+
+class SimulatedGateway(PaymentGateway):
+    """
+    Local stand-in for an online gateway, for development and tests.
+    """
+
+    def initiate(self, payment):
+        return {
+            'reference': f'SIM-{payment.idempotency_key}',
+            'redirect_url': f'{settings.PAYMENT_SIMULATOR_URL}/{self.name}/{payment.pk}/',
+        }
+
+    def callback(self, event_id, reference, status, amount):
+        """Signed body of a callback as the simulator sends it; returns the body and headers."""
+        body = json.dumps({
+            'event_id': event_id, 'reference': reference, 'status': status, 'amount': str(amount),
+        }).encode()
+        return body, {'X-Signature': self.sign(body)}
+
+    def parse_callback(self, body, headers):
+        self.verify(body, headers.get('X-Signature'))
+        try:
+            event = json.loads(body)
+            parsed = {
+                'event_id': str(event['event_id']),
+                'reference': str(event['reference']),
+                'status': event['status'],
+                'amount': Decimal(event['amount']),
+            }
+        except (ValueError, KeyError, TypeError, InvalidOperation):
+            raise InvalidCallbackError('Malformed callback.')
+        if parsed['status'] not in ('completed', 'failed', 'pending'):
+            raise InvalidCallbackError(f"Unknown payment status {parsed['status']!r}.")
+        return parsed
+
+
+def get_gateway(name):
+    """Return the adapter for a payment method."""
+    return import_string(settings.PAYMENT_GATEWAYS[name])(name)
@@ -0,0 +1,181 @@
+"""
+Local gateway simulator replaying bursts of payment callbacks.
+
+The command checks out scratch orders paid through a simulated gateway,
+then plays the gateway: for every payment it sends a ``pending`` and a
+final ``completed`` (or ``failed``) callback, each repeated as gateways
+retry, shuffled and posted from several threads at once. It reports how
+fast callbacks are acknowledged and how many repeats were recognised.
+
+Without ``--url`` the callbacks go through the Django test client and the
+processing tasks are held in memory, so acknowledgement is timed on its
+own; the held tasks are then drained and timed as a worker would run
+them, and the command checks every payment was settled exactly once. With
+``--url`` the callbacks are posted to a running server instead and its
+workers do the processing. Run it against a scratch database.
+"""
+
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from apps.accounts.models import User
+from apps.ecommerce import tasks as order_tasks
+from apps.ecommerce.models import Order
+from apps.ecommerce.services import CartService, OrderService
+from apps.inventory.models import Stock, Warehouse
+from apps.inventory.services import StockSummaryService
+from apps.payments import tasks, webhooks
+from apps.payments.gateways import get_gateway
+from apps.payments.models import GatewayEvent, Payment
+from apps.products.models import Product
+from core.benchmark import format_summary, latency_summary, timed
+
+
+class Command(BaseCommand):
+    help = 'Replays bursts of signed gateway callbacks and reports acknowledgement throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--gateway', default='bkash', help='Simulated gateway to play')
+        parser.add_argument('--payments', type=int, default=200, help='Payments to settle')
+        parser.add_argument('--retries', type=int, default=3, help='Deliveries of every callback')
+        parser.add_argument('--fail-rate', type=float, default=0.1, help='Share of payments the gateway declines')
+        parser.add_argument('--workers', type=int, default=8, help='Concurrent senders')
+        parser.add_argument('--url', default='', help='Base URL of a running server to post to')
+
+    def handle(self, *args, **options):
+        gateway = get_gateway(options['gateway'])
+        payments = self.setup(options)
+        rng = random.Random(0)
+        callbacks = []
+        for payment in payments:
+            final = 'failed' if rng.random() < options['fail_rate'] else 'completed'
+            for sequence, status in enumerate(('pending', final)):
+                event_id = f'{payment.gateway_reference}-{sequence}'
+                body, headers = gateway.callback(event_id, payment.gateway_reference, status, payment.amount)
+                callbacks.extend([(body, headers)] * options['retries'])
+        rng.shuffle(callbacks)
+
+        queued = deque()
+        with mock.patch.object(tasks, 'dispatch_payment_events', lambda *args: queued.append(args)):
+            latencies, statuses, elapsed = self.send(callbacks, options)
+
+        self.stdout.write(
+            f"Gateway: {gateway.name}  payments: {len(payments)}  callbacks: {len(callbacks)} "
+            f"({options['retries']} deliveries each)  senders: {options['workers']}"
+        )
+        self.stdout.write(
+            f'Acknowledged {statuses.get(200, 0)} in {elapsed:.2f}s ({len(callbacks) / elapsed:.0f}/s), '
+            f'{statuses["duplicate"]} as repeats, {len(callbacks) - statuses.get(200, 0)} errors: '
+            f'{format_summary(latency_summary(latencies))}'
+        )
+        if options['url']:
+            return
+
+        processing = []
+        while queued:
+            with timed(processing):
+                webhooks.process(*queued.popleft())
+        self.stdout.write(f'Processing ({len(processing)} tasks): {format_summary(latency_summary(processing))}')
+
+        references = [payment.gateway_reference for payment in payments]
+        events = Counter(GatewayEvent.objects.filter(reference__in=references).values_list('status', flat=True))
+        settled = Counter(Payment.objects.filter(pk__in=[p.pk for p in payments]).values_list('status', flat=True))
+        orders = Counter(Order.objects.filter(payments__in=payments).values_list('status', flat=True))
+        self.stdout.write(f'Events: {dict(events)}  payments: {dict(settled)}  orders: {dict(orders)}')
+        if events.total() == 2 * len(payments) and settled[Payment.STATUS_PENDING] == 0:
+            self.stdout.write(self.style.SUCCESS('Every callback was stored once and every payment settled.'))
+        else:
+            self.stdout.write(self.style.ERROR('Some callbacks were stored twice or payments left unsettled.'))
+
+    def setup(self, options):
+        """Check out scratch orders awaiting payment; returns their payments"""
+        tag = uuid.uuid4().hex[:8].upper()
+        warehouse = Warehouse.objects.create(name=f'Simulator {tag}', code=f'SM{tag}')
+        product = Product.objects.create(name=f'Simulator {tag}', sku=f'SIM-{tag}', selling_price=25)
+        Stock.objects.create(product=product, warehouse=warehouse, quantity=10 ** 6)
+        StockSummaryService.rebuild()
+        shopper = User.objects.create_user(
+            email=f'simulator-{tag}@example.com'.lower(),
+            username=f'simulator-{tag}'.lower(),
+            phone=f'+8803{int(tag, 16) % 10 ** 9:09d}',
+            password=uuid.uuid4().hex,
+        )
+
+        def inline(order_id, stage):
+            while stage:
+                stage = OrderService.run_stage(order_id, stage)
+
+        cart_id = CartService.cart_id(user=shopper)
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.dummy.EmailBackend'), \
+                mock.patch.object(order_tasks, 'dispatch_order_stage', inline):
+            for _ in range(options['payments']):
+                CartService.add(cart_id, product.pk, 2)
+                OrderService.checkout(
+                    shopper,
+                    warehouse,
+                    idempotency_key=uuid.uuid4().hex,
+                    payment_method=options['gateway'],
+                    shipping_address='Simulator',
+                )
+        return list(Payment.objects.filter(order__warehouse=warehouse, status=Payment.STATUS_PENDING))
+
+    def send(self, callbacks, options):
+        """Post the callbacks from concurrent senders; returns latencies, status counts and elapsed time"""
+        latencies, statuses = [], Counter()
+        lock = threading.Lock()
+        pending = deque(callbacks)
+        path = reverse('payments:callback', args=[options['gateway']])
+
+        def post(client, body, headers):
+            if not options['url']:
+                response = client.post(path, body, content_type='application/json', headers=headers)
+                return response.status_code, response.json() if response.status_code == 200 else {}
+            request = urllib.request.Request(
+                options['url'].rstrip('/') + path, data=body, method='POST',
+                headers={**headers, 'Content-Type': 'application/json'},
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=10) as response:
+                    return response.status, json.loads(response.read())
+            except urllib.error.HTTPError as exc:
+                return exc.code, {}
+
+        def sender():
+            client = Client(SERVER_NAME='localhost')
+            local_latencies, local_statuses = [], Counter()
+            try:
+                while True:
+                    with lock:
+                        if not pending:
+                            break
+                        body, headers = pending.popleft()
+                    start = time.perf_counter()
+                    code, data = post(client, body, headers)
+                    local_latencies.append(time.perf_counter() - start)
+                    local_statuses[code] += 1
+                    local_statuses['duplicate'] += bool(data.get('duplicate'))
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(local_latencies)
+                    statuses.update(local_statuses)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for _ in range(options['workers']):
+                pool.submit(sender)
+        return latencies, statuses, time.perf_counter() - started
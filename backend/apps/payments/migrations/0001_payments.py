@@ -0,0 +1,98 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:38
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("ecommerce", "0002_orders"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Payment",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                (
+                    "gateway",
+                    models.CharField(help_text="Gateway handling the payment", max_length=20),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2, help_text="Amount to collect", max_digits=12
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("pending", "Pending"),
+                            ("completed", "Completed"),
+                            ("failed", "Failed"),
+                        ],
+                        default="created",
+                        help_text="Payment status",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "idempotency_key",
+                    models.CharField(
+                        help_text="Key sent to the gateway", max_length=100, unique=True
+                    ),
+                ),
+                (
+                    "gateway_reference",
+                    models.CharField(blank=True, help_text="Gateway's payment id", max_length=100),
+                ),
+                (
+                    "redirect_url",
+                    models.URLField(
+                        blank=True, help_text="Where the customer completes payment", max_length=500
+                    ),
+                ),
+                (
+                    "order",
+                    models.ForeignKey(
+                        help_text="Order being paid",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="payments",
+                        to="ecommerce.order",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "payments",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
@@ -0,0 +1,126 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ecommerce", "0005_orders_updated_index"),
+        ("payments", "0001_payments"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GatewayEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "gateway",
+                    models.CharField(help_text="Gateway that sent the callback", max_length=20),
+                ),
+                (
+                    "event_id",
+                    models.CharField(help_text="Gateway's id for the event", max_length=100),
+                ),
+                ("reference", models.CharField(help_text="Gateway's payment id", max_length=100)),
+                (
+                    "payment_status",
+                    models.CharField(
+                        help_text="Payment status reported by the gateway", max_length=20
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        help_text="Amount reported by the gateway",
+                        max_digits=12,
+                        null=True,
+                    ),
+                ),
+                ("payload", models.TextField(help_text="Callback body as received")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("received", "Received"),
+                            ("processed", "Processed"),
+                            ("ignored", "Ignored"),
+                            ("failed", "Failed"),
+                        ],
+                        default="received",
+                        help_text="Processing status",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, help_text="Times processing was tried"),
+                ),
+                (
+                    "last_error",
+                    models.TextField(blank=True, help_text="Why the event was not applied"),
+                ),
+                (
+                    "received_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="When the callback was first received"
+                    ),
+                ),
+                (
+                    "processed_at",
+                    models.DateTimeField(
+                        blank=True, help_text="When the event was settled", null=True
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "payment_gateway_events",
+                "ordering": ["id"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="payment",
+            index=models.Index(
+                fields=["gateway", "gateway_reference"], name="payments_gateway_92367b_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="gatewayevent",
+            name="payment",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Payment the event was applied to",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="events",
+                to="payments.payment",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gatewayevent",
+            index=models.Index(
+                fields=["gateway", "reference", "status"], name="payment_gat_gateway_78a7ef_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gatewayevent",
+            index=models.Index(
+                fields=["status", "received_at"], name="payment_gat_status_e9649a_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="gatewayevent",
+            constraint=models.UniqueConstraint(
+                fields=("gateway", "event_id"), name="unique_gateway_event"
+            ),
+        ),
+    ]
@@ -0,0 +1,116 @@
+"""
+Payment models for the Supermarket Management System.
+"""
+
+from django.db import models
+
+from core.models import BaseModel
+
+
+class Payment(BaseModel):
+    """
+    A payment for an online order through one gateway.
+
+    ``idempotency_key`` is also sent to the gateway, so a retried initiation
+    reuses the same payment on both sides.
+    """
+    STATUS_CREATED = 'created'
+    STATUS_PENDING = 'pending'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_CREATED, 'Created'),
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    order = models.ForeignKey(
+        'ecommerce.Order',
+        on_delete=models.PROTECT,
+        related_name='payments',
+        help_text="Order being paid"
+    )
+    gateway = models.CharField(max_length=20, help_text="Gateway handling the payment")
+    amount = models.DecimalField(max_digits=12, decimal_places=2, help_text="Amount to collect")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_CREATED,
+        help_text="Payment status"
+    )
+    idempotency_key = models.CharField(max_length=100, unique=True, help_text="Key sent to the gateway")
+    gateway_reference = models.CharField(max_length=100, blank=True, help_text="Gateway's payment id")
+    redirect_url = models.URLField(max_length=500, blank=True, help_text="Where the customer completes payment")
+
+    class Meta:
+        db_table = 'payments'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['gateway', 'gateway_reference']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.gateway} {self.amount} ({self.status})"
+
+
+class GatewayEvent(models.Model):
+    """
+    A callback received from a payment gateway, stored as it arrived.
+
+    Gateways retry callbacks until acknowledged, so the same event can
+    arrive many times; the unique ``(gateway, event_id)`` keeps one row per
+    event. Events are applied to their payment later, in arrival order
+    (see ``apps.payments.webhooks``).
+    """
+    STATUS_RECEIVED = 'received'
+    STATUS_PROCESSED = 'processed'
+    STATUS_IGNORED = 'ignored'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_RECEIVED, 'Received'),
+        (STATUS_PROCESSED, 'Processed'),
+        (STATUS_IGNORED, 'Ignored'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    gateway = models.CharField(max_length=20, help_text="Gateway that sent the callback")
+    event_id = models.CharField(max_length=100, help_text="Gateway's id for the event")
+    reference = models.CharField(max_length=100, help_text="Gateway's payment id")
+    payment_status = models.CharField(max_length=20, help_text="Payment status reported by the gateway")
+    amount = models.DecimalField(
+        max_digits=12, decimal_places=2, null=True, blank=True, help_text="Amount reported by the gateway"
+    )
+    payload = models.TextField(help_text="Callback body as received")
+    payment = models.ForeignKey(
+        Payment,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='events',
+        help_text="Payment the event was applied to"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_RECEIVED,
+        help_text="Processing status"
+    )
+    attempts = models.PositiveIntegerField(default=0, help_text="Times processing was tried")
+    last_error = models.TextField(blank=True, help_text="Why the event was not applied")
+    received_at = models.DateTimeField(auto_now_add=True, help_text="When the callback was first received")
+    processed_at = models.DateTimeField(null=True, blank=True, help_text="When the event was settled")
+
+    class Meta:
+        db_table = 'payment_gateway_events'
+        ordering = ['id']
+        constraints = [
+            models.UniqueConstraint(fields=['gateway', 'event_id'], name='unique_gateway_event'),
+        ]
+        indexes = [
+            models.Index(fields=['gateway', 'reference', 'status']),
+            models.Index(fields=['status', 'received_at']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.gateway} {self.event_id} ({self.status})"
@@ -0,0 +1,48 @@
+"""
+Business logic for payments.
+"""
+
+from django.db import IntegrityError, transaction
+
+from .gateways import get_gateway
+from .models import Payment
+
+
+class PaymentService:
+    """
+    Starting payments for orders.
+    """
+
+    @staticmethod
+    def initiate(order, idempotency_key):
+        """
+        Start the order's payment once, however often it is retried.
+
+        The payment row is created under ``idempotency_key`` before the
+        gateway is called, and the gateway is only called while the payment
+        is still in its created state.
+
+        Returns:
+            Tuple of the Payment and its gateway adapter
+
+        Raises:
+            PaymentFailedError: The gateway declined the payment
+        """
+        gateway = get_gateway(order.payment_method)
+        try:
+            with transaction.atomic():
+                payment, _ = Payment.objects.get_or_create(
+                    idempotency_key=idempotency_key,
+                    defaults={'order': order, 'gateway': gateway.name, 'amount': order.total},
+                )
+        except IntegrityError:
+            payment = Payment.objects.get(idempotency_key=idempotency_key)
+        if payment.status != Payment.STATUS_CREATED:
+            return payment, gateway
+
+        started = gateway.initiate(payment)
+        payment.gateway_reference = started['reference']
+        payment.redirect_url = started['redirect_url']
+        payment.status = Payment.STATUS_PENDING
+        payment.save(update_fields=['gateway_reference', 'redirect_url', 'status', 'updated_at'])
+        return payment, gateway
@@ -0,0 +1,28 @@
+"""
+Celery tasks for the payments app.
+"""
+
+from celery import shared_task
+from django.conf import settings
+
+from . import webhooks
+
+
+@shared_task
+def process_payment_events(gateway, reference):
+    """Apply the received gateway events of one payment in order."""
+    return webhooks.process(gateway, reference)
+
+
+@shared_task
+def retry_payment_events():
+    """Process payments whose gateway events have been waiting."""
+    return webhooks.retry_stalled()
+
+
+def dispatch_payment_events(gateway, reference):
+    """Queue a payment's events, or apply them in-process when PAYMENT_EVENTS_EAGER is set."""
+    if settings.PAYMENT_EVENTS_EAGER:
+        process_payment_events.apply(args=[gateway, reference])
+    else:
+        process_payment_events.delay(gateway, reference)
@@ -0,0 +1,154 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from apps.ecommerce import store
+from apps.ecommerce.models import Order
+from apps.ecommerce.services import CartService, OrderService
+from apps.inventory.models import StockReservation
+from apps.payments import webhooks
+from apps.payments.gateways import get_gateway
+from apps.payments.models import GatewayEvent, Payment
+
+
+@pytest.fixture(autouse=True)
+def fresh_store():
+    """Start every test with an empty in-process cart store"""
+    store._stores.clear()
+    yield
+    store._stores.clear()
+
+
+@pytest.fixture
+def payment(create_user, create_stock):
+    """A pending bKash payment for an order of two units"""
+    user, stock = create_user(), create_stock()
+    CartService.add(CartService.cart_id(user=user), stock.product_id, 2)
+    order, _ = OrderService.checkout(user, stock.warehouse, 'key-1', 'bkash', 'House 1, Road 2, Dhaka')
+    OrderService.run_stage(order.pk, OrderService.STAGES[0])
+    return order.payments.get()
+
+
+def send(client, payment, event_id, payment_status, amount=None):
+    body, headers = get_gateway('bkash').callback(
+        event_id, payment.gateway_reference, payment_status, amount or payment.amount,
+    )
+    return client.post(
+        reverse('payments:callback', args=['bkash']), body, content_type='application/json', headers=headers,
+    )
+
+
+@pytest.mark.django_db
+class TestCallbacks:
+    """Test callbacks are stored once and applied in the background"""
+
+    def test_retries_credit_once(self, api_client, payment, settings, django_capture_on_commit_callbacks):
+        """Test repeats of a callback are acknowledged without paying the order twice"""
+        settings.PAYMENT_EVENTS_EAGER = False
+        with django_capture_on_commit_callbacks() as dispatched:
+            responses = [send(api_client, payment, 'evt-1', 'completed') for _ in range(3)]
+
+        assert [response.status_code for response in responses] == [status.HTTP_200_OK] * 3
+        assert [response.data['duplicate'] for response in responses] == [False, True, True]
+        assert len(dispatched) == 1
+        payment.refresh_from_db()
+        assert payment.status == Payment.STATUS_PENDING
+
+        assert webhooks.process('bkash', payment.gateway_reference) == 1
+        assert webhooks.process('bkash', payment.gateway_reference) == 0
+        payment.refresh_from_db()
+        assert payment.status == Payment.STATUS_COMPLETED
+        assert payment.order.status == Order.STATUS_PAID
+        assert GatewayEvent.objects.get().status == GatewayEvent.STATUS_PROCESSED
+
+    def test_events_in_order(self, api_client, payment, django_capture_on_commit_callbacks):
+        """Test a decline after the payment completed is ignored, and a second completion too"""
+        with django_capture_on_commit_callbacks(execute=True):
+            send(api_client, payment, 'evt-1', 'pending')
+            send(api_client, payment, 'evt-2', 'completed')
+            send(api_client, payment, 'evt-3', 'failed')
+            send(api_client, payment, 'evt-4', 'completed')
+
+        assert list(GatewayEvent.objects.values_list('event_id', 'status')) == [
+            ('evt-1', GatewayEvent.STATUS_IGNORED),
+            ('evt-2', GatewayEvent.STATUS_PROCESSED),
+            ('evt-3', GatewayEvent.STATUS_IGNORED),
+            ('evt-4', GatewayEvent.STATUS_IGNORED),
+        ]
+        assert Order.objects.get().status == Order.STATUS_PAID
+
+    def test_decline(self, api_client, payment, django_capture_on_commit_callbacks):
+        """Test a declined payment fails the order and releases its stock"""
+        with django_capture_on_commit_callbacks(execute=True):
+            send(api_client, payment, 'evt-1', 'failed')
+
+        payment.refresh_from_db()
+        assert payment.status == Payment.STATUS_FAILED
+        assert payment.order.status == Order.STATUS_FAILED
+        assert payment.order.reservation.status == StockReservation.STATUS_RELEASED
+
+    def test_wrong_amount(self, api_client, payment, django_capture_on_commit_callbacks):
+        """Test a completion for the wrong amount is held for attention"""
+        with django_capture_on_commit_callbacks(execute=True):
+            send(api_client, payment, 'evt-1', 'completed', amount='1.00')
+
+        event = GatewayEvent.objects.get()
+        assert event.status == GatewayEvent.STATUS_FAILED
+        assert 'does not match' in event.last_error
+        assert Order.objects.get().status == Order.STATUS_AWAITING_PAYMENT
+
+    def test_refused(self, api_client, payment):
+        """Test unsigned callbacks and unknown gateways are refused without storing anything"""
+        url = reverse('payments:callback', args=['bkash'])
+        body, _ = get_gateway('bkash').callback('evt-1', payment.gateway_reference, 'completed', payment.amount)
+
+        forged = api_client.post(url, body, content_type='application/json', headers={'X-Signature': 'forged'})
+        unknown = api_client.post(reverse('payments:callback', args=['paypal']), body, content_type='application/json')
+        cash = api_client.post(reverse('payments:callback', args=['cod']), body, content_type='application/json')
+
+        assert forged.status_code == status.HTTP_403_FORBIDDEN
+        assert (unknown.status_code, cash.status_code) == (status.HTTP_404_NOT_FOUND, status.HTTP_404_NOT_FOUND)
+        assert not GatewayEvent.objects.exists()
+
+    def test_unknown_payment_retried(self, api_client, payment, settings):
+        """Test events for a payment not yet known are retried, then given up on"""
+        settings.PAYMENT_EVENT_MAX_ATTEMPTS = 2
+        settings.PAYMENT_EVENT_RETRY_AFTER = 0
+        body, headers = get_gateway('bkash').callback('evt-1', 'SIM-unknown', 'completed', payment.amount)
+        api_client.post(reverse('payments:callback', args=['bkash']), body, content_type='application/json',
+                        headers=headers)
+
+        assert webhooks.retry_stalled() == 0
+        assert webhooks.retry_stalled() == 1
+        assert GatewayEvent.objects.get().status == GatewayEvent.STATUS_FAILED
+
+    def test_broker_down(self, api_client, payment, monkeypatch, settings, django_capture_on_commit_callbacks):
+        """Test a callback that cannot be queued is still acknowledged and applied by the retry sweep"""
+        settings.PAYMENT_EVENT_RETRY_AFTER = 0
+
+        def broker_down(gateway_name, reference):
+            raise ConnectionError('Broker unreachable')
+
+        monkeypatch.setattr(webhooks.tasks, 'dispatch_payment_events', broker_down)
+        with django_capture_on_commit_callbacks(execute=True):
+            response = send(api_client, payment, 'evt-1', 'completed')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert GatewayEvent.objects.get().status == GatewayEvent.STATUS_RECEIVED
+        assert webhooks.retry_stalled() == 1
+        assert Order.objects.get().status == Order.STATUS_PAID
+
+
+@pytest.mark.django_db(transaction=True)
+def test_simulator():
+    """Test the simulator settles every payment once from a shuffled burst of retries"""
+    out = StringIO()
+
+    call_command('simulate_gateway_callbacks', '--payments', '4', '--retries', '3', '--workers', '1', stdout=out)
+
+    assert 'Acknowledged 24' in out.getvalue()
+    assert '16 as repeats' in out.getvalue()
+    assert 'every payment settled' in out.getvalue()
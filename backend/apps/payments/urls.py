@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import PaymentCallbackView
+
+app_name = 'payments'
+
+urlpatterns = [
+    path('callback/<str:gateway>/', PaymentCallbackView.as_view(), name='callback'),
+]
@@ -0,0 +1,28 @@
+from drf_spectacular.utils import OpenApiTypes, extend_schema
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import webhooks
+
+
+@extend_schema(
+    description='Payment callback from a gateway; stored and acknowledged, applied in the background',
+    request=OpenApiTypes.OBJECT,
+    responses={200: OpenApiTypes.OBJECT}
+)
+class PaymentCallbackView(APIView):
+    """
+    Gateway callback endpoint.
+
+    Gateways authenticate with the callback signature rather than a user
+    token. The callback is stored and acknowledged at once; repeats of an
+    event are acknowledged without being stored again.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request, gateway):
+        _, created = webhooks.receive(gateway, request.body, request.headers)
+        return Response({'received': True, 'duplicate': not created}, status=status.HTTP_200_OK)
@@ -0,0 +1,158 @@
+"""
+Payment gateway callbacks.
+
+Gateways retry a callback until it is acknowledged, often several times at
+once, so receiving one does as little as possible: the adapter checks the
+signature and reads the event, one INSERT stores it and the gateway gets
+its acknowledgement. The unique ``(gateway, event_id)`` turns every retry
+of an event into a no-op acknowledgement, so an event is stored once.
+
+Stored events are applied to their payment by a worker. ``process`` locks
+the payment row and applies its received events in arrival order, so two
+workers never apply events of one payment at the same time or out of
+order, and a payment is completed, and its order paid, at most once.
+Events that arrive before their payment is known are retried by
+``retry_stalled`` until PAYMENT_EVENT_MAX_ATTEMPTS.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.ecommerce.models import Order, OrderStage
+from apps.ecommerce.services import OrderService
+from core.exceptions import InvalidCallbackError, InvalidOperationError
+from . import tasks
+from .gateways import get_gateway
+from .models import GatewayEvent, Payment
+
+logger = logging.getLogger(__name__)
+
+
+def receive(gateway_name, body, headers):
+    """
+    Store a callback and queue its payment for processing.
+
+    The event is acknowledged once stored; if it cannot be queued the error
+    is logged and ``retry_stalled`` picks the event up.
+
+    Returns:
+        Tuple of the stored GatewayEvent, or None for a repeat, and whether
+        it was new
+
+    Raises:
+        InvalidCallbackError: Unknown gateway, bad signature or malformed body
+    """
+    if gateway_name not in settings.PAYMENT_GATEWAYS:
+        raise InvalidCallbackError(f'Unknown gateway {gateway_name}.', status_code=404)
+    event = get_gateway(gateway_name).parse_callback(body, headers)
+    try:
+        with transaction.atomic():
+            stored = GatewayEvent.objects.create(
+                gateway=gateway_name,
+                event_id=event['event_id'],
+                reference=event['reference'],
+                payment_status=event['status'],
+                amount=event['amount'],
+                payload=body.decode(errors='replace'),
+            )
+    except IntegrityError:
+        return None, False
+    transaction.on_commit(lambda: tasks.dispatch_payment_events(gateway_name, event['reference']), robust=True)
+    return stored, True
+
+
+def _settle(event, status, error=''):
+    event.status = status
+    event.last_error = error
+    event.processed_at = timezone.now()
+
+
+def apply(payment, event):
+    """Apply one event to its locked payment, settling the event."""
+    event.payment = payment
+    if event.payment_status == 'pending':
+        _settle(event, GatewayEvent.STATUS_IGNORED)
+    elif event.payment_status == 'failed':
+        if payment.status not in (Payment.STATUS_CREATED, Payment.STATUS_PENDING):
+            _settle(event, GatewayEvent.STATUS_IGNORED, f'Payment already {payment.status}.')
+            return
+        payment.status = Payment.STATUS_FAILED
+        payment.save(update_fields=['status', 'updated_at'])
+        OrderService.compensate(payment.order_id, OrderStage.STAGE_PAYMENT, 'Payment declined by the gateway.')
+        _settle(event, GatewayEvent.STATUS_PROCESSED)
+    elif payment.status == Payment.STATUS_COMPLETED:
+        _settle(event, GatewayEvent.STATUS_IGNORED, 'Payment already completed.')
+    elif payment.status == Payment.STATUS_FAILED:
+        _settle(event, GatewayEvent.STATUS_FAILED, 'Completed after the payment had failed; refund it.')
+    elif event.amount != payment.amount:
+        _settle(event, GatewayEvent.STATUS_FAILED, f'Amount {event.amount} does not match {payment.amount}.')
+    else:
+        payment.status = Payment.STATUS_COMPLETED
+        payment.save(update_fields=['status', 'updated_at'])
+        order = Order.objects.select_related('reservation', 'user').get(pk=payment.order_id)
+        try:
+            with transaction.atomic():
+                OrderService.fulfil(order, Order.STATUS_PAID)
+        except InvalidOperationError as exc:
+            _settle(event, GatewayEvent.STATUS_FAILED, f'{exc.message} Payment taken; refund it.')
+        else:
+            _settle(event, GatewayEvent.STATUS_PROCESSED)
+    if event.status == GatewayEvent.STATUS_FAILED:
+        logger.warning('Gateway event %s for payment %s needs attention: %s', event, payment.pk, event.last_error)
+
+
+def process(gateway_name, reference):
+    """
+    Apply the received events of one payment, oldest first.
+
+    Returns:
+        Number of events settled
+    """
+    with transaction.atomic():
+        payment = (
+            Payment.objects
+            .select_for_update()
+            .filter(gateway=gateway_name, gateway_reference=reference)
+            .first()
+        )
+        events = list(
+            GatewayEvent.objects
+            .select_for_update()
+            .filter(gateway=gateway_name, reference=reference, status=GatewayEvent.STATUS_RECEIVED)
+            .order_by('id')
+        )
+        for event in events:
+            event.attempts += 1
+            if payment is not None:
+                apply(payment, event)
+            elif event.attempts >= settings.PAYMENT_EVENT_MAX_ATTEMPTS:
+                _settle(event, GatewayEvent.STATUS_FAILED, 'No payment with this reference.')
+            else:
+                event.last_error = 'No payment with this reference yet.'
+        GatewayEvent.objects.bulk_update(
+            events, ['payment', 'status', 'attempts', 'last_error', 'processed_at'],
+        )
+    return sum(event.status != GatewayEvent.STATUS_RECEIVED for event in events)
+
+
+def retry_stalled(now=None):
+    """
+    Process payments whose events have waited PAYMENT_EVENT_RETRY_AFTER
+    seconds, in case their task was lost or their payment was not yet known.
+
+    Returns:
+        Number of events settled
+    """
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.PAYMENT_EVENT_RETRY_AFTER)
+    stalled = (
+        GatewayEvent.objects
+        .filter(status=GatewayEvent.STATUS_RECEIVED, received_at__lt=cutoff)
+        .values_list('gateway', 'reference')
+        .order_by()
+        .distinct()
+    )
+    return sum(process(gateway_name, reference) for gateway_name, reference in list(stalled))
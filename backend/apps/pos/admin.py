@@ -0,0 +1,61 @@
+"""
+Admin configuration for pos app.
+"""
+
+from django.contrib import admin
+from .models import (
+    CatalogSnapshot, POSCashMovement, POSPayment, POSSession, POSSessionTotal, POSTransaction, POSTransactionItem,
+)
+
+
+class POSSessionTotalInline(admin.TabularInline):
+    """Inline admin for POSSessionTotal."""
+    model = POSSessionTotal
+    extra = 0
+    readonly_fields = ('kind', 'code', 'count', 'amount', 'tax_amount')
+
+
+class POSCashMovementInline(admin.TabularInline):
+    """Inline admin for POSCashMovement."""
+    model = POSCashMovement
+    extra = 0
+    raw_id_fields = ('created_by',)
+
+
+@admin.register(POSSession)
+class POSSessionAdmin(admin.ModelAdmin):
+    """Admin for POSSession model."""
+    inlines = (POSSessionTotalInline, POSCashMovementInline)
+    list_display = ('terminal_id', 'warehouse', 'cashier', 'status', 'opened_at', 'closed_at')
+    search_fields = ('terminal_id', 'cashier__email')
+    list_filter = ('status', 'warehouse')
+
+
+class POSTransactionItemInline(admin.TabularInline):
+    """Inline admin for POSTransactionItem."""
+    model = POSTransactionItem
+    extra = 0
+    raw_id_fields = ('product',)
+
+
+class POSPaymentInline(admin.TabularInline):
+    """Inline admin for POSPayment."""
+    model = POSPayment
+    extra = 0
+
+
+@admin.register(POSTransaction)
+class POSTransactionAdmin(admin.ModelAdmin):
+    """Admin for POSTransaction model."""
+    inlines = (POSTransactionItemInline, POSPaymentInline)
+    list_display = ('transaction_number', 'session', 'status', 'total', 'is_offline', 'occurred_at')
+    search_fields = ('transaction_number', 'idempotency_key')
+    list_filter = ('status', 'is_offline')
+    raw_id_fields = ('session', 'cashier')
+
+
+@admin.register(CatalogSnapshot)
+class CatalogSnapshotAdmin(admin.ModelAdmin):
+    """Admin for CatalogSnapshot model."""
+    list_display = ('version', 'product_count', 'size', 'created_at')
+    readonly_fields = ('version', 'file', 'product_count', 'size', 'created_at')
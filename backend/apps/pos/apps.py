@@ -5,3 +5,7 @@ class PosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.pos'
     label = 'pos'
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import apps.pos.signals
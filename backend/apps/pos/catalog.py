@@ -0,0 +1,102 @@
+"""
+Catalog sync feed for till terminals.
+
+Every write to a product's till-visible fields stamps it with the next
+catalog version (see ``CatalogCounter``). A till keeps the highest version
+it has applied and asks for the products changed since then; a new till
+starts from the latest pre-built snapshot and then catches up from the
+snapshot's version.
+
+Both payloads are newline-delimited JSON: a header line with the version
+the payload brings the till up to, followed by one line per product. Deleted
+products appear in the change feed with ``is_deleted`` set so tills can drop
+them, and are left out of snapshots.
+"""
+
+import json
+import tempfile
+import zlib
+
+from django.conf import settings
+from django.core.files import File
+
+from apps.products.models import CatalogCounter, Product
+from .models import CatalogSnapshot
+
+FIELDS = (
+    'id', 'sku', 'barcode', 'name', 'category_id', 'selling_price', 'tax_rate',
+    'is_active', 'is_deleted', 'catalog_version',
+)
+
+CHUNK_ROWS = 2000
+
+
+def changes(since, version):
+    """Products changed after ``since`` up to and including ``version``."""
+    return (
+        Product.objects
+        .filter(catalog_version__gt=since, catalog_version__lte=version)
+        .order_by('catalog_version', 'pk')
+        .values_list(*FIELDS)
+    )
+
+
+def ndjson(header, rows):
+    """Yield the header and rows as newline-delimited JSON, a few thousand rows per chunk."""
+    yield json.dumps(header).encode() + b'\n'
+    lines = []
+    for row in rows.iterator(chunk_size=CHUNK_ROWS):
+        lines.append(json.dumps(dict(zip(FIELDS, row)), default=str))
+        if len(lines) == CHUNK_ROWS:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+
+def gzipped(chunks, level=6):
+    """Compress a stream of byte chunks into a gzip stream as it is produced."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def feed(since):
+    """Return the version a change feed brings a till to, and its chunks."""
+    version = CatalogCounter.current()
+    snapshot = CatalogSnapshot.objects.order_by('-version').values_list('version', flat=True).first()
+    header = {'since': since, 'version': version, 'snapshot': snapshot}
+    return version, ndjson(header, changes(since, version))
+
+
+def build_snapshot():
+    """
+    Write the current catalog to storage as a gzip NDJSON snapshot.
+
+    Products changed after the snapshot's version are left out; a till
+    receives them from the change feed once it has loaded the snapshot.
+    Nothing is written if the catalog has not changed since the last
+    snapshot. Only the newest CATALOG_SNAPSHOTS_KEPT snapshots are retained.
+    """
+    version = CatalogCounter.current()
+    latest = CatalogSnapshot.objects.order_by('-version').first()
+    if latest is not None and latest.version == version:
+        return latest
+    rows = changes(0, version).filter(is_deleted=False)
+    count = rows.count()
+    header = {'since': 0, 'version': version, 'snapshot': version}
+    with tempfile.TemporaryFile() as buffer:
+        for chunk in gzipped(ndjson(header, rows), level=9):
+            buffer.write(chunk)
+        snapshot = CatalogSnapshot(version=version, product_count=count, size=buffer.tell())
+        buffer.seek(0)
+        snapshot.file.save(f'catalog-{version}.ndjson.gz', File(buffer), save=False)
+    snapshot.save()
+
+    for stale in CatalogSnapshot.objects.order_by('-version', '-created_at')[settings.CATALOG_SNAPSHOTS_KEPT:]:
+        stale.file.delete(save=False)
+        stale.delete()
+    return snapshot
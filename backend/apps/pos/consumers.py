@@ -0,0 +1,82 @@
+"""
+WebSocket consumer for till terminals.
+"""
+
+import asyncio
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+
+from .models import POSSession
+from .views import MANAGER_ROLES
+from . import realtime
+
+
+class POSSessionConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Push price changes, stock-out flags and session events to one till.
+
+    Events from the channel layer are buffered per ``(kind, key)`` so only
+    the latest survives, and the buffer is sent as one ``batch`` frame per
+    POS_REALTIME_FLUSH_INTERVAL.
+    """
+
+    async def connect(self):
+        """Accept the session's cashier or a manager while the session is open"""
+        self.joined = []
+        self.pending = {}
+        self.flusher = None
+        session = await self.get_session(
+            self.scope.get('user'),
+            self.scope['url_route']['kwargs']['session_id'],
+        )
+        if session is None:
+            await self.close(code=4403)
+            return
+
+        self.joined = [
+            realtime.CATALOG_GROUP,
+            realtime.branch_group(session.warehouse_id),
+            realtime.session_group(session.pk),
+        ]
+        for group in self.joined:
+            await self.channel_layer.group_add(group, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        """Leave the groups and drop anything still buffered"""
+        if self.flusher is not None:
+            self.flusher.cancel()
+        for group in self.joined:
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+    async def receive_json(self, content, **kwargs):
+        """Answer keep-alive pings; terminals send nothing else"""
+        if content.get('type') == 'ping':
+            await self.send_json({'type': 'pong'})
+
+    async def pos_events(self, message):
+        """Buffer events from the channel layer until the next flush"""
+        for item in message['events']:
+            self.pending[(item['kind'], item['key'])] = item
+        if self.flusher is None:
+            self.flusher = asyncio.ensure_future(self.flush_later())
+
+    async def flush_later(self):
+        """Send the buffered events as batched frames after the flush interval"""
+        await asyncio.sleep(settings.POS_REALTIME_FLUSH_INTERVAL)
+        events, self.pending, self.flusher = list(self.pending.values()), {}, None
+        size = settings.POS_REALTIME_MAX_FRAME_EVENTS
+        for start in range(0, len(events), size):
+            await self.send_json({'type': 'batch', 'events': events[start:start + size]})
+
+    @database_sync_to_async
+    def get_session(self, user, session_id):
+        """Return the open session if the user may watch it"""
+        if user is None or not user.is_authenticated:
+            return None
+        session = POSSession.objects.filter(pk=session_id, status=POSSession.STATUS_OPEN).first()
+        if session is None or (user.role not in MANAGER_ROLES and session.cashier_id != user.pk):
+            return None
+        return session
@@ -0,0 +1,133 @@
+"""
+Latency benchmark for committing online till sales.
+
+Several tills ring up baskets against one branch at the same time, each sale
+going through POSTransactionService.complete_sale. The command reports the
+statements one sale runs for a single-line and a full basket, which must
+match, and the commit latency percentiles against a p99 target. Sales are
+written to the append-only ledger, so run it against a scratch PostgreSQL
+database; SQLite serialises writers and reports lock waits instead.
+"""
+
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.accounts.models import User
+from apps.inventory.models import Stock, Warehouse
+from apps.inventory.services import StockSummaryService
+from apps.pos.models import POSSession
+from apps.pos.services import POSTransactionService
+from apps.products.models import Product
+from core.benchmark import format_summary, latency_summary
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks p99 latency of committing online till sales'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skus', type=int, default=500, help='SKUs stocked in the branch')
+        parser.add_argument('--tills', type=int, default=4, help='Concurrent tills')
+        parser.add_argument('--sales', type=int, default=250, help='Sales per till')
+        parser.add_argument('--basket-size', type=int, default=12, help='Lines per sale')
+        parser.add_argument('--target-ms', type=float, default=30.0, help='p99 commit latency target')
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8].upper()
+        warehouse = Warehouse.objects.create(name=f'Benchmark {tag}', code=f'BM{tag}')
+        products = Product.objects.bulk_create([
+            Product(name=f'Benchmark {tag} {n}', sku=f'BENCH-{tag}-{n}', selling_price=2)
+            for n in range(options['skus'])
+        ])
+        Stock.objects.bulk_create([
+            Stock(product=product, warehouse=warehouse, quantity=10 ** 6) for product in products
+        ])
+        StockSummaryService.rebuild()
+        sessions = [
+            POSSession.objects.create(
+                warehouse=warehouse,
+                terminal_id=f'BM{tag}-{till}',
+                cashier=User.objects.create_user(
+                    email=f'bench-{tag}-{till}@example.com'.lower(),
+                    username=f'bench-{tag}-{till}'.lower(),
+                    phone=f'+8801{till:03d}{int(tag, 16) % 10 ** 6:06d}',
+                    password=uuid.uuid4().hex,
+                    role='cashier',
+                ),
+            )
+            for till in range(options['tills'])
+        ]
+
+        def sale(rng, size):
+            basket = rng.sample(products, size)
+            return {
+                'idempotency_key': uuid.uuid4().hex,
+                'items': [{'product': product.pk, 'quantity': rng.randint(1, 3)} for product in basket],
+                'payments': [{'method': 'cash', 'amount': 6 * size, 'reference': ''}],
+            }
+
+        rng = random.Random(0)
+        statements = {}
+        for size in (1, options['basket_size']):
+            with CaptureQueriesContext(connection) as queries:
+                POSTransactionService.complete_sale(sessions[0], sale(rng, size), cashier=sessions[0].cashier)
+            statements[size] = len(queries)
+
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['tills'])
+
+        def till(index):
+            session = sessions[index]
+            till_rng = random.Random(index + 1)
+            local_latencies, local_errors = [], 0
+            try:
+                barrier.wait()
+                for _ in range(options['sales']):
+                    payload = sale(till_rng, options['basket_size'])
+                    start = time.perf_counter()
+                    try:
+                        POSTransactionService.complete_sale(session, payload, cashier=session.cashier)
+                        local_latencies.append(time.perf_counter() - start)
+                    except DatabaseError:
+                        local_errors += 1
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(local_latencies)
+                    errors.append(local_errors)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['tills']) as pool:
+            for index in range(options['tills']):
+                pool.submit(till, index)
+        elapsed = time.perf_counter() - started
+
+        summary = latency_summary(latencies)
+        self.stdout.write(
+            f"Tills: {options['tills']}  sales: {len(latencies)}  "
+            f"basket: {options['basket_size']} lines  elapsed: {elapsed:.2f}s  errors: {sum(errors)}"
+        )
+        self.stdout.write(
+            f"Statements per sale: {statements[1]} for 1 line, "
+            f"{statements[options['basket_size']]} for {options['basket_size']} lines"
+        )
+        self.stdout.write(f'Latency: {format_summary(summary)}')
+
+        if statements[1] != statements[options['basket_size']]:
+            self.stdout.write(self.style.ERROR('Statement count grows with the basket.'))
+        elif summary['p99_ms'] > options['target_ms']:
+            self.stdout.write(self.style.ERROR(
+                f"p99 {summary['p99_ms']:.2f}ms is over the {options['target_ms']:.0f}ms target."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"p99 {summary['p99_ms']:.2f}ms is within the {options['target_ms']:.0f}ms target."
+            ))
@@ -0,0 +1,121 @@
+"""
+Fan-out benchmark for the POS realtime channel.
+
+Connects many till terminals to ``/ws/pos/{session_id}/`` in process,
+publishes a catalog-wide price change and measures how long each terminal
+takes to receive every price, and in how many frames. Uses whichever channel
+layer the settings configure: in-memory under development settings, Redis in
+production.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.accounts.models import User
+from apps.inventory.models import Warehouse
+from apps.pos.models import POSSession
+from apps.pos.realtime import publish_prices
+from apps.pos.routing import websocket_urlpatterns
+from apps.products.models import Product
+from core.benchmark import format_summary, latency_summary
+from core.websocket import JWTAuthMiddleware
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks pushing a catalog-wide price change to many connected tills'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--terminals', type=int, default=200, help='Connected tills')
+        parser.add_argument('--products', type=int, default=5000, help='Products whose price changes')
+        parser.add_argument('--timeout', type=float, default=60.0, help='Seconds to wait for delivery')
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8].upper()
+        warehouse = Warehouse.objects.create(name=f'Benchmark {tag}', code=f'BM{tag}')
+        products = Product.objects.bulk_create([
+            Product(name=f'Benchmark {tag} {n}', sku=f'BENCH-{tag}-{n}', selling_price=2)
+            for n in range(options['products'])
+        ])
+        cashiers = User.objects.bulk_create([
+            User(
+                email=f'bench-{tag}-{n}@example.com'.lower(),
+                username=f'bench-{tag}-{n}'.lower(),
+                phone=f'+8802{n:04d}{int(tag, 16) % 10 ** 5:05d}',
+                role='cashier',
+            )
+            for n in range(options['terminals'])
+        ])
+        sessions = POSSession.objects.bulk_create([
+            POSSession(warehouse=warehouse, terminal_id=f'BM{tag}-{n}', cashier=cashier)
+            for n, cashier in enumerate(cashiers)
+        ])
+        application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+        terminals = [
+            WebsocketCommunicator(application, f'/ws/pos/{session.pk}/?token={AccessToken.for_user(cashier)}')
+            for session, cashier in zip(sessions, cashiers)
+        ]
+        for product in products:
+            product.selling_price = 3
+
+        try:
+            connected, results, published = async_to_sync(self.run)(terminals, products, options)
+        finally:
+            POSSession.objects.filter(pk__in=[session.pk for session in sessions]).delete()
+            User.objects.filter(pk__in=[cashier.pk for cashier in cashiers]).delete()
+            Product.objects.filter(pk__in=[product.pk for product in products]).delete()
+            warehouse.delete()
+
+        delivered = [result for result in results if result[1] == len(products)]
+        frames = [result[2] for result in delivered]
+        sizes = [result[3] for result in delivered]
+        self.stdout.write(
+            f"Terminals: {connected}/{options['terminals']}  prices: {len(products)}  "
+            f"publish: {published * 1000:.1f}ms"
+        )
+        self.stdout.write(f'Delivery: {format_summary(latency_summary([result[0] for result in delivered]))}')
+        if frames:
+            self.stdout.write(
+                f'Frames per terminal: {min(frames)}-{max(frames)}  '
+                f'bytes per terminal: {sum(sizes) // len(sizes)}'
+            )
+        if len(delivered) == options['terminals']:
+            self.stdout.write(self.style.SUCCESS('Every terminal received every price.'))
+        else:
+            self.stdout.write(self.style.ERROR(
+                f"{options['terminals'] - len(delivered)} terminals missed prices."
+            ))
+
+    async def run(self, terminals, products, options):
+        """Connect the terminals, publish the change and collect per-terminal delivery"""
+        connected = sum([ok for ok, _ in await asyncio.gather(*(terminal.connect() for terminal in terminals))])
+        start = time.perf_counter()
+        await sync_to_async(publish_prices)(products)
+        published = time.perf_counter() - start
+        results = await asyncio.gather(*(
+            self.collect(terminal, len(products), start, options['timeout']) for terminal in terminals
+        ))
+        await asyncio.gather(*(terminal.disconnect() for terminal in terminals))
+        return connected, results, published
+
+    async def collect(self, terminal, expected, start, timeout):
+        """Receive frames until every price arrived; return time, prices, frames and bytes"""
+        keys, frames, size = set(), 0, 0
+        deadline = start + timeout
+        while len(keys) < expected and time.perf_counter() < deadline:
+            try:
+                text = await terminal.receive_from(timeout=deadline - time.perf_counter())
+            except asyncio.TimeoutError:
+                break
+            frame = json.loads(text)
+            keys.update(event['key'] for event in frame.get('events', []))
+            frames += 1
+            size += len(text)
+        return time.perf_counter() - start, len(keys), frames, size
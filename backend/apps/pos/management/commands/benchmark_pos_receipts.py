@@ -0,0 +1,125 @@
+"""
+Throughput benchmark for rendering till receipts.
+
+Stores a batch of sales, then renders every receipt in both forms, reporting
+per-receipt render latency and overall throughput, the rate of the
+worker's batched prerender including cache writes, and the latency of a
+reprint served from the receipt cache. Uses the configured cache backend.
+"""
+
+import random
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts.models import User
+from apps.inventory.models import Warehouse
+from apps.pos import receipts
+from apps.pos.models import POSPayment, POSSession, POSTransaction, POSTransactionItem
+from apps.pos.services import POSTransactionService
+from apps.products.models import Product
+from core.benchmark import format_summary, latency_summary, timed
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks rendering and reprinting till receipts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--receipts', type=int, default=10000, help='Sales to render receipts for')
+        parser.add_argument('--lines', type=int, default=8, help='Lines per sale')
+        parser.add_argument('--batch', type=int, default=500, help='Sales loaded and rendered per batch')
+        parser.add_argument('--reprints', type=int, default=1000, help='Cached reprints to time')
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8].upper()
+        warehouse = Warehouse.objects.create(name=f'Benchmark {tag}', code=f'BM{tag}')
+        cashier = User.objects.create_user(
+            email=f'bench-{tag}@example.com'.lower(),
+            username=f'bench-{tag}'.lower(),
+            phone=f'+8803{int(tag, 16) % 10 ** 9:09d}',
+            password=uuid.uuid4().hex,
+            role='cashier',
+        )
+        session = POSSession.objects.create(warehouse=warehouse, terminal_id=f'BM{tag}', cashier=cashier)
+        products = Product.objects.bulk_create([
+            Product(name=f'Benchmark {tag} item {n}', sku=f'BENCH-{tag}-{n}', selling_price=2)
+            for n in range(options['lines'] * 10)
+        ])
+        ids = self.store_sales(session, cashier, products, options)
+
+        try:
+            self.report(ids, options)
+        finally:
+            receipts.forget(ids)
+            POSTransaction.objects.filter(session=session).delete()
+            session.delete()
+            cashier.delete()
+            Product.objects.filter(pk__in=[product.pk for product in products]).delete()
+            warehouse.delete()
+
+    def store_sales(self, session, cashier, products, options):
+        """Store the sales to render without touching stock; returns their ids"""
+        rng = random.Random(0)
+        ids = []
+        for start in range(0, options['receipts'], options['batch']):
+            sales, items, payments = [], [], []
+            for _ in range(min(options['batch'], options['receipts'] - start)):
+                sale_transaction, sale_items, sale_payments = POSTransactionService.build(
+                    session,
+                    {
+                        'idempotency_key': uuid.uuid4().hex,
+                        'items': [
+                            {'product': product.pk, 'quantity': rng.randint(1, 3), 'unit_price': product.selling_price}
+                            for product in rng.sample(products, options['lines'])
+                        ],
+                        'payments': [{'method': POSPayment.METHOD_CASH, 'amount': Decimal('100'), 'reference': ''}],
+                    },
+                    cashier=cashier,
+                )
+                sales.append(sale_transaction)
+                items += sale_items
+                payments += sale_payments
+            POSTransaction.objects.bulk_create(sales)
+            POSTransactionItem.objects.bulk_create(items)
+            POSPayment.objects.bulk_create(payments)
+            ids += [sale.pk for sale in sales]
+        return ids
+
+    def report(self, ids, options):
+        batches = [ids[start:start + options['batch']] for start in range(0, len(ids), options['batch'])]
+
+        latencies = {kind: [] for kind in receipts.KINDS}
+        sizes = {kind: 0 for kind in receipts.KINDS}
+        started = time.perf_counter()
+        for batch in batches:
+            for sale_transaction in receipts.load(batch):
+                for kind in receipts.KINDS:
+                    with timed(latencies[kind]):
+                        content = receipts.render(sale_transaction, kind)
+                    sizes[kind] += len(content)
+        rendered = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for batch in batches:
+            receipts.render_many(batch)
+        prerendered = time.perf_counter() - started
+
+        reprints = []
+        for pk in random.Random(1).sample(ids, min(options['reprints'], len(ids))):
+            with timed(reprints):
+                receipts.get(POSTransaction(pk=pk), receipts.KIND_ESCPOS)
+
+        self.stdout.write(
+            f"Receipts: {len(ids)}  lines: {options['lines']}  "
+            f"rendered both forms in {rendered:.2f}s ({len(ids) / rendered:.0f} receipts/s, incl. loading)"
+        )
+        for kind in receipts.KINDS:
+            self.stdout.write(
+                f'{kind:>6}: {format_summary(latency_summary(latencies[kind]))}  '
+                f'avg {sizes[kind] // len(ids)} bytes'
+            )
+        self.stdout.write(f'Prerender with cache writes: {prerendered:.2f}s ({len(ids) / prerendered:.0f} receipts/s)')
+        self.stdout.write(f'Cached reprint: {format_summary(latency_summary(reprints))}')
+        self.stdout.write(self.style.SUCCESS(f'Rendered {len(ids)} receipts.'))
@@ -0,0 +1,39 @@
+"""
+Verify the running totals of till sessions against a full recompute.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.pos.models import POSSession
+from apps.pos.services import POSSessionService
+
+
+class Command(BaseCommand):
+    help = 'Recomputes session totals from their sales and compares them with the running totals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--session', action='append', help='Session id to check; may be repeated')
+        parser.add_argument('--days', type=int, default=1, help='Check sessions opened in the last N days')
+
+    def handle(self, *args, **options):
+        sessions = POSSession.objects.order_by('opened_at')
+        if options['session']:
+            sessions = sessions.filter(pk__in=options['session'])
+        else:
+            sessions = sessions.filter(opened_at__gte=timezone.now() - timedelta(days=options['days']))
+
+        failed = 0
+        for session in sessions:
+            mismatches = POSSessionService.verify(session)
+            for mismatch in mismatches:
+                self.stdout.write(self.style.ERROR(
+                    f"{session.terminal_id} {session.pk}: {mismatch['field']} "
+                    f"recorded={mismatch['recorded']} actual={mismatch['actual']}"
+                ))
+            failed += bool(mismatches)
+        if failed:
+            raise CommandError(f'{failed} sessions have totals that disagree with their sales.')
+        self.stdout.write(self.style.SUCCESS('Session totals are consistent.'))
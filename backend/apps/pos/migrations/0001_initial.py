@@ -0,0 +1,320 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:02
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("inventory", "0007_stock_lots"),
+        ("products", "0002_product_supplier"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="POSSession",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                ("terminal_id", models.CharField(help_text="Till identifier", max_length=50)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("open", "Open"), ("closed", "Closed")],
+                        default="open",
+                        help_text="Session status",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "opening_float",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Cash in the drawer at opening",
+                        max_digits=12,
+                    ),
+                ),
+                (
+                    "opened_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, help_text="When the session was opened"
+                    ),
+                ),
+                (
+                    "closed_at",
+                    models.DateTimeField(
+                        blank=True, help_text="When the session was closed", null=True
+                    ),
+                ),
+                (
+                    "cashier",
+                    models.ForeignKey(
+                        help_text="Cashier running the session",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="pos_sessions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        help_text="Branch the till sells from",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="pos_sessions",
+                        to="inventory.warehouse",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "pos_sessions",
+                "ordering": ["-opened_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="POSTransaction",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                (
+                    "transaction_number",
+                    models.CharField(help_text="Receipt number", max_length=40, unique=True),
+                ),
+                (
+                    "idempotency_key",
+                    models.CharField(
+                        help_text="Client-generated sale key", max_length=64, unique=True
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("completed", "Completed"), ("voided", "Voided")],
+                        default="completed",
+                        help_text="Transaction status",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "subtotal",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Total before tax", max_digits=12
+                    ),
+                ),
+                (
+                    "tax_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Tax charged", max_digits=12
+                    ),
+                ),
+                (
+                    "total",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Amount due", max_digits=12
+                    ),
+                ),
+                (
+                    "is_offline",
+                    models.BooleanField(default=False, help_text="Made while the till was offline"),
+                ),
+                (
+                    "occurred_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="When the sale happened at the till",
+                    ),
+                ),
+                (
+                    "cashier",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Cashier who made the sale",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="pos_transactions",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "session",
+                    models.ForeignKey(
+                        help_text="Session the sale was made in",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="transactions",
+                        to="pos.possession",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "pos_transactions",
+                "ordering": ["-occurred_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="POSPayment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "method",
+                    models.CharField(
+                        choices=[
+                            ("cash", "Cash"),
+                            ("card", "Card"),
+                            ("mobile_banking", "Mobile Banking"),
+                        ],
+                        help_text="Tender type",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2, help_text="Amount paid with this tender", max_digits=12
+                    ),
+                ),
+                (
+                    "reference",
+                    models.CharField(
+                        blank=True, help_text="Card or mobile payment reference", max_length=100
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        help_text="Parent transaction",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payments",
+                        to="pos.postransaction",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "pos_payments",
+            },
+        ),
+        migrations.CreateModel(
+            name="POSTransactionItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField(help_text="Units sold")),
+                (
+                    "unit_price",
+                    models.DecimalField(
+                        decimal_places=2, help_text="Price per unit before tax", max_digits=12
+                    ),
+                ),
+                (
+                    "tax_rate",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Tax rate in percent", max_digits=5
+                    ),
+                ),
+                (
+                    "tax_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Tax on the line", max_digits=12
+                    ),
+                ),
+                (
+                    "line_total",
+                    models.DecimalField(
+                        decimal_places=2, help_text="Quantity times unit price", max_digits=12
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        help_text="Product sold",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="pos_items",
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "transaction",
+                    models.ForeignKey(
+                        help_text="Parent transaction",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="items",
+                        to="pos.postransaction",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "pos_transaction_items",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="possession",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "open")),
+                fields=("terminal_id",),
+                name="unique_open_session_per_terminal",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="postransaction",
+            index=models.Index(
+                fields=["session", "occurred_at"], name="pos_transac_session_a80a21_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,202 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:11
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pos", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="possession",
+            name="cash_in",
+            field=models.DecimalField(
+                decimal_places=2, default=0, help_text="Cash paid into the drawer", max_digits=14
+            ),
+        ),
+        migrations.AddField(
+            model_name="possession",
+            name="cash_out",
+            field=models.DecimalField(
+                decimal_places=2, default=0, help_text="Cash taken from the drawer", max_digits=14
+            ),
+        ),
+        migrations.AddField(
+            model_name="possession",
+            name="change_given",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Tender in excess of the total handed back as change",
+                max_digits=14,
+            ),
+        ),
+        migrations.AddField(
+            model_name="possession",
+            name="counted_cash",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=2,
+                help_text="Cash counted in the drawer at close",
+                max_digits=14,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="possession",
+            name="sales_count",
+            field=models.IntegerField(default=0, help_text="Completed sales"),
+        ),
+        migrations.AddField(
+            model_name="possession",
+            name="sales_subtotal",
+            field=models.DecimalField(
+                decimal_places=2, default=0, help_text="Sales before tax", max_digits=14
+            ),
+        ),
+        migrations.AddField(
+            model_name="possession",
+            name="sales_tax",
+            field=models.DecimalField(
+                decimal_places=2, default=0, help_text="Tax on sales", max_digits=14
+            ),
+        ),
+        migrations.AddField(
+            model_name="possession",
+            name="sales_total",
+            field=models.DecimalField(
+                decimal_places=2, default=0, help_text="Sales including tax", max_digits=14
+            ),
+        ),
+        migrations.AddField(
+            model_name="possession",
+            name="void_count",
+            field=models.IntegerField(default=0, help_text="Voided sales"),
+        ),
+        migrations.AddField(
+            model_name="possession",
+            name="void_total",
+            field=models.DecimalField(
+                decimal_places=2, default=0, help_text="Value of voided sales", max_digits=14
+            ),
+        ),
+        migrations.CreateModel(
+            name="POSCashMovement",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("pay_in", "Pay in"), ("pay_out", "Pay out")],
+                        help_text="Direction of the movement",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, help_text="Cash moved", max_digits=12),
+                ),
+                (
+                    "reason",
+                    models.CharField(blank=True, help_text="Why the cash moved", max_length=255),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, help_text="When the cash moved"
+                    ),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="User who moved the cash",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="pos_cash_movements",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "session",
+                    models.ForeignKey(
+                        help_text="Session whose drawer moved",
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="cash_movements",
+                        to="pos.possession",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "pos_cash_movements",
+                "ordering": ["created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="POSSessionTotal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("tender", "Tender"), ("tax", "Tax rate")],
+                        help_text="What the total is broken down by",
+                        max_length=10,
+                    ),
+                ),
+                ("code", models.CharField(help_text="Payment method or tax rate", max_length=20)),
+                ("count", models.IntegerField(default=0, help_text="Payments or lines counted")),
+                (
+                    "amount",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=0,
+                        help_text="Amount tendered, or taxable amount for tax rates",
+                        max_digits=14,
+                    ),
+                ),
+                (
+                    "tax_amount",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Tax charged", max_digits=14
+                    ),
+                ),
+                (
+                    "session",
+                    models.ForeignKey(
+                        help_text="Session the total belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="totals",
+                        to="pos.possession",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "pos_session_totals",
+                "ordering": ["kind", "code"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="possessiontotal",
+            constraint=models.UniqueConstraint(
+                fields=("session", "kind", "code"), name="unique_session_total"
+            ),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pos", "0002_session_totals"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "version",
+                    models.BigIntegerField(
+                        db_index=True, help_text="Catalog version the snapshot is complete up to"
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        help_text="Gzip-compressed NDJSON of the catalog", upload_to="catalog/"
+                    ),
+                ),
+                (
+                    "product_count",
+                    models.IntegerField(default=0, help_text="Products in the snapshot"),
+                ),
+                ("size", models.BigIntegerField(default=0, help_text="Compressed size in bytes")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="When the snapshot was built"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "pos_catalog_snapshots",
+                "ordering": ["-version"],
+            },
+        ),
+    ]
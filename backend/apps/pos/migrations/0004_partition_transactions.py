@@ -0,0 +1,43 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:47
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+from core.partitioning import partition_table
+
+
+def copy_sale_dates(apps, schema_editor):
+    """Give existing lines their sale's time."""
+    POSTransaction = apps.get_model('pos', 'POSTransaction')
+    POSTransactionItem = apps.get_model('pos', 'POSTransactionItem')
+    POSTransactionItem.objects.update(
+        occurred_at=Subquery(
+            POSTransaction.objects.filter(pk=OuterRef('transaction_id')).values('occurred_at')[:1]
+        )
+    )
+
+
+def partition(apps, schema_editor):
+    """Partition till sales and their lines by month on PostgreSQL."""
+    partition_table(schema_editor, 'pos_transactions', unique=[('transaction_number',), ('idempotency_key',)])
+    partition_table(schema_editor, 'pos_transaction_items')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("pos", "0003_catalog_snapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="postransactionitem",
+            name="occurred_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, help_text="Copy of the sale's; the partition key"
+            ),
+        ),
+        migrations.RunPython(copy_sale_dates, migrations.RunPython.noop),
+        migrations.RunPython(partition, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0001_initial"),
+        ("pos", "0004_partition_transactions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="postransaction",
+            name="customer",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Loyalty customer the sale was rung up for",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="pos_transactions",
+                to="customers.customer",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.14 on 2026-10-19 12:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0002_segmentation"),
+        ("pos", "0005_postransaction_customer"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="postransaction",
+            index=models.Index(
+                condition=models.Q(("customer__isnull", False)),
+                fields=["updated_at"],
+                name="pos_txn_customer_updated_idx",
+            ),
+        ),
+    ]
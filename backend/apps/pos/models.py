@@ -0,0 +1,311 @@
+"""
+Point of sale models for the Supermarket Management System.
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from core.models import BaseModel
+
+
+class POSSession(BaseModel):
+    """
+    A cashier's shift on one till, from opening float to close.
+    """
+    STATUS_OPEN = 'open'
+    STATUS_CLOSED = 'closed'
+    STATUS_CHOICES = [
+        (STATUS_OPEN, 'Open'),
+        (STATUS_CLOSED, 'Closed'),
+    ]
+
+    warehouse = models.ForeignKey(
+        'inventory.Warehouse',
+        on_delete=models.PROTECT,
+        related_name='pos_sessions',
+        help_text="Branch the till sells from"
+    )
+    terminal_id = models.CharField(max_length=50, help_text="Till identifier")
+    cashier = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name='pos_sessions',
+        help_text="Cashier running the session"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_OPEN,
+        help_text="Session status"
+    )
+    opening_float = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="Cash in the drawer at opening"
+    )
+    opened_at = models.DateTimeField(default=timezone.now, help_text="When the session was opened")
+    closed_at = models.DateTimeField(null=True, blank=True, help_text="When the session was closed")
+
+    # Running totals, kept in step as sales, voids and cash movements commit
+    sales_count = models.IntegerField(default=0, help_text="Completed sales")
+    sales_subtotal = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Sales before tax")
+    sales_tax = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Tax on sales")
+    sales_total = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Sales including tax")
+    change_given = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Tender in excess of the total handed back as change"
+    )
+    void_count = models.IntegerField(default=0, help_text="Voided sales")
+    void_total = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Value of voided sales")
+    cash_in = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Cash paid into the drawer")
+    cash_out = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Cash taken from the drawer")
+    counted_cash = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Cash counted in the drawer at close"
+    )
+
+    class Meta:
+        db_table = 'pos_sessions'
+        ordering = ['-opened_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['terminal_id'],
+                condition=models.Q(status='open'),
+                name='unique_open_session_per_terminal',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.terminal_id} {self.opened_at:%Y-%m-%d %H:%M} ({self.status})"
+
+
+class POSTransaction(BaseModel):
+    """
+    A completed till sale.
+
+    ``idempotency_key`` is chosen by the till, so a sale retried or synced
+    twice after an outage is stored once. On PostgreSQL the table is
+    partitioned by month of ``occurred_at`` (see core.partitioning).
+    """
+    STATUS_COMPLETED = 'completed'
+    STATUS_VOIDED = 'voided'
+    STATUS_CHOICES = [
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_VOIDED, 'Voided'),
+    ]
+
+    session = models.ForeignKey(
+        POSSession,
+        on_delete=models.PROTECT,
+        related_name='transactions',
+        help_text="Session the sale was made in"
+    )
+    transaction_number = models.CharField(max_length=40, unique=True, help_text="Receipt number")
+    idempotency_key = models.CharField(max_length=64, unique=True, help_text="Client-generated sale key")
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_COMPLETED,
+        help_text="Transaction status"
+    )
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Total before tax")
+    tax_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Tax charged")
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Amount due")
+    cashier = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='pos_transactions',
+        help_text="Cashier who made the sale"
+    )
+    customer = models.ForeignKey(
+        'customers.Customer',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='pos_transactions',
+        help_text="Loyalty customer the sale was rung up for"
+    )
+    is_offline = models.BooleanField(default=False, help_text="Made while the till was offline")
+    occurred_at = models.DateTimeField(default=timezone.now, help_text="When the sale happened at the till")
+
+    class Meta:
+        db_table = 'pos_transactions'
+        ordering = ['-occurred_at']
+        indexes = [
+            models.Index(fields=['session', 'occurred_at']),
+            models.Index(
+                fields=['updated_at'],
+                condition=models.Q(customer__isnull=False),
+                name='pos_txn_customer_updated_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.transaction_number} ({self.total})"
+
+
+class POSTransactionItem(models.Model):
+    """
+    One product line on a till sale.
+    """
+    transaction = models.ForeignKey(
+        POSTransaction,
+        on_delete=models.CASCADE,
+        related_name='items',
+        help_text="Parent transaction"
+    )
+    product = models.ForeignKey(
+        'products.Product',
+        on_delete=models.PROTECT,
+        related_name='pos_items',
+        help_text="Product sold"
+    )
+    quantity = models.PositiveIntegerField(help_text="Units sold")
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2, help_text="Price per unit before tax")
+    tax_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0, help_text="Tax rate in percent")
+    tax_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0, help_text="Tax on the line")
+    line_total = models.DecimalField(max_digits=12, decimal_places=2, help_text="Quantity times unit price")
+    occurred_at = models.DateTimeField(default=timezone.now, help_text="Copy of the sale's; the partition key")
+
+    class Meta:
+        db_table = 'pos_transaction_items'
+
+    def __str__(self) -> str:
+        return f"{self.quantity} x {self.product_id}"
+
+
+class POSPayment(models.Model):
+    """
+    Tender taken for a till sale; split payments have several rows.
+    """
+    METHOD_CASH = 'cash'
+    METHOD_CARD = 'card'
+    METHOD_MOBILE = 'mobile_banking'
+    METHOD_CHOICES = [
+        (METHOD_CASH, 'Cash'),
+        (METHOD_CARD, 'Card'),
+        (METHOD_MOBILE, 'Mobile Banking'),
+    ]
+
+    transaction = models.ForeignKey(
+        POSTransaction,
+        on_delete=models.CASCADE,
+        related_name='payments',
+        help_text="Parent transaction"
+    )
+    method = models.CharField(max_length=20, choices=METHOD_CHOICES, help_text="Tender type")
+    amount = models.DecimalField(max_digits=12, decimal_places=2, help_text="Amount paid with this tender")
+    reference = models.CharField(max_length=100, blank=True, help_text="Card or mobile payment reference")
+
+    class Meta:
+        db_table = 'pos_payments'
+
+    def __str__(self) -> str:
+        return f"{self.get_method_display()} {self.amount}"
+
+
+class POSSessionTotal(models.Model):
+    """
+    Running total for one tender or tax rate within a session.
+
+    Tender rows hold the number of payments and the amount taken; tax rows
+    hold the number of lines, the taxable amount and the tax charged.
+    """
+    KIND_TENDER = 'tender'
+    KIND_TAX = 'tax'
+    KIND_CHOICES = [
+        (KIND_TENDER, 'Tender'),
+        (KIND_TAX, 'Tax rate'),
+    ]
+
+    session = models.ForeignKey(
+        POSSession,
+        on_delete=models.CASCADE,
+        related_name='totals',
+        help_text="Session the total belongs to"
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, help_text="What the total is broken down by")
+    code = models.CharField(max_length=20, help_text="Payment method or tax rate")
+    count = models.IntegerField(default=0, help_text="Payments or lines counted")
+    amount = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0,
+        help_text="Amount tendered, or taxable amount for tax rates"
+    )
+    tax_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Tax charged")
+
+    class Meta:
+        db_table = 'pos_session_totals'
+        ordering = ['kind', 'code']
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'kind', 'code'], name='unique_session_total'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.code}: {self.amount}"
+
+
+class POSCashMovement(models.Model):
+    """
+    Cash paid into or taken out of a till drawer outside a sale.
+    """
+    KIND_PAY_IN = 'pay_in'
+    KIND_PAY_OUT = 'pay_out'
+    KIND_CHOICES = [
+        (KIND_PAY_IN, 'Pay in'),
+        (KIND_PAY_OUT, 'Pay out'),
+    ]
+
+    session = models.ForeignKey(
+        POSSession,
+        on_delete=models.PROTECT,
+        related_name='cash_movements',
+        help_text="Session whose drawer moved"
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, help_text="Direction of the movement")
+    amount = models.DecimalField(max_digits=12, decimal_places=2, help_text="Cash moved")
+    reason = models.CharField(max_length=255, blank=True, help_text="Why the cash moved")
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='pos_cash_movements',
+        help_text="User who moved the cash"
+    )
+    created_at = models.DateTimeField(default=timezone.now, help_text="When the cash moved")
+
+    class Meta:
+        db_table = 'pos_cash_movements'
+        ordering = ['created_at']
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} {self.amount}"
+
+
+class CatalogSnapshot(models.Model):
+    """
+    Pre-built copy of the whole catalog that new tills download first.
+    """
+    version = models.BigIntegerField(db_index=True, help_text="Catalog version the snapshot is complete up to")
+    file = models.FileField(upload_to='catalog/', help_text="Gzip-compressed NDJSON of the catalog")
+    product_count = models.IntegerField(default=0, help_text="Products in the snapshot")
+    size = models.BigIntegerField(default=0, help_text="Compressed size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="When the snapshot was built")
+
+    class Meta:
+        db_table = 'pos_catalog_snapshots'
+        ordering = ['-version']
+
+    def __str__(self) -> str:
+        return f"Catalog snapshot v{self.version}"
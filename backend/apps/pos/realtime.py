@@ -0,0 +1,72 @@
+"""
+Realtime updates pushed to till terminals over ``/ws/pos/{session_id}/``.
+
+Each terminal joins three channel layer groups: the catalog, its branch and
+its session. Publishers send once the change has committed, in chunks of at
+most POS_REALTIME_MAX_FRAME_EVENTS events per message. Every event carries a
+``kind`` and a ``key``; the terminal's consumer keeps only the latest event
+per kind and key and sends what it holds as one frame per flush interval, so
+a burst such as a catalog-wide price change reaches each till as a handful of
+batched frames rather than one message per product.
+"""
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+
+CATALOG_GROUP = 'pos.catalog'
+
+KIND_PRICE = 'price'
+KIND_STOCK = 'stock'
+KIND_SESSION = 'session'
+
+
+def branch_group(warehouse_id):
+    """Group for terminals selling from a branch."""
+    return f'pos.branch.{warehouse_id}'
+
+
+def session_group(session_id):
+    """Group for the terminals attached to one session."""
+    return f'pos.session.{session_id}'
+
+
+def event(kind, key, **data):
+    """Build an event; later events with the same kind and key replace it."""
+    return {'kind': kind, 'key': str(key), 'data': data}
+
+
+def send(group, events):
+    """Send ``events`` to ``group`` now, split into bounded messages."""
+    layer = get_channel_layer()
+    if layer is None or not events:
+        return
+    size = settings.POS_REALTIME_MAX_FRAME_EVENTS
+    for start in range(0, len(events), size):
+        async_to_sync(layer.group_send)(group, {'type': 'pos.events', 'events': events[start:start + size]})
+
+
+def publish(group, events):
+    """
+    Send ``events`` to ``group`` once the surrounding transaction commits.
+
+    Delivery is best effort: a channel layer error is logged and never
+    reaches the change that was committed.
+    """
+    events = list(events)
+    if events:
+        transaction.on_commit(lambda: send(group, events), robust=True)
+
+
+def publish_prices(products):
+    """Announce current selling prices for ``products`` to every terminal."""
+    publish(CATALOG_GROUP, [
+        event(
+            KIND_PRICE,
+            product.pk,
+            selling_price=str(product.selling_price),
+            is_active=product.is_active,
+        )
+        for product in products
+    ])
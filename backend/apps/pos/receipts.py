@@ -0,0 +1,191 @@
+"""
+Receipt rendering for till sales.
+
+A sale's receipt is rendered in two forms: an ESC/POS byte stream for the
+thermal printer and an HTML e-receipt. Both are built from the same plain
+receipt dict. The printer layout is compiled once per paper width into fixed
+byte segments and format strings, and the HTML template is compiled once by
+the template engine, so rendering a receipt is string formatting only.
+
+Rendered receipts are cached by transaction id. Sales are rendered by a
+Celery task after they commit, so printing and reprinting are cache hits;
+a miss renders inline and fills the cache.
+"""
+
+from decimal import Decimal
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import POSTransaction
+
+KIND_ESCPOS = 'escpos'
+KIND_HTML = 'html'
+KINDS = (KIND_ESCPOS, KIND_HTML)
+
+CONTENT_TYPES = {
+    KIND_ESCPOS: 'application/octet-stream',
+    KIND_HTML: 'text/html; charset=utf-8',
+}
+
+ESC = b'\x1b'
+GS = b'\x1d'
+INIT = ESC + b'@'
+ALIGN_LEFT = ESC + b'a\x00'
+ALIGN_CENTER = ESC + b'a\x01'
+BOLD_ON = ESC + b'E\x01'
+BOLD_OFF = ESC + b'E\x00'
+DOUBLE_ON = GS + b'!\x11'
+DOUBLE_OFF = GS + b'!\x00'
+FEED_AND_CUT = GS + b'V\x42\x03'
+
+
+def cache_key(transaction_id, kind):
+    """Cache key for one rendered receipt."""
+    return f'pos:receipt:{kind}:{transaction_id}'
+
+
+def _amount(value):
+    return f'{value:.2f}'
+
+
+def receipt_data(sale_transaction):
+    """
+    Flatten a sale into the values every receipt form prints.
+
+    Expects the session, warehouse and cashier to be selected and the items
+    and payments prefetched, as ``load`` does.
+    """
+    payments = list(sale_transaction.payments.all())
+    cashier = sale_transaction.cashier
+    tendered = sum((payment.amount for payment in payments), Decimal('0'))
+    return {
+        'store': sale_transaction.session.warehouse.name,
+        'terminal': sale_transaction.session.terminal_id,
+        'number': sale_transaction.transaction_number,
+        'occurred_at': timezone.localtime(sale_transaction.occurred_at).strftime('%Y-%m-%d %H:%M'),
+        'cashier': (cashier.get_full_name() or cashier.username) if cashier else '',
+        'voided': sale_transaction.status == POSTransaction.STATUS_VOIDED,
+        'items': [
+            {
+                'name': item.product.name,
+                'quantity': item.quantity,
+                'unit_price': _amount(item.unit_price),
+                'line_total': _amount(item.line_total),
+            }
+            for item in sale_transaction.items.all()
+        ],
+        'subtotal': _amount(sale_transaction.subtotal),
+        'tax': _amount(sale_transaction.tax_amount),
+        'total': _amount(sale_transaction.total),
+        'payments': [
+            {'method': payment.get_method_display(), 'amount': _amount(payment.amount)}
+            for payment in payments
+        ],
+        'change': _amount(max(tendered - sale_transaction.total, Decimal('0'))),
+    }
+
+
+class EscPosLayout:
+    """
+    Printer layout for one paper width and footer, compiled once.
+
+    The fixed command sequences around the variable text are joined into
+    byte segments up front; rendering fills in the text lines only.
+    """
+
+    def __init__(self, width, footer):
+        self.width = width
+        self.rule = b'-' * width + b'\n'
+        self.head = INIT + ALIGN_CENTER + BOLD_ON + DOUBLE_ON
+        self.after_store = b'\n' + DOUBLE_OFF + BOLD_OFF + ALIGN_LEFT
+        self.void = ALIGN_CENTER + BOLD_ON + DOUBLE_ON + b'VOID\n' + DOUBLE_OFF + BOLD_OFF
+        self.tail = ALIGN_CENTER + footer.encode('cp437', 'replace') + b'\n' + FEED_AND_CUT
+
+    def pair(self, label, value):
+        """Left label and right-aligned value on one line."""
+        room = self.width - len(value) - 1
+        return f'{label[:room]:<{room}} {value}\n'
+
+    def text(self, lines):
+        """Encode text lines for the printer's code page."""
+        return ''.join(lines).encode('cp437', 'replace')
+
+    def render(self, data):
+        """Render a receipt dict as an ESC/POS byte stream."""
+        header = [f"Receipt {data['number']}\n", self.pair(data['occurred_at'], f"Till {data['terminal']}")]
+        if data['cashier']:
+            header.append(self.pair('Cashier', data['cashier']))
+        items = []
+        for item in data['items']:
+            items.append(self.pair(item['name'], item['line_total']))
+            if item['quantity'] != 1:
+                items.append(f"  {item['quantity']} x {item['unit_price']}\n")
+        tenders = [self.pair(payment['method'], payment['amount']) for payment in data['payments']]
+        return b''.join([
+            self.head, data['store'].encode('cp437', 'replace'), self.after_store,
+            self.text(header), self.rule,
+            self.text(items), self.rule,
+            self.text([self.pair('Subtotal', data['subtotal']), self.pair('Tax', data['tax'])]),
+            BOLD_ON, self.text([self.pair('TOTAL', data['total'])]), BOLD_OFF,
+            self.text([*tenders, self.pair('Change', data['change'])]),
+            self.void if data['voided'] else b'',
+            self.tail,
+        ])
+
+
+@lru_cache(maxsize=None)
+def escpos_layout(width, footer):
+    """Return the compiled layout for a paper width and footer."""
+    return EscPosLayout(width, footer)
+
+
+def render(sale_transaction, kind):
+    """Render one receipt; returns bytes for ESC/POS and text for HTML."""
+    return render_data(receipt_data(sale_transaction), kind)
+
+
+def render_data(data, kind):
+    """Render a receipt dict in one form."""
+    if kind == KIND_ESCPOS:
+        return escpos_layout(settings.POS_RECEIPT_WIDTH, settings.POS_RECEIPT_FOOTER).render(data)
+    return get_template('pos/receipt.html').render({'receipt': data, 'footer': settings.POS_RECEIPT_FOOTER})
+
+
+def load(transaction_ids):
+    """Sales with everything a receipt prints, in four queries."""
+    return (
+        POSTransaction.objects
+        .filter(pk__in=transaction_ids)
+        .select_related('session__warehouse', 'cashier')
+        .prefetch_related('items__product', 'payments')
+    )
+
+
+def render_many(transaction_ids):
+    """Render every form of each sale's receipt and cache them; returns the count."""
+    rendered = {}
+    for sale_transaction in load(transaction_ids):
+        data = receipt_data(sale_transaction)
+        for kind in KINDS:
+            rendered[cache_key(sale_transaction.pk, kind)] = render_data(data, kind)
+    cache.set_many(rendered, settings.POS_RECEIPT_CACHE_TIMEOUT)
+    return len(rendered) // len(KINDS)
+
+
+def get(sale_transaction, kind):
+    """Return a sale's receipt from the cache, rendering it on a miss."""
+    key = cache_key(sale_transaction.pk, kind)
+    content = cache.get(key)
+    if content is None:
+        content = render(load([sale_transaction.pk]).get(), kind)
+        cache.set(key, content, settings.POS_RECEIPT_CACHE_TIMEOUT)
+    return content
+
+
+def forget(transaction_ids):
+    """Drop cached receipts, e.g. once a sale is voided."""
+    cache.delete_many([cache_key(pk, kind) for pk in transaction_ids for kind in KINDS])
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .consumers import POSSessionConsumer
+
+websocket_urlpatterns = [
+    path('ws/pos/<uuid:session_id>/', POSSessionConsumer.as_asgi()),
+]
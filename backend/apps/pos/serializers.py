@@ -0,0 +1,195 @@
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework import serializers
+
+from apps.inventory.models import Warehouse
+from .models import POSCashMovement, POSPayment, POSSession, POSTransaction, POSTransactionItem
+
+
+class POSSessionSerializer(serializers.ModelSerializer):
+    """Serializer for till sessions"""
+
+    warehouse_code = serializers.CharField(source='warehouse.code', read_only=True)
+
+    class Meta:
+        model = POSSession
+        fields = [
+            'id',
+            'warehouse',
+            'warehouse_code',
+            'terminal_id',
+            'cashier',
+            'status',
+            'opening_float',
+            'opened_at',
+            'closed_at',
+        ]
+        read_only_fields = fields
+
+
+class SessionOpenSerializer(serializers.Serializer):
+    """Serializer for opening a till session"""
+
+    warehouse = serializers.PrimaryKeyRelatedField(queryset=Warehouse.objects.filter(is_active=True))
+    terminal_id = serializers.CharField(max_length=50)
+    opening_float = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0, default=0)
+
+
+class SessionCloseSerializer(serializers.Serializer):
+    """Serializer for closing a till session"""
+
+    session = serializers.PrimaryKeyRelatedField(queryset=POSSession.objects.all())
+    counted_cash = serializers.DecimalField(max_digits=14, decimal_places=2, min_value=0)
+
+
+class POSCashMovementSerializer(serializers.ModelSerializer):
+    """Serializer for cash paid into or out of a drawer"""
+
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.01'))
+
+    class Meta:
+        model = POSCashMovement
+        fields = ['id', 'kind', 'amount', 'reason', 'created_by', 'created_at']
+        read_only_fields = ['id', 'created_by', 'created_at']
+
+
+class TenderTotalSerializer(serializers.Serializer):
+    """Serializer for one tender line of a session report"""
+
+    method = serializers.CharField()
+    count = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class TaxTotalSerializer(serializers.Serializer):
+    """Serializer for one tax rate line of a session report"""
+
+    rate = serializers.CharField()
+    count = serializers.IntegerField()
+    taxable_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+    tax_amount = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class SessionReportSerializer(serializers.Serializer):
+    """Serializer for X- and Z-reports"""
+
+    session = serializers.UUIDField()
+    terminal_id = serializers.CharField()
+    report_type = serializers.CharField()
+    opened_at = serializers.DateTimeField()
+    closed_at = serializers.DateTimeField(allow_null=True)
+    opening_float = serializers.DecimalField(max_digits=12, decimal_places=2)
+    sales_count = serializers.IntegerField()
+    sales_subtotal = serializers.DecimalField(max_digits=14, decimal_places=2)
+    sales_tax = serializers.DecimalField(max_digits=14, decimal_places=2)
+    sales_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    void_count = serializers.IntegerField()
+    void_total = serializers.DecimalField(max_digits=14, decimal_places=2)
+    change_given = serializers.DecimalField(max_digits=14, decimal_places=2)
+    cash_in = serializers.DecimalField(max_digits=14, decimal_places=2)
+    cash_out = serializers.DecimalField(max_digits=14, decimal_places=2)
+    expected_cash = serializers.DecimalField(max_digits=14, decimal_places=2)
+    counted_cash = serializers.DecimalField(max_digits=14, decimal_places=2, allow_null=True)
+    cash_variance = serializers.DecimalField(max_digits=14, decimal_places=2, allow_null=True)
+    tenders = TenderTotalSerializer(many=True)
+    tax_rates = TaxTotalSerializer(many=True)
+
+
+class SaleItemSerializer(serializers.Serializer):
+    """Serializer for one line of a till sale"""
+
+    product = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1)
+    unit_price = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0)
+    tax_rate = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=0, default=0)
+
+
+class SalePaymentSerializer(serializers.Serializer):
+    """Serializer for one tender of a till sale"""
+
+    method = serializers.ChoiceField(choices=POSPayment.METHOD_CHOICES)
+    amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=0)
+    reference = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+
+
+class SaleSerializer(serializers.Serializer):
+    """Serializer for a till sale identified by a client idempotency key"""
+
+    idempotency_key = serializers.CharField(max_length=64)
+    occurred_at = serializers.DateTimeField(required=False)
+    customer = serializers.UUIDField(required=False, allow_null=True)
+    items = SaleItemSerializer(many=True, allow_empty=False)
+    payments = SalePaymentSerializer(many=True, required=False, default=list)
+
+
+class CounterItemSerializer(serializers.Serializer):
+    """Serializer for one line of a sale rung up online; price and tax come from the catalog"""
+
+    product = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1)
+    tax_rate = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=0, required=False)
+
+
+class CounterSaleSerializer(serializers.Serializer):
+    """Serializer for a sale committed while the till is online"""
+
+    session = serializers.PrimaryKeyRelatedField(queryset=POSSession.objects.select_related('warehouse'))
+    idempotency_key = serializers.CharField(max_length=64)
+    customer = serializers.UUIDField(required=False, allow_null=True)
+    items = CounterItemSerializer(many=True, allow_empty=False)
+    payments = SalePaymentSerializer(many=True, allow_empty=False)
+
+
+class SyncSerializer(serializers.Serializer):
+    """Serializer for a batch of queued sales; sales are validated one by one"""
+
+    session = serializers.PrimaryKeyRelatedField(queryset=POSSession.objects.select_related('warehouse'))
+    transactions = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+        max_length=settings.POS_SYNC_MAX_TRANSACTIONS,
+    )
+
+
+class SyncResultSerializer(serializers.Serializer):
+    """Serializer for the outcome of one synced sale"""
+
+    idempotency_key = serializers.CharField()
+    status = serializers.CharField()
+    transaction_id = serializers.UUIDField(required=False, allow_null=True)
+    transaction_number = serializers.CharField(required=False)
+    errors = serializers.DictField(required=False)
+
+
+class POSTransactionItemSerializer(serializers.ModelSerializer):
+    """Serializer for sale lines"""
+
+    class Meta:
+        model = POSTransactionItem
+        fields = ['id', 'product', 'quantity', 'unit_price', 'tax_rate', 'tax_amount', 'line_total']
+        read_only_fields = fields
+
+
+class POSTransactionSerializer(serializers.ModelSerializer):
+    """Serializer for till sales with their lines"""
+
+    items = POSTransactionItemSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = POSTransaction
+        fields = [
+            'id',
+            'session',
+            'transaction_number',
+            'idempotency_key',
+            'status',
+            'subtotal',
+            'tax_amount',
+            'total',
+            'customer',
+            'is_offline',
+            'occurred_at',
+            'items',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,693 @@
+"""
+Business logic for point of sale.
+"""
+
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, DecimalField, F, IntegerField, Q, Sum, Value, When
+from django.utils import timezone
+
+from apps.customers.models import Customer
+from apps.customers.services import LoyaltyService
+from apps.inventory.models import StockMovement
+from apps.inventory.services import StockLotService, StockService
+from apps.products.models import Product
+from core.exceptions import InvalidOperationError
+from core.numbering import NumberAllocator
+from core.partitioning import guard_keys
+from . import realtime, receipts
+from .models import (
+    POSCashMovement, POSPayment, POSSession, POSSessionTotal, POSTransaction, POSTransactionItem,
+)
+from .tasks import render_receipts
+
+CENT = Decimal('0.01')
+
+RECEIPT_NUMBERS = NumberAllocator('pos', 'POS')
+
+
+def _money(value):
+    """Round to whole cents."""
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def _rate_code(rate):
+    """Key a tax rate the same way whichever path recorded it."""
+    return f'{Decimal(rate):.2f}'
+
+
+def _prerender_receipts(transaction_ids):
+    """Have a worker render the receipts once the sales commit; a broker error only costs the cache."""
+    transaction_ids = [str(pk) for pk in transaction_ids]
+    if transaction_ids and settings.POS_RECEIPT_PRERENDER:
+        transaction.on_commit(lambda: render_receipts.delay(transaction_ids), robust=True)
+
+
+def _queue_points(sale_transactions, void=False):
+    """Queue the loyalty points of sales rung up for a customer, or take them back for voids."""
+    LoyaltyService.enqueue(
+        (
+            sale_transaction.customer_id,
+            LoyaltyService.points_for(sale_transaction.total) * (-1 if void else 1),
+            f"{'VOID-' if void else ''}{sale_transaction.transaction_number}",
+        )
+        for sale_transaction in sale_transactions
+    )
+
+
+class POSSessionService:
+    """
+    Opening and closing till sessions.
+    """
+
+    @staticmethod
+    def open(warehouse, terminal_id, cashier, opening_float=0):
+        """
+        Open a session on a till.
+
+        Raises:
+            InvalidOperationError: The till already has an open session
+        """
+        if POSSession.objects.filter(terminal_id=terminal_id, status=POSSession.STATUS_OPEN).exists():
+            raise InvalidOperationError(f'Terminal {terminal_id} already has an open session.')
+        return POSSession.objects.create(
+            warehouse=warehouse,
+            terminal_id=terminal_id,
+            cashier=cashier,
+            opening_float=opening_float,
+        )
+
+    @staticmethod
+    def record_sales(session, sales, sign=1):
+        """
+        Fold stored sales into the session's running totals.
+
+        One UPDATE of the session row, then one insert and one UPDATE of its
+        tender and tax rows, however many sales and lines are folded in. The
+        session row only matches while it is open, so a sale racing the close
+        is rolled back instead of landing after the Z-report.
+
+        Args:
+            sales: Iterable of ``(transaction, items, payments)`` as built by
+                ``POSTransactionService.build``
+            sign: ``-1`` takes voided sales back out and counts the void
+
+        Raises:
+            InvalidOperationError: The session is closed
+        """
+        count = 0
+        subtotal = tax = total = change = Decimal('0')
+        breakdown = defaultdict(lambda: [0, Decimal('0'), Decimal('0')])
+        for sale_transaction, items, payments in sales:
+            count += 1
+            subtotal += sale_transaction.subtotal
+            tax += sale_transaction.tax_amount
+            total += sale_transaction.total
+            paid = sum((Decimal(payment.amount) for payment in payments), Decimal('0'))
+            change += max(paid - sale_transaction.total, Decimal('0'))
+            for payment in payments:
+                row = breakdown[(POSSessionTotal.KIND_TENDER, payment.method)]
+                row[0] += 1
+                row[1] += Decimal(payment.amount)
+            for item in items:
+                row = breakdown[(POSSessionTotal.KIND_TAX, _rate_code(item.tax_rate))]
+                row[0] += 1
+                row[1] += item.line_total
+                row[2] += item.tax_amount
+        if not count:
+            return
+
+        changes = {
+            'sales_count': F('sales_count') + sign * count,
+            'sales_subtotal': F('sales_subtotal') + sign * subtotal,
+            'sales_tax': F('sales_tax') + sign * tax,
+            'sales_total': F('sales_total') + sign * total,
+            'change_given': F('change_given') + sign * change,
+        }
+        if sign < 0:
+            changes.update(void_count=F('void_count') + count, void_total=F('void_total') + total)
+        updated = (
+            POSSession.objects
+            .filter(pk=session.pk, status=POSSession.STATUS_OPEN)
+            .update(**changes, updated_at=timezone.now())
+        )
+        if not updated:
+            raise InvalidOperationError('Session is closed.')
+
+        POSSessionTotal.objects.bulk_create(
+            [POSSessionTotal(session_id=session.pk, kind=kind, code=code) for kind, code in breakdown],
+            ignore_conflicts=True,
+        )
+        rows = Q()
+        for kind in (POSSessionTotal.KIND_TENDER, POSSessionTotal.KIND_TAX):
+            codes = [code for row_kind, code in breakdown if row_kind == kind]
+            if codes:
+                rows |= Q(kind=kind, code__in=codes)
+        POSSessionTotal.objects.filter(rows, session_id=session.pk).update(**{
+            field: F(field) + Case(
+                *[
+                    When(kind=kind, code=code, then=Value(sign * values[position]))
+                    for (kind, code), values in breakdown.items()
+                ],
+                default=Value(0),
+                output_field=output_field,
+            )
+            for position, (field, output_field) in enumerate((
+                ('count', IntegerField()),
+                ('amount', DecimalField(max_digits=14, decimal_places=2)),
+                ('tax_amount', DecimalField(max_digits=14, decimal_places=2)),
+            ))
+        })
+
+    @staticmethod
+    def move_cash(session, kind, amount, reason='', user=None):
+        """
+        Record cash paid into or taken out of the drawer.
+
+        Raises:
+            InvalidOperationError: The session is closed
+        """
+        field = 'cash_in' if kind == POSCashMovement.KIND_PAY_IN else 'cash_out'
+        with transaction.atomic():
+            updated = (
+                POSSession.objects
+                .filter(pk=session.pk, status=POSSession.STATUS_OPEN)
+                .update(**{field: F(field) + amount}, updated_at=timezone.now())
+            )
+            if not updated:
+                raise InvalidOperationError('Session is closed.')
+            movement = POSCashMovement.objects.create(
+                session=session,
+                kind=kind,
+                amount=amount,
+                reason=reason,
+                created_by=user,
+            )
+            realtime.publish(realtime.session_group(session.pk), [realtime.event(
+                realtime.KIND_SESSION,
+                f'cash:{movement.pk}',
+                event=kind,
+                amount=str(amount),
+            )])
+        return movement
+
+    @staticmethod
+    def close(session, counted_cash):
+        """
+        Close a session with the cash counted in the drawer.
+
+        Only the session row is touched; the Z-report is read from the
+        running totals.
+
+        Raises:
+            InvalidOperationError: The session is already closed
+        """
+        with transaction.atomic():
+            session = POSSession.objects.select_for_update().get(pk=session.pk)
+            if session.status != POSSession.STATUS_OPEN:
+                raise InvalidOperationError('Session is already closed.')
+            session.status = POSSession.STATUS_CLOSED
+            session.closed_at = timezone.now()
+            session.counted_cash = counted_cash
+            session.save(update_fields=['status', 'closed_at', 'counted_cash', 'updated_at'])
+            realtime.publish(realtime.session_group(session.pk), [realtime.event(
+                realtime.KIND_SESSION,
+                'status',
+                event='closed',
+                closed_at=session.closed_at.isoformat(),
+            )])
+        return session
+
+    @staticmethod
+    def report(session):
+        """
+        X-report for an open session, Z-report for a closed one.
+
+        Reads the session row and its tender and tax rows only.
+        """
+        totals = list(session.totals.all())
+        cash_taken = sum(
+            (row.amount for row in totals
+             if row.kind == POSSessionTotal.KIND_TENDER and row.code == POSPayment.METHOD_CASH),
+            Decimal('0'),
+        )
+        expected_cash = session.opening_float + cash_taken - session.change_given + session.cash_in - session.cash_out
+        return {
+            'session': session.pk,
+            'terminal_id': session.terminal_id,
+            'report_type': 'Z' if session.status == POSSession.STATUS_CLOSED else 'X',
+            'opened_at': session.opened_at,
+            'closed_at': session.closed_at,
+            'opening_float': session.opening_float,
+            'sales_count': session.sales_count,
+            'sales_subtotal': session.sales_subtotal,
+            'sales_tax': session.sales_tax,
+            'sales_total': session.sales_total,
+            'void_count': session.void_count,
+            'void_total': session.void_total,
+            'change_given': session.change_given,
+            'cash_in': session.cash_in,
+            'cash_out': session.cash_out,
+            'expected_cash': expected_cash,
+            'counted_cash': session.counted_cash,
+            'cash_variance': None if session.counted_cash is None else session.counted_cash - expected_cash,
+            'tenders': [
+                {'method': row.code, 'count': row.count, 'amount': row.amount}
+                for row in totals if row.kind == POSSessionTotal.KIND_TENDER
+            ],
+            'tax_rates': [
+                {'rate': row.code, 'count': row.count, 'taxable_amount': row.amount, 'tax_amount': row.tax_amount}
+                for row in totals if row.kind == POSSessionTotal.KIND_TAX
+            ],
+        }
+
+    @staticmethod
+    def recompute(session):
+        """
+        Session totals recomputed from its transactions, payments and cash movements.
+
+        Returns:
+            Tuple of a dict of session-level figures and a dict mapping
+            ``(kind, code)`` to ``(count, amount, tax_amount)``
+        """
+        sales = POSTransaction.objects.filter(session=session)
+        completed = sales.filter(status=POSTransaction.STATUS_COMPLETED)
+        figures = completed.aggregate(
+            sales_count=Count('pk'),
+            sales_subtotal=Sum('subtotal'),
+            sales_tax=Sum('tax_amount'),
+            sales_total=Sum('total'),
+        )
+        figures.update(sales.filter(status=POSTransaction.STATUS_VOIDED).aggregate(
+            void_count=Count('pk'),
+            void_total=Sum('total'),
+        ))
+        payments = POSPayment.objects.filter(transaction__in=completed)
+        paid = dict(
+            payments.values('transaction_id').annotate(paid=Sum('amount')).values_list('transaction_id', 'paid')
+        )
+        figures['change_given'] = sum(
+            (max(paid.get(pk, Decimal('0')) - total, Decimal('0')) for pk, total in completed.values_list('pk', 'total')),
+            Decimal('0'),
+        )
+        cash = dict(session.cash_movements.values('kind').annotate(total=Sum('amount')).values_list('kind', 'total'))
+        figures['cash_in'] = cash.get(POSCashMovement.KIND_PAY_IN)
+        figures['cash_out'] = cash.get(POSCashMovement.KIND_PAY_OUT)
+        figures = {field: value or 0 for field, value in figures.items()}
+
+        totals = {}
+        for method, count, amount in (
+            payments.values('method').annotate(count=Count('pk'), total=Sum('amount'))
+            .values_list('method', 'count', 'total').order_by()
+        ):
+            totals[(POSSessionTotal.KIND_TENDER, method)] = (count, amount, Decimal('0'))
+        for rate, count, amount, tax in (
+            POSTransactionItem.objects.filter(transaction__in=completed)
+            .values('tax_rate').annotate(count=Count('pk'), base=Sum('line_total'), tax=Sum('tax_amount'))
+            .values_list('tax_rate', 'count', 'base', 'tax').order_by()
+        ):
+            key = (POSSessionTotal.KIND_TAX, _rate_code(rate))
+            previous = totals.get(key, (0, Decimal('0'), Decimal('0')))
+            totals[key] = (previous[0] + count, previous[1] + amount, previous[2] + tax)
+        return figures, totals
+
+    @staticmethod
+    def verify(session):
+        """
+        Running totals that disagree with a full recompute.
+
+        Returns:
+            List of ``{'field', 'recorded', 'actual'}`` dicts; empty when
+            everything agrees
+        """
+        session = POSSession.objects.get(pk=session.pk)
+        figures, totals = POSSessionService.recompute(session)
+        mismatches = [
+            {'field': field, 'recorded': getattr(session, field), 'actual': actual}
+            for field, actual in figures.items()
+            if _money(getattr(session, field)) != _money(actual)
+        ]
+        recorded = {
+            (row.kind, row.code): (row.count, row.amount, row.tax_amount)
+            for row in session.totals.all()
+        }
+        empty = (0, Decimal('0'), Decimal('0'))
+        for key in sorted(set(recorded) | set(totals)):
+            stored, actual = recorded.get(key, empty), totals.get(key, empty)
+            if stored[0] != actual[0] or any(_money(a) != _money(b) for a, b in zip(stored[1:], actual[1:])):
+                mismatches.append({'field': ':'.join(key), 'recorded': stored, 'actual': actual})
+        return mismatches
+
+
+class POSTransactionService:
+    """
+    Recording till sales.
+    """
+
+    RESULT_CREATED = 'created'
+    RESULT_DUPLICATE = 'duplicate'
+    RESULT_REJECTED = 'rejected'
+
+    @staticmethod
+    def generate_transaction_number(session, count=None):
+        """Return a new receipt number for the session's branch, or a list of ``count``."""
+        numbers = RECEIPT_NUMBERS.allocate(session.warehouse.code, count or 1)
+        return numbers if count is not None else numbers[0]
+
+    @staticmethod
+    def build(session, sale, cashier=None, is_offline=False, transaction_number=None):
+        """
+        Price a validated sale into unsaved transaction, item and payment rows.
+
+        Args:
+            sale: Dict with ``idempotency_key``, ``items`` (``product``,
+                ``quantity``, ``unit_price``, ``tax_rate``), ``payments``
+                (``method``, ``amount``, ``reference``) and optionally
+                ``occurred_at`` and ``customer``
+            transaction_number: Receipt number; allocated if omitted
+
+        Returns:
+            Tuple of ``(transaction, items, payments)``
+        """
+        sale_transaction = POSTransaction(
+            session=session,
+            transaction_number=transaction_number or POSTransactionService.generate_transaction_number(session),
+            idempotency_key=sale['idempotency_key'],
+            cashier=cashier,
+            customer_id=sale.get('customer'),
+            is_offline=is_offline,
+            occurred_at=sale.get('occurred_at') or timezone.now(),
+        )
+        items = []
+        for line in sale['items']:
+            line_total = _money(line['unit_price'] * line['quantity'])
+            tax_rate = line.get('tax_rate') or Decimal('0')
+            items.append(POSTransactionItem(
+                transaction=sale_transaction,
+                product_id=line['product'],
+                quantity=line['quantity'],
+                unit_price=line['unit_price'],
+                tax_rate=tax_rate,
+                tax_amount=_money(line_total * tax_rate / 100),
+                line_total=line_total,
+                occurred_at=sale_transaction.occurred_at,
+            ))
+        sale_transaction.subtotal = sum((item.line_total for item in items), Decimal('0'))
+        sale_transaction.tax_amount = sum((item.tax_amount for item in items), Decimal('0'))
+        sale_transaction.total = sale_transaction.subtotal + sale_transaction.tax_amount
+        payments = [
+            POSPayment(
+                transaction=sale_transaction,
+                method=payment['method'],
+                amount=payment['amount'],
+                reference=payment.get('reference', ''),
+            )
+            for payment in sale.get('payments', [])
+        ]
+        return sale_transaction, items, payments
+
+    @staticmethod
+    def complete_sale(session, sale, cashier=None):
+        """
+        Commit a till sale in a constant number of statements.
+
+        Prices and tax rates are read for the whole basket at once, the
+        transaction, its items and its payments are inserted with one
+        statement each, and stock for every line is decremented by
+        StockService's single conditional multi-row UPDATE. A retried sale
+        with a known idempotency key returns the stored transaction.
+
+        Args:
+            session: Open POSSession the sale is made in
+            sale: Dict with ``idempotency_key``, ``items`` (``product``,
+                ``quantity``, optional ``tax_rate`` overriding the product's)
+                and ``payments``
+
+        Returns:
+            Tuple of the POSTransaction and whether it was created
+
+        Raises:
+            InsufficientStockError: A line exceeds unreserved stock
+            InvalidOperationError: Closed session, unknown product or
+                payments short of the total
+        """
+        if session.status != POSSession.STATUS_OPEN:
+            raise InvalidOperationError('Session is closed.')
+        # Taken before the transaction opens so the worker can keep its number block
+        transaction_number = POSTransactionService.generate_transaction_number(session)
+        try:
+            with transaction.atomic():
+                if guard_keys('pos', [sale['idempotency_key']]):
+                    existing = POSTransaction.objects.filter(idempotency_key=sale['idempotency_key']).first()
+                    if existing is not None:
+                        return existing, False
+                prices = {
+                    pk: (price, tax_rate)
+                    for pk, price, tax_rate in Product.objects
+                    .filter(pk__in={line['product'] for line in sale['items']}, is_active=True, is_deleted=False)
+                    .values_list('pk', 'selling_price', 'tax_rate')
+                }
+                if any(line['product'] not in prices for line in sale['items']):
+                    raise InvalidOperationError('Unknown or inactive product in sale.')
+                if sale.get('customer') and not Customer.objects.filter(pk=sale['customer']).exists():
+                    raise InvalidOperationError('Unknown customer.')
+                sale_transaction, items, payments = POSTransactionService.build(
+                    session,
+                    {
+                        **sale,
+                        'items': [
+                            {
+                                'tax_rate': prices[line['product']][1],
+                                **line,
+                                'unit_price': prices[line['product']][0],
+                            }
+                            for line in sale['items']
+                        ],
+                    },
+                    cashier=cashier,
+                    transaction_number=transaction_number,
+                )
+                if sum((payment.amount for payment in payments), Decimal('0')) < sale_transaction.total:
+                    raise InvalidOperationError(f'Payments do not cover the total of {sale_transaction.total}.')
+
+                sale_transaction.save(force_insert=True)
+                POSTransactionItem.objects.bulk_create(items)
+                POSPayment.objects.bulk_create(payments)
+                POSSessionService.record_sales(session, [(sale_transaction, items, payments)])
+                POSTransactionService._deduct_stock(session, items, sale_transaction.transaction_number, cashier)
+                _queue_points([sale_transaction])
+                _prerender_receipts([sale_transaction.pk])
+        except IntegrityError:
+            existing = POSTransaction.objects.filter(idempotency_key=sale['idempotency_key']).first()
+            if existing is None:
+                raise
+            return existing, False
+        return sale_transaction, True
+
+    @staticmethod
+    def void(sale_transaction, user=None):
+        """
+        Void a completed sale while its session is open.
+
+        The sold units are returned to stock and to the lots they were drawn
+        from, and the sale is taken out of the session's running totals and
+        counted as a void.
+
+        Cached receipts are dropped once the void commits; a cache error is
+        logged and the re-rendered receipts overwrite the stale ones.
+
+        Raises:
+            InvalidOperationError: Already voided, or the session is closed
+        """
+        with transaction.atomic():
+            sale_transaction = (
+                POSTransaction.objects.select_for_update().select_related('session').get(pk=sale_transaction.pk)
+            )
+            if sale_transaction.status != POSTransaction.STATUS_COMPLETED:
+                raise InvalidOperationError('Only completed sales can be voided.')
+            items = list(sale_transaction.items.all())
+            payments = list(sale_transaction.payments.all())
+            sale_transaction.status = POSTransaction.STATUS_VOIDED
+            sale_transaction.save(update_fields=['status', 'updated_at'])
+            session = sale_transaction.session
+            POSSessionService.record_sales(session, [(sale_transaction, items, payments)], sign=-1)
+
+            returned = defaultdict(int)
+            for item in items:
+                returned[item.product_id] += item.quantity
+            StockService.apply_movements(
+                [
+                    (product_id, session.warehouse_id, StockMovement.TYPE_RETURN, quantity)
+                    for product_id, quantity in returned.items()
+                ],
+                reference=f'VOID-{sale_transaction.transaction_number}',
+                user=user,
+            )
+            StockLotService.restore([sale_transaction.transaction_number])
+            realtime.publish(realtime.session_group(session.pk), [realtime.event(
+                realtime.KIND_SESSION,
+                f'void:{sale_transaction.pk}',
+                event='voided',
+                transaction_number=sale_transaction.transaction_number,
+                total=str(sale_transaction.total),
+            )])
+            _queue_points([sale_transaction], void=True)
+            transaction.on_commit(lambda: receipts.forget([sale_transaction.pk]), robust=True)
+            _prerender_receipts([sale_transaction.pk])
+        return sale_transaction
+
+    @staticmethod
+    def _deduct_stock(session, items, reference, cashier=None, allow_negative=False):
+        """
+        Take sold units from the session's branch, one ledger entry per SKU.
+
+        Lots are allocated per sale under its transaction number, so a void
+        can put them back.
+        """
+        sold = defaultdict(int)
+        drawn = defaultdict(int)
+        for item in items:
+            sold[item.product_id] += item.quantity
+            drawn[(item.product_id, item.transaction.transaction_number)] += item.quantity
+        StockService.apply_movements(
+            [
+                (product_id, session.warehouse_id, StockMovement.TYPE_SALE, -quantity)
+                for product_id, quantity in sold.items()
+            ],
+            reference=reference,
+            user=cashier,
+            allow_negative=allow_negative,
+        )
+        StockLotService.allocate([
+            (product_id, session.warehouse_id, quantity, transaction_number)
+            for (product_id, transaction_number), quantity in drawn.items()
+        ])
+
+    @staticmethod
+    def sync_batch(session, sales, cashier=None):
+        """
+        Ingest sales queued by a till while it was offline.
+
+        Sales whose idempotency key was already stored, or appears earlier
+        in the batch, are reported as duplicates and skipped. The rest are
+        inserted with one bulk insert per table, and stock is decremented
+        with one ledger entry per SKU for the whole batch. Offline sales have
+        already left the shop, so stock is allowed to go negative.
+
+        Args:
+            session: Open POSSession the till synced from
+            sales: List of validated sale dicts (see ``build``); invalid
+                sales may be passed as ``{'idempotency_key': ..., 'errors': ...}``
+
+        Returns:
+            One result dict per sale, in input order, with ``idempotency_key``,
+            ``status`` and, for stored sales, ``transaction_id`` and
+            ``transaction_number``
+
+        Raises:
+            InvalidOperationError: The session is closed
+        """
+        if session.status != POSSession.STATUS_OPEN:
+            raise InvalidOperationError('Cannot sync into a closed session.')
+
+        keys = [sale['idempotency_key'] for sale in sales]
+        stored = dict(
+            POSTransaction.objects
+            .filter(idempotency_key__in=keys)
+            .values_list('idempotency_key', 'pk')
+        )
+        known_products = set(
+            Product.objects
+            .filter(pk__in={line['product'] for sale in sales for line in sale.get('items', [])})
+            .values_list('pk', flat=True)
+        )
+        known_customers = set(
+            Customer.objects
+            .filter(pk__in={sale['customer'] for sale in sales if sale.get('customer')})
+            .values_list('pk', flat=True)
+        )
+
+        results, pending, seen = [], {}, set()
+        for sale in sales:
+            key = sale['idempotency_key']
+            errors = sale.get('errors')
+            if not errors and (key in stored or key in seen):
+                results.append({'idempotency_key': key, 'status': POSTransactionService.RESULT_DUPLICATE})
+                continue
+            if not errors and any(line['product'] not in known_products for line in sale['items']):
+                errors = {'items': ['Unknown product.']}
+            if not errors and sale.get('customer') and sale['customer'] not in known_customers:
+                errors = {'customer': ['Unknown customer.']}
+            if errors:
+                results.append({
+                    'idempotency_key': key,
+                    'status': POSTransactionService.RESULT_REJECTED,
+                    'errors': errors,
+                })
+                continue
+            seen.add(key)
+            pending[key] = sale
+            results.append({'idempotency_key': key, 'status': POSTransactionService.RESULT_CREATED})
+        numbers = POSTransactionService.generate_transaction_number(session, count=len(pending)) if pending else []
+        pending = {
+            key: POSTransactionService.build(session, sale, cashier=cashier, is_offline=True, transaction_number=number)
+            for (key, sale), number in zip(pending.items(), numbers)
+        }
+
+        with transaction.atomic():
+            if guard_keys('pos', list(pending)):
+                stored.update(
+                    POSTransaction.objects
+                    .filter(idempotency_key__in=list(pending))
+                    .values_list('idempotency_key', 'pk')
+                )
+            POSTransaction.objects.bulk_create(
+                [sale_transaction for key, (sale_transaction, _, _) in pending.items() if key not in stored],
+                batch_size=1000,
+                ignore_conflicts=True,
+            )
+            # A concurrent sync of the same queue may have won some keys
+            stored.update(
+                POSTransaction.objects
+                .filter(idempotency_key__in=list(pending))
+                .values_list('idempotency_key', 'pk')
+            )
+            created = {
+                key: sale for key, sale in pending.items()
+                if stored[key] == sale[0].pk
+            }
+            POSTransactionItem.objects.bulk_create(
+                [item for _, items, _ in created.values() for item in items],
+                batch_size=1000,
+            )
+            POSPayment.objects.bulk_create(
+                [payment for _, _, payments in created.values() for payment in payments],
+                batch_size=1000,
+            )
+            POSSessionService.record_sales(session, created.values())
+            POSTransactionService._deduct_stock(
+                session,
+                [item for _, items, _ in created.values() for item in items],
+                f'SYNC-{session.terminal_id}-{timezone.now():%Y%m%d%H%M%S}',
+                cashier,
+                allow_negative=True,
+            )
+            _queue_points(sale[0] for sale in created.values())
+            _prerender_receipts(sale[0].pk for sale in created.values())
+
+        for result in results:
+            key = result['idempotency_key']
+            if result['status'] != POSTransactionService.RESULT_CREATED:
+                if result['status'] == POSTransactionService.RESULT_DUPLICATE:
+                    result['transaction_id'] = stored[key]
+                continue
+            if key in created:
+                sale_transaction = created[key][0]
+                result['transaction_id'] = sale_transaction.pk
+                result['transaction_number'] = sale_transaction.transaction_number
+            else:
+                result.update(status=POSTransactionService.RESULT_DUPLICATE, transaction_id=stored[key])
+        return results
@@ -0,0 +1,38 @@
+"""
+Signal receivers that feed the POS realtime channel.
+"""
+
+from collections import defaultdict
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.inventory.signals import stock_availability_changed
+from apps.products.models import Product
+from . import realtime
+
+
+@receiver(post_save, sender=Product)
+def announce_price(sender, instance, update_fields=None, **kwargs):
+    """
+    Push a product's price to the tills when its price or status may have changed.
+    """
+    if update_fields is None or {'selling_price', 'is_active'} & set(update_fields):
+        realtime.publish_prices([instance])
+
+
+@receiver(stock_availability_changed)
+def announce_stock_outs(sender, changes, **kwargs):
+    """
+    Push stock-out flags to the tills of each affected branch.
+    """
+    branches = defaultdict(list)
+    for change in changes:
+        branches[change['warehouse_id']].append(realtime.event(
+            realtime.KIND_STOCK,
+            change['product_id'],
+            available=change['available'],
+            out_of_stock=change['out_of_stock'],
+        ))
+    for warehouse_id, events in branches.items():
+        realtime.publish(realtime.branch_group(warehouse_id), events)
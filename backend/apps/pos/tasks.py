@@ -0,0 +1,20 @@
+"""
+Celery tasks for the pos app.
+"""
+
+from celery import shared_task
+
+from . import catalog, receipts
+
+
+@shared_task
+def build_catalog_snapshot():
+    """Pre-build the catalog snapshot new tills download first."""
+    snapshot = catalog.build_snapshot()
+    return snapshot.version
+
+
+@shared_task
+def render_receipts(transaction_ids):
+    """Render and cache receipts for committed sales before they are printed."""
+    return receipts.render_many(transaction_ids)
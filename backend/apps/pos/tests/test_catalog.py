@@ -0,0 +1,114 @@
+import gzip
+import json
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from apps.pos import catalog
+from apps.pos.models import CatalogSnapshot
+from apps.products.models import CatalogCounter, Product
+
+
+def lines(payload):
+    """Split an NDJSON payload into the header and product rows"""
+    header, *rows = [json.loads(line) for line in payload.decode().splitlines()]
+    return header, rows
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    """Keep snapshot files out of the project's media directory"""
+    settings.MEDIA_ROOT = tmp_path
+
+
+@pytest.mark.django_db
+class TestCatalogVersion:
+    """Test every catalog change is stamped with a new version"""
+
+    def test_writes_bump_version(self, create_product):
+        """Test save, update, bulk_create and bulk_update each take a newer version"""
+        product = create_product()
+        seen = [product.catalog_version]
+
+        product.selling_price = Decimal('11.00')
+        product.save(update_fields=['selling_price'])
+        seen.append(Product.objects.get(pk=product.pk).catalog_version)
+        Product.objects.filter(pk=product.pk).update(tax_rate=Decimal('5.00'))
+        seen.append(Product.objects.get(pk=product.pk).catalog_version)
+        [created] = Product.objects.bulk_create([Product(name='Rice', sku='RICE-1', selling_price=3)])
+        seen.append(created.catalog_version)
+        product.barcode = '123'
+        Product.objects.bulk_update([product], ['barcode'])
+        seen.append(Product.objects.get(pk=product.pk).catalog_version)
+
+        assert seen == sorted(set(seen))
+        assert seen[-1] == CatalogCounter.current()
+
+    def test_other_fields_keep_version(self, create_product):
+        """Test cost price changes do not send the product to the tills"""
+        product = create_product()
+
+        Product.objects.filter(pk=product.pk).update(cost_price=Decimal('4.00'))
+        product.cost_price = Decimal('5.00')
+        product.save(update_fields=['cost_price'])
+
+        assert Product.objects.get(pk=product.pk).catalog_version == product.catalog_version
+
+
+@pytest.mark.django_db
+class TestCatalogAPI:
+    """Test the change feed and snapshot download"""
+
+    def test_changes_since_version(self, client_for, create_user, create_product):
+        """Test only products changed after the till's version are sent"""
+        old = create_product(sku='OLD-1')
+        since = CatalogCounter.current()
+        changed = create_product(sku='NEW-1')
+        Product.objects.filter(pk=old.pk).update(is_deleted=True)
+        client = client_for(create_user(role='cashier'))
+
+        response = client.get(reverse('pos:catalog-changes'), {'since': since}, HTTP_ACCEPT_ENCODING='gzip')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Encoding'] == 'gzip'
+        header, rows = lines(gzip.decompress(b''.join(response.streaming_content)))
+        assert header['since'] == since
+        assert header['version'] == int(response['X-Catalog-Version']) == CatalogCounter.current()
+        assert [(row['sku'], row['is_deleted']) for row in rows] == [('NEW-1', False), ('OLD-1', True)]
+        assert rows[0]['id'] == str(changed.pk)
+        assert rows[0]['selling_price'] == '10.00'
+
+        caught_up = client.get(reverse('pos:catalog-changes'), {'since': header['version']})
+        assert lines(b''.join(caught_up.streaming_content))[1] == []
+
+    def test_snapshot_then_changes(self, client_for, create_user, create_product, media):
+        """Test a new till loads the snapshot and catches up from its version"""
+        client = client_for(create_user(role='cashier'))
+        assert client.get(reverse('pos:catalog-snapshot')).status_code == status.HTTP_404_NOT_FOUND
+        create_product(sku='KEEP-1')
+        create_product(sku='GONE-1', is_deleted=True)
+        snapshot = catalog.build_snapshot()
+        assert catalog.build_snapshot() == snapshot
+        create_product(sku='LATE-1')
+
+        response = client.get(reverse('pos:catalog-snapshot'))
+
+        payload = gzip.decompress(b''.join(response.streaming_content))
+        header, rows = lines(payload)
+        assert response['Content-Encoding'] == 'gzip'
+        assert [row['sku'] for row in rows] == ['KEEP-1']
+        assert snapshot.product_count == 1
+        changes = client.get(reverse('pos:catalog-changes'), {'since': header['version']})
+        assert [row['sku'] for row in lines(b''.join(changes.streaming_content))[1]] == ['LATE-1']
+
+    def test_old_snapshots_are_pruned(self, create_product, settings, media):
+        """Test only the newest snapshots are kept"""
+        settings.CATALOG_SNAPSHOTS_KEPT = 2
+        for n in range(3):
+            create_product(sku=f'SNAP-{n}')
+            catalog.build_snapshot()
+
+        assert CatalogSnapshot.objects.count() == 2
+        assert list(CatalogSnapshot.objects.values_list('product_count', flat=True)) == [3, 2]
@@ -0,0 +1,114 @@
+import uuid
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from apps.inventory.models import Stock, StockMovement
+from apps.pos.models import POSPayment, POSTransaction
+from apps.pos.services import POSTransactionService
+from core.exceptions import InsufficientStockError
+
+
+def counter_sale(session, stocks, quantity=1, key=None, paid='100.00'):
+    """Build an online sale payload with one line per stock row"""
+    return {
+        'session': str(session.pk),
+        'idempotency_key': key or uuid.uuid4().hex,
+        'items': [{'product': str(stock.product_id), 'quantity': quantity} for stock in stocks],
+        'payments': [{'method': 'cash', 'amount': paid}],
+    }
+
+
+@pytest.mark.django_db
+class TestCompleteSaleAPI:
+    """Test committing online till sales"""
+
+    def test_commit_prices_from_catalog_and_deducts_stock(self, client_for, create_session, create_stock):
+        """Test a sale is stored at catalog prices and stock drops"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse, quantity=5)
+
+        response = client_for(session.cashier).post(
+            reverse('pos:transaction-list'), counter_sale(session, [stock], quantity=3), format='json'
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED, response.data
+        assert response.data['total'] == '30.00'
+        assert response.data['is_offline'] is False
+        assert Stock.objects.get(pk=stock.pk).quantity == 2
+        assert StockMovement.objects.get().reference == response.data['transaction_number']
+
+    def test_retry_returns_stored_sale(self, client_for, create_session, create_stock):
+        """Test a repeated idempotency key does not sell twice"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse, quantity=5)
+        client = client_for(session.cashier)
+        payload = counter_sale(session, [stock], key='till-1-0001')
+
+        first = client.post(reverse('pos:transaction-list'), payload, format='json')
+        second = client.post(reverse('pos:transaction-list'), payload, format='json')
+
+        assert second.status_code == status.HTTP_200_OK
+        assert second.data['id'] == first.data['id']
+        assert Stock.objects.get(pk=stock.pk).quantity == 4
+
+    def test_short_stock_rolls_back(self, client_for, create_session, create_stock):
+        """Test one short line leaves no sale, payment or stock change"""
+        session = create_session()
+        plenty = create_stock(warehouse=session.warehouse, quantity=10)
+        scarce = create_stock(warehouse=session.warehouse, quantity=1)
+
+        response = client_for(session.cashier).post(
+            reverse('pos:transaction-list'), counter_sale(session, [plenty, scarce], quantity=2), format='json'
+        )
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert not POSTransaction.objects.exists()
+        assert not POSPayment.objects.exists()
+        assert Stock.objects.get(pk=plenty.pk).quantity == 10
+
+    def test_underpaid_sale(self, client_for, create_session, create_stock):
+        """Test payments must cover the total"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse)
+
+        response = client_for(session.cashier).post(
+            reverse('pos:transaction-list'), counter_sale(session, [stock], paid='5.00'), format='json'
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Stock.objects.get(pk=stock.pk).quantity == 10
+
+
+@pytest.mark.django_db
+class TestCompleteSaleStatements:
+    """Test the commit path does not grow with the basket"""
+
+    def commit(self, session, stocks, quantity=1):
+        """Commit a sale and return the number of statements it ran"""
+        sale = {
+            'idempotency_key': uuid.uuid4().hex,
+            'items': [{'product': stock.product_id, 'quantity': quantity} for stock in stocks],
+            'payments': [{'method': 'cash', 'amount': 1000, 'reference': ''}],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            POSTransactionService.complete_sale(session, sale, cashier=session.cashier)
+        return len(queries)
+
+    def test_statement_count_is_constant(self, create_session, create_stock):
+        """Test a 20-line basket runs as many statements as a 1-line basket"""
+        session = create_session()
+        stocks = [create_stock(warehouse=session.warehouse) for _ in range(20)]
+
+        assert self.commit(session, stocks[:1]) == self.commit(session, stocks)
+
+    def test_insufficient_stock_raises(self, create_session, create_stock):
+        """Test the conditional stock update raises the API error"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse, quantity=1)
+
+        with pytest.raises(InsufficientStockError):
+            self.commit(session, [stock], quantity=2)
@@ -0,0 +1,70 @@
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.pos.models import POSPayment
+from apps.pos.services import POSTransactionService
+from core.models import NumberCounter
+from core.numbering import NumberAllocator
+
+
+@pytest.mark.django_db(transaction=True)
+class TestNumberAllocator:
+    """Test block allocation of document numbers"""
+
+    def test_workers_take_separate_blocks(self, settings):
+        """Test each worker hands out numbers from its own block, touching the counter once per block"""
+        settings.NUMBER_BLOCK_SIZE = 10
+        first, second = NumberAllocator('test', 'T'), NumberAllocator('test', 'T')
+        today = f'{timezone.localdate():%Y%m%d}'
+
+        numbers = first.allocate('DHK', 3) + second.allocate('DHK', 2) + first.allocate('DHK', 9)
+
+        assert numbers[:5] == [f'T-DHK-{today}-{n:06d}' for n in (1, 2, 3, 11, 12)]
+        assert numbers[-2:] == [f'T-DHK-{today}-{n:06d}' for n in (21, 22)]
+        assert len(set(numbers)) == len(numbers)
+        assert NumberCounter.objects.get(scope='test', branch='DHK').high == 30
+        assert first.next('CTG') == f'T-CTG-{today}-000001'
+
+    def test_block_not_kept_inside_transaction(self, settings):
+        """Test numbers reserved inside a transaction that rolls back are handed out once at most"""
+        settings.NUMBER_BLOCK_SIZE = 10
+        allocator = NumberAllocator('test', 'T')
+
+        with pytest.raises(RuntimeError), transaction.atomic():
+            allocator.next('DHK')
+            raise RuntimeError
+
+        # PostgreSQL reserved the block outside the rolled back transaction and keeps it
+        first = 2 if connection.vendor == 'postgresql' else 1
+        assert allocator.next('DHK').endswith(f'-{first:06d}')
+        assert allocator.next('DHK').endswith(f'-{first + 1:06d}')
+
+
+@pytest.mark.django_db
+class TestReceiptNumbers:
+    """Test receipt numbers of till sales"""
+
+    def test_numbered_per_branch(self, create_session, create_stock):
+        """Test sales are numbered by their session's branch and day"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse)
+
+        numbers = [
+            POSTransactionService.complete_sale(
+                session,
+                {
+                    'idempotency_key': uuid.uuid4().hex,
+                    'items': [{'product': stock.product_id, 'quantity': 1}],
+                    'payments': [{'method': POSPayment.METHOD_CASH, 'amount': Decimal('10.00'), 'reference': ''}],
+                },
+                cashier=session.cashier,
+            )[0].transaction_number
+            for _ in range(2)
+        ]
+
+        prefix = f'POS-{session.warehouse.code}-{timezone.localdate():%Y%m%d}-'
+        assert numbers == [f'{prefix}000001', f'{prefix}000002']
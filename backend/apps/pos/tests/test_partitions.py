@@ -0,0 +1,103 @@
+import uuid
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.payments.models import Payment
+from apps.pos.models import POSPayment
+from apps.pos.services import POSTransactionService
+from core import partitioning, tasks
+
+
+class TestPartitionHelpers:
+    """Test the month arithmetic and partition statements"""
+
+    def test_months(self):
+        """Test months roll over year ends both ways"""
+        assert partitioning.month_start(date(2026, 10, 19)) == date(2026, 10, 1)
+        assert partitioning.add_months(date(2026, 11, 1), 3) == date(2027, 2, 1)
+        assert partitioning.add_months(date(2026, 1, 1), -12) == date(2025, 1, 1)
+
+    def test_partition_statement(self):
+        """Test a month's partition covers that month in UTC"""
+        sql, params = partitioning.create_partition_sql('orders', date(2026, 12, 1), lambda name: f'"{name}"')
+
+        assert sql == (
+            'CREATE TABLE IF NOT EXISTS "orders_p202612" PARTITION OF "orders" FOR VALUES FROM (%s) TO (%s)'
+        )
+        assert params == [
+            datetime(2026, 12, 1, tzinfo=dt_timezone.utc),
+            datetime(2027, 1, 1, tzinfo=dt_timezone.utc),
+        ]
+
+
+@pytest.mark.django_db
+class TestPartitionedTables:
+    """Test the partitioned tables, and that they keep working unpartitioned on SQLite"""
+
+    @pytest.mark.skipif(partitioning.supported(), reason='Partitioned on PostgreSQL')
+    def test_command_skips_sqlite(self):
+        """Test the partition command does nothing without PostgreSQL"""
+        out = StringIO()
+
+        call_command('manage_partitions', '--archive', stdout=out)
+
+        assert 'needs PostgreSQL' in out.getvalue()
+
+    @pytest.mark.skipif(not partitioning.supported(), reason='Needs PostgreSQL')
+    def test_migrations_partition_tables(self):
+        """Test the migrations leave every table partitioned with a month partition and its own id sequence"""
+        with connection.cursor() as cursor:
+            for table in partitioning.PARTITIONED_TABLES:
+                assert partitioning.is_partitioned(cursor, table)
+                assert partitioning.month_start(timezone.now().date()) in partitioning.partitions(cursor, table)
+            for table in ('order_items', 'pos_transaction_items'):
+                cursor.execute('SELECT pg_get_serial_sequence(%s, %s)', [table, 'id'])
+                assert cursor.fetchone()[0] == f'public.{table}_id_seq'
+
+    @pytest.mark.skipif(not partitioning.supported(), reason='Needs PostgreSQL')
+    def test_references(self):
+        """Test lines keep a foreign key on id and partition key while other references are checked instead"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT conrelid::regclass::text, pg_get_constraintdef(oid) FROM pg_constraint "
+                "WHERE contype = 'f' AND confrelid IN ('orders'::regclass, 'pos_transactions'::regclass)"
+            )
+            keys = dict(cursor.fetchall())
+        assert keys['order_items'].startswith('FOREIGN KEY (order_id, created_at) REFERENCES orders(id, created_at)')
+        assert keys['pos_transaction_items'].startswith(
+            'FOREIGN KEY (transaction_id, occurred_at) REFERENCES pos_transactions(id, occurred_at)'
+        )
+        assert 'payments' not in keys
+        assert partitioning.dangling_references() == []
+
+        Payment.objects.create(order_id=uuid.uuid4(), gateway='cod', amount=Decimal('1.00'), idempotency_key='orphan')
+
+        assert partitioning.dangling_references() == [('payments', 'order_id', 1)]
+        assert tasks.verify_partition_references() == 1
+
+    def test_lines_carry_sale_time(self, client_for, create_session, create_stock):
+        """Test sale lines share the sale's partition key and listings filter on it"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse)
+        occurred_at = timezone.now() - timedelta(days=40)
+        results = POSTransactionService.sync_batch(session, [{
+            'idempotency_key': uuid.uuid4().hex,
+            'occurred_at': occurred_at,
+            'items': [{'product': stock.product_id, 'quantity': 1, 'unit_price': Decimal('10.00')}],
+            'payments': [{'method': POSPayment.METHOD_CASH, 'amount': Decimal('10.00'), 'reference': ''}],
+        }])
+        sale_transaction = session.transactions.get(pk=results[0]['transaction_id'])
+
+        assert sale_transaction.items.get().occurred_at == occurred_at
+        url = reverse('pos:transaction-list')
+        client = client_for(session.cashier)
+        since = (timezone.now() - timedelta(days=30)).isoformat()
+        assert client.get(url, {'occurred_at__gte': since}).data['count'] == 0
+        assert client.get(url, {'occurred_at__lt': since}).data['count'] == 1
@@ -0,0 +1,129 @@
+import pytest
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.inventory.models import StockMovement
+from apps.inventory.services import StockService
+from apps.pos import realtime
+from apps.pos.routing import websocket_urlpatterns
+from core.websocket import JWTAuthMiddleware
+
+application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+
+def terminal(session, user=None):
+    """Build a communicator for a session, authenticated as its cashier by default"""
+    token = RefreshToken.for_user(user or session.cashier).access_token
+    return WebsocketCommunicator(application, f'/ws/pos/{session.pk}/?token={token}')
+
+
+@pytest.fixture
+def fast_flush(settings):
+    """Flush terminal buffers quickly and keep frames small"""
+    settings.POS_REALTIME_FLUSH_INTERVAL = 0.05
+    settings.POS_REALTIME_MAX_FRAME_EVENTS = 2
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPOSConsumer:
+    """Test the till WebSocket channel"""
+
+    def test_rejects_other_cashiers(self, create_session, create_user):
+        """Test only the session's cashier or a manager may connect"""
+        session = create_session()
+        outsider = terminal(session, create_user(role='cashier'))
+        anonymous = WebsocketCommunicator(application, f'/ws/pos/{session.pk}/')
+        owner = terminal(session)
+
+        async def scenario():
+            outsider_connected, _ = await outsider.connect()
+            anonymous_connected, _ = await anonymous.connect()
+            connected, _ = await owner.connect()
+            await owner.disconnect()
+            return outsider_connected, anonymous_connected, connected
+
+        assert async_to_sync(scenario)() == (False, False, True)
+
+    def test_bursts_are_coalesced(self, create_session, fast_flush):
+        """Test repeated keys collapse and a burst arrives as bounded batch frames"""
+        session = create_session()
+        communicator = terminal(session)
+
+        async def scenario():
+            await communicator.connect()
+            layer = get_channel_layer()
+            for price in ('1.00', '2.00', '3.00'):
+                await layer.group_send(realtime.CATALOG_GROUP, {
+                    'type': 'pos.events',
+                    'events': [
+                        realtime.event(realtime.KIND_PRICE, 'p1', selling_price=price),
+                        realtime.event(realtime.KIND_PRICE, 'p2', selling_price=price),
+                    ],
+                })
+            await layer.group_send(realtime.session_group(session.pk), {
+                'type': 'pos.events',
+                'events': [realtime.event(realtime.KIND_SESSION, 'status', event='closed')],
+            })
+            frames = [await communicator.receive_json_from(), await communicator.receive_json_from()]
+            quiet = await communicator.receive_nothing(timeout=0.2)
+            await communicator.disconnect()
+            return frames, quiet
+
+        frames, quiet = async_to_sync(scenario)()
+
+        events = [item for frame in frames for item in frame['events']]
+        assert [frame['type'] for frame in frames] == ['batch', 'batch']
+        assert [(item['key'], item['data']) for item in events] == [
+            ('p1', {'selling_price': '3.00'}),
+            ('p2', {'selling_price': '3.00'}),
+            ('status', {'event': 'closed'}),
+        ]
+        assert quiet
+
+    def test_price_and_stock_out_are_pushed(self, create_session, create_stock, fast_flush):
+        """Test a price change and a sell-out reach the branch's till"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse, quantity=1)
+
+        def change():
+            stock.product.selling_price = '12.50'
+            stock.product.save(update_fields=['selling_price'])
+            StockService.apply_movements(
+                [(stock.product_id, stock.warehouse_id, StockMovement.TYPE_SALE, -1)]
+            )
+
+        communicator = terminal(session)
+
+        async def scenario():
+            await communicator.connect()
+            await database_sync_to_async(change)()
+            frame = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return frame
+
+        events = {item['kind']: item for item in async_to_sync(scenario)()['events']}
+
+        assert events['price']['data']['selling_price'] == '12.50'
+        assert events['stock']['key'] == str(stock.product_id)
+        assert events['stock']['data'] == {'available': 0, 'out_of_stock': True}
+
+
+@pytest.mark.django_db
+def test_broadcast_is_best_effort(create_stock, monkeypatch, django_capture_on_commit_callbacks):
+    """Test a stock change still commits when the channel layer is down"""
+    stock = create_stock(quantity=1)
+
+    def layer_down(group, events):
+        raise ConnectionError('Channel layer unreachable')
+
+    monkeypatch.setattr(realtime, 'send', layer_down)
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        StockService.apply_movements([(stock.product_id, stock.warehouse_id, StockMovement.TYPE_SALE, -1)])
+
+    stock.refresh_from_db()
+    assert callbacks
+    assert stock.quantity == 0
@@ -0,0 +1,153 @@
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+
+from apps.pos import receipts, tasks
+from apps.pos.models import POSPayment
+from apps.pos.services import POSTransactionService
+from apps.products.models import Product
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    """Cache receipts in process memory"""
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    yield
+    cache.clear()
+
+
+def sell(session, stock, quantity=2):
+    """Commit a cash sale of one product"""
+    sale_transaction, _ = POSTransactionService.complete_sale(
+        session,
+        {
+            'idempotency_key': uuid.uuid4().hex,
+            'items': [{'product': stock.product_id, 'quantity': quantity}],
+            'payments': [{'method': POSPayment.METHOD_CASH, 'amount': Decimal('50.00'), 'reference': ''}],
+        },
+        cashier=session.cashier,
+    )
+    return sale_transaction
+
+
+@pytest.mark.django_db
+class TestReceiptRendering:
+    """Test the printer and e-receipt forms"""
+
+    def test_escpos_layout(self, create_session, create_stock, settings):
+        """Test the byte stream has the printer commands, lines and totals"""
+        settings.POS_RECEIPT_WIDTH = 32
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse)
+        sale_transaction = sell(session, stock)
+
+        content = receipts.render(receipts.load([sale_transaction.pk]).get(), receipts.KIND_ESCPOS)
+
+        assert content.startswith(receipts.INIT)
+        assert content.endswith(receipts.FEED_AND_CUT)
+        assert session.warehouse.name.encode() in content
+        text = content.decode('cp437')
+        assert f"{stock.product.name:<26} 20.00\n" in text
+        assert '  2 x 10.00\n' in text
+        assert f"{'Change':<26} 30.00\n" in text
+
+    def test_html_receipt(self, create_session, create_stock):
+        """Test the e-receipt lists the sale"""
+        session = create_session()
+        sale_transaction = sell(session, create_stock(warehouse=session.warehouse))
+
+        content = receipts.render(receipts.load([sale_transaction.pk]).get(), receipts.KIND_HTML)
+
+        assert sale_transaction.transaction_number in content
+        assert '20.00' in content
+        assert 'VOID' not in content
+
+    def test_sales_are_prerendered(self, create_session, create_stock, settings, monkeypatch,
+                                   django_capture_on_commit_callbacks):
+        """Test a committed sale's receipts are cached before the first print"""
+        settings.POS_RECEIPT_PRERENDER = True
+        monkeypatch.setattr(tasks.render_receipts, 'delay', tasks.render_receipts)
+        session = create_session()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            sale_transaction = sell(session, create_stock(warehouse=session.warehouse))
+
+        for kind in receipts.KINDS:
+            assert cache.get(receipts.cache_key(sale_transaction.pk, kind))
+
+    def test_prerender_is_best_effort(self, create_session, create_stock, settings, monkeypatch,
+                                      django_capture_on_commit_callbacks):
+        """Test a sale still completes when its receipts cannot be queued, and prints on demand"""
+        settings.POS_RECEIPT_PRERENDER = True
+
+        def broker_down(transaction_ids):
+            raise ConnectionError('Broker unreachable')
+
+        monkeypatch.setattr(tasks.render_receipts, 'delay', broker_down)
+        session = create_session()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            sale_transaction = sell(session, create_stock(warehouse=session.warehouse))
+
+        assert not cache.get(receipts.cache_key(sale_transaction.pk, receipts.KIND_HTML))
+        assert sale_transaction.transaction_number in receipts.render(
+            receipts.load([sale_transaction.pk]).get(), receipts.KIND_HTML
+        )
+
+
+@pytest.mark.django_db
+class TestReceiptAPI:
+    """Test printing and reprinting receipts"""
+
+    def test_reprint_is_cached(self, client_for, create_session, create_stock):
+        """Test a reprint returns the cached receipt without rendering again"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse)
+        sale_transaction = sell(session, stock)
+        client = client_for(session.cashier)
+        url = reverse('pos:transaction-receipt', args=[sale_transaction.pk])
+
+        first = client.get(url)
+        Product.objects.filter(pk=stock.product_id).update(name='Renamed')
+        reprint = client.get(url)
+
+        assert first.status_code == status.HTTP_200_OK
+        assert first['Content-Type'] == 'application/octet-stream'
+        assert reprint.content == first.content
+        html = client.get(url, {'type': 'html'})
+        assert html['Content-Type'].startswith('text/html')
+        assert 'Renamed' in html.content.decode()
+        assert client.get(url, {'type': 'pdf'}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_void_replaces_cached_receipt(self, client_for, create_session, create_stock, create_user,
+                                          django_capture_on_commit_callbacks):
+        """Test a receipt printed after a void shows the void"""
+        session = create_session()
+        sale_transaction = sell(session, create_stock(warehouse=session.warehouse))
+        client = client_for(session.cashier)
+        url = reverse('pos:transaction-receipt', args=[sale_transaction.pk])
+        assert b'VOID' not in client.get(url).content
+
+        with django_capture_on_commit_callbacks(execute=True):
+            POSTransactionService.void(sale_transaction, user=create_user(role='manager'))
+
+        assert b'VOID' in client.get(url).content
+
+    def test_void_survives_cache_outage(self, monkeypatch, create_session, create_stock, create_user,
+                                        django_capture_on_commit_callbacks):
+        """Test a cache error while dropping receipts does not fail the committed void"""
+        session = create_session()
+        sale_transaction = sell(session, create_stock(warehouse=session.warehouse))
+
+        def cache_down(transaction_ids):
+            raise ConnectionError('Cache unreachable')
+
+        monkeypatch.setattr(receipts, 'forget', cache_down)
+        with django_capture_on_commit_callbacks(execute=True):
+            voided = POSTransactionService.void(sale_transaction, user=create_user(role='manager'))
+
+        assert voided.status == voided.STATUS_VOIDED
@@ -0,0 +1,158 @@
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from apps.inventory.models import Stock, StockLot
+from apps.inventory.services import StockLotService
+from apps.pos.models import POSPayment, POSSession, POSSessionTotal
+from apps.pos.services import POSSessionService, POSTransactionService
+from core.exceptions import InvalidOperationError
+
+
+def ring(session, stock, quantity=1, tax_rate=0, payments=None):
+    """Commit an online sale of one product"""
+    sale_transaction, _ = POSTransactionService.complete_sale(
+        session,
+        {
+            'idempotency_key': uuid.uuid4().hex,
+            'items': [{'product': stock.product_id, 'quantity': quantity, 'tax_rate': Decimal(tax_rate)}],
+            'payments': payments or [{'method': POSPayment.METHOD_CASH, 'amount': Decimal('100.00'), 'reference': ''}],
+        },
+        cashier=session.cashier,
+    )
+    return sale_transaction
+
+
+@pytest.mark.django_db
+class TestRunningTotals:
+    """Test session totals kept as sales commit"""
+
+    def test_sales_update_totals(self, create_session, create_stock):
+        """Test tenders, tax rates and change accumulate on the session"""
+        session = create_session(opening_float=Decimal('50.00'))
+        stock = create_stock(warehouse=session.warehouse, quantity=20)
+        ring(session, stock, quantity=2, tax_rate=5)
+        ring(session, stock, payments=[{'method': POSPayment.METHOD_CARD, 'amount': Decimal('10.00'), 'reference': 'c1'}])
+
+        report = POSSessionService.report(POSSession.objects.get(pk=session.pk))
+
+        assert report['report_type'] == 'X'
+        assert report['sales_count'] == 2
+        assert report['sales_total'] == Decimal('31.00')
+        assert report['change_given'] == Decimal('79.00')
+        assert report['expected_cash'] == Decimal('71.00')
+        assert {row['method']: row['amount'] for row in report['tenders']} == {
+            'cash': Decimal('100.00'), 'card': Decimal('10.00'),
+        }
+        assert {row['rate']: row['tax_amount'] for row in report['tax_rates']} == {
+            '0.00': Decimal('0.00'), '5.00': Decimal('1.00'),
+        }
+        assert POSSessionService.verify(session) == []
+
+    def test_void_reverses_totals(self, create_session, create_stock):
+        """Test a void returns stock and lots and moves the sale into the void count"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse, quantity=20)
+        StockLotService.receive_lots([(stock.product_id, stock.warehouse_id, 'L-1', None, 20)])
+        ring(session, stock)
+        sale_transaction = ring(session, stock, quantity=3)
+
+        POSTransactionService.void(sale_transaction, user=session.cashier)
+
+        session.refresh_from_db()
+        assert session.sales_count == 1
+        assert session.sales_total == Decimal('10.00')
+        assert session.void_count == 1
+        assert session.void_total == Decimal('30.00')
+        assert Stock.objects.get(pk=stock.pk).quantity == 19
+        assert StockLot.objects.get(stock=stock).quantity == 19
+        assert POSSessionService.verify(session) == []
+        with pytest.raises(InvalidOperationError):
+            POSTransactionService.void(sale_transaction)
+
+    def test_verify_detects_drift(self, create_session, create_stock):
+        """Test the reconciliation flags totals that disagree with the sales"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse)
+        ring(session, stock)
+        POSSession.objects.filter(pk=session.pk).update(sales_total=Decimal('99.00'))
+        POSSessionTotal.objects.filter(kind=POSSessionTotal.KIND_TENDER).update(count=7)
+
+        fields = sorted(mismatch['field'] for mismatch in POSSessionService.verify(session))
+
+        assert fields == ['sales_total', 'tender:cash']
+
+    def test_closed_session_rejects_sales(self, create_session, create_stock):
+        """Test nothing is added to a session after its close"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse)
+        POSSessionService.close(session, counted_cash=Decimal('0'))
+
+        with pytest.raises(InvalidOperationError):
+            ring(session, stock)
+        with pytest.raises(InvalidOperationError):
+            POSSessionService.move_cash(session, 'pay_in', Decimal('5.00'))
+
+
+@pytest.mark.django_db
+class TestCloseAPI:
+    """Test cash movements, close and the Z-report"""
+
+    def test_close_returns_z_report(self, client_for, create_session, create_stock):
+        """Test closing reports expected cash and the counted variance"""
+        session = create_session(opening_float=Decimal('100.00'))
+        stock = create_stock(warehouse=session.warehouse)
+        client = client_for(session.cashier)
+        ring(session, stock, payments=[{'method': 'cash', 'amount': Decimal('10.00'), 'reference': ''}])
+        client.post(reverse('pos:session-cash', args=[session.pk]), {'kind': 'pay_out', 'amount': '20.00'})
+
+        response = client.post(reverse('pos:session-close'), {'session': str(session.pk), 'counted_cash': '85.00'})
+
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert response.data['report_type'] == 'Z'
+        assert response.data['expected_cash'] == '90.00'
+        assert response.data['cash_variance'] == '-5.00'
+        z_report = client.get(reverse('pos:session-z-report', args=[session.pk]))
+        assert z_report.data['sales_total'] == '10.00'
+        again = client.post(reverse('pos:session-close'), {'session': str(session.pk), 'counted_cash': '85.00'})
+        assert again.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_z_report_needs_closed_session(self, client_for, create_session):
+        """Test an open session only has an X-report"""
+        session = create_session()
+        client = client_for(session.cashier)
+
+        assert client.get(reverse('pos:session-z-report', args=[session.pk])).status_code == 400
+        assert client.get(reverse('pos:session-x-report', args=[session.pk])).data['report_type'] == 'X'
+
+    def test_close_does_not_scan_sales(self, client_for, create_session, create_stock):
+        """Test close runs the same statements after one sale or many"""
+        counts = []
+        for sales in (1, 10):
+            session = create_session()
+            stock = create_stock(warehouse=session.warehouse, quantity=100)
+            for _ in range(sales):
+                ring(session, stock)
+            client = client_for(session.cashier)
+            with CaptureQueriesContext(connection) as queries:
+                client.post(reverse('pos:session-close'), {'session': str(session.pk), 'counted_cash': '0'})
+            counts.append(len(queries))
+
+        assert counts[0] == counts[1]
+
+    def test_void_is_manager_only(self, client_for, create_session, create_stock, create_user):
+        """Test cashiers cannot void and managers can"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse)
+        sale_transaction = ring(session, stock)
+        url = reverse('pos:transaction-void', args=[sale_transaction.pk])
+
+        assert client_for(session.cashier).post(url).status_code == status.HTTP_403_FORBIDDEN
+        response = client_for(create_user(role='manager')).post(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['status'] == 'voided'
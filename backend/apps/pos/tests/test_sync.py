@@ -0,0 +1,126 @@
+import gzip
+import json
+import uuid
+
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+from apps.inventory.models import Stock, StockMovement
+from apps.pos.models import POSPayment, POSSession, POSTransaction, POSTransactionItem
+from apps.pos.services import POSTransactionService
+from core.exceptions import InvalidOperationError
+
+
+def sale(product, quantity=1, key=None, unit_price='10.00', tax_rate='5.00'):
+    """Build a queued sale payload for one product"""
+    return {
+        'idempotency_key': key or uuid.uuid4().hex,
+        'occurred_at': '2026-01-05T10:00:00Z',
+        'items': [{
+            'product': str(product.pk),
+            'quantity': quantity,
+            'unit_price': unit_price,
+            'tax_rate': tax_rate,
+        }],
+        'payments': [{'method': 'cash', 'amount': '10.50'}],
+    }
+
+
+def sync(client, session, sales, compress=False):
+    """Post a sync batch, optionally gzip-compressed"""
+    body = json.dumps({'session': str(session.pk), 'transactions': sales}).encode()
+    headers = {}
+    if compress:
+        body = gzip.compress(body)
+        headers['HTTP_CONTENT_ENCODING'] = 'gzip'
+    return client.post(
+        reverse('pos:transaction-sync'), data=body, content_type='application/json', **headers
+    )
+
+
+@pytest.mark.django_db
+class TestSyncAPI:
+    """Test offline sale sync"""
+
+    def test_sync_stores_sales_and_decrements_stock(self, client_for, create_session, create_stock):
+        """Test queued sales are stored once and stock drops per SKU"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse, quantity=5)
+        sales = [sale(stock.product, quantity=2) for _ in range(4)]
+
+        response = sync(client_for(session.cashier), session, sales, compress=True)
+
+        assert response.status_code == status.HTTP_200_OK, response.data
+        assert response.data['created'] == 4
+        assert POSTransaction.objects.filter(is_offline=True).count() == 4
+        assert POSTransactionItem.objects.count() == 4
+        assert POSPayment.objects.count() == 4
+        assert Stock.objects.get(pk=stock.pk).quantity == -3
+        movement = StockMovement.objects.get()
+        assert movement.quantity == -8
+        sale_transaction = POSTransaction.objects.first()
+        assert str(sale_transaction.total) == '21.00'
+
+    def test_resync_is_idempotent(self, client_for, create_session, create_stock):
+        """Test replaying a batch, and repeats inside it, store nothing new"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse, quantity=50)
+        first = sale(stock.product, key='till-1-0001')
+        client = client_for(session.cashier)
+        sync(client, session, [first])
+
+        response = sync(client, session, [first, sale(stock.product, key='till-1-0002'), first])
+
+        statuses = [result['status'] for result in response.data['results']]
+        assert statuses == ['duplicate', 'created', 'duplicate']
+        assert response.data['results'][0]['transaction_id'] == str(
+            POSTransaction.objects.get(idempotency_key='till-1-0001').pk
+        )
+        assert POSTransaction.objects.count() == 2
+        assert Stock.objects.get(pk=stock.pk).quantity == 48
+
+    def test_invalid_sales_are_rejected_individually(self, client_for, create_session, create_stock,
+                                                     create_product):
+        """Test bad sales are reported without failing the batch"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse, quantity=50)
+        unknown = sale(stock.product)
+        unknown['items'][0]['product'] = str(uuid.uuid4())
+        broken = sale(stock.product)
+        broken['items'][0]['quantity'] = 0
+
+        response = sync(client_for(session.cashier), session, [sale(stock.product), unknown, broken])
+
+        assert [result['status'] for result in response.data['results']] == ['created', 'rejected', 'rejected']
+        assert 'quantity' in response.data['results'][2]['errors']['items'][0]
+
+    def test_other_cashiers_session(self, client_for, create_session, create_user, create_stock):
+        """Test a cashier cannot sync into someone else's session"""
+        session = create_session()
+        stock = create_stock(warehouse=session.warehouse)
+
+        response = sync(client_for(create_user(role='cashier')), session, [sale(stock.product)])
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_closed_session(self, create_session, create_stock):
+        """Test sales cannot be synced into a closed session"""
+        session = create_session(status=POSSession.STATUS_CLOSED)
+
+        with pytest.raises(InvalidOperationError):
+            POSTransactionService.sync_batch(session, [])
+
+
+@pytest.mark.django_db
+class TestSessionAPI:
+    """Test opening till sessions"""
+
+    def test_open_once_per_terminal(self, client_for, create_user, create_warehouse):
+        """Test a till cannot have two open sessions"""
+        client = client_for(create_user(role='cashier'))
+        warehouse = create_warehouse()
+        payload = {'warehouse': str(warehouse.pk), 'terminal_id': 'TILL-9', 'opening_float': '100.00'}
+
+        assert client.post(reverse('pos:session-open'), payload).status_code == status.HTTP_201_CREATED
+        assert client.post(reverse('pos:session-open'), payload).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,15 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import CatalogViewSet, POSSessionViewSet, POSTransactionViewSet
+
+app_name = 'pos'
+
+# Router for viewsets
+router = DefaultRouter()
+router.register(r'sessions', POSSessionViewSet, basename='session')
+router.register(r'transactions', POSTransactionViewSet, basename='transaction')
+router.register(r'catalog', CatalogViewSet, basename='catalog')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
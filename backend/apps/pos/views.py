@@ -0,0 +1,281 @@
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core.exceptions import InvalidOperationError
+from core.pagination import StandardResultsSetPagination
+from core.parsers import GzipJSONParser
+from core.permissions import IsAdminOrManager, IsCashier
+from . import catalog, receipts
+from .models import CatalogSnapshot, POSSession, POSTransaction
+from .serializers import (
+    CounterSaleSerializer,
+    POSCashMovementSerializer,
+    POSSessionSerializer,
+    POSTransactionSerializer,
+    SaleSerializer,
+    SessionCloseSerializer,
+    SessionOpenSerializer,
+    SessionReportSerializer,
+    SyncResultSerializer,
+    SyncSerializer,
+)
+from .services import POSSessionService, POSTransactionService
+
+MANAGER_ROLES = ['super_admin', 'admin', 'manager']
+
+
+def _own(queryset, user, field='cashier'):
+    """Limit cashiers to their own rows; managers see every till"""
+    if user.role in MANAGER_ROLES:
+        return queryset
+    return queryset.filter(**{field: user})
+
+
+def _check_session(session, user):
+    """Only the session's cashier or a manager may ring sales into it"""
+    if user.role not in MANAGER_ROLES and session.cashier_id != user.pk:
+        raise InvalidOperationError('Session belongs to another cashier.', status_code=status.HTTP_403_FORBIDDEN)
+
+
+@extend_schema_view(
+    list=extend_schema(description='List till sessions'),
+    retrieve=extend_schema(description='Get a till session'),
+)
+class POSSessionViewSet(mixins.ListModelMixin,
+                        mixins.RetrieveModelMixin,
+                        viewsets.GenericViewSet):
+    """
+    ViewSet for till sessions.
+
+    Cashiers see their own sessions; managers see every till.
+    """
+    serializer_class = POSSessionSerializer
+    permission_classes = [IsCashier]
+    pagination_class = StandardResultsSetPagination
+    filterset_fields = ['warehouse', 'status', 'terminal_id']
+    ordering = ['-opened_at']
+
+    def get_queryset(self):
+        """Return sessions visible to the current user"""
+        return _own(POSSession.objects.select_related('warehouse'), self.request.user)
+
+    @extend_schema(
+        description='Open a session on a till',
+        request=SessionOpenSerializer,
+        responses={201: POSSessionSerializer}
+    )
+    @action(detail=False, methods=['post'])
+    def open(self, request):
+        """Open a session for the current cashier"""
+        serializer = SessionOpenSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = POSSessionService.open(cashier=request.user, **serializer.validated_data)
+        return Response(POSSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+    @extend_schema(
+        description='Close a session with the cash counted in the drawer and return its Z-report',
+        request=SessionCloseSerializer,
+        responses={200: SessionReportSerializer}
+    )
+    @action(detail=False, methods=['post'])
+    def close(self, request):
+        """Close a session; totals are already running, so this touches one row"""
+        serializer = SessionCloseSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = serializer.validated_data['session']
+        _check_session(session, request.user)
+        session = POSSessionService.close(session, serializer.validated_data['counted_cash'])
+        return Response(SessionReportSerializer(POSSessionService.report(session)).data)
+
+    @extend_schema(
+        description='Mid-shift totals for a session',
+        responses={200: SessionReportSerializer}
+    )
+    @action(detail=True, methods=['get'], url_path='x-report')
+    def x_report(self, request, pk=None):
+        """Report the running totals without closing"""
+        return Response(SessionReportSerializer(POSSessionService.report(self.get_object())).data)
+
+    @extend_schema(
+        description='End-of-shift report for a closed session',
+        responses={200: SessionReportSerializer}
+    )
+    @action(detail=True, methods=['get'], url_path='z-report')
+    def z_report(self, request, pk=None):
+        """Report the final totals of a closed session"""
+        session = self.get_object()
+        if session.status != POSSession.STATUS_CLOSED:
+            raise InvalidOperationError('Session is still open; use the X-report.')
+        return Response(SessionReportSerializer(POSSessionService.report(session)).data)
+
+    @extend_schema(
+        description='Pay cash into or take cash out of the drawer',
+        request=POSCashMovementSerializer,
+        responses={201: POSCashMovementSerializer}
+    )
+    @action(detail=True, methods=['post'])
+    def cash(self, request, pk=None):
+        """Record a drawer pay-in or pay-out"""
+        session = self.get_object()
+        serializer = POSCashMovementSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        movement = POSSessionService.move_cash(session, user=request.user, **serializer.validated_data)
+        return Response(POSCashMovementSerializer(movement).data, status=status.HTTP_201_CREATED)
+
+
+@extend_schema_view(
+    list=extend_schema(description='List till sales'),
+    create=extend_schema(
+        description='Commit a sale rung up online. Retrying with the same '
+                    'idempotency key returns the stored sale.',
+        request=CounterSaleSerializer,
+        responses={201: POSTransactionSerializer, 200: POSTransactionSerializer},
+    ),
+    retrieve=extend_schema(description='Get a till sale with its lines'),
+)
+class POSTransactionViewSet(mixins.ListModelMixin,
+                            mixins.RetrieveModelMixin,
+                            viewsets.GenericViewSet):
+    """
+    ViewSet for till sales.
+    """
+    serializer_class = POSTransactionSerializer
+    permission_classes = [IsCashier]
+    pagination_class = StandardResultsSetPagination
+    # Filtering on occurred_at limits the scan to the matching monthly partitions
+    filterset_fields = {
+        'session': ['exact'],
+        'status': ['exact'],
+        'is_offline': ['exact'],
+        'occurred_at': ['gte', 'lt'],
+    }
+    ordering = ['-occurred_at']
+
+    def get_queryset(self):
+        """Return sales visible to the current user"""
+        return _own(POSTransaction.objects.prefetch_related('items'), self.request.user, 'session__cashier')
+
+    def create(self, request):
+        """Commit one sale and its stock movement in a single transaction"""
+        serializer = CounterSaleSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        sale = dict(serializer.validated_data)
+        session = sale.pop('session')
+        _check_session(session, request.user)
+        sale_transaction, created = POSTransactionService.complete_sale(session, sale, cashier=request.user)
+        return Response(
+            POSTransactionSerializer(sale_transaction).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @extend_schema(
+        description='Void a sale and return its stock; managers only',
+        request=None,
+        responses={200: POSTransactionSerializer}
+    )
+    @action(detail=True, methods=['post'], permission_classes=[IsAdminOrManager])
+    def void(self, request, pk=None):
+        """Void a completed sale in an open session"""
+        sale_transaction = POSTransactionService.void(self.get_object(), user=request.user)
+        return Response(POSTransactionSerializer(sale_transaction).data)
+
+    @extend_schema(
+        description='Receipt for a sale, as an ESC/POS byte stream for the till printer or an HTML e-receipt',
+        parameters=[OpenApiParameter('type', str, enum=list(receipts.KINDS), description='Receipt form; escpos by default')],
+        responses={(200, 'application/octet-stream'): bytes, (200, 'text/html'): str}
+    )
+    @action(detail=True, methods=['get'])
+    def receipt(self, request, pk=None):
+        """Print or reprint a receipt, served from the receipt cache"""
+        kind = request.query_params.get('type', receipts.KIND_ESCPOS)
+        if kind not in receipts.KINDS:
+            raise InvalidOperationError(f"Receipt type must be one of: {', '.join(receipts.KINDS)}.")
+        return HttpResponse(receipts.get(self.get_object(), kind), content_type=receipts.CONTENT_TYPES[kind])
+
+    @extend_schema(
+        description='Upload sales queued while the till was offline. '
+                    'The body may be sent with Content-Encoding: gzip.',
+        request=SyncSerializer,
+        responses={200: SyncResultSerializer(many=True)}
+    )
+    @action(detail=False, methods=['post'], parser_classes=[GzipJSONParser])
+    def sync(self, request):
+        """Store queued sales once each and report the outcome per sale"""
+        serializer = SyncSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        session = serializer.validated_data['session']
+        _check_session(session, request.user)
+
+        sales = []
+        for raw in serializer.validated_data['transactions']:
+            sale = SaleSerializer(data=raw)
+            if sale.is_valid():
+                sales.append(sale.validated_data)
+            else:
+                sales.append({'idempotency_key': str(raw.get('idempotency_key', '')), 'errors': sale.errors})
+        results = POSTransactionService.sync_batch(session, sales, cashier=request.user)
+
+        counts = {
+            outcome: sum(1 for result in results if result['status'] == outcome)
+            for outcome in (
+                POSTransactionService.RESULT_CREATED,
+                POSTransactionService.RESULT_DUPLICATE,
+                POSTransactionService.RESULT_REJECTED,
+            )
+        }
+        return Response({
+            'success': True,
+            **counts,
+            'results': SyncResultSerializer(results, many=True).data,
+        })
+
+
+class CatalogViewSet(viewsets.ViewSet):
+    """
+    ViewSet for the tills' offline copy of the catalog.
+
+    Payloads are streamed as newline-delimited JSON, gzip-compressed when the
+    client accepts it; the first line carries the version to resume from.
+    """
+    permission_classes = [IsCashier]
+
+    @extend_schema(
+        description='Products changed since a catalog version',
+        parameters=[OpenApiParameter('since', int, description='Last catalog version the till applied')],
+        responses={(200, 'application/x-ndjson'): bytes}
+    )
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """Stream the products changed after ``since``"""
+        try:
+            since = max(int(request.query_params.get('since', 0)), 0)
+        except ValueError:
+            raise InvalidOperationError('since must be a catalog version number.')
+        version, chunks = catalog.feed(since)
+        gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        response = StreamingHttpResponse(
+            catalog.gzipped(chunks) if gzip else chunks,
+            content_type='application/x-ndjson',
+        )
+        if gzip:
+            response['Content-Encoding'] = 'gzip'
+        response['X-Catalog-Version'] = str(version)
+        return response
+
+    @extend_schema(
+        description='Latest full catalog snapshot for a new till',
+        responses={(200, 'application/x-ndjson'): bytes}
+    )
+    @action(detail=False, methods=['get'])
+    def snapshot(self, request):
+        """Download the newest pre-built snapshot"""
+        snapshot = CatalogSnapshot.objects.order_by('-version').first()
+        if snapshot is None:
+            raise Http404('No catalog snapshot has been built yet.')
+        response = FileResponse(snapshot.file.open('rb'), content_type='application/x-ndjson')
+        response['Content-Encoding'] = 'gzip'
+        response['X-Catalog-Version'] = str(snapshot.version)
+        return response
@@ -0,0 +1,30 @@
+"""
+Admin configuration for products app.
+"""
+
+from django.contrib import admin
+from .models import Category, Product, ProductDetail
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    """Admin for Category model."""
+    list_display = ('name', 'slug', 'parent')
+    search_fields = ('name', 'slug')
+    prepopulated_fields = {'slug': ('name',)}
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    """Admin for Product model."""
+    list_display = ('name', 'sku', 'barcode', 'category', 'selling_price', 'tax_rate', 'is_active')
+    search_fields = ('name', 'sku', 'barcode')
+    list_filter = ('is_active', 'category')
+
+
+@admin.register(ProductDetail)
+class ProductDetailAdmin(admin.ModelAdmin):
+    """Admin for ProductDetail model."""
+    list_display = ('product', 'catalog_version', 'built_at')
+    search_fields = ('product__name', 'product__sku')
+    readonly_fields = ('product', 'payload', 'catalog_version', 'built_at')
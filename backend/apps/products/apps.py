@@ -5,3 +5,7 @@ class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.products'
     label = 'products'
+
+    def ready(self):
+        """Import signals when app is ready."""
+        import apps.products.signals
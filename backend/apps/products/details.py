@@ -0,0 +1,203 @@
+"""
+Pre-serialized product detail payloads for the storefront.
+
+A product's detail page shows the product, its price with tax, the
+branches it is in stock at and its category path. Instead of joining those
+on every view, each product's page is serialized once into a JSON string,
+stored in ProductDetail and cached; the view returns the string as is.
+
+Payloads are rebuilt once the writes that change them commit: product and
+category saves, and stock rows crossing zero (see ``signals``). Bulk
+product writes send no signals but still stamp a new catalog version, so
+``refresh`` periodically rebuilds every payload built from an older
+version. ``warm_product_details`` rebuilds the whole catalog.
+"""
+
+import json
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+
+from apps.inventory.models import Stock
+from .models import Category, Product, ProductDetail
+
+CHUNK_SIZE = 500
+
+CENT = Decimal('0.01')
+
+
+def cache_key(product_id):
+    """Cache key for one product's payload."""
+    return f'products:detail:{product_id}'
+
+
+def _categories():
+    """Every category by id, as ``(name, slug, parent_id)``."""
+    return {
+        pk: (name, slug, parent_id)
+        for pk, name, slug, parent_id in Category.objects.values_list('pk', 'name', 'slug', 'parent_id')
+    }
+
+
+def breadcrumbs(categories, category_id):
+    """Path of categories from the root down to ``category_id``."""
+    path = []
+    while category_id is not None and category_id in categories and len(path) < len(categories):
+        name, slug, parent_id = categories[category_id]
+        path.append({'id': str(category_id), 'name': name, 'slug': slug})
+        category_id = parent_id
+    return path[::-1]
+
+
+def subtree(categories, category_id):
+    """Ids of ``category_id`` and every category below it."""
+    children = {}
+    for pk, (_, _, parent_id) in categories.items():
+        children.setdefault(parent_id, []).append(pk)
+    found, pending = set(), [category_id]
+    while pending:
+        pk = pending.pop()
+        if pk not in found:
+            found.add(pk)
+            pending.extend(children.get(pk, ()))
+    return found
+
+
+def category_products(category_id):
+    """Ids of the products filed under the category or one below it."""
+    return list(
+        Product.objects
+        .filter(category_id__in=subtree(_categories(), category_id))
+        .values_list('pk', flat=True)
+    )
+
+
+def _branches(product_ids):
+    """Active branches with stock available, by product id."""
+    branches = {}
+    rows = (
+        Stock.objects
+        .filter(
+            product_id__in=product_ids,
+            quantity__gt=F('reserved_quantity'),
+            is_deleted=False,
+            warehouse__is_active=True,
+        )
+        .order_by('warehouse__name')
+        .values_list('product_id', 'warehouse_id', 'warehouse__code', 'warehouse__name')
+    )
+    for product_id, warehouse_id, code, name in rows:
+        branches.setdefault(product_id, []).append({'id': str(warehouse_id), 'code': code, 'name': name})
+    return branches
+
+
+def _with_tax(price, tax_rate):
+    return (price * (1 + tax_rate / 100)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def serialize(product, categories, branches):
+    """The detail payload of one product as a JSON string."""
+    in_stock = branches.get(product.pk, [])
+    return json.dumps({
+        'id': str(product.pk),
+        'name': product.name,
+        'sku': product.sku,
+        'barcode': product.barcode,
+        'price': f'{product.selling_price:.2f}',
+        'tax_rate': f'{product.tax_rate:.2f}',
+        'price_with_tax': f'{_with_tax(product.selling_price, product.tax_rate):.2f}',
+        'availability': {'in_stock': bool(in_stock), 'branches': in_stock},
+        'breadcrumbs': breadcrumbs(categories, product.category_id),
+        'catalog_version': product.catalog_version,
+    }, separators=(',', ':'))
+
+
+def build(product_ids):
+    """
+    Rebuild, store and cache the payloads of the given products.
+
+    Products that are inactive, deleted or gone lose their payload.
+
+    Returns:
+        Payloads by product id (as a string) of the products rebuilt
+    """
+    product_ids = list(product_ids)
+    categories = _categories()
+    built = {}
+    for start in range(0, len(product_ids), CHUNK_SIZE):
+        chunk = product_ids[start:start + CHUNK_SIZE]
+        products = list(
+            Product.objects
+            .filter(pk__in=chunk, is_active=True, is_deleted=False)
+            .only('pk', 'name', 'sku', 'barcode', 'category', 'selling_price', 'tax_rate', 'catalog_version')
+        )
+        branches = _branches([product.pk for product in products])
+        details = [
+            ProductDetail(
+                product_id=product.pk,
+                payload=serialize(product, categories, branches),
+                catalog_version=product.catalog_version,
+            )
+            for product in products
+        ]
+        ProductDetail.objects.bulk_create(
+            details,
+            update_conflicts=True,
+            unique_fields=['product'],
+            update_fields=['payload', 'catalog_version', 'built_at'],
+        )
+        payloads = {str(detail.product_id): detail.payload for detail in details}
+        gone = {str(pk) for pk in chunk} - set(payloads)
+        if gone:
+            ProductDetail.objects.filter(product_id__in=gone).delete()
+            cache.delete_many([cache_key(pk) for pk in gone])
+        cache.set_many(
+            {cache_key(pk): payload for pk, payload in payloads.items()},
+            settings.PRODUCT_DETAIL_CACHE_TIMEOUT,
+        )
+        built.update(payloads)
+    return built
+
+
+def get(product_id):
+    """
+    Return a product's payload from the cache, then the table, building it
+    on a miss; None if the product is not on sale.
+    """
+    key = cache_key(product_id)
+    payload = cache.get(key)
+    if payload is None:
+        payload = ProductDetail.objects.filter(product_id=product_id).values_list('payload', flat=True).first()
+        if payload is None:
+            return build([product_id]).get(str(product_id))
+        cache.set(key, payload, settings.PRODUCT_DETAIL_CACHE_TIMEOUT)
+    return payload
+
+
+def stale():
+    """Ids of products whose payload is missing or older than the product."""
+    return (
+        Product.objects
+        .filter(
+            Q(detail__isnull=True, is_active=True, is_deleted=False)
+            | Q(detail__catalog_version__lt=F('catalog_version'))
+        )
+        .values_list('pk', flat=True)
+    )
+
+
+def refresh():
+    """Rebuild the payloads missed by signals; returns the count rebuilt."""
+    return len(build(list(stale())))
+
+
+def all_products():
+    """Ids of every product that has or should have a payload."""
+    return (
+        Product.objects
+        .filter(Q(is_active=True, is_deleted=False) | Q(detail__isnull=False))
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
@@ -0,0 +1,39 @@
+"""
+Rebuild every storefront product detail payload, in parallel.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.products import details
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds and caches the detail payload of every product, spread over worker threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Threads rebuilding at once')
+        parser.add_argument('--chunk', type=int, default=details.CHUNK_SIZE, help='Products per rebuild')
+        parser.add_argument('--stale', action='store_true', help='Only rebuild missing or outdated payloads')
+
+    def handle(self, *args, **options):
+        product_ids = list(details.stale() if options['stale'] else details.all_products())
+        size = max(1, options['chunk'])
+        chunks = [product_ids[start:start + size] for start in range(0, len(product_ids), size)]
+
+        def work(chunk):
+            try:
+                return len(details.build(chunk))
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            built = sum(pool.map(work, chunks))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {built} product detail payloads from {len(product_ids)} products in {elapsed:.1f}s.'
+        ))
@@ -0,0 +1,140 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:28
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Category",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                ("name", models.CharField(help_text="Category name", max_length=100)),
+                (
+                    "slug",
+                    models.SlugField(
+                        help_text="URL-friendly identifier", max_length=120, unique=True
+                    ),
+                ),
+                (
+                    "parent",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Parent category",
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="children",
+                        to="products.category",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "categories",
+                "db_table": "categories",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Product",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        help_text="Unique identifier",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Timestamp when the record was created"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, help_text="Timestamp when the record was last updated"
+                    ),
+                ),
+                ("is_deleted", models.BooleanField(default=False, help_text="Soft delete flag")),
+                ("name", models.CharField(help_text="Product name", max_length=255)),
+                (
+                    "sku",
+                    models.CharField(help_text="Stock keeping unit", max_length=64, unique=True),
+                ),
+                (
+                    "barcode",
+                    models.CharField(
+                        blank=True, db_index=True, help_text="EAN/UPC barcode", max_length=64
+                    ),
+                ),
+                (
+                    "cost_price",
+                    models.DecimalField(
+                        decimal_places=2, default=0, help_text="Unit cost price", max_digits=12
+                    ),
+                ),
+                (
+                    "selling_price",
+                    models.DecimalField(
+                        decimal_places=2, help_text="Unit selling price", max_digits=12
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(default=True, help_text="Whether the product can be sold"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Product category",
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="products",
+                        to="products.category",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "products",
+                "ordering": ["name"],
+                "indexes": [
+                    models.Index(fields=["sku"], name="products_sku_fe2039_idx"),
+                    models.Index(fields=["category"], name="products_categor_4083ff_idx"),
+                ],
+            },
+        ),
+    ]
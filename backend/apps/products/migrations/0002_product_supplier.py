@@ -0,0 +1,27 @@
+# Generated by Django 5.0.14 on 2026-10-19 10:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0004_purchase_orders"),
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="product",
+            name="supplier",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Preferred supplier for replenishment",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="products",
+                to="inventory.supplier",
+            ),
+        ),
+    ]
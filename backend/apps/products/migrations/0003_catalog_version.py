@@ -0,0 +1,61 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:22
+
+from django.db import migrations, models
+
+
+def stamp_catalog(apps, schema_editor):
+    """Put existing products at version 1 so tills syncing from 0 receive them."""
+    CatalogCounter = apps.get_model('products', 'CatalogCounter')
+    Product = apps.get_model('products', 'Product')
+    CatalogCounter.objects.create(pk=1, version=1)
+    Product.objects.update(catalog_version=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0007_stock_lots"),
+        ("products", "0002_product_supplier"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("version", models.BigIntegerField(default=0, help_text="Last version handed out")),
+            ],
+            options={
+                "db_table": "catalog_counter",
+            },
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="catalog_version",
+            field=models.BigIntegerField(
+                default=0,
+                editable=False,
+                help_text="Catalog version of the product's last change, for till sync",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="tax_rate",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0,
+                help_text="Sales tax charged on the product, in percent",
+                max_digits=5,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="product",
+            index=models.Index(fields=["catalog_version"], name="products_catalog_5f25d7_idx"),
+        ),
+        migrations.RunPython(stamp_catalog, migrations.RunPython.noop),
+    ]
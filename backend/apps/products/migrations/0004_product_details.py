@@ -0,0 +1,41 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0003_catalog_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductDetail",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        help_text="Product",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="detail",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                ("payload", models.TextField(help_text="JSON payload served as is")),
+                (
+                    "catalog_version",
+                    models.BigIntegerField(
+                        default=0, help_text="Product catalog version the payload was built from"
+                    ),
+                ),
+                ("built_at", models.DateTimeField(auto_now=True, help_text="Last rebuild")),
+            ],
+            options={
+                "db_table": "product_details",
+            },
+        ),
+    ]
@@ -0,0 +1,222 @@
+"""
+Product catalog models for the Supermarket Management System.
+"""
+
+from django.db import models, transaction
+from django.db.models import F, FilteredRelation, Q, Value
+from django.db.models.functions import Coalesce
+from core.models import BaseModel
+
+
+class Category(BaseModel):
+    """
+    Hierarchical product category.
+    """
+    name = models.CharField(max_length=100, help_text="Category name")
+    slug = models.SlugField(max_length=120, unique=True, help_text="URL-friendly identifier")
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='children',
+        help_text="Parent category"
+    )
+
+    class Meta:
+        db_table = 'categories'
+        ordering = ['name']
+        verbose_name_plural = 'categories'
+
+    def __str__(self) -> str:
+        return self.name
+
+
+# Fields a till keeps in its offline copy of the catalog; writing any of them
+# stamps the product with a new catalog version.
+CATALOG_FIELDS = frozenset({
+    'name', 'sku', 'barcode', 'category', 'category_id', 'selling_price', 'tax_rate', 'is_active', 'is_deleted',
+})
+
+
+class CatalogCounter(models.Model):
+    """
+    Single-row counter that hands out catalog versions.
+
+    Taking the next version locks the row until the writing transaction
+    commits, so versions become visible in the order they were handed out
+    and a till that has seen version N never misses a change numbered N or
+    below.
+    """
+    version = models.BigIntegerField(default=0, help_text="Last version handed out")
+
+    class Meta:
+        db_table = 'catalog_counter'
+
+    def __str__(self) -> str:
+        return f"Catalog version {self.version}"
+
+    @classmethod
+    def current(cls):
+        """Return the last version handed out."""
+        return cls.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+    @classmethod
+    def next_version(cls):
+        """Take the next version; call inside the transaction that writes the products."""
+        if not cls.objects.filter(pk=1).update(version=F('version') + 1):
+            cls.objects.get_or_create(pk=1)
+            cls.objects.filter(pk=1).update(version=F('version') + 1)
+        return cls.current()
+
+
+class ProductQuerySet(models.QuerySet):
+    """
+    QuerySet helpers for product listings.
+
+    Writes through ``update`` (and so ``bulk_update``) or ``bulk_create``
+    that touch a catalog field stamp the rows with a new catalog version,
+    like ``Product.save``.
+    """
+
+    def with_availability(self, region=None, warehouse=None):
+        """
+        Annotate stock availability with one join per figure.
+
+        ``available_anywhere`` comes from the maintained per-product summary,
+        ``available_in_region`` from the regional aggregate and
+        ``available_in_branch`` from the branch's own stock row, so listings
+        never sum stock across warehouses at read time.
+        """
+        queryset = self.annotate(
+            available_anywhere=Coalesce(
+                F('stock_summary__total_quantity') - F('stock_summary__total_reserved'), Value(0)
+            ),
+        )
+        if region is not None:
+            queryset = queryset.annotate(
+                region_stock=FilteredRelation('regional_stock', condition=Q(regional_stock__region=region)),
+                available_in_region=Coalesce(
+                    F('region_stock__quantity') - F('region_stock__reserved_quantity'), Value(0)
+                ),
+            )
+        if warehouse is not None:
+            queryset = queryset.annotate(
+                branch_stock=FilteredRelation('stock_levels', condition=Q(stock_levels__warehouse=warehouse)),
+                available_in_branch=Coalesce(
+                    F('branch_stock__quantity') - F('branch_stock__reserved_quantity'), Value(0)
+                ),
+            )
+        return queryset
+
+    def update(self, **kwargs):
+        if 'catalog_version' in kwargs or not CATALOG_FIELDS & set(kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            return super().update(catalog_version=CatalogCounter.next_version(), **kwargs)
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self.db):
+            version = CatalogCounter.next_version()
+            for obj in objs:
+                obj.catalog_version = version
+            return super().bulk_create(objs, *args, **kwargs)
+
+
+class Product(BaseModel):
+    """
+    Sellable product identified by SKU and barcode.
+    """
+    name = models.CharField(max_length=255, help_text="Product name")
+    sku = models.CharField(max_length=64, unique=True, help_text="Stock keeping unit")
+    barcode = models.CharField(max_length=64, blank=True, db_index=True, help_text="EAN/UPC barcode")
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='products',
+        help_text="Product category"
+    )
+    cost_price = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="Unit cost price"
+    )
+    selling_price = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        help_text="Unit selling price"
+    )
+    supplier = models.ForeignKey(
+        'inventory.Supplier',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='products',
+        help_text="Preferred supplier for replenishment"
+    )
+    tax_rate = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=0,
+        help_text="Sales tax charged on the product, in percent"
+    )
+    is_active = models.BooleanField(default=True, help_text="Whether the product can be sold")
+    catalog_version = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Catalog version of the product's last change, for till sync"
+    )
+
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'products'
+        ordering = ['name']
+        indexes = [
+            models.Index(fields=['sku']),
+            models.Index(fields=['category']),
+            models.Index(fields=['catalog_version']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.sku})"
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not CATALOG_FIELDS & set(update_fields):
+            return super().save(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get('using')):
+            self.catalog_version = CatalogCounter.next_version()
+            if update_fields is not None:
+                kwargs['update_fields'] = [*update_fields, 'catalog_version']
+            super().save(*args, **kwargs)
+
+
+class ProductDetail(models.Model):
+    """
+    Pre-serialized storefront payload of a product's detail page.
+
+    Rebuilt by ``apps.products.details`` whenever the product, its category
+    path or its stock availability changes, so the detail page is served
+    without touching the catalog tables.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='detail',
+        help_text="Product"
+    )
+    payload = models.TextField(help_text="JSON payload served as is")
+    catalog_version = models.BigIntegerField(default=0, help_text="Product catalog version the payload was built from")
+    built_at = models.DateTimeField(auto_now=True, help_text="Last rebuild")
+
+    class Meta:
+        db_table = 'product_details'
+
+    def __str__(self) -> str:
+        return f"Detail of {self.product_id}"
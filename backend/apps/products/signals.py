@@ -0,0 +1,51 @@
+"""
+Signal receivers that keep storefront detail payloads current.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.inventory.signals import stock_availability_changed
+from . import details, tasks
+from .models import CATALOG_FIELDS, Category, Product
+
+
+def _rebuild(product_ids):
+    """
+    Rebuild the products' payloads once the current transaction commits.
+
+    A broker error is logged rather than failing the save or sale that has
+    already committed; missed catalog changes are caught up by the
+    ``refresh_product_details`` sweep.
+    """
+    product_ids = sorted({str(pk) for pk in product_ids})
+    if product_ids:
+        transaction.on_commit(lambda: tasks.dispatch_rebuild(product_ids), robust=True)
+
+
+@receiver(post_save, sender=Product)
+def rebuild_product(sender, instance, update_fields=None, **kwargs):
+    """
+    Rebuild a product's payload when a catalog field may have changed; the
+    payload shows the same fields the tills do.
+    """
+    if update_fields is None or CATALOG_FIELDS & set(update_fields):
+        _rebuild([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def rebuild_category(sender, instance, created=False, **kwargs):
+    """
+    Rebuild the payloads whose breadcrumbs pass through a changed category.
+    """
+    if not created:
+        _rebuild(details.category_products(instance.pk))
+
+
+@receiver(stock_availability_changed)
+def rebuild_availability(sender, changes, **kwargs):
+    """
+    Rebuild the payloads of products that sold out or came back at a branch.
+    """
+    _rebuild(change['product_id'] for change in changes)
@@ -0,0 +1,28 @@
+"""
+Celery tasks for the products app.
+"""
+
+from celery import shared_task
+from django.conf import settings
+
+from . import details
+
+
+@shared_task
+def rebuild_product_details(product_ids):
+    """Rebuild the storefront payloads of the given products."""
+    return len(details.build(product_ids))
+
+
+@shared_task
+def refresh_product_details():
+    """Rebuild payloads older than their product, e.g. after bulk updates."""
+    return details.refresh()
+
+
+def dispatch_rebuild(product_ids):
+    """Queue a payload rebuild, or run it in-process when PRODUCT_DETAILS_EAGER is set."""
+    if settings.PRODUCT_DETAILS_EAGER:
+        rebuild_product_details.apply(args=[product_ids])
+    else:
+        rebuild_product_details.delay(product_ids)
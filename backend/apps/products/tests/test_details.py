@@ -0,0 +1,138 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+
+from apps.inventory.models import StockMovement
+from apps.inventory.services import StockService
+from apps.products import details, tasks
+from apps.products.models import Category, Product, ProductDetail
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    """Cache payloads in process memory"""
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    yield
+    cache.clear()
+
+
+def page(client, product):
+    return client.get(reverse('products:detail', args=[product.pk]))
+
+
+@pytest.mark.django_db
+class TestDetailPayload:
+    """Test building and serving detail payloads"""
+
+    def test_payload(self, api_client, create_product, create_stock, create_warehouse):
+        """Test the payload carries the price with tax, branches in stock and the category path"""
+        food = Category.objects.create(name='Food', slug='food')
+        rice = Category.objects.create(name='Rice', slug='rice', parent=food)
+        product = create_product(category=rice, selling_price='100.00', tax_rate='7.50')
+        stock = create_stock(product=product)
+        create_stock(product=product, quantity=0)
+        create_stock(product=product, warehouse=create_warehouse(is_active=False))
+
+        response = page(api_client, product)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/json'
+        payload = json.loads(response.content)
+        assert (payload['price'], payload['price_with_tax']) == ('100.00', '107.50')
+        assert payload['availability'] == {
+            'in_stock': True,
+            'branches': [{'id': str(stock.warehouse_id), 'code': stock.warehouse.code, 'name': stock.warehouse.name}],
+        }
+        assert [crumb['slug'] for crumb in payload['breadcrumbs']] == ['food', 'rice']
+        assert ProductDetail.objects.get(product=product).payload == response.content.decode()
+
+    def test_served_without_queries(self, api_client, create_product, django_assert_num_queries):
+        """Test a built payload is served from the cache alone"""
+        product = create_product()
+        details.build([product.pk])
+
+        with django_assert_num_queries(0):
+            response = page(api_client, product)
+
+        assert json.loads(response.content)['id'] == str(product.pk)
+
+    def test_not_on_sale(self, api_client, create_product):
+        """Test inactive products have no page and lose their payload"""
+        product = create_product()
+        details.build([product.pk])
+        Product.objects.filter(pk=product.pk).update(is_active=False)
+
+        assert details.refresh() == 0
+        assert page(api_client, product).status_code == status.HTTP_404_NOT_FOUND
+        assert not ProductDetail.objects.exists()
+
+
+@pytest.mark.django_db
+class TestDetailRebuilds:
+    """Test payloads follow the data they show"""
+
+    def test_product_and_category_saves(self, create_product, django_capture_on_commit_callbacks):
+        """Test renaming a product or its category rebuilds the payload after commit"""
+        category = Category.objects.create(name='Drinks', slug='drinks')
+        product = create_product(category=category)
+        details.build([product.pk])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            product.selling_price = '12.00'
+            product.save(update_fields=['selling_price'])
+            category.name = 'Beverages'
+            category.save()
+
+        payload = json.loads(details.get(product.pk))
+        assert payload['price'] == '12.00'
+        assert payload['breadcrumbs'][0]['name'] == 'Beverages'
+
+    def test_sell_out(self, create_stock, django_capture_on_commit_callbacks):
+        """Test a branch selling out drops it from the payload"""
+        stock = create_stock(quantity=2)
+        details.build([stock.product_id])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            StockService.apply_movements([(stock.product_id, stock.warehouse_id, StockMovement.TYPE_SALE, -2)])
+
+        assert json.loads(details.get(stock.product_id))['availability'] == {'in_stock': False, 'branches': []}
+
+    def test_rebuild_is_best_effort(self, create_stock, monkeypatch, django_capture_on_commit_callbacks):
+        """Test a sale still completes when its payload rebuild cannot be queued"""
+        stock = create_stock(quantity=2)
+
+        def broker_down(product_ids):
+            raise ConnectionError('Broker unreachable')
+
+        monkeypatch.setattr(tasks, 'dispatch_rebuild', broker_down)
+        with django_capture_on_commit_callbacks(execute=True):
+            StockService.apply_movements([(stock.product_id, stock.warehouse_id, StockMovement.TYPE_SALE, -2)])
+
+        stock.refresh_from_db()
+        assert stock.quantity == 0
+
+    def test_bulk_update_refreshed(self, create_product):
+        """Test the sweep rebuilds payloads behind their product's catalog version"""
+        product = create_product()
+        details.build([product.pk])
+        Product.objects.filter(pk=product.pk).update(name='Renamed')
+
+        assert details.refresh() == 1
+        assert json.loads(details.get(product.pk))['name'] == 'Renamed'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_warm_up(create_product):
+    """Test the warm-up command rebuilds every product across threads"""
+    products = [create_product() for _ in range(5)]
+    out = StringIO()
+
+    call_command('warm_product_details', '--workers', '2', '--chunk', '2', stdout=out)
+
+    assert 'Rebuilt 5 product detail payloads' in out.getvalue()
+    assert ProductDetail.objects.filter(product__in=products).count() == 5
@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import ProductDetailView
+
+app_name = 'products'
+
+urlpatterns = [
+    path('<uuid:pk>/', ProductDetailView.as_view(), name='detail'),
+]
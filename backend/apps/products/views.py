@@ -0,0 +1,26 @@
+from django.http import Http404, HttpResponse
+from drf_spectacular.utils import OpenApiTypes, extend_schema
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+
+from . import details
+
+
+@extend_schema(
+    description='Storefront detail page of a product: price with tax, branches with stock and category path',
+    responses={200: OpenApiTypes.OBJECT}
+)
+class ProductDetailView(APIView):
+    """
+    Product detail page.
+
+    Returns the pre-serialized payload kept by ``apps.products.details``
+    byte for byte, without reading the catalog tables.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk):
+        payload = details.get(pk)
+        if payload is None:
+            raise Http404
+        return HttpResponse(payload, content_type='application/json')
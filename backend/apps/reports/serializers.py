@@ -0,0 +1,66 @@
+from rest_framework import serializers
+
+from apps.inventory.models import Stock, StockLot
+
+
+class LowStockSerializer(serializers.ModelSerializer):
+    """Serializer for the low-stock report"""
+
+    product_id = serializers.UUIDField(source='product.id', read_only=True)
+    sku = serializers.CharField(source='product.sku', read_only=True)
+    product_name = serializers.CharField(source='product.name', read_only=True)
+    warehouse_code = serializers.CharField(source='warehouse.code', read_only=True)
+    shortfall = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Stock
+        fields = [
+            'id',
+            'product_id',
+            'sku',
+            'product_name',
+            'warehouse_code',
+            'quantity',
+            'reserved_quantity',
+            'reorder_level',
+            'shortfall',
+            'updated_at',
+        ]
+        read_only_fields = fields
+
+    def get_shortfall(self, obj):
+        """Units needed to get back above the reorder level"""
+        return obj.reorder_level - obj.quantity
+
+
+class NearExpirySerializer(serializers.ModelSerializer):
+    """Serializer for the near-expiry report"""
+
+    product_id = serializers.UUIDField(source='stock.product.id', read_only=True)
+    sku = serializers.CharField(source='stock.product.sku', read_only=True)
+    product_name = serializers.CharField(source='stock.product.name', read_only=True)
+    warehouse_code = serializers.CharField(source='stock.warehouse.code', read_only=True)
+
+    class Meta:
+        model = StockLot
+        fields = [
+            'id',
+            'product_id',
+            'sku',
+            'product_name',
+            'warehouse_code',
+            'lot_number',
+            'expiry_date',
+            'quantity',
+        ]
+        read_only_fields = fields
+
+
+class SegmentationSerializer(serializers.Serializer):
+    """Serializer for one segment and tier of the customer segmentation report"""
+
+    segment = serializers.CharField()
+    tier = serializers.CharField()
+    customers = serializers.IntegerField()
+    total_spent = serializers.DecimalField(max_digits=16, decimal_places=2)
+    average_points = serializers.FloatField()
@@ -0,0 +1,31 @@
+import pytest
+from django.urls import reverse
+from rest_framework import status
+
+
+@pytest.mark.django_db
+class TestLowStockReport:
+    """Test the low-stock report endpoint"""
+
+    def test_lists_flagged_rows(self, manager_client, create_stock, create_warehouse):
+        """Test only flagged rows are returned, filterable by warehouse"""
+        branch = create_warehouse(code='DHK01')
+        low = create_stock(warehouse=branch, quantity=2, reorder_level=5, is_low_stock=True)
+        create_stock(quantity=2, reorder_level=5, is_low_stock=True)
+        create_stock(warehouse=branch, quantity=50, reorder_level=5)
+
+        response = manager_client.get(reverse('reports:low-stock'), {'warehouse': 'DHK01'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 1
+        row = response.data['results'][0]
+        assert row['id'] == str(low.pk)
+        assert row['shortfall'] == 3
+
+    def test_requires_manager(self, client_for, create_user):
+        """Test customers cannot read the report"""
+        client = client_for(create_user())
+
+        response = client.get(reverse('reports:low-stock'))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,10 @@
+from django.urls import path
+from .views import CustomerSegmentationReportView, LowStockReportView, NearExpiryReportView
+
+app_name = 'reports'
+
+urlpatterns = [
+    path('inventory/low-stock/', LowStockReportView.as_view(), name='low-stock'),
+    path('inventory/near-expiry/', NearExpiryReportView.as_view(), name='near-expiry'),
+    path('customers/segmentation/', CustomerSegmentationReportView.as_view(), name='customer-segmentation'),
+]
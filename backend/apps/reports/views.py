@@ -0,0 +1,97 @@
+from django.db.models import Avg, Count, Sum
+from rest_framework import generics
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+
+from apps.customers.models import Customer
+from apps.inventory.models import Stock
+from apps.inventory.services import StockLotService
+from core.pagination import StandardResultsSetPagination
+from core.permissions import IsAdminOrManager
+from .serializers import LowStockSerializer, NearExpirySerializer, SegmentationSerializer
+
+
+@extend_schema(
+    description='Products at or below their reorder level',
+    parameters=[OpenApiParameter('warehouse', str, description='Warehouse code')],
+    responses={200: LowStockSerializer(many=True)}
+)
+class LowStockReportView(generics.ListAPIView):
+    """
+    Low-stock report.
+
+    Reads the ``is_low_stock`` flag maintained by StockService through its
+    partial index instead of comparing every stock row to its reorder level.
+    """
+    serializer_class = LowStockSerializer
+    permission_classes = [IsAdminOrManager]
+    pagination_class = StandardResultsSetPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        """Return flagged stock rows, optionally for one warehouse"""
+        queryset = (
+            Stock.objects
+            .filter(is_low_stock=True)
+            .select_related('product', 'warehouse')
+            .order_by('warehouse__code', 'quantity')
+        )
+        warehouse = self.request.query_params.get('warehouse')
+        if warehouse:
+            queryset = queryset.filter(warehouse__code=warehouse)
+        return queryset
+
+
+@extend_schema(
+    description='Lots with stock left that expire soon or have expired',
+    parameters=[
+        OpenApiParameter('days', int, description='Days ahead to look (default LOT_NEAR_EXPIRY_DAYS)'),
+        OpenApiParameter('warehouse', str, description='Warehouse code'),
+    ],
+    responses={200: NearExpirySerializer(many=True)}
+)
+class NearExpiryReportView(generics.ListAPIView):
+    """
+    Near-expiry report.
+
+    Same indexed range query as the nightly sweep, soonest expiry first.
+    """
+    serializer_class = NearExpirySerializer
+    permission_classes = [IsAdminOrManager]
+    pagination_class = StandardResultsSetPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        """Return lots expiring within ``days``, optionally for one warehouse"""
+        days = self.request.query_params.get('days')
+        queryset = StockLotService.near_expiry(days=int(days) if days and days.isdigit() else None)
+        warehouse = self.request.query_params.get('warehouse')
+        if warehouse:
+            queryset = queryset.filter(stock__warehouse__code=warehouse)
+        return queryset
+
+
+@extend_schema(
+    description='Customers, spend and average points per RFM segment and tier',
+    responses={200: SegmentationSerializer(many=True)}
+)
+class CustomerSegmentationReportView(generics.ListAPIView):
+    """
+    Customer segmentation report.
+
+    Groups the segments and tiers stored by the nightly segmentation job,
+    so the report is one aggregate query whatever the number of customers.
+    """
+    serializer_class = SegmentationSerializer
+    permission_classes = [IsAdminOrManager]
+    pagination_class = None
+    filter_backends = []
+
+    def get_queryset(self):
+        """Return one row per segment and tier"""
+        return (
+            Customer.objects
+            .filter(is_deleted=False)
+            .values('segment', 'tier')
+            .annotate(customers=Count('pk'), total_spent=Sum('total_spent'), average_points=Avg('points_balance'))
+            .order_by('segment', 'tier')
+        )
@@ -0,0 +1,16 @@
+"""
+Celery application for the Supermarket Management System.
+
+Workers and beat are started with ``celery -A config worker`` and
+``celery -A config beat``.
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+
+app = Celery('config')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
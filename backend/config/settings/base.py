@@ -7,6 +7,9 @@ from pathlib import Path
 from decouple import config, Csv
 from datetime import timedelta
 
+from celery.schedules import crontab
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -32,6 +35,7 @@ DJANGO_APPS = [
 ]
 
 THIRD_PARTY_APPS = [
+    'channels',
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework_simplejwt.token_blacklist',
@@ -41,6 +45,7 @@ THIRD_PARTY_APPS = [
 ]
 
 LOCAL_APPS = [
+    'core',
     'apps.accounts',
     'apps.products',
     'apps.inventory',
@@ -54,7 +59,8 @@ LOCAL_APPS = [
     'apps.settings',
 ]
 
-INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
+# daphne goes first so runserver serves the ASGI application, WebSockets included
+INSTALLED_APPS = ['daphne'] + DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 # ==============================================================================
 # MIDDLEWARE
@@ -92,6 +98,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
 
 
 # ==============================================================================
@@ -160,6 +167,9 @@ REST_FRAMEWORK = {
     'EXCEPTION_HANDLER': 'core.exceptions.custom_exception_handler',
 }
 
+# Largest body, in bytes, a gzip-encoded request may expand to
+MAX_DECOMPRESSED_REQUEST_SIZE = config('MAX_DECOMPRESSED_REQUEST_SIZE', default=20 * 1024 * 1024, cast=int)
+
 # ==============================================================================
 # SIMPLE JWT
 # ==============================================================================
@@ -184,6 +194,7 @@ CORS_ALLOWED_ORIGINS = config(
     cast=Csv()
 )
 CORS_ALLOW_CREDENTIALS = True
+CORS_ALLOW_HEADERS = (*default_headers, 'x-cart-token', 'x-admission-token')
 
 # ==============================================================================
 # DRF SPECTACULAR (API DOCUMENTATION)
@@ -205,6 +216,72 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Dhaka'
+CELERY_BEAT_SCHEDULE = {
+    'expire-stock-reservations': {
+        'task': 'apps.inventory.tasks.expire_stock_reservations',
+        'schedule': 60.0,
+    },
+    'compact-stock-ledger': {
+        'task': 'apps.inventory.tasks.compact_stock_ledger',
+        'schedule': crontab(minute=15),
+    },
+    'verify-stock-ledger': {
+        'task': 'apps.inventory.tasks.verify_stock_ledger',
+        'schedule': crontab(hour=3, minute=30),
+    },
+    'generate-purchase-order-drafts': {
+        'task': 'apps.inventory.tasks.generate_purchase_order_drafts',
+        'schedule': crontab(hour=4, minute=0),
+    },
+    'sweep-expiring-lots': {
+        'task': 'apps.inventory.tasks.sweep_expiring_lots',
+        'schedule': crontab(hour=5, minute=0),
+    },
+    'flush-carts': {
+        'task': 'apps.ecommerce.tasks.flush_carts',
+        'schedule': 300.0,
+    },
+    'resume-order-stages': {
+        'task': 'apps.ecommerce.tasks.resume_order_stages',
+        'schedule': 60.0,
+    },
+    'build-catalog-snapshot': {
+        'task': 'apps.pos.tasks.build_catalog_snapshot',
+        'schedule': crontab(minute=45),
+    },
+    'refresh-product-details': {
+        'task': 'apps.products.tasks.refresh_product_details',
+        'schedule': 600.0,
+    },
+    'apply-loyalty-accruals': {
+        'task': 'apps.customers.tasks.apply_loyalty_accruals',
+        'schedule': 60.0,
+    },
+    'expire-loyalty-points': {
+        'task': 'apps.customers.tasks.expire_loyalty_points',
+        'schedule': crontab(hour=1, minute=30),
+    },
+    'verify-loyalty-balances': {
+        'task': 'apps.customers.tasks.verify_loyalty_balances',
+        'schedule': crontab(hour=3, minute=45),
+    },
+    'segment-customers': {
+        'task': 'apps.customers.tasks.segment_customers',
+        'schedule': crontab(hour=2, minute=45),
+    },
+    'retry-payment-events': {
+        'task': 'apps.payments.tasks.retry_payment_events',
+        'schedule': 60.0,
+    },
+    'create-table-partitions': {
+        'task': 'core.tasks.create_table_partitions',
+        'schedule': crontab(hour=2, minute=15),
+    },
+    'verify-partition-references': {
+        'task': 'core.tasks.verify_partition_references',
+        'schedule': crontab(hour=4, minute=15),
+    },
+}
 
 # ==============================================================================
 # REDIS CACHE
@@ -221,6 +298,149 @@ CACHES = {
     }
 }
 
+# ==============================================================================
+# CHANNEL LAYERS (WebSockets)
+# ==============================================================================
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {
+            'hosts': [config('CHANNEL_LAYER_URL', default='redis://localhost:6379/2')],
+        },
+    }
+}
+
+# ==============================================================================
+# INVENTORY
+# ==============================================================================
+# Seconds an unconfirmed stock reservation holds quantity before it expires
+STOCK_RESERVATION_TTL = config('STOCK_RESERVATION_TTL', default=900, cast=int)
+
+# Days ahead the nightly sweep looks for lots that are about to expire
+LOT_NEAR_EXPIRY_DAYS = config('LOT_NEAR_EXPIRY_DAYS', default=3, cast=int)
+
+# ==============================================================================
+# POINT OF SALE
+# ==============================================================================
+# Most queued sales a till may upload in one sync request
+POS_SYNC_MAX_TRANSACTIONS = config('POS_SYNC_MAX_TRANSACTIONS', default=5000, cast=int)
+
+# Seconds a terminal's WebSocket buffers realtime events before sending them
+# as one frame, and the most events per frame
+POS_REALTIME_FLUSH_INTERVAL = config('POS_REALTIME_FLUSH_INTERVAL', default=0.25, cast=float)
+POS_REALTIME_MAX_FRAME_EVENTS = config('POS_REALTIME_MAX_FRAME_EVENTS', default=500, cast=int)
+
+# Full catalog snapshots kept for new tills; older ones are deleted
+CATALOG_SNAPSHOTS_KEPT = config('CATALOG_SNAPSHOTS_KEPT', default=3, cast=int)
+
+# Receipts: printer width in characters, footer line, how long rendered
+# receipts stay cached for reprints, and whether a worker renders them as
+# soon as the sale commits (otherwise the first print renders and caches)
+POS_RECEIPT_WIDTH = config('POS_RECEIPT_WIDTH', default=42, cast=int)
+POS_RECEIPT_FOOTER = config('POS_RECEIPT_FOOTER', default='Thank you for shopping with us')
+POS_RECEIPT_CACHE_TIMEOUT = config('POS_RECEIPT_CACHE_TIMEOUT', default=7 * 24 * 3600, cast=int)
+POS_RECEIPT_PRERENDER = config('POS_RECEIPT_PRERENDER', default=True, cast=bool)
+
+# ==============================================================================
+# ONLINE SHOP
+# ==============================================================================
+# Where live carts are kept, how long an untouched cart lives, and how many
+# changed carts one write-behind flush persists at a time
+CART_STORE = config('CART_STORE', default='apps.ecommerce.store.RedisCartStore')
+CART_TTL = config('CART_TTL', default=7 * 24 * 3600, cast=int)
+CART_FLUSH_BATCH = config('CART_FLUSH_BATCH', default=500, cast=int)
+
+# Storefront detail payloads (apps.products.details): how long they stay
+# cached, and whether rebuilds run in-process instead of on a worker
+PRODUCT_DETAIL_CACHE_TIMEOUT = config('PRODUCT_DETAIL_CACHE_TIMEOUT', default=24 * 3600, cast=int)
+PRODUCT_DETAILS_EAGER = config('PRODUCT_DETAILS_EAGER', default=False, cast=bool)
+
+# ==============================================================================
+# LOYALTY
+# ==============================================================================
+# Sales queue their points; a worker applies them to the ledger and cached
+# balances in batches (apps.customers.services.LoyaltyService)
+LOYALTY_SPEND_PER_POINT = config('LOYALTY_SPEND_PER_POINT', default=100, cast=int)
+LOYALTY_POINTS_TTL_DAYS = config('LOYALTY_POINTS_TTL_DAYS', default=365, cast=int)
+LOYALTY_BATCH_SIZE = config('LOYALTY_BATCH_SIZE', default=1000, cast=int)
+
+# Customer segmentation (apps.customers.segmentation): score breakpoints,
+# lifetime spend for the silver, gold and platinum tiers, and customers
+# scored per chunk
+CUSTOMER_RECENCY_DAYS = (30, 90, 180, 365)
+CUSTOMER_FREQUENCY_BREAKS = (2, 4, 8, 16)
+CUSTOMER_MONETARY_BREAKS = (1000, 5000, 20000, 50000)
+CUSTOMER_TIER_THRESHOLDS = (10000, 50000, 150000)
+CUSTOMER_SEGMENT_CHUNK = config('CUSTOMER_SEGMENT_CHUNK', default=10000, cast=int)
+
+# Till lookup by phone prefix (apps.customers.lookup): country code also
+# indexed in national form, digits typed before searching, matches returned
+# and how often each worker reads customers saved by other workers
+CUSTOMER_PHONE_COUNTRY_CODE = config('CUSTOMER_PHONE_COUNTRY_CODE', default='880')
+CUSTOMER_LOOKUP_MIN_DIGITS = config('CUSTOMER_LOOKUP_MIN_DIGITS', default=3, cast=int)
+CUSTOMER_LOOKUP_LIMIT = config('CUSTOMER_LOOKUP_LIMIT', default=10, cast=int)
+CUSTOMER_LOOKUP_SYNC_SECONDS = config('CUSTOMER_LOOKUP_SYNC_SECONDS', default=30, cast=int)
+
+# Duplicate customers (apps.customers.dedup): largest block compared, scores
+# worth reviewing and merged by ``dedupe_customers --merge``, and customers
+# keyed or pairs scored per chunk
+CUSTOMER_DEDUP_MAX_BLOCK = config('CUSTOMER_DEDUP_MAX_BLOCK', default=50, cast=int)
+CUSTOMER_DEDUP_MIN_SCORE = config('CUSTOMER_DEDUP_MIN_SCORE', default=0.6, cast=float)
+CUSTOMER_DEDUP_MERGE_SCORE = config('CUSTOMER_DEDUP_MERGE_SCORE', default=0.9, cast=float)
+CUSTOMER_DEDUP_CHUNK = config('CUSTOMER_DEDUP_CHUNK', default=5000, cast=int)
+
+# ==============================================================================
+# DOCUMENT NUMBERS
+# ==============================================================================
+# Order and receipt numbers reserved per worker at a time (core.numbering)
+NUMBER_BLOCK_SIZE = config('NUMBER_BLOCK_SIZE', default=50, cast=int)
+
+# ==============================================================================
+# TABLE PARTITIONING (PostgreSQL)
+# ==============================================================================
+# Orders and till sales are partitioned by month (core.partitioning)
+PARTITION_MONTHS_AHEAD = config('PARTITION_MONTHS_AHEAD', default=3, cast=int)
+PARTITION_RETENTION_MONTHS = config('PARTITION_RETENTION_MONTHS', default=13, cast=int)
+PARTITION_ARCHIVE_SCHEMA = config('PARTITION_ARCHIVE_SCHEMA', default='archive')
+
+# ==============================================================================
+# FLASH SALE ADMISSION CONTROL
+# ==============================================================================
+# Virtual queues and checkout slots for live flash sales (apps.ecommerce.admission)
+ADMISSION_STORE = config('ADMISSION_STORE', default='apps.ecommerce.admission.RedisAdmissionStore')
+ADMISSION_TOKEN_TTL = config('ADMISSION_TOKEN_TTL', default=10 * 60, cast=int)
+ADMISSION_QUEUE_TTL = config('ADMISSION_QUEUE_TTL', default=6 * 3600, cast=int)
+ADMISSION_SLOT_TTL = config('ADMISSION_SLOT_TTL', default=30, cast=int)
+ADMISSION_SALES_REFRESH = config('ADMISSION_SALES_REFRESH', default=5, cast=int)
+ADMISSION_MAX_RETRY_AFTER = config('ADMISSION_MAX_RETRY_AFTER', default=30, cast=int)
+
+# ==============================================================================
+# CHECKOUT
+# ==============================================================================
+# Checkout reserves stock and stores the order; payment and the customer
+# notification then run as Celery stages (apps.ecommerce.tasks); stages
+# waiting longer than ORDER_STAGE_LEASE seconds are queued again
+ORDER_RESERVATION_TTL = config('ORDER_RESERVATION_TTL', default=30 * 60, cast=int)
+ORDER_STAGE_LEASE = config('ORDER_STAGE_LEASE', default=300, cast=int)
+ORDER_STAGE_MAX_RETRIES = config('ORDER_STAGE_MAX_RETRIES', default=5, cast=int)
+ORDER_STAGES_EAGER = config('ORDER_STAGES_EAGER', default=False, cast=bool)
+PAYMENT_GATEWAYS = {
+    'cod': 'apps.payments.gateways.CashOnDeliveryGateway',
+}
+PAYMENT_SIMULATOR_URL = config('PAYMENT_SIMULATOR_URL', default='http://localhost:8000/payments/simulator')
+
+# Gateway callbacks (apps.payments.webhooks): signing secrets per gateway,
+# when waiting events are retried and how often before giving up, and
+# whether events are applied in-process instead of on a worker
+PAYMENT_WEBHOOK_SECRETS = {
+    'bkash': config('BKASH_WEBHOOK_SECRET', default=''),
+    'nagad': config('NAGAD_WEBHOOK_SECRET', default=''),
+    'card': config('CARD_WEBHOOK_SECRET', default=''),
+}
+PAYMENT_EVENT_RETRY_AFTER = config('PAYMENT_EVENT_RETRY_AFTER', default=60, cast=int)
+PAYMENT_EVENT_MAX_ATTEMPTS = config('PAYMENT_EVENT_MAX_ATTEMPTS', default=10, cast=int)
+PAYMENT_EVENTS_EAGER = config('PAYMENT_EVENTS_EAGER', default=False, cast=bool)
+
 # ==============================================================================
 # INTERNATIONALIZATION
 # ==============================================================================
@@ -27,6 +27,43 @@ INSTALLED_APPS += [
 # For development, you can use SQLite if PostgreSQL is not set up
 # Set USE_SQLITE=True in your .env file
 
+# ==============================================================================
+# CHANNEL LAYERS (In-memory; single process only)
+# ==============================================================================
+# Set CHANNEL_LAYER_URL and drop this override to test against Redis
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    }
+}
+
+# ==============================================================================
+# POINT OF SALE
+# ==============================================================================
+# No Celery worker runs in development; receipts render on first print
+POS_RECEIPT_PRERENDER = False
+
+# ==============================================================================
+# ONLINE SHOP
+# ==============================================================================
+# In-process carts and flash sale queues; single process only, like the
+# channel layer above
+CART_STORE = 'apps.ecommerce.store.LocalCartStore'
+ADMISSION_STORE = 'apps.ecommerce.admission.LocalAdmissionStore'
+
+# Checkout stages, product page rebuilds and gateway callbacks run in the
+# request without a worker; online gateways are simulated
+ORDER_STAGES_EAGER = True
+PRODUCT_DETAILS_EAGER = True
+PAYMENT_GATEWAYS = {
+    **PAYMENT_GATEWAYS,
+    'bkash': 'apps.payments.gateways.SimulatedGateway',
+    'nagad': 'apps.payments.gateways.SimulatedGateway',
+    'card': 'apps.payments.gateways.SimulatedGateway',
+}
+PAYMENT_WEBHOOK_SECRETS = {gateway: 'simulator-secret' for gateway in ('bkash', 'nagad', 'card')}
+PAYMENT_EVENTS_EAGER = True
+
 # ==============================================================================
 # EMAIL BACKEND (Console for development)
 # ==============================================================================
@@ -35,6 +35,13 @@ urlpatterns = [
     
     # API endpoints
     path('api/', include('apps.accounts.urls', namespace='accounts')),
+    path('api/inventory/', include('apps.inventory.urls', namespace='inventory')),
+    path('api/pos/', include('apps.pos.urls', namespace='pos')),
+    path('api/products/', include('apps.products.urls', namespace='products')),
+    path('api/customers/', include('apps.customers.urls', namespace='customers')),
+    path('api/', include('apps.ecommerce.urls', namespace='ecommerce')),
+    path('api/payments/', include('apps.payments.urls', namespace='payments')),
+    path('api/reports/', include('apps.reports.urls', namespace='reports')),
 ]
 
 # Serve media files in development
@@ -0,0 +1,144 @@
+"""
+Fixtures shared across app test suites.
+"""
+
+import itertools
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.customers.models import Customer
+from apps.inventory.models import Stock, Warehouse
+from apps.pos.models import POSSession
+from apps.products.models import Category, Product
+from core import numbering
+
+User = get_user_model()
+
+_sequence = itertools.count(1)
+
+
+@pytest.fixture(autouse=True)
+def close_number_connection():
+    """Close the thread's block-reserving connection so the test database can be dropped"""
+    yield
+    numbering._local.side = None
+
+
+@pytest.fixture
+def api_client():
+    """Return API client"""
+    return APIClient()
+
+
+@pytest.fixture
+def create_user(db):
+    """Factory to create users with unique email, username and phone"""
+    def make_user(**kwargs):
+        n = next(_sequence)
+        defaults = {
+            'email': f'user{n}@example.com',
+            'username': f'user{n}',
+            'phone': f'+88017{n:08d}',
+            'role': 'customer',
+        }
+        defaults.update(kwargs)
+        password = defaults.pop('password', 'testpass123')
+        return User.objects.create_user(password=password, **defaults)
+    return make_user
+
+
+@pytest.fixture
+def client_for(api_client):
+    """Return a function that authenticates the API client as a user"""
+    def authenticate(user):
+        refresh = RefreshToken.for_user(user)
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        api_client.user = user
+        return api_client
+    return authenticate
+
+
+@pytest.fixture
+def manager_client(client_for, create_user):
+    """Return API client authenticated as a manager"""
+    return client_for(create_user(role='manager'))
+
+
+@pytest.fixture
+def create_category(db):
+    """Factory to create categories"""
+    def make_category(**kwargs):
+        n = next(_sequence)
+        defaults = {'name': f'Category {n}', 'slug': f'category-{n}'}
+        defaults.update(kwargs)
+        return Category.objects.create(**defaults)
+    return make_category
+
+
+@pytest.fixture
+def create_product(db):
+    """Factory to create products"""
+    def make_product(**kwargs):
+        n = next(_sequence)
+        defaults = {
+            'name': f'Product {n}',
+            'sku': f'SKU-{n:05d}',
+            'barcode': f'{n:013d}',
+            'selling_price': '10.00',
+            'cost_price': '7.00',
+        }
+        defaults.update(kwargs)
+        return Product.objects.create(**defaults)
+    return make_product
+
+
+@pytest.fixture
+def create_warehouse(db):
+    """Factory to create warehouses"""
+    def make_warehouse(**kwargs):
+        n = next(_sequence)
+        defaults = {'name': f'Branch {n}', 'code': f'BR{n:03d}'}
+        defaults.update(kwargs)
+        return Warehouse.objects.create(**defaults)
+    return make_warehouse
+
+
+@pytest.fixture
+def create_stock(create_product, create_warehouse):
+    """Factory to create stock rows, creating product and warehouse if omitted"""
+    def make_stock(**kwargs):
+        if 'product' not in kwargs:
+            kwargs['product'] = create_product()
+        if 'warehouse' not in kwargs:
+            kwargs['warehouse'] = create_warehouse()
+        kwargs.setdefault('quantity', 10)
+        return Stock.objects.create(**kwargs)
+    return make_stock
+
+
+@pytest.fixture
+def create_session(create_user, create_warehouse):
+    """Factory to create open till sessions, creating cashier and warehouse if omitted"""
+    def make_session(**kwargs):
+        n = next(_sequence)
+        if 'cashier' not in kwargs:
+            kwargs['cashier'] = create_user(role='cashier')
+        if 'warehouse' not in kwargs:
+            kwargs['warehouse'] = create_warehouse()
+        kwargs.setdefault('terminal_id', f'TILL-{n}')
+        return POSSession.objects.create(**kwargs)
+    return make_session
+
+
+@pytest.fixture
+def create_customer(db):
+    """Factory to create customers"""
+    def make_customer(**kwargs):
+        n = next(_sequence)
+        defaults = {'name': f'Customer {n}', 'phone': f'+88019{n:08d}'}
+        defaults.update(kwargs)
+        return Customer.objects.create(**defaults)
+    return make_customer
@@ -0,0 +1,56 @@
+"""
+Helpers shared by the ``benchmark_*`` management commands.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+
+
+def percentile(samples, pct):
+    """
+    Return the ``pct`` percentile of ``samples`` using nearest-rank.
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def latency_summary(samples):
+    """
+    Summarise latencies given in seconds as milliseconds.
+    """
+    if not samples:
+        return {'count': 0, 'mean_ms': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+    return {
+        'count': len(samples),
+        'mean_ms': sum(samples) / len(samples) * 1000,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+        'max_ms': max(samples) * 1000,
+    }
+
+
+def format_summary(summary):
+    """
+    Render a latency summary as a single line.
+    """
+    return (
+        f"n={summary['count']} mean={summary['mean_ms']:.2f}ms p50={summary['p50_ms']:.2f}ms "
+        f"p95={summary['p95_ms']:.2f}ms p99={summary['p99_ms']:.2f}ms max={summary['max_ms']:.2f}ms"
+    )
+
+
+@contextmanager
+def timed(samples):
+    """
+    Append the elapsed wall time of the block to ``samples``.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples.append(time.perf_counter() - start)
@@ -18,6 +18,16 @@ def custom_exception_handler(exc, context):
         "errors": {...}
     }
     """
+    # Business errors raised by services carry their own status and message
+    if isinstance(exc, APIException):
+        response = Response(
+            {'success': False, 'message': exc.message, 'errors': getattr(exc, 'errors', {})},
+            status=exc.status_code
+        )
+        if getattr(exc, 'retry_after', None):
+            response['Retry-After'] = str(exc.retry_after)
+        return response
+
     # Call REST framework's default exception handler first
     response = exception_handler(exc, context)
     
@@ -78,7 +88,30 @@ class PaymentFailedError(APIException):
     default_message = 'Payment failed'
 
 
+class InsufficientPointsError(APIException):
+    """Exception raised when a customer has too few loyalty points."""
+    status_code = status.HTTP_409_CONFLICT
+    default_message = 'Not enough loyalty points'
+
+
 class InvalidOperationError(APIException):
     """Exception raised for invalid business operations."""
     status_code = status.HTTP_400_BAD_REQUEST
     default_message = 'Invalid operation'
+
+
+class InvalidCallbackError(APIException):
+    """Exception raised for a payment gateway callback that cannot be accepted."""
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_message = 'Invalid gateway callback'
+
+
+class AdmissionRequiredError(APIException):
+    """Exception raised when admission control turns a shopper away for now."""
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    default_message = 'You are in line'
+
+    def __init__(self, message=None, errors=None, retry_after=None):
+        super().__init__(message)
+        self.errors = errors or {}
+        self.retry_after = retry_after
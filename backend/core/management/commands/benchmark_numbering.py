@@ -0,0 +1,87 @@
+"""
+Throughput benchmark for allocating order and receipt numbers.
+
+Many workers, each with its own allocator as separate web or Celery
+processes would have, take numbers for the same branch at once. The run is
+made twice: with a block size of one, where every number is an UPDATE of the
+shared counter row as with a single counter, and with NUMBER_BLOCK_SIZE
+blocks. Reports numbers per second, latency percentiles and counter writes,
+and checks every number was handed out once. Run it against PostgreSQL for
+representative contention; SQLite serialises writers and reports lock
+waits instead.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.test.utils import override_settings
+
+from core.benchmark import format_summary, latency_summary
+from core.models import NumberCounter
+from core.numbering import NumberAllocator
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks concurrent order number allocation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=16, help='Concurrent workers')
+        parser.add_argument('--numbers', type=int, default=500, help='Numbers per worker')
+        parser.add_argument('--block-size', type=int, default=settings.NUMBER_BLOCK_SIZE, help='Hi-lo block size')
+
+    def handle(self, *args, **options):
+        scope = f'bench-{uuid.uuid4().hex[:8]}'
+        try:
+            for label, block_size in (('Counter row', 1), ('Hi-lo', options['block_size'])):
+                with override_settings(NUMBER_BLOCK_SIZE=block_size):
+                    self.run(label, f'{scope}-{block_size}', options)
+        finally:
+            NumberCounter.objects.filter(scope__startswith=scope).delete()
+
+    def run(self, label, scope, options):
+        latencies, numbers, errors = [], [], []
+        lock = threading.Lock()
+        barrier = threading.Barrier(options['workers'])
+
+        def worker(index):
+            allocator = NumberAllocator(scope, 'BM')
+            local_latencies, local_numbers, local_errors = [], [], 0
+            try:
+                barrier.wait()
+                for _ in range(options['numbers']):
+                    start = time.perf_counter()
+                    try:
+                        local_numbers.append(allocator.next('BENCH'))
+                        local_latencies.append(time.perf_counter() - start)
+                    except DatabaseError:
+                        local_errors += 1
+            finally:
+                connection.close()
+                with lock:
+                    latencies.extend(local_latencies)
+                    numbers.extend(local_numbers)
+                    errors.append(local_errors)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for index in range(options['workers']):
+                pool.submit(worker, index)
+        elapsed = time.perf_counter() - started
+
+        high = NumberCounter.objects.filter(scope=scope).values_list('high', flat=True).first() or 0
+        block_size = settings.NUMBER_BLOCK_SIZE
+        self.stdout.write(
+            f"{label} (block {block_size}): {len(numbers)} numbers by {options['workers']} workers "
+            f"in {elapsed:.2f}s ({len(numbers) / elapsed:.0f}/s), "
+            f"{-(-high // block_size)} counter writes, {sum(errors)} errors"
+        )
+        self.stdout.write(f'  {format_summary(latency_summary(latencies))}')
+        if len(set(numbers)) != len(numbers):
+            self.stdout.write(self.style.ERROR(f'  {len(numbers) - len(set(numbers))} duplicate numbers.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('  Every number is unique.'))
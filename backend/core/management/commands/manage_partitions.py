@@ -0,0 +1,44 @@
+"""
+Create upcoming monthly partitions and archive old ones.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core import partitioning
+
+
+class Command(BaseCommand):
+    help = 'Creates monthly partitions ahead and detaches expired ones into the archive schema'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead', type=int, default=settings.PARTITION_MONTHS_AHEAD, help='Months to create ahead'
+        )
+        parser.add_argument('--archive', action='store_true', help='Also archive partitions past retention')
+        parser.add_argument(
+            '--retention',
+            type=int,
+            default=settings.PARTITION_RETENTION_MONTHS,
+            help='Months kept attached, the current one included',
+        )
+
+    def handle(self, *args, **options):
+        if not partitioning.supported():
+            self.stdout.write(self.style.WARNING('Table partitioning needs PostgreSQL; nothing to do.'))
+            return
+
+        this_month = partitioning.month_start(timezone.now().date())
+        through = partitioning.add_months(this_month, options['ahead'])
+        before = partitioning.add_months(this_month, 1 - options['retention'])
+        for table in partitioning.PARTITIONED_TABLES:
+            for name in partitioning.create_partitions(table, through):
+                self.stdout.write(f'Created {name}')
+            if options['archive']:
+                for name in partitioning.archive_partitions(table, before):
+                    self.stdout.write(f'Archived {name} to {settings.PARTITION_ARCHIVE_SCHEMA}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Partitions run through {through:%Y-%m}'
+            + (f'; months before {before:%Y-%m} are archived.' if options['archive'] else '.')
+        ))
@@ -0,0 +1,42 @@
+# Generated by Django 5.0.14 on 2026-10-19 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="NumberCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("scope", models.CharField(help_text="Kind of document numbered", max_length=20)),
+                ("branch", models.CharField(help_text="Branch code", max_length=20)),
+                ("day", models.DateField(help_text="Local day the numbers belong to")),
+                (
+                    "high",
+                    models.PositiveBigIntegerField(
+                        default=0, help_text="Last number reserved by any worker"
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "number_counters",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="numbercounter",
+            constraint=models.UniqueConstraint(
+                fields=("scope", "branch", "day"), name="unique_number_counter"
+            ),
+        ),
+    ]
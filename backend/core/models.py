@@ -43,3 +43,23 @@ class BaseModel(models.Model):
         """Restore a soft-deleted instance."""
         self.is_deleted = False
         self.save(update_fields=['is_deleted', 'updated_at'])
+
+
+class NumberCounter(models.Model):
+    """
+    High-water mark of the document numbers handed out for one scope,
+    branch and day. See core.numbering.
+    """
+    scope = models.CharField(max_length=20, help_text="Kind of document numbered")
+    branch = models.CharField(max_length=20, help_text="Branch code")
+    day = models.DateField(help_text="Local day the numbers belong to")
+    high = models.PositiveBigIntegerField(default=0, help_text="Last number reserved by any worker")
+
+    class Meta:
+        db_table = 'number_counters'
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'branch', 'day'], name='unique_number_counter'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.scope} {self.branch} {self.day}: {self.high}"
@@ -0,0 +1,131 @@
+"""
+Sequential document numbers per branch and day without a global lock.
+
+Numbers are handed out in blocks (hi-lo). A worker process reserves a block
+of NUMBER_BLOCK_SIZE numbers by raising the high-water mark of the scope,
+branch and day in NumberCounter with one upsert, then hands out numbers
+from the block in memory. The counter row is touched once per block rather
+than once per document, so concurrent checkouts and till sales do not
+queue behind it.
+
+On PostgreSQL a block is reserved on a separate autocommit connection when
+the caller is inside a transaction, so the row lock is released at once
+instead of being held until the caller's order or sale commits. That
+connection is checked before each block, reopened when the server has
+dropped it and closed when its thread exits. Other databases reserve
+inside the caller's transaction; as a rollback would hand the block out
+again, only the numbers needed are reserved there and nothing is kept for
+later.
+
+Numbers are unique and increase within each worker, but are not gap-free:
+workers interleave their blocks, and the unused rest of a block is lost
+when its worker exits.
+"""
+
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from .models import NumberCounter
+
+_local = threading.local()
+
+
+class _SideConnection:
+    """
+    A thread's autocommit connection for reserving blocks, closed when the
+    thread exits and its local storage is dropped.
+    """
+
+    def __init__(self):
+        self.connection = connections.create_connection(DEFAULT_DB_ALIAS)
+
+    def usable(self):
+        """The connection, reopened first if the server dropped it or it outlived CONN_MAX_AGE."""
+        self.connection.close_if_unusable_or_obsolete()
+        if self.connection.connection is not None and not self.connection.is_usable():
+            self.connection.close()
+        return self.connection
+
+    def __del__(self):
+        # The local may be dropped by another thread than the one that used it
+        self.connection.inc_thread_sharing()
+        self.connection.close()
+
+
+def _block_connection():
+    """
+    Connection to reserve blocks on, and whether a reservation made on it
+    survives a rollback of the caller's transaction.
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    if not connection.in_atomic_block:
+        return connection, True
+    if connection.vendor != 'postgresql':
+        return connection, False
+    if getattr(_local, 'side', None) is None:
+        _local.side = _SideConnection()
+    return _local.side.usable(), True
+
+
+def reserve_block(connection, scope, branch, day, size):
+    """
+    Raise the high-water mark by ``size``; returns the first and last number of the block.
+    """
+    table = NumberCounter._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (scope, branch, day, high) VALUES (%s, %s, %s, %s) "
+            f"ON CONFLICT (scope, branch, day) DO UPDATE SET high = {table}.high + excluded.high "
+            f"RETURNING high",
+            [scope, branch, day, size],
+        )
+        high = cursor.fetchone()[0]
+    return high - size + 1, high
+
+
+class NumberAllocator:
+    """
+    Hands out numbers like ``POS-DHK01-20261019-000042`` for one scope.
+
+    One instance per scope is shared by the threads of a worker process.
+    """
+
+    def __init__(self, scope, prefix):
+        self.scope = scope
+        self.prefix = prefix
+        self.blocks = {}
+        self.lock = threading.Lock()
+
+    def allocate(self, branch, count=1):
+        """
+        Return ``count`` new numbers for the branch's current local day.
+
+        Args:
+            branch: Branch (warehouse) code
+        """
+        day = timezone.localdate()
+        key = (branch, day)
+        numbers = []
+        with self.lock:
+            for stale in [other for other in self.blocks if other[1] != day]:
+                del self.blocks[stale]
+            while len(numbers) < count:
+                block = self.blocks.get(key)
+                if block is None or block[0] > block[1]:
+                    connection, durable = _block_connection()
+                    needed = count - len(numbers)
+                    size = max(settings.NUMBER_BLOCK_SIZE, needed) if durable else needed
+                    block = list(reserve_block(connection, self.scope, branch, day, size))
+                    if durable:
+                        self.blocks[key] = block
+                take = min(count - len(numbers), block[1] - block[0] + 1)
+                numbers += range(block[0], block[0] + take)
+                block[0] += take
+        return [f'{self.prefix}-{branch}-{day:%Y%m%d}-{number:06d}' for number in numbers]
+
+    def next(self, branch):
+        """Return one new number for the branch."""
+        return self.allocate(branch)[0]
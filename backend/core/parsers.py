@@ -0,0 +1,38 @@
+"""
+Custom request parsers.
+"""
+
+import gzip
+import io
+import zlib
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class GzipJSONParser(JSONParser):
+    """
+    JSON parser that also accepts ``Content-Encoding: gzip`` bodies.
+
+    Used by endpoints that take large batches, such as POS offline sync.
+    The decompressed size is capped by ``MAX_DECOMPRESSED_REQUEST_SIZE`` so
+    a small compressed body cannot expand without bound.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = (parser_context or {}).get('request')
+        encoding = request.META.get('HTTP_CONTENT_ENCODING', '') if request is not None else ''
+        if encoding.lower() not in ('gzip', 'x-gzip'):
+            return super().parse(stream, media_type, parser_context)
+
+        limit = settings.MAX_DECOMPRESSED_REQUEST_SIZE
+        try:
+            with gzip.GzipFile(fileobj=stream) as body:
+                data = body.read(limit + 1)
+        except (OSError, EOFError, zlib.error) as exc:
+            raise ParseError(f'Invalid gzip body - {exc}')
+        if len(data) > limit:
+            raise ParseError('Decompressed request body is too large.')
+        return super().parse(io.BytesIO(data), media_type, parser_context)
+
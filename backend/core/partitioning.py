@@ -0,0 +1,341 @@
+"""
+Monthly range partitioning of the busiest tables on PostgreSQL.
+
+Orders and till sales are range-partitioned by month on their timestamp,
+with their lines partitioned on a copy of the parent's timestamp so a month
+of orders and its lines are created and archived together. Queries that
+filter on the timestamp only scan the matching months. A default
+partition catches rows outside every month, e.g. from a till with a wrong
+clock; they move to their month when it is created.
+
+``manage_partitions`` keeps PARTITION_MONTHS_AHEAD months created ahead and
+detaches months older than PARTITION_RETENTION_MONTHS into the
+PARTITION_ARCHIVE_SCHEMA schema, where they stay queryable by SQL but no
+longer by the application.
+
+Foreign keys into the partitioned tables only survive from their lines,
+which carry the partition key; references from other tables (payments,
+order stages, till payments) are checked nightly by
+``dangling_references`` instead.
+
+PostgreSQL cannot enforce uniqueness across partitions, so on the
+partitioned tables number and idempotency key constraints include the
+timestamp. Numbers are unique by construction (core.numbering); writers of
+idempotent sales and orders serialise on their keys with ``guard_keys``
+instead. Nothing here applies to SQLite, which keeps plain tables.
+"""
+
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.apps import apps
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+# Table to the timestamp column it is partitioned on, parents first
+PARTITIONED_TABLES = {
+    'orders': 'created_at',
+    'order_items': 'created_at',
+    'pos_transactions': 'occurred_at',
+    'pos_transaction_items': 'occurred_at',
+}
+
+
+def supported(connection=None):
+    """Whether the database supports table partitioning."""
+    return (connection or connections[DEFAULT_DB_ALIAS]).vendor == 'postgresql'
+
+
+def month_start(day):
+    """First day of the month ``day`` falls in."""
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, count):
+    """First day of the month ``count`` months after ``month``."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    """Name of the partition holding ``month``."""
+    return f'{table}_p{month:%Y%m}'
+
+
+def default_partition_name(table):
+    return f'{table}_default'
+
+
+def bounds(month):
+    """UTC timestamps the month's partition starts at and stops before."""
+    return (
+        datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc),
+        datetime.combine(add_months(month, 1), datetime.min.time(), tzinfo=dt_timezone.utc),
+    )
+
+
+def create_partition_sql(table, month, quote_name):
+    """Statement creating the month's partition, with its bounds as parameters."""
+    return (
+        f'CREATE TABLE IF NOT EXISTS {quote_name(partition_name(table, month))} '
+        f'PARTITION OF {quote_name(table)} FOR VALUES FROM (%s) TO (%s)',
+        list(bounds(month)),
+    )
+
+
+def is_partitioned(cursor, table):
+    cursor.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = %s AND c.relnamespace = current_schema()::regnamespace)",
+        [table],
+    )
+    return cursor.fetchone()[0]
+
+
+def partitions(cursor, table):
+    """Monthly partitions attached to ``table``, by month."""
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = %s::regclass",
+        [table],
+    )
+    prefix = f'{table}_p'
+    return {
+        date(int(name[-6:-2]), int(name[-2:]), 1): name
+        for (name,) in cursor.fetchall()
+        if name.startswith(prefix) and name[len(prefix):].isdigit()
+    }
+
+
+def create_partitions(table, through, connection=None):
+    """
+    Create the monthly partitions of ``table`` missing up to ``through``.
+
+    Starts after the latest partition, or at the current month. Rows the
+    default partition holds for a new month are moved into it.
+
+    Returns:
+        Names of the partitions created
+    """
+    connection = connection or connections[DEFAULT_DB_ALIAS]
+    quote_name = connection.ops.quote_name
+    key = quote_name(PARTITIONED_TABLES[table])
+    default = quote_name(default_partition_name(table))
+    created = []
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor, table):
+            return created
+        existing = partitions(cursor, table)
+        month = add_months(max(existing), 1) if existing else month_start(timezone.now().date())
+        while month <= month_start(through):
+            sql, params = create_partition_sql(table, month, quote_name)
+            with transaction.atomic(using=connection.alias):
+                cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {default} WHERE {key} >= %s AND {key} < %s)', bounds(month))
+                if cursor.fetchone()[0]:
+                    cursor.execute(f'ALTER TABLE {quote_name(table)} DETACH PARTITION {default}')
+                    cursor.execute(sql, params)
+                    cursor.execute(
+                        f'INSERT INTO {quote_name(table)} SELECT * FROM {default} WHERE {key} >= %s AND {key} < %s',
+                        bounds(month),
+                    )
+                    cursor.execute(f'DELETE FROM {default} WHERE {key} >= %s AND {key} < %s', bounds(month))
+                    cursor.execute(f'ALTER TABLE {quote_name(table)} ATTACH PARTITION {default} DEFAULT')
+                else:
+                    cursor.execute(sql, params)
+            created.append(partition_name(table, month))
+            month = add_months(month, 1)
+    return created
+
+
+def archive_partitions(table, before, connection=None):
+    """
+    Detach the monthly partitions of ``table`` ending on or before ``before``
+    and move them to the archive schema.
+
+    Returns:
+        Names of the partitions archived
+    """
+    connection = connection or connections[DEFAULT_DB_ALIAS]
+    quote_name = connection.ops.quote_name
+    schema = quote_name(settings.PARTITION_ARCHIVE_SCHEMA)
+    archived = []
+    with connection.cursor() as cursor:
+        if not is_partitioned(cursor, table):
+            return archived
+        for month, name in sorted(partitions(cursor, table).items()):
+            if add_months(month, 1) > month_start(before):
+                break
+            with transaction.atomic(using=connection.alias):
+                cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {schema}')
+                cursor.execute(f'ALTER TABLE {quote_name(table)} DETACH PARTITION {quote_name(name)}')
+                cursor.execute(f'ALTER TABLE {quote_name(name)} SET SCHEMA {schema}')
+            archived.append(name)
+    return archived
+
+
+def partition_table(schema_editor, table, unique=()):
+    """
+    Rebuild ``table`` as a partitioned table with its rows, for migrations.
+
+    The primary key and each column group in ``unique`` become unique
+    together with the partition key. Plain indexes and outgoing foreign
+    keys are recreated. PostgreSQL cannot reference a partitioned table by
+    ``id`` alone, so foreign keys pointing at the table are recreated on
+    ``id`` and the partition key from the lines, which carry a copy of it,
+    and dropped from every other table; ``dangling_references`` finds the
+    rows those would have rejected. An identity ``id`` becomes a
+    sequence default. Partitions are created from
+    the month of the oldest row to PARTITION_MONTHS_AHEAD months ahead.
+    Does nothing on other databases.
+    """
+    connection = schema_editor.connection
+    if not supported(connection):
+        return
+    quote_name = schema_editor.quote_name
+    key = PARTITIONED_TABLES[table]
+    old = f'{table}_unpartitioned'
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_get_indexdef(indexrelid) FROM pg_index '
+            'WHERE indrelid = %s::regclass AND NOT indisunique AND NOT indisprimary',
+            [table],
+        )
+        indexes = [definition for (definition,) in cursor.fetchall()]
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype = 'f' AND conparentid = 0",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(
+            "SELECT c.conrelid::regclass::text, c.conname, a.attname "
+            "FROM pg_constraint c JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1] "
+            "WHERE c.confrelid = %s::regclass AND c.contype = 'f' AND c.conrelid <> c.confrelid "
+            "AND c.conparentid = 0",
+            [table],
+        )
+        references = cursor.fetchall()
+        for referencing, name, _ in references:
+            cursor.execute(f'ALTER TABLE {referencing} DROP CONSTRAINT {quote_name(name)}')
+        cursor.execute(
+            "SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass AND attidentity <> ''",
+            [table],
+        )
+        identities = [name for (name,) in cursor.fetchall()]
+        cursor.execute(f'SELECT min({quote_name(key)}) FROM {quote_name(table)}')
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(f'ALTER TABLE {quote_name(table)} RENAME TO {quote_name(old)}')
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p'",
+            [old],
+        )
+        cursor.execute(
+            f'ALTER TABLE {quote_name(old)} RENAME CONSTRAINT {quote_name(cursor.fetchone()[0])} '
+            f'TO {quote_name(f"{old}_pkey")}'
+        )
+        for column in identities:
+            # Renaming the table keeps its identity sequence's name, which the new table's sequence takes
+            cursor.execute(f'ALTER TABLE {quote_name(old)} ALTER COLUMN {quote_name(column)} DROP IDENTITY')
+        cursor.execute(
+            f'CREATE TABLE {quote_name(table)} (LIKE {quote_name(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+            f'PARTITION BY RANGE ({quote_name(key)})'
+        )
+        cursor.execute(f'ALTER TABLE {quote_name(table)} ADD PRIMARY KEY (id, {quote_name(key)})')
+        for columns in unique:
+            name = f"{table}_{'_'.join(columns)}_{key}_uniq"
+            cursor.execute(
+                f'ALTER TABLE {quote_name(table)} ADD CONSTRAINT {quote_name(name)} '
+                f"UNIQUE ({', '.join(quote_name(column) for column in (*columns, key))})"
+            )
+        for column in identities:
+            sequence = quote_name(f'{table}_{column}_seq')
+            cursor.execute(f'CREATE SEQUENCE {sequence} OWNED BY {quote_name(table)}.{quote_name(column)}')
+            cursor.execute(
+                f'SELECT setval(%s, coalesce(max({quote_name(column)}), 0) + 1, false) FROM {quote_name(old)}',
+                [f'{table}_{column}_seq'],
+            )
+            cursor.execute(
+                f"ALTER TABLE {quote_name(table)} ALTER COLUMN {quote_name(column)} SET DEFAULT nextval('{sequence}')"
+            )
+
+        month = month_start(oldest.date() if oldest else timezone.now().date())
+        through = add_months(month_start(timezone.now().date()), settings.PARTITION_MONTHS_AHEAD)
+        while month <= through:
+            cursor.execute(*create_partition_sql(table, month, quote_name))
+            month = add_months(month, 1)
+        cursor.execute(
+            f'CREATE TABLE {quote_name(default_partition_name(table))} PARTITION OF {quote_name(table)} DEFAULT'
+        )
+
+        cursor.execute(f'INSERT INTO {quote_name(table)} SELECT * FROM {quote_name(old)}')
+        cursor.execute(f'DROP TABLE {quote_name(old)}')
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {quote_name(table)} ADD CONSTRAINT {quote_name(name)} {definition}')
+        for referencing, name, column in references:
+            if PARTITIONED_TABLES.get(referencing) == key:
+                cursor.execute(
+                    f'ALTER TABLE {referencing} ADD CONSTRAINT {quote_name(name)} '
+                    f'FOREIGN KEY ({quote_name(column)}, {quote_name(key)}) '
+                    f'REFERENCES {quote_name(table)} (id, {quote_name(key)}) DEFERRABLE INITIALLY DEFERRED'
+                )
+
+
+def dangling_references(connection=None):
+    """
+    Count the rows whose foreign key names a missing row of a partitioned
+    table, for the references the database no longer enforces.
+
+    Returns:
+        List of ``(table, column, count)`` for every reference with
+        dangling rows; empty on other databases
+    """
+    connection = connection or connections[DEFAULT_DB_ALIAS]
+    if not supported(connection):
+        return []
+    quote_name = connection.ops.quote_name
+    found = []
+    with connection.cursor() as cursor:
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if not field.many_to_one and not field.one_to_one:
+                    continue
+                table, column = model._meta.db_table, field.column
+                target = field.related_model._meta.db_table
+                if target not in PARTITIONED_TABLES or PARTITIONED_TABLES.get(table) == PARTITIONED_TABLES[target]:
+                    continue
+                cursor.execute(
+                    f'SELECT count(*) FROM {quote_name(table)} r WHERE r.{quote_name(column)} IS NOT NULL '
+                    f'AND NOT EXISTS (SELECT 1 FROM {quote_name(target)} t WHERE t.id = r.{quote_name(column)})'
+                )
+                count = cursor.fetchone()[0]
+                if count:
+                    found.append((table, column, count))
+    return found
+
+
+def guard_keys(scope, keys):
+    """
+    Serialise writers of the same idempotency keys until the transaction ends.
+
+    Only needed, and only done, on PostgreSQL, where partitioned tables
+    cannot enforce unique keys. Call it inside the writing transaction.
+
+    Returns:
+        True if the keys were locked; the caller must then look for rows
+        already stored under them itself
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    if not supported(connection) or not keys:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_advisory_xact_lock(h) FROM ('
+            'SELECT DISTINCT hashtextextended(%s || k, 0) AS h FROM unnest(%s::text[]) AS k ORDER BY h'
+            ') AS keys',
+            [f'{scope}:', list(keys)],
+        )
+    return True
@@ -0,0 +1,35 @@
+"""
+Celery tasks for the core app.
+"""
+
+import logging
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from . import partitioning
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def create_table_partitions():
+    """Keep monthly partitions created PARTITION_MONTHS_AHEAD months ahead."""
+    if not partitioning.supported():
+        return []
+    through = partitioning.add_months(timezone.now().date(), settings.PARTITION_MONTHS_AHEAD)
+    return [
+        name
+        for table in partitioning.PARTITIONED_TABLES
+        for name in partitioning.create_partitions(table, through)
+    ]
+
+
+@shared_task
+def verify_partition_references():
+    """Log rows referencing partitioned rows that do not exist."""
+    dangling = partitioning.dangling_references()
+    for table, column, count in dangling:
+        logger.error('%s rows of %s reference a missing row through %s', count, table, column)
+    return len(dangling)
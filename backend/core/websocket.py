@@ -0,0 +1,41 @@
+"""
+WebSocket authentication for Channels consumers.
+
+Browsers cannot set an Authorization header on a WebSocket handshake, so the
+JWT access token is passed as ``?token=<access>`` instead.
+"""
+
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+
+@database_sync_to_async
+def _user_for(raw_token):
+    """Return the active user the access token belongs to, or an anonymous user"""
+    try:
+        token = AccessToken(raw_token)
+    except TokenError:
+        return AnonymousUser()
+    User = get_user_model()
+    try:
+        return User.objects.get(**{api_settings.USER_ID_FIELD: token[api_settings.USER_ID_CLAIM]}, is_active=True)
+    except (User.DoesNotExist, KeyError):
+        return AnonymousUser()
+
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Set ``scope['user']`` from the ``token`` query parameter.
+    """
+
+    async def __call__(self, scope, receive, send):
+        tokens = parse_qs(scope.get('query_string', b'').decode()).get('token')
+        scope['user'] = await _user_for(tokens[0]) if tokens else AnonymousUser()
+        return await super().__call__(scope, receive, send)